@@ -4,12 +4,43 @@ Ad scraping utilities for downloading videos from various platforms.
 
 import requests
 import re
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import subprocess
 import tempfile
 import os
 
 
+# Add custom user agent to avoid 403 errors
+YT_DLP_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+YT_DLP_FORMAT = 'best[height<=720]'
+
+
+def find_yt_dlp() -> Optional[List[str]]:
+    """
+    Locate a working yt-dlp executable.
+
+    Returns:
+        Base command as a list (e.g. ['yt-dlp'] or ['python3', '-m', 'yt_dlp']),
+        or None if yt-dlp is not installed
+    """
+    # Try multiple paths for yt-dlp
+    yt_dlp_paths = [
+        ['yt-dlp'],
+        ['/Users/julieschiller/Library/Python/3.9/bin/yt-dlp'],
+        ['python3', '-m', 'yt_dlp']
+    ]
+
+    for cmd in yt_dlp_paths:
+        try:
+            result = subprocess.run(cmd + ['--version'], capture_output=True)
+            if result.returncode == 0:
+                return cmd
+        except:
+            continue
+
+    return None
+
+
 class AdScraper:
     """Base class for ad scrapers"""
 
@@ -107,54 +138,20 @@ class YouTubeScraper(AdScraper):
             True if successful
         """
         try:
-            # Try multiple paths for yt-dlp
-            yt_dlp_paths = [
-                'yt-dlp',
-                '/Users/julieschiller/Library/Python/3.9/bin/yt-dlp',
-                'python3 -m yt_dlp'
-            ]
-
-            yt_dlp_cmd = None
-            for cmd_path in yt_dlp_paths:
-                try:
-                    if cmd_path.startswith('python3'):
-                        test_cmd = ['python3', '-m', 'yt_dlp', '--version']
-                    else:
-                        test_cmd = [cmd_path, '--version']
-
-                    result = subprocess.run(test_cmd, capture_output=True)
-                    if result.returncode == 0:
-                        yt_dlp_cmd = cmd_path
-                        break
-                except:
-                    continue
+            yt_dlp_cmd = find_yt_dlp()
 
             if not yt_dlp_cmd:
                 print("❌ yt-dlp not found. Install with: pip3 install yt-dlp")
                 return False
 
             # Download video (max 720p, mp4 format)
-            # Add custom user agent to avoid 403 errors
-            user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-
-            if yt_dlp_cmd.startswith('python3'):
-                cmd = [
-                    'python3', '-m', 'yt_dlp',
-                    url,
-                    '-f', 'best[height<=720]',
-                    '-o', output_path,
-                    '--no-playlist',
-                    '--user-agent', user_agent
-                ]
-            else:
-                cmd = [
-                    yt_dlp_cmd,
-                    url,
-                    '-f', 'best[height<=720]',
-                    '-o', output_path,
-                    '--no-playlist',
-                    '--user-agent', user_agent
-                ]
+            cmd = yt_dlp_cmd + [
+                url,
+                '-f', YT_DLP_FORMAT,
+                '-o', output_path,
+                '--no-playlist',
+                '--user-agent', YT_DLP_USER_AGENT
+            ]
 
             result = subprocess.run(cmd, capture_output=True, text=True)
             if result.returncode == 0:
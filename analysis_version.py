@@ -0,0 +1,76 @@
+"""
+Version stamps for stored analyses.
+
+Nothing used to record which prompt, framework or model settings an ad
+was scored with, so after any edit the only safe option was re-running
+the whole archive. Each stored analysis now carries a 'version' stamp:
+a hash per component (the prompt templates the current settings send,
+the scoring framework, the model settings) and one over all three.
+`simple_pipeline.py reanalyze --stale` compares the stamps with the
+current version and re-runs only the ads whose components differ.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+COMPONENTS = ('prompt', 'framework', 'model')
+
+# Stale reason for analyses stored before stamping
+UNVERSIONED = 'unversioned'
+
+# Stale reason for split analyses stored with failed parts (never stamped)
+INCOMPLETE = 'incomplete'
+
+
+def component_hash(value) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def _stamp(prompts: List[str], framework: Dict, model: Dict) -> Dict:
+    stamp = {'prompt': component_hash(prompts), 'framework': component_hash(framework),
+             'model': component_hash(model)}
+    stamp['hash'] = component_hash([stamp[name] for name in COMPONENTS])
+    return stamp
+
+
+def video_version(framework: Optional[Dict] = None) -> Dict:
+    """Stamp for a video analysis with the current video_config (single or split requests)"""
+    from config import video_config
+    from prompt_compiler import default_framework, video_part_prompt, video_prompt, video_split_parts
+
+    framework = framework or default_framework()
+    if video_config.split_requests:
+        prompts = [video_part_prompt(part, dimensions, '', 'auto', framework)
+                   for part, dimensions in video_split_parts(framework, video_config.split_group_size)]
+        max_output_tokens = video_config.split_max_output_tokens
+    else:
+        prompts = [video_prompt('', 'auto', framework)]
+        max_output_tokens = video_config.max_output_tokens
+
+    model = {'model': video_config.model_name, 'temperature': video_config.temperature,
+             'max_output_tokens': max_output_tokens, 'use_proxy': video_config.use_proxy}
+    if video_config.use_proxy:
+        from video_proxy import proxy_settings
+
+        model['proxy'] = proxy_settings()
+    return _stamp(prompts, framework, model)
+
+
+def image_version() -> Dict:
+    """Stamp for an image analysis (single and packed prompts share it)"""
+    from image_analysis import GENERATION_CONFIG, IMAGE_MODEL, create_analysis_prompt, create_packed_prompt
+    from prompt_compiler import default_framework
+
+    prompts = [create_analysis_prompt(''), create_packed_prompt([''])]
+    return _stamp(prompts, default_framework(), {'model': IMAGE_MODEL, **GENERATION_CONFIG})
+
+
+def stale_reasons(stamp: Optional[Dict], current: Dict) -> List[str]:
+    """Components that differ from the current version ([] if up to date)"""
+    if not isinstance(stamp, dict) or 'hash' not in stamp:
+        return [UNVERSIONED]
+    if stamp['hash'] == current['hash']:
+        return []
+    return [name for name in COMPONENTS if stamp.get(name) != current[name]]
@@ -1,22 +1,23 @@
 import streamlit as st
-import google.generativeai as genai
 import base64
-from PIL import Image, ImageDraw, ImageFont
+import collections.abc
+import hashlib
 import io
 import json
-import plotly.graph_objects as go
-from typing import Dict, List
+import threading
+import typing
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, List
 from datetime import datetime
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image as RLImage
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-import pandas as pd
+from framework import FRAMEWORK
+from image_analysis import IMAGE_MODEL, ResponseParseError, analyze_image, detect_language
+from model_backend import get_backend
+from profiling import profiled
+
+# Plotly, PIL, ReportLab and pandas are imported in the functions that use
+# them, so a page load only pays for what it renders
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # Page config
 st.set_page_config(
@@ -32,6 +33,8 @@ if 'analysis_history' not in st.session_state:
 # Helper function to create realistic example ad images
 def create_example_image(ad_type: str) -> bytes:
     """Create a realistic-looking placeholder image for example ads"""
+    from PIL import Image, ImageDraw, ImageFont
+
     # Create image with appropriate theme
     img = Image.new('RGB', (1200, 800), color=(255, 255, 255))
     draw = ImageDraw.Draw(img)
@@ -165,74 +168,6 @@ Hozz bármilyen ruhadarabot - akár a miénk, akár nem - ingyen segítünk megj
     }
 }
 
-# Scoring framework definition (English and Hungarian)
-FRAMEWORK = {
-    "Climate Responsibility": {
-        "weight": 0.25,
-        "indicators": [
-            "Sustainability messaging presence and authenticity",
-            "Absence of greenwashing or exaggerated claims",
-            "Climate-positive products/behaviors shown",
-            "Transparency in environmental framing"
-        ],
-        "hu_name": "Klímafelelősség",
-        "hu_indicators": [
-            "Fenntarthatósági üzenetek jelenléte és hitelessége",
-            "Zöldre festés és túlzó állítások hiánya",
-            "Klímapozitív termékek/viselkedések bemutatása",
-            "Átláthatóság a környezeti kommunikációban"
-        ]
-    },
-    "Social Responsibility": {
-        "weight": 0.25,
-        "indicators": [
-            "Diversity in representation (gender, race, age, body type, ability)",
-            "Avoidance of harmful stereotypes",
-            "Empowering depiction of underrepresented groups",
-            "Inclusive language and messaging"
-        ],
-        "hu_name": "Társadalmi Felelősség",
-        "hu_indicators": [
-            "Sokszínűség a megjelenítésben (nem, faj, kor, testalkat, képesség)",
-            "Káros sztereotípiák elkerülése",
-            "Alulreprezentált csoportok megerősítő ábrázolása",
-            "Befogadó nyelvezet és üzenet"
-        ]
-    },
-    "Cultural Sensitivity": {
-        "weight": 0.25,
-        "indicators": [
-            "Respectful use of cultural symbols and traditions",
-            "Sensitivity to local norms and values",
-            "Awareness of geopolitical contexts",
-            "Balance between global and local resonance"
-        ],
-        "hu_name": "Kulturális Érzékenység",
-        "hu_indicators": [
-            "Kulturális szimbólumok és hagyományok tiszteletteljes használata",
-            "Érzékenység a helyi normák és értékek iránt",
-            "Geopolitikai kontextusok tudatossága",
-            "Egyensúly a globális és helyi rezonancia között"
-        ]
-    },
-    "Ethical Communication": {
-        "weight": 0.25,
-        "indicators": [
-            "Transparency in intent and disclosures",
-            "Avoidance of manipulative techniques",
-            "Truthful and verifiable claims",
-            "Encouragement of informed choice over exploitation"
-        ],
-        "hu_name": "Etikus Kommunikáció",
-        "hu_indicators": [
-            "Átláthatóság a szándékban és közlésekben",
-            "Manipulatív technikák elkerülése",
-            "Igazolható és valós állítások",
-            "Tájékozott döntéshozatal ösztönzése a kizsákmányolás helyett"
-        ]
-    }
-}
-
 # Language-specific UI text
 UI_TEXT = {
     "en": {
@@ -261,217 +196,53 @@ UI_TEXT = {
     }
 }
 
-def detect_language(text: str) -> str:
-    """Detect if the text is primarily Hungarian or English"""
-    # Simple detection based on common Hungarian characters and words
-    hungarian_chars = sum(1 for c in text if c in 'áéíóöőúüűÁÉÍÓÖŐÚÜŰ')
-    hungarian_words = ['és', 'hogy', 'van', 'nem', 'egy', 'az', 'ezt', 'csak', 'még', 'vagy']
-    hungarian_word_count = sum(1 for word in hungarian_words if word in text.lower())
-
-    if hungarian_chars > 5 or hungarian_word_count > 2:
-        return 'hu'
-    return 'en'
-
-def create_analysis_prompt(ad_copy: str, output_language: str = 'bilingual') -> str:
-    """Create the prompt for Gemini to analyze the ad with language support"""
-
-    # Detect the ad language
-    ad_language = detect_language(ad_copy)
-
-    if output_language == 'bilingual' or ad_language == 'hu':
-        # Bilingual prompt for Hungarian ads or when bilingual output is requested
-        prompt = f"""You are an expert in responsible advertising assessment. Analyze this advertisement across four key dimensions.
-
-IMPORTANT: This ad may be in Hungarian. Please provide your analysis in BOTH English and Hungarian for maximum accessibility.
-
-ADVERTISEMENT COPY:
-{ad_copy}
-
-FRAMEWORK / KERETRENDSZER:
-{json.dumps(FRAMEWORK, indent=2)}
-
-Please analyze this ad and provide:
-
-1. A score (0-100) for each of the four dimensions:
-   - Climate Responsibility / Klímafelelősség
-   - Social Responsibility / Társadalmi Felelősség
-   - Cultural Sensitivity / Kulturális Érzékenység
-   - Ethical Communication / Etikus Kommunikáció
-
-2. For each dimension, provide:
-   - The score
-   - 2-3 key findings in BOTH English and Hungarian (both strengths and risks)
-   - Specific examples from the ad
-
-3. An overall Responsibility Score (weighted average of the four dimensions)
-
-4. A summary with:
-   - Top 3 strengths (in both English and Hungarian)
-   - Top 3 areas of concern or risk (in both English and Hungarian)
-   - 2-3 recommendations for improvement (in both English and Hungarian)
-
-CRITICAL: For Hungarian ads, be sensitive to Hungarian cultural context, local norms, and language nuances.
-
-Please return your response in this EXACT JSON format (no markdown, just pure JSON):
-{{
-    "overall_score": <number 0-100>,
-    "ad_language": "{ad_language}",
-    "dimensions": {{
-        "Climate Responsibility": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1 (EN)", "finding 2 (EN)", "finding 3 (EN)"],
-            "findings_hu": ["megállapítás 1 (HU)", "megállapítás 2 (HU)", "megállapítás 3 (HU)"]
-        }},
-        "Social Responsibility": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1 (EN)", "finding 2 (EN)", "finding 3 (EN)"],
-            "findings_hu": ["megállapítás 1 (HU)", "megállapítás 2 (HU)", "megállapítás 3 (HU)"]
-        }},
-        "Cultural Sensitivity": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1 (EN)", "finding 2 (EN)", "finding 3 (EN)"],
-            "findings_hu": ["megállapítás 1 (HU)", "megállapítás 2 (HU)", "megállapítás 3 (HU)"]
-        }},
-        "Ethical Communication": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1 (EN)", "finding 2 (EN)", "finding 3 (EN)"],
-            "findings_hu": ["megállapítás 1 (HU)", "megállapítás 2 (HU)", "megállapítás 3 (HU)"]
-        }}
-    }},
-    "summary": {{
-        "strengths": ["strength 1 (EN)", "strength 2 (EN)", "strength 3 (EN)"],
-        "strengths_hu": ["erősség 1 (HU)", "erősség 2 (HU)", "erősség 3 (HU)"],
-        "concerns": ["concern 1 (EN)", "concern 2 (EN)", "concern 3 (EN)"],
-        "concerns_hu": ["aggály 1 (HU)", "aggály 2 (HU)", "aggály 3 (HU)"],
-        "recommendations": ["rec 1 (EN)", "rec 2 (EN)", "rec 3 (EN)"],
-        "recommendations_hu": ["ajánlás 1 (HU)", "ajánlás 2 (HU)", "ajánlás 3 (HU)"]
-    }}
-}}
-
-Be specific and reference actual elements from the ad copy and image. For Hungarian content, maintain cultural sensitivity and understanding of local context."""
-    else:
-        # English-only prompt for English ads
-        prompt = f"""You are an expert in responsible advertising assessment. Analyze this advertisement across four key dimensions.
-
-ADVERTISEMENT COPY:
-{ad_copy}
-
-FRAMEWORK:
-{json.dumps(FRAMEWORK, indent=2)}
-
-Please analyze this ad and provide:
-
-1. A score (0-100) for each of the four dimensions:
-   - Climate Responsibility
-   - Social Responsibility
-   - Cultural Sensitivity
-   - Ethical Communication
-
-2. For each dimension, provide:
-   - The score
-   - 2-3 key findings (both strengths and risks)
-   - Specific examples from the ad
-
-3. An overall Responsibility Score (weighted average of the four dimensions)
-
-4. A summary with:
-   - Top 3 strengths
-   - Top 3 areas of concern or risk
-   - 2-3 recommendations for improvement
-
-Please return your response in this EXACT JSON format (no markdown, just pure JSON):
-{{
-    "overall_score": <number 0-100>,
-    "ad_language": "en",
-    "dimensions": {{
-        "Climate Responsibility": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1", "finding 2", "finding 3"]
-        }},
-        "Social Responsibility": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1", "finding 2", "finding 3"]
-        }},
-        "Cultural Sensitivity": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1", "finding 2", "finding 3"]
-        }},
-        "Ethical Communication": {{
-            "score": <number 0-100>,
-            "findings": ["finding 1", "finding 2", "finding 3"]
-        }}
-    }},
-    "summary": {{
-        "strengths": ["strength 1", "strength 2", "strength 3"],
-        "concerns": ["concern 1", "concern 2", "concern 3"],
-        "recommendations": ["rec 1", "rec 2", "rec 3"]
-    }}
-}}
-
-Be specific and reference actual elements from the ad copy and image."""
-
-    return prompt
-
 def analyze_ad(image_data: bytes, ad_copy: str, api_key: str) -> Dict:
-    """Send the ad to Gemini for analysis"""
-    
-    # Configure Gemini
-    genai.configure(api_key=api_key)
-    
-    # Use Gemini 2.5 Flash
-    model = genai.GenerativeModel('models/gemini-2.5-flash')
-    
-    # Open image
-    img = Image.open(io.BytesIO(image_data))
-    
-    # Create the prompt
-    prompt = create_analysis_prompt(ad_copy)
-    
+    """
+    Send the ad to Gemini for analysis
+    The image is downsized and re-encoded first; near-identical creatives
+    with the same copy are served from the shared result cache (image_cache.py)
+    """
+    # Use Gemini 2.5 Flash (or the offline stand-in, see model_backend.py)
+    backend = get_backend(api_key, IMAGE_MODEL)
+
     try:
-        # Generate content with both image and text
-        response = model.generate_content(
-            [prompt, img],
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.4,
-                max_output_tokens=8000,  # Increased for bilingual detailed output
-            )
-        )
-        
-        # Get the response text
-        response_text = response.text
-        
-        # Parse JSON from response
-        try:
-            # Try to find JSON in the response
-            # Remove markdown code blocks if present
-            if "```json" in response_text:
-                start_idx = response_text.find("```json") + 7
-                end_idx = response_text.find("```", start_idx)
-                json_str = response_text[start_idx:end_idx].strip()
-            elif "```" in response_text:
-                start_idx = response_text.find("```") + 3
-                end_idx = response_text.find("```", start_idx)
-                json_str = response_text[start_idx:end_idx].strip()
-            else:
-                # Try to find JSON object directly
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
-                json_str = response_text[start_idx:end_idx]
-            
-            result = json.loads(json_str)
-            return result
-        except json.JSONDecodeError as e:
-            st.error("Error parsing AI response. Raw response:")
-            st.code(response_text)
-            st.error(f"JSON Error: {str(e)}")
-            return None
-            
+        analysis = analyze_image(image_data, ad_copy, backend)
+    except ResponseParseError as e:
+        st.error("Error parsing AI response. Raw response:")
+        st.code(e.response_text)
+        st.error(str(e))
+        return None
     except Exception as e:
         st.error(f"Error calling Gemini API: {str(e)}")
         return None
 
-def create_radar_chart(scores: Dict, ad_name: str = "Ad") -> go.Figure:
+    if analysis['cached']:
+        st.info("♻️ Reused the analysis of an identical or near-identical creative with the same copy")
+    return analysis['result']
+
+def hungarian_result(result: Dict, api_key: str) -> Dict:
+    """
+    The result with its _hu lists for the Hungarian interface
+    Analyses are generated in English; missing Hungarian versions come from
+    one cached translation request (translation.py)
+    """
+    from config import translation_config
+    from translation import needs_translation, translate_result
+
+    if not api_key or not needs_translation(result):
+        return result
+
+    backend = get_backend(api_key, translation_config.model_name)
+    try:
+        with st.spinner("Fordítás magyarra... / Translating to Hungarian..."):
+            return translate_result(result, backend)
+    except Exception as e:
+        st.warning(f"Hungarian translation unavailable: {str(e)}")
+        return result
+
+def create_radar_chart(scores: Dict, ad_name: str = "Ad") -> 'go.Figure':
     """Create a radar chart for the four dimensions"""
+    import plotly.graph_objects as go
     
     categories = list(scores.keys())
     values = [scores[cat]["score"] for cat in categories]
@@ -508,8 +279,9 @@ def create_radar_chart(scores: Dict, ad_name: str = "Ad") -> go.Figure:
     
     return fig
 
-def create_comparison_radar_chart(analyses: List[Dict]) -> go.Figure:
+def create_comparison_radar_chart(analyses: List[Dict]) -> 'go.Figure':
     """Create an overlay radar chart comparing multiple ads"""
+    import plotly.graph_objects as go
     
     fig = go.Figure()
     
@@ -566,8 +338,9 @@ def create_comparison_radar_chart(analyses: List[Dict]) -> go.Figure:
     
     return fig
 
-def create_gauge_chart(score: float) -> go.Figure:
+def create_gauge_chart(score: float) -> 'go.Figure':
     """Create a gauge chart for the overall score"""
+    import plotly.graph_objects as go
     
     # Determine color based on score
     if score >= 80:
@@ -606,351 +379,105 @@ def create_gauge_chart(score: float) -> go.Figure:
     return fig
 
 def export_to_excel(analyses: List[Dict]) -> bytes:
-    """Export analysis results to Excel format"""
-    
-    # Create DataFrame
-    data = []
-    for analysis in analyses:
-        result = analysis['result']
-        row = {
-            'Brand': analysis.get('brand_name') or analysis.get('brand', 'Unknown'),
-            'Analysis Date': analysis['timestamp'],
-            'Overall Score': result['overall_score'],
-            'Climate Responsibility': result['dimensions']['Climate Responsibility']['score'],
-            'Social Responsibility': result['dimensions']['Social Responsibility']['score'],
-            'Cultural Sensitivity': result['dimensions']['Cultural Sensitivity']['score'],
-            'Ethical Communication': result['dimensions']['Ethical Communication']['score'],
-            'Rating': '⭐⭐⭐⭐⭐' if result['overall_score'] >= 90 else (
-                     '⭐⭐⭐⭐' if result['overall_score'] >= 75 else (
-                     '⭐⭐⭐' if result['overall_score'] >= 60 else '⭐⭐')),
-            'Key Strengths': ' | '.join(result['summary']['strengths']),
-            'Key Concerns': ' | '.join(result['summary']['concerns']),
-            'Recommendations': ' | '.join(result['summary']['recommendations']),
-            'Ad Copy (excerpt)': (analysis.get('ad_copy', '')[:200] + '...' if len(analysis.get('ad_copy', '')) > 200 else analysis.get('ad_copy', 'N/A'))
-        }
-        data.append(row)
-    
-    df = pd.DataFrame(data)
-    
-    # Create Excel file in memory
+    """Export analysis results to Excel format (summary, findings and scenes sheets)"""
+    from excel_export import write_analyses_xlsx
+
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='RAI Analysis', index=False)
-        
-        # Get the workbook and worksheet
-        workbook = writer.book
-        worksheet = writer.sheets['RAI Analysis']
-        
-        # Adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
+    write_analyses_xlsx(analyses, output)
     return output.getvalue()
 
 def generate_pdf_report(result: Dict, brand_name: str = "Unknown Brand", ad_copy: str = "") -> bytes:
     """Generate a PDF report of the analysis"""
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
-    # Title
-    title = Paragraph("Responsible Advertising Index", title_style)
-    elements.append(title)
-    
-    subtitle = Paragraph(f"Analysis Report - {brand_name}", styles['Heading2'])
-    elements.append(subtitle)
-    
-    date_para = Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles['Normal'])
-    elements.append(date_para)
-    elements.append(Spacer(1, 20))
-    
-    # Executive Summary Box
-    exec_summary = Paragraph("Executive Summary", heading_style)
-    elements.append(exec_summary)
-    
-    overall_score = result['overall_score']
-    score_color = colors.green if overall_score >= 80 else (colors.orange if overall_score >= 60 else colors.red)
-    
-    summary_data = [
-        ['Overall Responsibility Score', f"{overall_score}/100"],
-        ['Rating', 'Excellent' if overall_score >= 80 else ('Good' if overall_score >= 60 else 'Needs Improvement')]
-    ]
-    
-    summary_table = Table(summary_data, colWidths=[4*inch, 2*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, 0), score_color),
-        ('TEXTCOLOR', (1, 0), (1, 0), colors.white),
-    ]))
-    
-    elements.append(summary_table)
-    elements.append(Spacer(1, 20))
-    
-    # Dimension Scores
-    dimensions_header = Paragraph("Dimension Scores", heading_style)
-    elements.append(dimensions_header)
-    
-    dim_data = [['Dimension', 'Score', 'Assessment']]
-    for dim_name, dim_data_dict in result['dimensions'].items():
-        score = dim_data_dict['score']
-        assessment = '⭐⭐⭐⭐⭐' if score >= 90 else ('⭐⭐⭐⭐' if score >= 75 else ('⭐⭐⭐' if score >= 60 else '⭐⭐'))
-        dim_data.append([dim_name, f"{score}/100", assessment])
-    
-    dim_table = Table(dim_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
-    dim_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-    ]))
-    
-    elements.append(dim_table)
-    elements.append(Spacer(1, 20))
-    
-    # Key Findings
-    findings_header = Paragraph("Detailed Findings", heading_style)
-    elements.append(findings_header)
-    
-    for dim_name, dim_data_dict in result['dimensions'].items():
-        dim_title = Paragraph(f"<b>{dim_name}</b> ({dim_data_dict['score']}/100)", styles['Heading3'])
-        elements.append(dim_title)
-        
-        for finding in dim_data_dict['findings']:
-            finding_para = Paragraph(f"• {finding}", styles['Normal'])
-            elements.append(finding_para)
-        
-        elements.append(Spacer(1, 10))
-    
-    # Page break before summary
-    elements.append(PageBreak())
-    
-    # Strengths
-    strengths_header = Paragraph("Key Strengths", heading_style)
-    elements.append(strengths_header)
-    
-    for strength in result['summary']['strengths']:
-        strength_para = Paragraph(f"✓ {strength}", styles['Normal'])
-        elements.append(strength_para)
-    
-    elements.append(Spacer(1, 15))
-    
-    # Concerns
-    concerns_header = Paragraph("Areas of Concern", heading_style)
-    elements.append(concerns_header)
-    
-    for concern in result['summary']['concerns']:
-        concern_para = Paragraph(f"⚠ {concern}", styles['Normal'])
-        elements.append(concern_para)
-    
-    elements.append(Spacer(1, 15))
-    
-    # Recommendations
-    recs_header = Paragraph("Recommendations", heading_style)
-    elements.append(recs_header)
-    
-    for i, rec in enumerate(result['summary']['recommendations'], 1):
-        rec_para = Paragraph(f"{i}. {rec}", styles['Normal'])
-        elements.append(rec_para)
-    
-    elements.append(Spacer(1, 30))
-    
-    # Footer
-    footer = Paragraph("This report was generated by the Responsible Advertising Index assessment tool.", 
-                      styles['Italic'])
-    elements.append(footer)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Get the value of the BytesIO buffer
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    
-    return pdf_bytes
+    from pdf_reports import render_ad_report
+
+    return render_ad_report(result, brand_name, ad_copy)
 
 def generate_comparison_pdf(analyses: List[Dict]) -> bytes:
     """Generate a comparison PDF report for multiple ads"""
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
-    # Title
-    title = Paragraph("Responsible Advertising Index", title_style)
-    elements.append(title)
-    
-    subtitle = Paragraph(f"Comparison Report - {len(analyses)} Advertisements", styles['Heading2'])
-    elements.append(subtitle)
-    
-    date_para = Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles['Normal'])
-    elements.append(date_para)
-    elements.append(Spacer(1, 20))
-    
-    # Comparison Summary Table
-    comp_header = Paragraph("Overall Comparison", heading_style)
-    elements.append(comp_header)
-    
-    # Create comparison table
-    table_data = [['Brand', 'Overall Score', 'Climate', 'Social', 'Cultural', 'Ethical']]
-    
-    for analysis in analyses:
-        result = analysis['result']
-        row = [
-            analysis['brand_name'],
-            f"{result['overall_score']}/100",
-            f"{result['dimensions']['Climate Responsibility']['score']}",
-            f"{result['dimensions']['Social Responsibility']['score']}",
-            f"{result['dimensions']['Cultural Sensitivity']['score']}",
-            f"{result['dimensions']['Ethical Communication']['score']}"
-        ]
-        table_data.append(row)
-    
-    comp_table = Table(table_data, colWidths=[2*inch, 1*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch])
-    comp_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-    ]))
-    
-    elements.append(comp_table)
-    elements.append(Spacer(1, 20))
-    
-    # Winner section
-    winner = max(analyses, key=lambda x: x['result']['overall_score'])
-    winner_header = Paragraph("🏆 Highest Score", heading_style)
-    elements.append(winner_header)
-    
-    winner_text = Paragraph(
-        f"<b>{winner['brand_name']}</b> achieved the highest overall score of "
-        f"<b>{winner['result']['overall_score']}/100</b>",
-        styles['Normal']
-    )
-    elements.append(winner_text)
-    elements.append(Spacer(1, 30))
-    
-    # Individual analyses
-    for idx, analysis in enumerate(analyses, 1):
-        elements.append(PageBreak())
-        
-        brand_header = Paragraph(f"Advertisement {idx}: {analysis['brand_name']}", heading_style)
-        elements.append(brand_header)
-        
-        result = analysis['result']
-        
-        # Score summary
-        score_data = [
-            ['Overall Score', f"{result['overall_score']}/100"],
-            ['Climate Responsibility', f"{result['dimensions']['Climate Responsibility']['score']}/100"],
-            ['Social Responsibility', f"{result['dimensions']['Social Responsibility']['score']}/100"],
-            ['Cultural Sensitivity', f"{result['dimensions']['Cultural Sensitivity']['score']}/100"],
-            ['Ethical Communication', f"{result['dimensions']['Ethical Communication']['score']}/100"]
-        ]
-        
-        score_table = Table(score_data, colWidths=[3*inch, 2*inch])
-        score_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        
-        elements.append(score_table)
-        elements.append(Spacer(1, 15))
-        
-        # Key strengths
-        strengths_para = Paragraph("<b>Key Strengths:</b>", styles['Normal'])
-        elements.append(strengths_para)
-        for strength in result['summary']['strengths']:
-            elements.append(Paragraph(f"✓ {strength}", styles['Normal']))
-        
-        elements.append(Spacer(1, 10))
-        
-        # Key concerns
-        concerns_para = Paragraph("<b>Areas of Concern:</b>", styles['Normal'])
-        elements.append(concerns_para)
-        for concern in result['summary']['concerns']:
-            elements.append(Paragraph(f"⚠ {concern}", styles['Normal']))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    
-    return pdf_bytes
+    from pdf_reports import render_comparison_report
+
+    return render_comparison_report(analyses)
+
+def export_history_json(analyses: List[Dict]) -> str:
+    """Analysis history as JSON (datetime timestamps become ISO strings)"""
+    history_serializable = []
+    for item in analyses:
+        item_copy = item.copy()
+        if 'timestamp' in item_copy and isinstance(item_copy['timestamp'], datetime):
+            item_copy['timestamp'] = item_copy['timestamp'].isoformat()
+        history_serializable.append(item_copy)
+
+    return json.dumps(history_serializable, indent=2)
+
+# Rendered export files, keyed by builder and a hash of its inputs
+EXPORT_CACHE_SIZE = 16
+_export_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_export_cache_lock = threading.Lock()
+
+def cached_export(builder: Callable, *inputs):
+    """
+    Build an export file, or return the copy rendered earlier for the same inputs.
+
+    Args:
+        builder: Export function (generate_pdf_report, export_to_excel, ...)
+        *inputs: Its arguments (JSON-serializable apart from datetimes)
+
+    Returns:
+        The builder's output
+    """
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"{builder.__name__}:{digest}"
+
+    with _export_cache_lock:
+        if key in _export_cache:
+            _export_cache.move_to_end(key)
+            return _export_cache[key]
+
+    data = builder(*inputs)
+
+    with _export_cache_lock:
+        _export_cache[key] = data
+        while len(_export_cache) > EXPORT_CACHE_SIZE:
+            _export_cache.popitem(last=False)
+    return data
+
+def _supports_deferred_downloads(download_button: Callable = None) -> bool:
+    """True if st.download_button's data parameter accepts a callable that runs on click"""
+    try:
+        data_type = typing.get_type_hints(download_button or st.download_button).get('data')
+    except Exception:
+        # Annotations that don't resolve: assume the older, eager API
+        return False
+    options = typing.get_args(data_type) or (data_type,)
+    return any(typing.get_origin(option) is collections.abc.Callable for option in options)
+
+DEFERRED_DOWNLOADS = _supports_deferred_downloads()
+
+def export_button(label: str, builder: Callable, inputs: tuple, file_name: str, mime: str, key: str):
+    """
+    Download button whose file is rendered only when it's needed.
+
+    Reruns that don't download anything never call the builder. On Streamlit
+    versions with deferred downloads the file is built on click; on older ones
+    a "Prepare" click builds it and the download button appears.
+    """
+    if DEFERRED_DOWNLOADS:
+        st.download_button(label=label, data=lambda: cached_export(builder, *inputs),
+                           file_name=file_name, mime=mime, key=key, use_container_width=True)
+        return
+
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+    prepared = st.session_state.get(f"export_{key}")
+    if prepared and prepared[0] == digest:
+        st.download_button(label=label, data=prepared[1], file_name=file_name, mime=mime,
+                           key=key, use_container_width=True)
+    elif st.button(f"⚙️ Prepare: {label}", key=f"prepare_{key}", use_container_width=True):
+        with st.spinner("Rendering..."):
+            st.session_state[f"export_{key}"] = (digest, cached_export(builder, *inputs))
+        st.rerun()
 
 # Main app
+@profiled('app')
 def main():
     # Initialize language preference in session state
     if 'display_language' not in st.session_state:
@@ -1014,6 +541,12 @@ def main():
         st.header("📚 Analysis History")
         history_count = len(st.session_state.analysis_history)
         st.metric("Total Analyses", history_count)
+
+        import image_cache
+        if image_cache.stats['hits'] + image_cache.stats['misses']:
+            saved = 1 - image_cache.stats['bytes_sent'] / max(image_cache.stats['bytes_uploaded'], 1)
+            st.caption(f"♻️ Image cache: {image_cache.stats['hits']} hits, {image_cache.stats['misses']} API calls, "
+                       f"{saved:.0%} fewer image bytes sent")
         
         if history_count > 0:
             if st.button("🗑️ Clear History", use_container_width=True):
@@ -1159,6 +692,8 @@ def main():
         # Display results if available
         if 'result' in st.session_state:
             result = st.session_state['result']
+            if st.session_state.display_language == 'hu':
+                result = st.session_state['result'] = hungarian_result(result, api_key)
             brand_name = st.session_state.get('current_brand', 'Unknown Brand')
             ad_copy = st.session_state.get('current_copy', '')
             
@@ -1311,14 +846,14 @@ def main():
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                # PDF Download
-                pdf_bytes = generate_pdf_report(result, brand_name, ad_copy)
-                st.download_button(
+                # PDF Download (rendered on click)
+                export_button(
                     label="📄 Download PDF Report",
-                    data=pdf_bytes,
+                    builder=generate_pdf_report,
+                    inputs=(result, brand_name, ad_copy),
                     file_name=f"RAI_Report_{brand_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf",
                     mime="application/pdf",
-                    use_container_width=True
+                    key="pdf_report"
                 )
             
             with col2:
@@ -1366,10 +901,8 @@ def main():
                 try:
                     from video_utils import get_video_metadata, format_duration, estimate_cost
 
-                    video_bytes = uploaded_video.read()
-                    uploaded_video.seek(0)  # Reset for later use
-
-                    metadata = get_video_metadata(video_bytes)
+                    # Header parse on a zero-copy view of the upload (runs every rerun)
+                    metadata = get_video_metadata(uploaded_video.getbuffer())
 
                     col_a, col_b, col_c = st.columns(3)
                     col_a.metric("File Size", f"{metadata['size_mb']:.1f} MB")
@@ -1531,8 +1064,10 @@ def main():
                     # Detailed findings per dimension
                     st.subheader("🔍 Detailed Findings")
 
-                    # Determine which language to show first
-                    show_language = result.get('detected_language', 'en')  # Use detected language from analysis
+                    # Show the interface language first (Hungarian versions are translated on demand)
+                    show_language = st.session_state.display_language
+                    if show_language == 'hu':
+                        result = hungarian_result(result, api_key)
 
                     for dim_name, dim_data in result.get('dimensions', {}).items():
                         with st.expander(f"{dim_name}: {dim_data.get('score', 0)}/100"):
@@ -1632,6 +1167,7 @@ def main():
                         'Ethical': result['dimensions']['Ethical Communication']['score']
                     })
                 
+                import pandas as pd
                 comp_df = pd.DataFrame(comp_data)
                 
                 # Highlight winner
@@ -1690,25 +1226,25 @@ def main():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    # Comparison PDF
-                    comp_pdf_bytes = generate_comparison_pdf(selected_analyses)
-                    st.download_button(
+                    # Comparison PDF (rendered on click)
+                    export_button(
                         label="📄 Download Comparison PDF",
-                        data=comp_pdf_bytes,
+                        builder=generate_comparison_pdf,
+                        inputs=(selected_analyses,),
                         file_name=f"RAI_Comparison_{len(selected_analyses)}ads_{datetime.now().strftime('%Y%m%d')}.pdf",
                         mime="application/pdf",
-                        use_container_width=True
+                        key="comparison_pdf"
                     )
                 
                 with col2:
-                    # Comparison Excel
-                    comp_excel_bytes = export_to_excel(selected_analyses)
-                    st.download_button(
+                    # Comparison Excel (rendered on click)
+                    export_button(
                         label="📊 Download Comparison Excel",
-                        data=comp_excel_bytes,
+                        builder=export_to_excel,
+                        inputs=(selected_analyses,),
                         file_name=f"RAI_Comparison_{len(selected_analyses)}ads_{datetime.now().strftime('%Y%m%d')}.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
+                        key="comparison_excel"
                     )
             
             elif len(selected_ad_names) == 1:
@@ -1737,6 +1273,7 @@ def main():
                     'Social': result['dimensions']['Social Responsibility']['score']
                 })
             
+            import pandas as pd
             preview_df = pd.DataFrame(preview_data)
             st.dataframe(preview_df, use_container_width=True)
             
@@ -1748,32 +1285,25 @@ def main():
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                # Export all as Excel
-                all_excel_bytes = export_to_excel(st.session_state.analysis_history)
-                st.download_button(
+                # Export all as Excel (rendered on click)
+                export_button(
                     label=f"📊 Export All ({len(st.session_state.analysis_history)} ads) to Excel",
-                    data=all_excel_bytes,
+                    builder=export_to_excel,
+                    inputs=(st.session_state.analysis_history,),
                     file_name=f"RAI_All_Analyses_{datetime.now().strftime('%Y%m%d')}.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
+                    key="all_excel"
                 )
             
             with col2:
-                # Export all as JSON (convert datetime objects to strings)
-                history_serializable = []
-                for item in st.session_state.analysis_history:
-                    item_copy = item.copy()
-                    if 'timestamp' in item_copy and isinstance(item_copy['timestamp'], datetime):
-                        item_copy['timestamp'] = item_copy['timestamp'].isoformat()
-                    history_serializable.append(item_copy)
-
-                all_json = json.dumps(history_serializable, indent=2)
-                st.download_button(
+                # Export all as JSON (rendered on click)
+                export_button(
                     label=f"📄 Export All ({len(st.session_state.analysis_history)} ads) to JSON",
-                    data=all_json,
+                    builder=export_history_json,
+                    inputs=(st.session_state.analysis_history,),
                     file_name=f"RAI_All_Analyses_{datetime.now().strftime('%Y%m%d')}.json",
                     mime="application/json",
-                    use_container_width=True
+                    key="all_json"
                 )
             
             with col3:
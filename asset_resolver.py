@@ -0,0 +1,262 @@
+"""
+Find already-downloaded copies of an ad before fetching it again.
+
+Our catalogs overlap (video_catalog_*.csv, cannes_youtube_only.csv, ...) and
+ads end up in several places: downloaded_ads/, submissions/ and
+analysis_storage/<id>/. LocalAssetIndex scans those once, keyed by a
+canonical form of the ad URL (so youtu.be/X and youtube.com/watch?v=X&t=3
+match), and the pipeline hard-links a match into the ad's storage directory
+instead of downloading.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+FILE_SIZE = re.compile(r'^\s*([0-9]+(?:\.([0-9]+))?)\s*(B|KB|MB|GB)\s*$', re.IGNORECASE)
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def canonical_url_key(url: str) -> str:
+    """
+    Normalize an ad URL so different forms of the same video compare equal.
+
+    Returns:
+        'youtube:<id>', 'vimeo:<id>' or the URL without fragment/trailing slash
+    """
+    url = url.strip()
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.startswith('www.') or host.startswith('m.'):
+        host = host.split('.', 1)[1]
+
+    if host in ('youtube.com', 'youtube-nocookie.com', 'music.youtube.com'):
+        video_id = parse_qs(parsed.query).get('v', [''])[0]
+        if not video_id:
+            parts = [p for p in parsed.path.split('/') if p]
+            if len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+                video_id = parts[1]
+        if YOUTUBE_ID.match(video_id):
+            return f'youtube:{video_id}'
+
+    if host == 'youtu.be':
+        video_id = parsed.path.strip('/').split('/')[0]
+        if YOUTUBE_ID.match(video_id):
+            return f'youtube:{video_id}'
+
+    if host in ('vimeo.com', 'player.vimeo.com'):
+        digits = [p for p in parsed.path.split('/') if p.isdigit()]
+        if digits:
+            return f'vimeo:{digits[0]}'
+
+    return f"{parsed.scheme.lower()}://{host}{parsed.path.rstrip('/')}" + (f"?{parsed.query}" if parsed.query else '')
+
+
+def parse_file_size(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Parse a catalog 'File Size' value such as '3.1 MB'.
+
+    Returns:
+        (bytes, tolerance_bytes) where the tolerance covers the rounding of
+        the printed value, or None if the value isn't a size
+    """
+    match = FILE_SIZE.match(text or '')
+    if not match:
+        return None
+
+    unit = SIZE_UNITS[match.group(3).upper()]
+    decimals = len(match.group(2) or '')
+    size = float(match.group(1)) * unit
+    tolerance = 0.5 * (10 ** -decimals) * unit
+    return int(size), int(tolerance) + 1
+
+
+def is_usable_video(path: Path) -> bool:
+    """
+    Non-empty file whose container reports a duration and whose boxes all
+    fit in the file (a faststart MP4 cut off mid-mdat still has its full
+    moov, see container_probe.is_truncated)
+    """
+    from container_probe import is_truncated
+    from video_utils import get_video_metadata
+
+    try:
+        if not path.is_file() or path.stat().st_size == 0 or is_truncated(path):
+            return False
+        return get_video_metadata(path).get('duration', 0) > 0
+    except Exception:
+        return False
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source: Path, destination: Path) -> str:
+    """
+    Hard-link source to destination, copying if a link isn't possible.
+
+    Returns:
+        'link' or 'copy'
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        destination.unlink()
+
+    try:
+        os.link(source, destination)
+        return 'link'
+    except OSError:
+        # Different filesystem or no hard-link support
+        shutil.copy2(source, destination)
+        return 'copy'
+
+
+class LocalAssetIndex:
+    """Index of local video copies, keyed by canonical URL and content hash"""
+
+    def __init__(self, base_dir: Path = Path('.'),
+                 storage_dir: str = 'analysis_storage',
+                 downloads_dir: str = 'downloaded_ads',
+                 submissions_dir: str = 'submissions'):
+        self.base_dir = Path(base_dir)
+        self.storage_dir = self.base_dir / storage_dir
+        self.downloads_dir = self.base_dir / downloads_dir
+        self.submissions_dir = self.base_dir / submissions_dir
+
+        self.by_url: Dict[str, List[Path]] = {}
+        self.by_hash: Dict[str, Path] = {}
+
+        # Guessed locations only count if the file size matches the catalog
+        self.expected_sizes: Dict[Path, Tuple[int, int]] = {}
+
+        self._index_catalogs()
+        self._index_submissions()
+        self._index_storage()
+
+    def _add(self, url: str, path: Path, expected_size: Optional[Tuple[int, int]] = None):
+        if not url:
+            return
+        paths = self.by_url.setdefault(canonical_url_key(url), [])
+        if path not in paths:
+            paths.append(path)
+        if expected_size is not None:
+            self.expected_sizes[path] = expected_size
+
+    def _index_catalogs(self):
+        """Catalog rows marked Downloaded, mapped onto downloaded_ads/"""
+        for catalog in sorted(self.base_dir.glob('*.csv')):
+            try:
+                with open(catalog, newline='', encoding='utf-8') as f:
+                    rows = list(csv.DictReader(f))
+            except (OSError, UnicodeDecodeError, csv.Error):
+                continue
+
+            for row in rows:
+                row = {str(k).strip().lower(): (v or '').strip() for k, v in row.items() if k}
+                url = row.get('url', '')
+                status = row.get('status', '').lower().replace('_', ' ')
+                if not url or status != 'downloaded':
+                    continue
+
+                file_path = row.get('file path', '')
+                if file_path and file_path != '-':
+                    self._add(url, Path(file_path))
+
+                # Catalog paths were recorded on another machine, so also try
+                # the same file name under our downloads directory. download_ads.py
+                # numbers files per machine (ad_005.mp4 may be a different ad
+                # here), so these guesses must match the catalog's File Size
+                expected_size = parse_file_size(row.get('file size', ''))
+                if expected_size is None:
+                    continue
+
+                if file_path and file_path != '-':
+                    self._add(url, self.downloads_dir / Path(file_path).name, expected_size)
+
+                expected = row.get('expected filename') or row.get('expected_filename')
+                if expected:
+                    self._add(url, self.downloads_dir / expected, expected_size)
+
+    def _index_submissions(self):
+        """URL submissions whose video was later saved next to the metadata"""
+        for metadata_path in sorted(self.submissions_dir.glob('*_metadata.json')):
+            try:
+                with open(metadata_path, 'r') as f:
+                    submission = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+
+            ad = submission.get('ad') or {}
+            if ad.get('url') and ad.get('file_path'):
+                self._add(ad['url'], self.base_dir / ad['file_path'])
+
+    def _index_storage(self):
+        """Videos already in analysis_storage/ (under any ad id)"""
+        if not self.storage_dir.exists():
+            return
+
+        for metadata_path in sorted(self.storage_dir.glob('*/metadata.json')):
+            try:
+                with open(metadata_path, 'r') as f:
+                    metadata = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+
+            video_path = metadata_path.parent / 'video.mp4'
+            if not video_path.exists():
+                continue
+
+            self._add(metadata.get('url', ''), video_path)
+            if metadata.get('content_sha256'):
+                self.by_hash[metadata['content_sha256']] = video_path
+
+    def resolve(self, url: str, exclude: Optional[Path] = None) -> Optional[Path]:
+        """
+        Find an existing local copy of the ad at url.
+
+        Args:
+            url: Ad URL
+            exclude: Path to ignore (the download target itself)
+
+        Returns:
+            Path to a readable local video, or None
+        """
+        for path in self.by_url.get(canonical_url_key(url), []):
+            if exclude is not None and path.resolve() == exclude.resolve():
+                continue
+            if not path.is_file():
+                continue
+            if path in self.expected_sizes:
+                size, tolerance = self.expected_sizes[path]
+                if abs(path.stat().st_size - size) > tolerance:
+                    continue
+            if is_usable_video(path):
+                return path
+        return None
+
+    def find_by_hash(self, content_sha256: str, exclude: Optional[Path] = None) -> Optional[Path]:
+        """Return a stored video with identical content, if any"""
+        path = self.by_hash.get(content_sha256)
+        if path is None or not path.exists():
+            return None
+        if exclude is not None and path.resolve() == exclude.resolve():
+            return None
+        return path
+
+    def register(self, url: str, video_path: Path, content_sha256: str):
+        """Record a newly stored video so later ads in the same run can reuse it"""
+        self._add(url, video_path)
+        self.by_hash.setdefault(content_sha256, video_path)
@@ -0,0 +1,299 @@
+"""
+Live status for long batch runs.
+
+BatchStatus listens to pipeline_metrics spans and tracks ads completed,
+failed and in flight per stage, rolling throughput, rate-limit (429) errors,
+queue depth and an ETA from the observed stage latencies.
+start_status_server() serves it on a local port:
+
+  /metrics  Prometheus text format
+  /status   JSON
+
+Usage:
+  python3 simple_pipeline.py batch catalog.csv --metrics-port 9464
+  curl -s localhost:9464/status
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import pipeline_metrics
+
+DEFAULT_PORT = 9464
+
+# Throughput and 429 rate are computed over this many recent seconds
+ROLLING_WINDOW_S = 600
+
+# Keep this many recent durations per stage for the latency estimates
+LATENCY_SAMPLES = 200
+
+# Stages that make a request to Google
+API_STAGES = {pipeline_metrics.UPLOAD, pipeline_metrics.STREAM_UPLOAD, pipeline_metrics.GENERATE,
+              pipeline_metrics.TRANSLATE, pipeline_metrics.REPAIR}
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True if an exception (or its cause) is an HTTP 429"""
+    return pipeline_metrics.http_status(exc) == 429
+
+
+class BatchStatus:
+    """Thread-safe counters for one batch run"""
+
+    def __init__(self, total: int, name: str = 'batch', delay_seconds: float = 0.0):
+        """
+        Args:
+            total: Ads in the batch
+            name: Label for /status and /metrics
+            delay_seconds: Pause the runner makes between ads (counted in the ETA)
+        """
+        self.name = name
+        self.total = total
+        self.delay_seconds = delay_seconds
+        self.started_at = time.time()
+        self.started = 0
+        self.finished: Dict[str, int] = {}
+        self.current_ad: Optional[str] = None
+
+        self.stage_completed: Dict[str, int] = {}
+        self.stage_failed: Dict[str, int] = {}
+        self.stage_in_flight: Dict[str, int] = {}
+        self.stage_durations: Dict[str, deque] = {}
+        self.rate_limited = 0
+
+        # Stages the current ad has started, and when each in-flight one began
+        self._current_stages = set()
+        self._stage_started_at: Dict[str, float] = {}
+        self._current_429_counted = False
+
+        # (timestamp, ...) events for the rolling window
+        self._finished_times = deque()
+        self._api_calls = deque()
+
+        self._lock = threading.Lock()
+        pipeline_metrics.add_listener(self.on_span)
+
+    def close(self):
+        pipeline_metrics.remove_listener(self.on_span)
+
+    def on_span(self, event: str, record: Dict):
+        """pipeline_metrics listener"""
+        stage = record['stage']
+        with self._lock:
+            if event == 'start':
+                self.stage_in_flight[stage] = self.stage_in_flight.get(stage, 0) + 1
+                self._current_stages.add(stage)
+                self._stage_started_at[stage] = time.time()
+                return
+
+            self.stage_in_flight[stage] = max(0, self.stage_in_flight.get(stage, 0) - 1)
+            self._stage_started_at.pop(stage, None)
+
+            if record.get('error'):
+                self.stage_failed[stage] = self.stage_failed.get(stage, 0) + 1
+            else:
+                self.stage_completed[stage] = self.stage_completed.get(stage, 0) + 1
+                durations = self.stage_durations.setdefault(stage, deque(maxlen=LATENCY_SAMPLES))
+                durations.append(record['seconds'])
+
+            if stage in API_STAGES:
+                limited = record.get('http_status') == 429
+                self._record_api_call(limited)
+                self._current_429_counted = self._current_429_counted or limited
+
+    def _record_api_call(self, limited: bool):
+        self._api_calls.append((time.time(), limited))
+        if limited:
+            self.rate_limited += 1
+
+    def ad_started(self, ad_key: str):
+        with self._lock:
+            self.started += 1
+            self.current_ad = ad_key
+            self._current_stages = set()
+
+    def ad_finished(self, status: str, error: Optional[BaseException] = None):
+        """
+        Record an ad's final status ('success', 'download_failed', 'error', ...)
+
+        Pass the exception for ads that raised, so 429s outside an
+        instrumented stage still count towards the rate-limit figures.
+        """
+        with self._lock:
+            self.finished[status] = self.finished.get(status, 0) + 1
+            self._finished_times.append(time.time())
+            self.current_ad = None
+            self._current_stages = set()
+
+            # A 429 raised inside an API span was already counted by on_span
+            if error is not None and is_rate_limited(error) and not self._current_429_counted:
+                self._record_api_call(True)
+            self._current_429_counted = False
+
+    def _trim(self, now: float):
+        while self._finished_times and self._finished_times[0] < now - ROLLING_WINDOW_S:
+            self._finished_times.popleft()
+        while self._api_calls and self._api_calls[0][0] < now - ROLLING_WINDOW_S:
+            self._api_calls.popleft()
+
+    def _eta(self, done: int, now: float) -> Optional[int]:
+        """
+        Seconds left, from observed stage latencies.
+
+        Each stage contributes its p50 weighted by how often it runs per ad
+        (downloads are skipped for reused videos, proxies are optional).
+        Queued ads need every stage; the in-flight ad only needs the stages it
+        hasn't reached, plus what's left of the one running now.
+        """
+        if not done or not self.stage_durations:
+            return None
+
+        per_stage = {}
+        for stage, durations in self.stage_durations.items():
+            runs_per_ad = min(1.0, self.stage_completed.get(stage, 0) / done)
+            per_stage[stage] = pipeline_metrics.percentile(list(durations), 50) * runs_per_ad
+
+        per_ad = sum(per_stage.values()) + self.delay_seconds
+        queued = max(0, self.total - self.started)
+
+        current = 0.0
+        if self.current_ad is not None:
+            for stage, seconds in per_stage.items():
+                if stage not in self._current_stages:
+                    current += seconds
+                elif stage in self._stage_started_at:
+                    current += max(0.0, seconds - (now - self._stage_started_at[stage]))
+            current += self.delay_seconds
+
+        return round(queued * per_ad + current)
+
+    def snapshot(self) -> Dict:
+        """Current status as a JSON-serializable dict"""
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+
+            done = sum(self.finished.values())
+            elapsed = now - self.started_at
+            window = min(elapsed, ROLLING_WINDOW_S) or 1
+            throughput = len(self._finished_times) / window * 3600
+
+            api_calls = len(self._api_calls)
+            limited = sum(1 for _, was_limited in self._api_calls if was_limited)
+
+            stages = {}
+            for stage in sorted(set(self.stage_completed) | set(self.stage_failed) | set(self.stage_in_flight)):
+                durations = list(self.stage_durations.get(stage, []))
+                stages[stage] = {
+                    'completed': self.stage_completed.get(stage, 0),
+                    'failed': self.stage_failed.get(stage, 0),
+                    'in_flight': self.stage_in_flight.get(stage, 0),
+                    'p50_seconds': pipeline_metrics.percentile(durations, 50),
+                    'mean_seconds': round(sum(durations) / len(durations), 3) if durations else None
+                }
+
+            return {
+                'name': self.name,
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+                'elapsed_seconds': round(elapsed),
+                'total': self.total,
+                'done': done,
+                'finished': dict(self.finished),
+                'in_flight': self.started - done,
+                'queue_depth': max(0, self.total - self.started),
+                'current_ad': self.current_ad,
+                'stages': stages,
+                'throughput_ads_per_hour': round(throughput, 2),
+                'rate_limited_total': self.rate_limited,
+                'rate_limited_ratio': round(limited / api_calls, 4) if api_calls else 0.0,
+                'eta_seconds': self._eta(done, now)
+            }
+
+
+def prometheus_text(snapshot: Dict) -> str:
+    """Render a snapshot in the Prometheus text exposition format"""
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, samples):
+        lines.append(f"# HELP rai_{name} {help_text}")
+        lines.append(f"# TYPE rai_{name} {kind}")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_str = ','.join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"rai_{name}{{{label_str}}} {value}" if label_str else f"rai_{name} {value}")
+
+    stages = snapshot['stages']
+
+    metric('ads_total', 'gauge', 'Ads in this batch', [({}, snapshot['total'])])
+    metric('ads_finished_total', 'counter', 'Ads finished by final status',
+           [({'status': status}, n) for status, n in sorted(snapshot['finished'].items())])
+    metric('ads_in_flight', 'gauge', 'Ads started but not finished', [({}, snapshot['in_flight'])])
+    metric('queue_depth', 'gauge', 'Ads not started yet', [({}, snapshot['queue_depth'])])
+    metric('stage_completed_total', 'counter', 'Stage spans completed',
+           [({'stage': s}, v['completed']) for s, v in stages.items()])
+    metric('stage_failed_total', 'counter', 'Stage spans that raised',
+           [({'stage': s}, v['failed']) for s, v in stages.items()])
+    metric('stage_in_flight', 'gauge', 'Stage spans running now',
+           [({'stage': s}, v['in_flight']) for s, v in stages.items()])
+    metric('stage_p50_seconds', 'gauge', 'Median stage latency (recent successful spans)',
+           [({'stage': s}, v['p50_seconds']) for s, v in stages.items()])
+    metric('stage_mean_seconds', 'gauge', 'Mean stage latency (recent successful spans)',
+           [({'stage': s}, v['mean_seconds']) for s, v in stages.items()])
+    metric('throughput_ads_per_hour', 'gauge', f'Ads finished per hour over the last {ROLLING_WINDOW_S}s',
+           [({}, snapshot['throughput_ads_per_hour'])])
+    metric('rate_limited_total', 'counter', 'API calls rejected with 429', [({}, snapshot['rate_limited_total'])])
+    metric('rate_limited_ratio', 'gauge', f'Share of API calls rejected with 429 over the last {ROLLING_WINDOW_S}s',
+           [({}, snapshot['rate_limited_ratio'])])
+    metric('eta_seconds', 'gauge', 'Estimated seconds until the batch finishes', [({}, snapshot['eta_seconds'])])
+
+    return '\n'.join(lines) + '\n'
+
+
+def start_status_server(status: BatchStatus, port: int = DEFAULT_PORT,
+                        host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve /metrics and /status for a batch in a daemon thread.
+
+    Args:
+        status: The BatchStatus to expose
+        port: Local port to listen on
+        host: Bind address (localhost only by default)
+
+    Returns:
+        The running server (call shutdown() when the batch ends)
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/metrics':
+                body = prometheus_text(status.snapshot()).encode()
+                content_type = 'text/plain; version=0.0.4'
+            elif path in ('/status', '/'):
+                body = json.dumps(status.snapshot(), indent=2).encode()
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep request logs out of the batch output
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='rai-status', daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dashboard load time, filter latency and memory at scale.
+
+Generates synthetic stores (benchmarks/synthetic_store.py) at each size and
+runs every dashboard against them headless with Streamlit's AppTest:
+
+  cold     first script run (reads the store, builds every chart)
+  filter   rerun after each filter interaction (median)
+  rerun    rerun with nothing changed (shows what st.cache_data saves)
+  RSS      peak resident memory of the process, and growth over the
+           baseline after importing streamlit/pandas/plotly
+
+Each dashboard runs in its own subprocess so peak RSS is per dashboard.
+
+Usage:
+  python3 benchmarks/bench_dashboards.py
+  python3 benchmarks/bench_dashboards.py --sizes 1000,10000 --dashboards enhanced,new
+  python3 benchmarks/bench_dashboards.py --sizes 100000 --timeout 1800 --json dash.json
+"""
+
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_store import generate_store
+
+# name: (script relative to the repo root, filter interactions)
+# Each interaction is (widget type, label, value); value 'last' picks the last option.
+DASHBOARDS = {
+    'enhanced': ('dashboard_enhanced.py', [
+        ('slider', 'Overall Score', (60, 100)),
+        ('selectbox', 'Detected Language', 'hu'),
+        ('radio', 'Show', 'Climate Leaders'),
+        ('text_input', 'Brand/Campaign Name', 'Volvo'),
+    ]),
+    'new': ('dashboard_new.py', [
+        ('slider', 'Overall Score Range', (60, 100)),
+        ('selectbox', 'Language', 'hu'),
+        ('text_input', 'Search Brand/Campaign', 'Volvo'),
+    ]),
+    'home': ('dashboard/Home.py', []),
+    'cannes': ('dashboard/pages/1_🏆_Cannes_Overview.py', []),
+    'hungarian': ('dashboard/pages/2_🇭🇺_Hungarian_Overview.py', [
+        ('radio', 'Language / Nyelv', 'Magyar'),
+    ]),
+    'comparison': ('dashboard/pages/3_⚖️_Comparison.py', []),
+    'individual': ('dashboard/pages/4_🔍_Individual_Ads.py', [
+        ('selectbox', 'Select Ad', 'last'),
+        ('radio', 'Select Dataset', '🇭🇺 Hungarian 50-50 Lista'),
+    ]),
+}
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def prepare_workdir(store_dir: Path):
+    """Put the dashboards next to the synthetic store, where they look for data"""
+    shutil.copy(REPO_ROOT / 'dashboard_enhanced.py', store_dir)
+    shutil.copy(REPO_ROOT / 'dashboard_new.py', store_dir)
+    shutil.copytree(REPO_ROOT / 'dashboard', store_dir / 'dashboard',
+                    ignore=shutil.ignore_patterns('__pycache__'), dirs_exist_ok=True)
+
+
+def _timed_run(at, timeout: float) -> float:
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def _interact(at, widget: str, label: str, value):
+    """Apply one filter interaction (looks the widget up by its label)"""
+    elements = [e for e in getattr(at, widget) if e.label == label]
+    if not elements:
+        raise RuntimeError(f"No {widget} labelled {label!r}")
+    element = elements[0]
+    if value == 'last':
+        value = element.options[-1]
+        if widget == 'selectbox':
+            # format_func selectboxes store the index
+            return element.set_value(len(element.options) - 1)
+    if widget in ('selectbox', 'radio') and value not in element.options:
+        value = element.options[-1]
+    return element.set_value(value)
+
+
+def run_dashboard(name: str, store_dir: Path, timeout: float) -> dict:
+    """Run one dashboard in this process (called in the worker subprocess)"""
+    os.chdir(store_dir)
+
+    import pandas  # noqa: F401  (baseline includes the dashboards' heavy imports)
+    import plotly.express  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+    baseline = peak_rss_mb()
+
+    script, interactions = DASHBOARDS[name]
+    result = {'dashboard': name, 'baseline_rss_mb': round(baseline, 1)}
+
+    try:
+        at = AppTest.from_file(str(store_dir / script), default_timeout=timeout)
+        result['cold_seconds'] = round(_timed_run(at, timeout), 3)
+
+        filter_times = []
+        for widget, label, value in interactions:
+            _interact(at, widget, label, value)
+            filter_times.append(_timed_run(at, timeout))
+        result['filter_seconds'] = round(statistics.median(filter_times), 3) if filter_times else None
+        result['filter_max_seconds'] = round(max(filter_times), 3) if filter_times else None
+
+        result['rerun_seconds'] = round(_timed_run(at, timeout), 3)
+    except Exception as e:
+        result['error'] = str(e)[:300]
+
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    result['rss_growth_mb'] = round(result['peak_rss_mb'] - baseline, 1)
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(name, default):
+        if name in args:
+            return args[args.index(name) + 1]
+        return default
+
+    timeout = float(option('--timeout', '900'))
+
+    # Worker subprocess: run one dashboard and print its JSON
+    if '--_worker' in args:
+        result = run_dashboard(option('--_worker', 'enhanced'), Path(option('--store', '.')), timeout)
+        print(json.dumps(result))
+        return
+
+    sizes = [int(s) for s in option('--sizes', ','.join(map(str, DEFAULT_SIZES))).split(',')]
+    names = option('--dashboards', ','.join(DASHBOARDS)).split(',')
+    json_path = option('--json', None)
+
+    unknown = [n for n in names if n not in DASHBOARDS]
+    if unknown:
+        print(f"❌ Unknown dashboards: {', '.join(unknown)} (choose from {', '.join(DASHBOARDS)})")
+        sys.exit(1)
+
+    results = []
+    tmp_dir = Path(tempfile.mkdtemp(prefix='rai_dash_bench_'))
+    try:
+        for size in sizes:
+            store_dir = tmp_dir / f'store_{size}'
+            start = time.perf_counter()
+            stats = generate_store(store_dir, size)
+            prepare_workdir(store_dir)
+            print(f"\n📦 {size} ads ({stats['bytes'] / 1e6:.0f} MB, generated in {time.perf_counter() - start:.0f}s)")
+            print(f"{'dashboard':12s} {'cold':>8s} {'filter':>8s} {'max':>8s} {'rerun':>8s} {'RSS MB':>8s} {'growth':>8s}")
+            print("-" * 70)
+
+            for name in names:
+                completed = subprocess.run(
+                    [sys.executable, __file__, '--_worker', name, '--store', str(store_dir),
+                     '--timeout', str(timeout)],
+                    capture_output=True, text=True,
+                    env={**os.environ, 'PYTHONPATH': os.pathsep.join([str(store_dir), str(REPO_ROOT)])}
+                )
+                if completed.returncode != 0:
+                    print(f"{name:12s} ❌ worker failed:\n{completed.stderr[-1500:]}")
+                    continue
+
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                result['ads'] = size
+                results.append(result)
+
+                if 'error' in result:
+                    print(f"{name:12s} ❌ {result['error']}")
+                    continue
+
+                def fmt(key):
+                    return f"{result[key]:7.2f}s" if result.get(key) is not None else f"{'-':>8s}"
+
+                print(f"{name:12s} {fmt('cold_seconds')} {fmt('filter_seconds')} {fmt('filter_max_seconds')} "
+                      f"{fmt('rerun_seconds')} {result['peak_rss_mb']:8.0f} {result['rss_growth_mb']:8.0f}")
+
+            shutil.rmtree(store_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump({'sizes': sizes, 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Excel export of large analysis sets.
+
+Compares the streaming, write-only exporter (excel_export.py) with the
+previous app.py export_to_excel (pandas DataFrame -> ExcelWriter, then a
+walk over every cell to size the columns) on synthetic analyses
+(benchmarks/synthetic_store.py). Each run is its own subprocess so peak RSS
+is per exporter; the streaming exporter is fed a generator, the legacy one
+needs the full list.
+
+Usage:
+  python3 benchmarks/bench_excel.py                      # 10k and 100k analyses
+  python3 benchmarks/bench_excel.py --sizes 1000,10000
+  python3 benchmarks/bench_excel.py --sizes 100000 --skip-legacy
+"""
+
+import io
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_store import make_ad
+
+DEFAULT_SIZES = [10000, 100000]
+
+
+def synthetic_history(count: int, seed: int = 0):
+    """app.py history entries, generated lazily"""
+    rng = random.Random(seed)
+    started = datetime(2025, 1, 1)
+    for index in range(count):
+        ad = make_ad(rng, index, started)
+        yield {
+            'brand_name': ad['brand'],
+            'timestamp': ad['analyzed_at'],
+            'ad_copy': ad['campaign'],
+            'result': ad
+        }
+
+
+def legacy_export_to_excel(analyses) -> bytes:
+    """app.export_to_excel before the streaming exporter"""
+    import pandas as pd
+
+    data = []
+    for analysis in analyses:
+        result = analysis['result']
+        data.append({
+            'Brand': analysis.get('brand_name') or analysis.get('brand', 'Unknown'),
+            'Analysis Date': analysis['timestamp'],
+            'Overall Score': result['overall_score'],
+            'Climate Responsibility': result['dimensions']['Climate Responsibility']['score'],
+            'Social Responsibility': result['dimensions']['Social Responsibility']['score'],
+            'Cultural Sensitivity': result['dimensions']['Cultural Sensitivity']['score'],
+            'Ethical Communication': result['dimensions']['Ethical Communication']['score'],
+            'Key Strengths': ' | '.join(result['summary'].get('strengths', [])),
+            'Key Concerns': ' | '.join(result['summary'].get('concerns', [])),
+            'Recommendations': ' | '.join(result['summary'].get('recommendations', [])),
+        })
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        pd.DataFrame(data).to_excel(writer, sheet_name='RAI Analysis', index=False)
+        worksheet = writer.sheets['RAI Analysis']
+        for column in worksheet.columns:
+            max_length = max(len(str(cell.value)) for cell in column)
+            worksheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+    return output.getvalue()
+
+
+def run(exporter: str, count: int) -> dict:
+    """One export in this process (called in the worker subprocess)"""
+    start = time.perf_counter()
+    if exporter == 'streaming':
+        from excel_export import write_analyses_xlsx
+        output = io.BytesIO()
+        rows = write_analyses_xlsx(synthetic_history(count), output)
+        size = len(output.getvalue())
+    else:
+        rows = {'summary': count}
+        size = len(legacy_export_to_excel(list(synthetic_history(count))))
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'exporter': exporter,
+        'analyses': count,
+        'seconds': round(time.perf_counter() - start, 2),
+        'rows': rows,
+        'file_mb': round(size / 1e6, 1),
+        'peak_rss_mb': round(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024, 1)
+    }
+
+
+def main():
+    args = sys.argv[1:]
+
+    if '--_worker' in args:
+        exporter, count = args[args.index('--_worker') + 1:args.index('--_worker') + 3]
+        print(json.dumps(run(exporter, int(count))))
+        return
+
+    sizes = DEFAULT_SIZES
+    if '--sizes' in args:
+        sizes = [int(s) for s in args[args.index('--sizes') + 1].split(',')]
+    exporters = ['streaming'] if '--skip-legacy' in args else ['legacy', 'streaming']
+
+    print(f"{'exporter':10s} {'analyses':>9s} {'seconds':>8s} {'rows (summary/findings/scenes)':>32s} "
+          f"{'file MB':>8s} {'RSS MB':>8s}")
+    print("-" * 82)
+
+    for count in sizes:
+        for exporter in exporters:
+            completed = subprocess.run([sys.executable, __file__, '--_worker', exporter, str(count)],
+                                       capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"{exporter:10s} {count:9d} ❌ {completed.stderr.strip().splitlines()[-1]}")
+                continue
+
+            r = json.loads(completed.stdout.strip().splitlines()[-1])
+            rows = '/'.join(str(r['rows'].get(k, '-')) for k in ('summary', 'findings', 'scenes'))
+            print(f"{exporter:10s} {count:9d} {r['seconds']:8.1f} {rows:>32s} {r['file_mb']:8.1f} {r['peak_rss_mb']:8.0f}")
+
+
+if __name__ == '__main__':
+    main()
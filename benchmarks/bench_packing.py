@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one creative per request vs packed multi-creative requests.
+
+Scores the same set of banner creatives twice, once with
+image_analysis.analyze_image per creative and once with
+image_analysis.analyze_packed, each against an empty result cache, and
+reports per creative: input/output tokens, wall time, model calls and
+fallbacks to single requests.
+
+Creatives are synthetic banners in common display sizes, each with
+its own copy (so nothing is served from the cache), or the images in a
+directory (ad copy from <name>.txt).
+
+Usage:
+  RAI_MODEL_BACKEND=fake RAI_FAKE_TIME_SCALE=0.05 python3 benchmarks/bench_packing.py
+  python3 benchmarks/bench_packing.py --count 30             # real API (GOOGLE_API_KEY)
+  python3 benchmarks/bench_packing.py --dir banners/ --workers 4
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import image_config
+from image_analysis import IMAGE_MODEL, analyze_image, analyze_packed
+from image_cache import ResultCache
+from model_backend import get_backend
+from pipeline_metrics import StageRecorder
+
+BANNER_SIZES = [(300, 250), (728, 90), (160, 600), (300, 600), (970, 250), (1200, 628), (1080, 1080)]
+
+
+def synthetic_banners(count: int, seed: int = 0):
+    """(png bytes, ad copy) per creative"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    creatives = []
+    for index in range(count):
+        size = BANNER_SIZES[index % len(BANNER_SIZES)]
+        img = Image.new('RGB', size, tuple(rng.randint(0, 255) for _ in range(3)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(4):
+            x0, y0 = rng.randint(0, size[0] // 2), rng.randint(0, size[1] // 2)
+            draw.rectangle([x0, y0, x0 + size[0] // 3, y0 + size[1] // 3],
+                           fill=tuple(rng.randint(0, 255) for _ in range(3)))
+        draw.text((10, 10), f"Offer {index}", fill=(255, 255, 255))
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        copy = f"Banner {index}: {rng.choice(['Save', 'Drive', 'Fly', 'Eat', 'Switch'])} " \
+               f"{rng.choice(['green', 'smart', 'local', 'more', 'less'])} today. Offer {rng.randint(10, 90)}% off."
+        creatives.append((buffer.getvalue(), copy))
+    return creatives
+
+
+def directory_banners(path: Path):
+    creatives = []
+    for image in sorted(path.rglob('*')):
+        if image.suffix.lower() in ('.png', '.jpg', '.jpeg', '.webp') and image.is_file():
+            copy_path = image.with_suffix('.txt')
+            creatives.append((image.read_bytes(), copy_path.read_text().strip() if copy_path.exists() else ''))
+    return creatives
+
+
+class CountingBackend:
+    """Counts generate_content calls of the wrapped backend"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, contents, generation_config):
+        with self._lock:
+            self.calls += 1
+        return self.inner.generate_content(contents, generation_config=generation_config)
+
+
+def totals(recorders):
+    input_tokens = output_tokens = 0
+    for recorder in recorders:
+        generate = recorder.stages().get('generate', {})
+        input_tokens += generate.get('input_tokens', 0) or 0
+        output_tokens += generate.get('output_tokens', 0) or 0
+    return input_tokens, output_tokens
+
+
+def run_single(creatives, backend, cache, workers):
+    recorders = [StageRecorder() for _ in creatives]
+
+    def one(args):
+        (image, copy), recorder = args
+        return analyze_image(image, copy, backend, cache=cache, recorder=recorder)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, zip(creatives, recorders)))
+    return recorders, 0
+
+
+def run_packed(creatives, backend, cache, workers):
+    group = image_config.max_pack_size
+    groups = [creatives[i:i + group] for i in range(0, len(creatives), group)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        analyses = [a for batch in pool.map(lambda g: analyze_packed(g, backend, cache=cache), groups) for a in batch]
+    return [a['recorder'] for a in analyses], sum(1 for a in analyses if a.get('fallback'))
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(name, default):
+        return args[args.index(name) + 1] if name in args else default
+
+    count = int(option('--count', '40'))
+    workers = int(option('--workers', '4'))
+    creatives = directory_banners(Path(option('--dir', ''))) if '--dir' in args else synthetic_banners(count)
+
+    backend = get_backend(os.getenv('GOOGLE_API_KEY'), IMAGE_MODEL)
+    print(f"🖼️ {len(creatives)} creatives, {workers} workers, backend {type(backend).__name__}")
+    print(f"{'mode':8s} {'calls':>6s} {'in-tok/creative':>16s} {'out-tok/creative':>17s} "
+          f"{'s/creative':>11s} {'fallbacks':>10s}")
+    print("-" * 74)
+
+    for mode, runner in (('single', run_single), ('packed', run_packed)):
+        counting = CountingBackend(backend)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            start = time.perf_counter()
+            recorders, fallbacks = runner(creatives, counting, ResultCache(cache_dir), workers)
+            elapsed = time.perf_counter() - start
+
+        input_tokens, output_tokens = totals(recorders)
+        n = len(creatives)
+        print(f"{mode:8s} {counting.calls:6d} {input_tokens / n:16.0f} {output_tokens / n:17.0f} "
+              f"{elapsed / n:11.3f} {fallbacks:10d}")
+
+
+if __name__ == '__main__':
+    main()
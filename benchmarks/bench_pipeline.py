@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end analysis pipeline throughput, fully offline.
+
+Runs simple_pipeline's download -> upload -> processing wait -> generate ->
+parse path for N synthetic ads against the fake model backend
+(model_backend.FakeBackend). The videos are served from a local HTTP server,
+so the download stage is real. Every mode runs in its own subprocess (so
+peak RSS is per mode) with a fresh analysis_storage/.
+
+Modes:
+  serial      one ad after another, like `simple_pipeline.py batch`
+  threads-N   N ads in flight at once (thread pool over the same per-ad code)
+
+Reports ads/hour, p50/p95 per stage, peak RSS, disk bytes and upload bytes,
+and writes them as JSON (benchmarks/results/<commit>.json by default) for
+benchmarks/compare.py.
+
+Usage:
+  python3 benchmarks/bench_pipeline.py
+  python3 benchmarks/bench_pipeline.py --ads 40 --modes serial,threads-4,threads-8
+  python3 benchmarks/bench_pipeline.py --time-scale 0.05 --json results.json
+"""
+
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_video import make_ffmpeg_video, make_mp4
+
+RESULTS_DIR = BENCH_DIR / 'results'
+
+
+def make_videos(video_dir: Path, count: int, size_mb: float):
+    """Synthetic ads: rendered with ffmpeg like create_test_video.sh when available"""
+    video_dir.mkdir(parents=True, exist_ok=True)
+    template = make_ffmpeg_video(video_dir / '_template.mp4', duration_s=15)
+    for i in range(count):
+        path = video_dir / f'ad_{i:04d}.mp4'
+        if template:
+            # Distinct bytes per ad so content-hash dedup doesn't kick in
+            path.write_bytes(template.read_bytes() + i.to_bytes(4, 'big'))
+        else:
+            path.write_bytes(make_mp4(duration_s=30, size_bytes=int(size_mb * 1024 * 1024) + i))
+    if template:
+        template.unlink()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory: Path) -> ThreadingHTTPServer:
+    handler = partial(QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+
+
+def run_mode(mode: str, urls, work_dir: Path) -> dict:
+    """Run one mode in this process (called in the worker subprocess)"""
+    os.chdir(work_dir)
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        import simple_pipeline
+        from pipeline_metrics import METRICS_FILE, load_metrics, stage_report, UPLOAD
+
+        def one(url):
+            return simple_pipeline.process_catalog_ad(url, 'BenchBrand', 'Bench')['status']
+
+        start = time.perf_counter()
+        if mode == 'serial':
+            statuses = [one(url) for url in urls]
+        elif mode.startswith('threads-'):
+            with ThreadPoolExecutor(max_workers=int(mode.split('-')[1])) as pool:
+                statuses = list(pool.map(one, urls))
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+        wall = time.perf_counter() - start
+
+    storage = work_dir / 'analysis_storage'
+    lines = load_metrics(storage / METRICS_FILE)
+    report = stage_report(lines)
+    upload_bytes = sum(line['stages'].get(UPLOAD, {}).get('bytes', 0) for line in lines)
+
+    return {
+        'mode': mode,
+        'ads': len(urls),
+        'succeeded': statuses.count('success'),
+        'wall_seconds': round(wall, 3),
+        'ads_per_hour': round(len(urls) / wall * 3600, 1),
+        'stages': {stage: {'p50': r['p50'], 'p95': r['p95'], 'count': r['count']}
+                   for stage, r in report.items()},
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'disk_bytes': dir_bytes(storage),
+        'upload_bytes': upload_bytes
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(name, default):
+        if name in args:
+            return args[args.index(name) + 1]
+        return default
+
+    # Worker subprocess: run one mode and print its JSON
+    if '--_worker' in args:
+        urls = json.loads(option('--urls', '[]'))
+        result = run_mode(option('--_worker', 'serial'), urls, Path(option('--work-dir', '.')))
+        print(json.dumps(result))
+        return
+
+    ads = int(option('--ads', '20'))
+    modes = option('--modes', 'serial,threads-4').split(',')
+    time_scale = option('--time-scale', '0.02')
+    size_mb = float(option('--size-mb', '4'))
+    json_path = Path(option('--json', str(RESULTS_DIR / f'{git_commit()}.json')))
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix='rai_bench_'))
+    try:
+        make_videos(tmp_dir / 'videos', ads, size_mb)
+        server = serve_directory(tmp_dir / 'videos')
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        urls = [f'{base_url}/{p.name}' for p in sorted((tmp_dir / 'videos').glob('*.mp4'))]
+
+        env = {
+            **os.environ,
+            'RAI_MODEL_BACKEND': 'fake',
+            'RAI_FAKE_TIME_SCALE': time_scale,
+            'GOOGLE_API_KEY': os.getenv('GOOGLE_API_KEY', 'offline-benchmark'),
+            'PYTHONPATH': str(REPO_ROOT)
+        }
+        env.pop('RAI_CASSETTE_DIR', None)
+
+        print(f"🏁 {ads} synthetic ads, fake backend (time scale {time_scale}), modes: {', '.join(modes)}\n")
+        print(f"{'mode':12s} {'ads/h':>10s} {'wall':>8s} {'ok':>5s} {'RSS MB':>8s} {'disk MB':>8s} {'upload MB':>10s}  stage p50/p95 (s)")
+        print("-" * 110)
+
+        results = []
+        for mode in modes:
+            work_dir = tmp_dir / f'run_{mode}'
+            work_dir.mkdir()
+            completed = subprocess.run(
+                [sys.executable, __file__, '--_worker', mode, '--work-dir', str(work_dir),
+                 '--urls', json.dumps(urls)],
+                env=env, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print(f"{mode:12s} ❌ failed:\n{completed.stderr[-2000:]}")
+                continue
+
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+
+            stages = ' '.join(f"{stage}={r['p50']:.2f}/{r['p95']:.2f}" for stage, r in result['stages'].items())
+            print(f"{mode:12s} {result['ads_per_hour']:10.0f} {result['wall_seconds']:7.1f}s "
+                  f"{result['succeeded']:5d} {result['peak_rss_mb']:8.1f} "
+                  f"{result['disk_bytes'] / 1e6:8.1f} {result['upload_bytes'] / 1e6:10.1f}  {stages}")
+
+        server.shutdown()
+        server.server_close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(json_path, 'w') as f:
+        json.dump({
+            'commit': git_commit(),
+            'recorded_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'settings': {'ads': ads, 'time_scale': float(time_scale), 'size_mb': size_mb},
+            'results': results
+        }, f, indent=2)
+    print(f"\n💾 Results written to {json_path}")
+
+
+if __name__ == '__main__':
+    main()
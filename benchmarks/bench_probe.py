@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: container header fast path vs ffprobe for video metadata.
+
+Times container_probe.probe_container against the ffprobe path that
+video_utils.get_video_metadata used for every call, on in-memory buffers
+(like the Streamlit upload) and on file paths.
+
+Usage:
+  python3 benchmarks/bench_probe.py                       # synthetic MP4/WebM
+  python3 benchmarks/bench_probe.py downloaded_ads/*.mp4  # real files
+"""
+
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from container_probe import probe_container
+from synthetic_video import make_mp4, make_webm
+from video_utils import _ffprobe_metadata
+
+
+def time_call(fn, repeat: int) -> float:
+    """Median seconds per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    paths = [Path(p) for p in sys.argv[1:]]
+    tmp_dir = None
+
+    if not paths:
+        tmp_dir = Path(tempfile.mkdtemp(prefix='rai_probe_'))
+        samples = {
+            'synthetic_720p.mp4': make_mp4(size_bytes=20 * 1024 * 1024),
+            'synthetic_faststart.mp4': make_mp4(size_bytes=20 * 1024 * 1024, moov_at_end=False),
+            'synthetic_1080p.webm': make_webm(width=1920, height=1080, size_bytes=20 * 1024 * 1024),
+        }
+        for name, data in samples.items():
+            (tmp_dir / name).write_bytes(data)
+            paths.append(tmp_dir / name)
+
+    has_ffprobe = shutil.which('ffprobe') is not None
+    if not has_ffprobe:
+        print("⚠️ ffprobe not installed - reporting fast path only\n")
+
+    print(f"{'file':32s} {'buffer':>12s} {'path':>12s} {'ffprobe':>12s}  result")
+    print("-" * 100)
+
+    for path in paths:
+        data = path.read_bytes()
+
+        buffer_s = time_call(lambda: probe_container(data), 200)
+        path_s = time_call(lambda: probe_container(path), 200)
+        ffprobe_s = time_call(lambda: _ffprobe_metadata(str(path), len(data)), 5) if has_ffprobe else None
+
+        result = probe_container(path)
+        summary = "fallback to ffprobe" if result is None else (
+            f"{result['duration']:.1f}s {result['width']}x{result['height']} "
+            f"{result['fps']:.2f}fps {result['codec']}"
+        )
+
+        ffprobe_col = f"{ffprobe_s * 1e3:9.1f} ms" if ffprobe_s is not None else f"{'n/a':>12s}"
+        print(f"{path.name[:32]:32s} {buffer_s * 1e6:9.1f} µs {path_s * 1e6:9.1f} µs {ffprobe_col}  {summary}")
+
+    if tmp_dir:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: original upload vs low-resolution proxy upload.
+
+For each video, measures upload time, Gemini processing wait (PROCESSING →
+ACTIVE), generation time and end-to-end latency, once with the original file
+and once with the proxy from video_proxy.make_proxy (transcode time is
+reported separately and counted in the proxy's end-to-end time unless the
+proxy was already cached).
+
+Usage:
+  python3 benchmarks/bench_proxy.py analysis_storage/<id>/video.mp4 [...]
+  python3 benchmarks/bench_proxy.py test_videos/*.mp4 --json results.json
+
+Requires GOOGLE_API_KEY and ffmpeg. Each video costs two model calls.
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import video_config
+from video_processor import VideoAnalyzer
+from video_proxy import make_proxy, is_proxy_fresh
+
+
+def time_analysis(analyzer: VideoAnalyzer, path: Path) -> dict:
+    """Upload, wait and generate for one file, timing each step"""
+    prompt = analyzer._create_prompt("", "auto")
+
+    start = time.perf_counter()
+    video_file = analyzer.backend.upload_file(str(path))
+    uploaded = time.perf_counter()
+
+    while video_file.state.name == "PROCESSING":
+        time.sleep(0.5 * analyzer.backend.time_scale)
+        video_file = analyzer.backend.get_file(video_file.name)
+    active = time.perf_counter()
+
+    response = analyzer.backend.generate_content(
+        [video_file, prompt],
+        generation_config={
+            "temperature": video_config.temperature,
+            "max_output_tokens": video_config.max_output_tokens
+        }
+    )
+    generated = time.perf_counter()
+
+    analyzer.backend.delete_file(video_file.name)
+
+    usage = getattr(response, 'usage_metadata', None)
+
+    return {
+        'bytes': path.stat().st_size,
+        'upload_s': uploaded - start,
+        'processing_wait_s': active - uploaded,
+        'generate_s': generated - active,
+        'end_to_end_s': generated - start,
+        'input_tokens': getattr(usage, 'prompt_token_count', None),
+        'output_tokens': getattr(usage, 'candidates_token_count', None)
+    }
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    json_path = None
+    if '--json' in sys.argv:
+        json_path = sys.argv[sys.argv.index('--json') + 1]
+        args.remove(json_path)
+
+    if not args:
+        print(__doc__)
+        return
+
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        print("❌ GOOGLE_API_KEY not set")
+        sys.exit(1)
+
+    analyzer = VideoAnalyzer(api_key=api_key)
+    rows = []
+
+    for video in args:
+        video_path = Path(video)
+        print(f"\n🎬 {video_path}")
+
+        was_cached = is_proxy_fresh(video_path)
+        start = time.perf_counter()
+        proxy_path = make_proxy(video_path)
+        transcode_s = 0.0 if was_cached else time.perf_counter() - start
+
+        if proxy_path == video_path:
+            print("  ⚠️ No proxy produced, skipping")
+            continue
+
+        original = time_analysis(analyzer, video_path)
+        proxy = time_analysis(analyzer, proxy_path)
+        proxy['transcode_s'] = transcode_s
+        proxy['end_to_end_s'] += transcode_s
+
+        rows.append({'video': str(video_path), 'original': original, 'proxy': proxy})
+
+        for label, r in (('original', original), ('proxy', proxy)):
+            print(f"  {label:9s} {r['bytes'] / 1e6:7.1f} MB | upload {r['upload_s']:6.2f}s | "
+                  f"wait {r['processing_wait_s']:6.2f}s | generate {r['generate_s']:6.2f}s | "
+                  f"total {r['end_to_end_s']:6.2f}s")
+
+    if not rows:
+        return
+
+    print("\n" + "=" * 70)
+    print("MEDIAN (original → proxy)")
+    print("=" * 70)
+    for key in ('bytes', 'upload_s', 'processing_wait_s', 'generate_s', 'end_to_end_s'):
+        before = statistics.median(r['original'][key] for r in rows)
+        after = statistics.median(r['proxy'][key] for r in rows)
+        change = (after - before) / before * 100 if before else 0
+        print(f"  {key:18s} {before:12.2f} → {after:12.2f}  ({change:+.0f}%)")
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n💾 Results written to {json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one video analysis request vs split concurrent part requests.
+
+Analyzes the same synthetic videos with VideoAnalyzer twice, once as a
+single request and once with video_config.split_requests (transcript,
+dimension groups and scenes/summary/temporal as concurrent requests on
+one upload), and reports per ad: wall time (p50/p95; the fake backend's
+upload and processing are instant), model calls, input/output tokens
+and failed parts.
+
+Generation time in the fake backend grows with the reply length
+(--per-1k seconds per 1000 output tokens on top of --base), so the split
+mode's wall time is that of its longest part reply, while a single
+request pays for the whole reply.
+
+Usage:
+  python3 benchmarks/bench_split.py
+  python3 benchmarks/bench_split.py --ads 20 --time-scale 0.05 --base 3 --per-1k 8
+  RAI_MODEL_BACKEND=gemini python3 benchmarks/bench_split.py --ads 5   # real API (GOOGLE_API_KEY)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from config import video_config
+from model_backend import FakeBackend
+from synthetic_video import make_mp4
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_mode(split: bool, videos, make_backend):
+    from video_processor import VideoAnalyzer
+
+    video_config.split_requests = split
+    backend = make_backend()
+    walls, input_tokens, output_tokens, failed = [], 0, 0, 0
+
+    for video in videos:
+        analyzer = VideoAnalyzer(api_key=os.getenv('GOOGLE_API_KEY', 'unused'))
+        analyzer.backend = backend
+        start = time.perf_counter()
+        result = analyzer.analyze_video_file(video, ad_copy='Brand: Bench', detected_language='en')
+        walls.append(time.perf_counter() - start)
+
+        generate = analyzer.recorder.stages().get('generate', {})
+        input_tokens += generate.get('input_tokens', 0) or 0
+        output_tokens += generate.get('output_tokens', 0) or 0
+        failed += len(result.get('split_failed', [])) + (result.get('transcript') == '[Error: Response truncated]')
+
+    calls = backend.calls['generate'] if isinstance(backend, FakeBackend) else None
+    return walls, calls, input_tokens, output_tokens, failed
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(name, default):
+        return args[args.index(name) + 1] if name in args else default
+
+    count = int(option('--ads', '10'))
+    time_scale = float(option('--time-scale', '0.05'))
+    # Upload and processing are the same in both modes; leave them out of the wall time
+    latency = {'upload_base': (0.0, 0.0), 'upload_per_mb': (0.0, 0.0), 'processing': (0.0, 0.0),
+               'generate': (float(option('--base', '3')), 0.35),
+               'generate_per_1k_output': (float(option('--per-1k', '8')), 0.2)}
+
+    def make_backend():
+        if os.getenv('RAI_MODEL_BACKEND', 'fake') == 'fake':
+            return FakeBackend(time_scale=time_scale, latency=latency)
+        from model_backend import get_backend
+        return get_backend(os.getenv('GOOGLE_API_KEY'), video_config.model_name)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        videos = []
+        for i in range(count):
+            path = Path(tmp) / f'ad_{i}.mp4'
+            path.write_bytes(make_mp4(duration_s=30) + i.to_bytes(4, 'big'))
+            videos.append(path)
+
+        print(f"🎬 {count} videos, fake time scale {time_scale:g}")
+        print(f"{'mode':8s} {'calls':>6s} {'p50 s':>8s} {'p95 s':>8s} {'in-tok/ad':>10s} "
+              f"{'out-tok/ad':>11s} {'failed':>7s}")
+        print("-" * 64)
+        for mode, split in (('single', False), ('split', True)):
+            walls, calls, input_tokens, output_tokens, failed = run_mode(split, videos, make_backend)
+            print(f"{mode:8s} {calls if calls is not None else '-':>6} {statistics.median(walls):8.2f} "
+                  f"{percentile(walls, 0.95):8.2f} {input_tokens / count:10.0f} {output_tokens / count:11.0f} "
+                  f"{failed:7d}")
+
+
+if __name__ == '__main__':
+    main()
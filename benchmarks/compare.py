@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compare two bench_pipeline.py result files (e.g. two commits).
+
+Usage:
+  python3 benchmarks/compare.py benchmarks/results/abc123.json benchmarks/results/def456.json
+  python3 benchmarks/compare.py old.json new.json --fail-over 10   # exit 1 if ads/h drops >10%
+"""
+
+import json
+import sys
+
+
+def pct_change(old, new):
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def fmt_change(change, higher_is_better=True):
+    if change is None:
+        return "    n/a"
+    better = change >= 0 if higher_is_better else change <= 0
+    return f"{change:+6.1f}% {'✅' if better else '⚠️'}"
+
+
+def main():
+    args = sys.argv[1:]
+    fail_over = None
+    if '--fail-over' in args:
+        i = args.index('--fail-over')
+        fail_over = float(args[i + 1])
+        args = args[:i] + args[i + 2:]
+
+    if len(args) != 2:
+        print(__doc__)
+        sys.exit(2)
+
+    with open(args[0]) as f:
+        old = json.load(f)
+    with open(args[1]) as f:
+        new = json.load(f)
+
+    print(f"📊 {old['commit']} → {new['commit']}")
+    if old['settings'] != new['settings']:
+        print(f"⚠️ Settings differ: {old['settings']} vs {new['settings']}")
+
+    old_modes = {r['mode']: r for r in old['results']}
+    regressed = False
+
+    for result in new['results']:
+        mode = result['mode']
+        base = old_modes.get(mode)
+        print(f"\n{mode}")
+        if base is None:
+            print("  (not in baseline)")
+            continue
+
+        throughput = pct_change(base['ads_per_hour'], result['ads_per_hour'])
+        print(f"  {'ads/hour':19s} {base['ads_per_hour']:10.0f} → {result['ads_per_hour']:10.0f}  {fmt_change(throughput)}")
+        for key, label in (('peak_rss_mb', 'peak RSS MB'), ('disk_bytes', 'disk bytes'),
+                           ('upload_bytes', 'upload bytes')):
+            change = pct_change(base[key], result[key])
+            print(f"  {label:19s} {base[key]:10.1f} → {result[key]:10.1f}  {fmt_change(change, higher_is_better=False)}")
+
+        for stage, r in result['stages'].items():
+            if stage in base['stages']:
+                change = pct_change(base['stages'][stage]['p50'], r['p50'])
+                print(f"  p50 {stage:15s} {base['stages'][stage]['p50']:9.3f}s → {r['p50']:9.3f}s  "
+                      f"{fmt_change(change, higher_is_better=False)}")
+
+        if fail_over is not None and throughput is not None and throughput < -fail_over:
+            regressed = True
+
+    if regressed:
+        print(f"\n❌ Throughput dropped by more than {fail_over}%")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Synthetic analysis store for dashboard scale testing.
+
+Writes N analyzed ads the way the pipeline leaves them on disk:
+
+- analysis_storage/<id>/metadata.json, a mix of the old format (scores
+  nested under 'analysis', written by simple_pipeline.py) and the flat
+  format (VideoAnalyzer result at the top level) that
+  dashboard_enhanced.load_data / dashboard_new.load_data both read
+- cannes_analysis_results_<timestamp>.json and
+  hungarian_analysis_results_<timestamp>.json snapshots for dashboard/
+
+Scores, languages, transcripts and findings are drawn from distributions
+shaped like the real runs: overall scores around the low 60s, climate the
+weakest and most spread out dimension, mostly English and Hungarian ads,
+short transcripts with a long tail, a few failed (all-zero) analyses.
+
+Usage:
+  python3 benchmarks/synthetic_store.py 10000 --out /tmp/rai_store
+  python3 benchmarks/synthetic_store.py 1000 --out /tmp/rai_store --old-format 0.5 --seed 7
+"""
+
+import hashlib
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+DIMENSIONS = {
+    # name: (short key, mean, standard deviation)
+    'Climate Responsibility': ('climate', 48, 20),
+    'Social Responsibility': ('social', 68, 13),
+    'Cultural Sensitivity': ('cultural', 74, 11),
+    'Ethical Communication': ('ethical', 66, 14),
+}
+
+LANGUAGES = [('en', 0.55), ('hu', 0.30), ('de', 0.04), ('fr', 0.04), ('es', 0.03),
+             ('pt', 0.02), ('ja', 0.01), ('unknown', 0.01)]
+
+# Share of ads whose analysis failed and stored all-zero scores
+FAILED_RATE = 0.02
+
+# Share of Hungarian ads that came from the stakeholder (Reklámgyűjtő) collection
+STAKEHOLDER_RATE = 0.15
+
+BRANDS = [
+    'Volvo', 'IKEA', 'Patagonia', 'Dove', 'Heineken', 'Apple', 'Nike', 'Unilever',
+    'Coca-Cola', 'McDonald\'s', 'Toyota', 'Samsung', 'Google', 'Spotify', 'Adidas',
+    'OTP Bank', 'Telekom', 'MOL', 'Dreher', 'Szentkirályi', 'Yettel', 'Lidl',
+    'Tesco', 'Auchan', 'Vodafone', 'Renault', 'L\'Oréal', 'Nestlé', 'Danone', 'BMW',
+]
+
+AWARD_CATEGORIES = ['Film', 'Film Craft', 'Sustainable Development Goals', 'Glass',
+                    'Outdoor', 'Social & Creator', 'Brand Experience']
+
+EN_WORDS = ('the future is here together we make every day better for you and your family '
+            'clean energy planet community care choose real people moments share life '
+            'taste fresh new world change start today because it matters').split()
+
+HU_WORDS = ('a jövő itt van együtt minden nap jobbá tesszük neked és a családodnak '
+            'tiszta energia bolygó közösség törődés válassz igazi emberek pillanatok '
+            'ossz meg élet íz friss új világ változás kezdd ma mert számít').split()
+
+FINDINGS = {
+    'climate': ['No environmental claims are made', 'Promotes reusable packaging without lifecycle data',
+                'Vague "green" messaging without substantiation', 'Concrete emissions target cited with a date',
+                'Product use implies high energy consumption', 'Highlights renewable energy sourcing'],
+    'social': ['Diverse cast across age and ethnicity', 'Gender roles are traditional',
+               'Inclusive representation of people with disabilities', 'Targets affluent urban consumers',
+               'Positive portrayal of community and family', 'Limited representation beyond one demographic'],
+    'cultural': ['Respectful use of local traditions', 'Humour relies on national stereotypes',
+                 'Universal message that travels across markets', 'Local language and references used well',
+                 'Religious imagery used carelessly', 'No cultural appropriation concerns'],
+    'ethical': ['Claims are specific and verifiable', 'Fine print contradicts the headline claim',
+                'Emotional pressure targeting children', 'Clear pricing and conditions shown',
+                'Selective disclosure of product risks', 'Transparent about sponsorship'],
+}
+
+FINDINGS_HU = {
+    'climate': ['Nincsenek környezeti állítások', 'Újrahasználható csomagolás életciklus-adatok nélkül',
+                'Homályos "zöld" üzenet alátámasztás nélkül', 'Konkrét kibocsátási cél dátummal'],
+    'social': ['Sokszínű szereplőgárda', 'Hagyományos nemi szerepek',
+               'Befogadó ábrázolás', 'Tehetős városi fogyasztókat céloz'],
+    'cultural': ['Helyi hagyományok tiszteletteljes használata', 'A humor nemzeti sztereotípiákra épít',
+                 'Univerzális üzenet', 'Jó helyi nyelvi utalások'],
+    'ethical': ['Konkrét, ellenőrizhető állítások', 'Az apró betű ellentmond a főüzenetnek',
+                'Gyerekekre irányuló érzelmi nyomás', 'Átlátható árazás'],
+}
+
+SUMMARY = {
+    'strengths': ['Authentic storytelling', 'Clear and honest product claims', 'Inclusive casting',
+                  'Strong sustainability message', 'Respectful humour'],
+    'concerns': ['Unsubstantiated environmental claims', 'Stereotypical portrayals',
+                 'Promotes overconsumption', 'Missing disclosures', 'Pressure tactics'],
+    'recommendations': ['Back green claims with data', 'Broaden representation',
+                        'Add lifecycle information', 'Clarify conditions on screen', 'Avoid stereotypes'],
+}
+
+SUMMARY_HU = {
+    'strengths': ['Hiteles történetmesélés', 'Világos, őszinte állítások', 'Befogadó szereposztás'],
+    'concerns': ['Alátámasztatlan környezeti állítások', 'Sztereotip ábrázolás', 'Túlfogyasztást népszerűsít'],
+    'recommendations': ['Adatokkal támassza alá a zöld állításokat', 'Szélesebb reprezentáció',
+                        'Életciklus-információk hozzáadása'],
+}
+
+
+def _clip(value: float) -> int:
+    return max(0, min(100, int(round(value))))
+
+
+def _pick_language(rng: random.Random) -> str:
+    r = rng.random()
+    for language, share in LANGUAGES:
+        r -= share
+        if r <= 0:
+            return language
+    return LANGUAGES[0][0]
+
+
+def _transcript(rng: random.Random, language: str) -> str:
+    """Spoken text of a 15-90s ad: usually short, sometimes long, sometimes none"""
+    if rng.random() < 0.08:
+        return ''
+    words = HU_WORDS if language == 'hu' else EN_WORDS
+    length = min(900, int(rng.lognormvariate(4.3, 0.6)))
+    return ' '.join(rng.choice(words) for _ in range(length)).capitalize() + '.'
+
+
+def _scenes(rng: random.Random, dimensions: Dict) -> List[Dict]:
+    """3-5 scenes of a video analysis, scored around the ad's dimension scores"""
+    scenes = []
+    start = 0
+    for _ in range(rng.randint(3, 5)):
+        length = rng.randint(3, 15)
+        scores = {key: _clip(dimensions[name]['score'] + rng.gauss(0, 8))
+                  for name, (key, _, _) in DIMENSIONS.items()}
+        scenes.append({
+            'timestamp': f"{start // 60}:{start % 60:02d}-{(start + length) // 60}:{(start + length) % 60:02d}",
+            'description': rng.choice(['Family at breakfast table', 'Product close-up with logo',
+                                       'City street at night', 'Athletes training outdoors',
+                                       'Voiceover over nature footage', 'Call to action end card']),
+            'visual_elements': rng.sample(['logo', 'product', 'people', 'nature', 'text overlay', 'city'], 2),
+            'audio_content': rng.choice(['Upbeat music', 'Voiceover', 'Dialogue', 'Silence', 'Jingle']),
+            **{f'{key}_score': score for key, score in scores.items()},
+            'overall_scene_score': _clip(sum(scores.values()) / len(scores))
+        })
+        start += length
+    return scenes
+
+
+def make_analysis(rng: random.Random, language: str) -> Dict:
+    """
+    One VideoAnalyzer-style result (dimensions, scenes, summary, transcript).
+
+    Dimension scores share an ad-level quality term, so they correlate
+    the way real analyses do.
+    """
+    if rng.random() < FAILED_RATE:
+        return {
+            'overall_score': 0,
+            'detected_language': language,
+            'dimensions': {name: {'score': 0, 'findings': []} for name in DIMENSIONS},
+            'summary': {},
+            'transcript': ''
+        }
+
+    quality = rng.gauss(0, 8)
+    bilingual = language == 'hu'
+
+    dimensions = {}
+    for name, (key, mean, sd) in DIMENSIONS.items():
+        dimension = {
+            'score': _clip(mean + quality + rng.gauss(0, sd)),
+            'findings': rng.sample(FINDINGS[key], rng.randint(2, 4))
+        }
+        if bilingual:
+            dimension['findings_hu'] = rng.sample(FINDINGS_HU[key], rng.randint(2, 4))
+        dimensions[name] = dimension
+
+    summary = {key: rng.sample(items, rng.randint(2, 4)) for key, items in SUMMARY.items()}
+    if bilingual:
+        summary.update({f'{key}_hu': rng.sample(items, rng.randint(1, 3)) for key, items in SUMMARY_HU.items()})
+
+    return {
+        'overall_score': _clip(sum(d['score'] for d in dimensions.values()) / len(dimensions)),
+        'detected_language': language,
+        'dimensions': dimensions,
+        'summary': summary,
+        'transcript': _transcript(rng, language),
+        'scenes': _scenes(rng, dimensions),
+        'duration_analyzed': f"{rng.choice([15, 20, 30, 30, 30, 45, 60, 90])}s"
+    }
+
+
+def make_ad(rng: random.Random, index: int, started: datetime) -> Dict:
+    """One ad: catalog fields plus its analysis"""
+    language = _pick_language(rng)
+    # A few brands run most of the ads
+    brand = BRANDS[min(len(BRANDS) - 1, int(rng.paretovariate(1.2)) - 1)]
+    stakeholder = language == 'hu' and rng.random() < STAKEHOLDER_RATE
+
+    prefix = 'stakeholder' if stakeholder else 'ad'
+    ad_id = f"{prefix}_{hashlib.md5(str(index).encode()).hexdigest()[:12]}"
+    analyzed_at = started + timedelta(seconds=index * rng.uniform(20, 90))
+
+    return {
+        'id': ad_id,
+        'url': f"https://www.youtube.com/watch?v={ad_id[-11:]}",
+        'brand': brand,
+        'campaign': f"{brand} {rng.choice(['Spring', 'Summer', 'Holiday', 'Launch', 'Brand'])} {2019 + index % 6}",
+        'analyzed_at': analyzed_at.isoformat(),
+        'award_category': rng.choice(AWARD_CATEGORIES) if language != 'hu' else None,
+        **make_analysis(rng, language)
+    }
+
+
+def old_format_metadata(ad: Dict) -> Dict:
+    """metadata.json as simple_pipeline.analyze_ad writes it"""
+    dims = ad['dimensions']
+    return {
+        'id': ad['id'],
+        'url': ad['url'],
+        'brand': ad['brand'],
+        'campaign': ad['campaign'],
+        'downloaded_at': ad['analyzed_at'],
+        'video_file': f"analysis_storage/{ad['id']}/video.mp4",
+        'source': 'download',
+        'status': 'analyzed',
+        'analysis': {
+            'analyzed_at': ad['analyzed_at'],
+            'detected_language': ad['detected_language'],
+            'overall_score': ad['overall_score'],
+            'climate_score': dims['Climate Responsibility']['score'],
+            'social_score': dims['Social Responsibility']['score'],
+            'cultural_score': dims['Cultural Sensitivity']['score'],
+            'ethical_score': dims['Ethical Communication']['score'],
+            'summary': ad['summary'],
+            'dimensions': dims,
+            'transcript': ad['transcript'],
+            'duration': ad.get('duration_analyzed', '')
+        }
+    }
+
+
+def flat_format_metadata(ad: Dict) -> Dict:
+    """metadata.json with the VideoAnalyzer result stored at the top level"""
+    return {
+        'id': ad['id'],
+        'url': ad['url'],
+        'brand': ad['brand'],
+        'campaign': ad['campaign'],
+        'analyzed_at': ad['analyzed_at'],
+        'overall_score': ad['overall_score'],
+        'detected_language': ad['detected_language'],
+        'dimensions': ad['dimensions'],
+        'summary': ad['summary'],
+        'transcript': ad['transcript'],
+        'scenes': ad.get('scenes', []),
+        'duration_analyzed': ad.get('duration_analyzed', '')
+    }
+
+
+def snapshot_record(ad: Dict) -> Dict:
+    """One entry of a *_analysis_results_*.json file as dashboard/ reads it"""
+    dims = ad['dimensions']
+    hungarian = ad['detected_language'] == 'hu'
+    return {
+        'filename': f"{ad['id']}.mp4",
+        'brand': ad['brand'],
+        'title': f"{ad['brand']} // {ad['campaign']}" if hungarian else ad['campaign'],
+        'url': ad['url'],
+        'award_category': ad.get('award_category'),
+        'detected_language': ad['detected_language'],
+        'overall_score': ad['overall_score'],
+        'climate_score': dims['Climate Responsibility']['score'],
+        'social_score': dims['Social Responsibility']['score'],
+        'cultural_score': dims['Cultural Sensitivity']['score'],
+        'ethical_score': dims['Ethical Communication']['score'],
+        'dimensions': dims,
+        'summary': ad['summary'],
+        'transcript': ad['transcript'],
+        'duration_analyzed': ad.get('duration_analyzed', ''),
+        'analyzed_at': ad['analyzed_at']
+    }
+
+
+def generate_store(out_dir: Path, count: int, seed: int = 0, old_format: float = 0.4) -> Dict:
+    """
+    Write a synthetic store of `count` ads under out_dir.
+
+    Args:
+        out_dir: Root to write into (analysis_storage/ and the snapshots go here)
+        count: Number of ads
+        seed: RNG seed (same seed, same store)
+        old_format: Share of metadata.json files in the old nested format
+
+    Returns:
+        dict with ads, old_format, flat_format, cannes, hungarian, bytes
+    """
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    storage = out_dir / 'analysis_storage'
+    storage.mkdir(parents=True, exist_ok=True)
+
+    started = datetime(2025, 1, 1)
+    cannes: List[Dict] = []
+    hungarian: List[Dict] = []
+    stats = {'ads': count, 'old_format': 0, 'flat_format': 0, 'bytes': 0}
+
+    for index in range(count):
+        ad = make_ad(rng, index, started)
+
+        if rng.random() < old_format:
+            metadata = old_format_metadata(ad)
+            stats['old_format'] += 1
+        else:
+            metadata = flat_format_metadata(ad)
+            stats['flat_format'] += 1
+
+        ad_dir = storage / ad['id']
+        ad_dir.mkdir(exist_ok=True)
+        text = json.dumps(metadata, indent=2, ensure_ascii=False)
+        (ad_dir / 'metadata.json').write_text(text, encoding='utf-8')
+        stats['bytes'] += len(text.encode('utf-8'))
+
+        (hungarian if ad['detected_language'] == 'hu' else cannes).append(snapshot_record(ad))
+
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    for name, records in (('cannes', cannes), ('hungarian', hungarian)):
+        path = out_dir / f'{name}_analysis_results_{stamp}.json'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        stats[name] = len(records)
+        stats['bytes'] += path.stat().st_size
+
+    return stats
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or not args[0].isdigit():
+        print(__doc__)
+        sys.exit(1)
+
+    def option(name, default):
+        if name in args:
+            return args[args.index(name) + 1]
+        return default
+
+    count = int(args[0])
+    out_dir = Path(option('--out', 'synthetic_store'))
+    stats = generate_store(out_dir, count, seed=int(option('--seed', '0')),
+                           old_format=float(option('--old-format', '0.4')))
+
+    print(f"✅ {stats['ads']} ads in {out_dir}/analysis_storage "
+          f"({stats['old_format']} old format, {stats['flat_format']} flat)")
+    print(f"   Snapshots: {stats['cannes']} Cannes, {stats['hungarian']} Hungarian")
+    print(f"   {stats['bytes'] / 1e6:.1f} MB written")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Synthetic test videos for benchmarks.
+
+Two kinds:
+- make_mp4 / make_webm build structurally valid containers in pure Python
+  (correct moov/EBML headers, padded payload). They are not playable, but
+  probe exactly like real files and need no ffmpeg.
+- make_ffmpeg_video renders a real, playable ad like create_test_video.sh
+  when ffmpeg is installed.
+"""
+
+import shutil
+import struct
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def _full_box(box_type: bytes, version: int, payload: bytes) -> bytes:
+    return _box(box_type, struct.pack('>I', version << 24) + payload)
+
+
+def make_mp4(duration_s: float = 30.0, width: int = 1280, height: int = 720,
+             fps: int = 30, fourcc: bytes = b'avc1', size_bytes: int = 1024 * 1024,
+             moov_at_end: bool = True) -> bytes:
+    """
+    Build an MP4 container with one video track.
+
+    Args:
+        duration_s: Duration written to mvhd/mdhd
+        width, height: Coded frame size
+        fps: Constant frame rate (one stts entry)
+        fourcc: Sample entry codec ('avc1', 'hvc1', ...)
+        size_bytes: Approximate total file size (mdat is padded)
+        moov_at_end: Put moov after mdat like a non-faststart download
+
+    Returns:
+        File contents as bytes
+    """
+    timescale = 90000
+    media_timescale = fps * 1000
+    frames = int(duration_s * fps)
+
+    mvhd = _full_box(b'mvhd', 0, struct.pack('>IIII', 0, 0, timescale, int(duration_s * timescale)) + bytes(80))
+
+    matrix = struct.pack('>9I', 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    tkhd = _full_box(b'tkhd', 0, struct.pack('>IIIII', 0, 0, 1, 0, int(duration_s * timescale))
+                     + bytes(8) + bytes(8) + matrix + struct.pack('>II', width << 16, height << 16))
+
+    mdhd = _full_box(b'mdhd', 0, struct.pack('>IIII', 0, 0, media_timescale, frames * 1000) + bytes(4))
+    hdlr = _full_box(b'hdlr', 0, bytes(4) + b'vide' + bytes(12) + b'VideoHandler\x00')
+
+    sample_entry = _box(fourcc, bytes(6) + struct.pack('>H', 1) + bytes(16)
+                        + struct.pack('>HH', width, height) + bytes(50))
+    stsd = _full_box(b'stsd', 0, struct.pack('>I', 1) + sample_entry)
+    stts = _full_box(b'stts', 0, struct.pack('>III', 1, frames, 1000))
+    stbl = _box(b'stbl', stsd + stts)
+    minf = _box(b'minf', stbl)
+    mdia = _box(b'mdia', mdhd + hdlr + minf)
+    trak = _box(b'trak', tkhd + mdia)
+    moov = _box(b'moov', mvhd + trak)
+
+    ftyp = _box(b'ftyp', b'isom' + struct.pack('>I', 512) + b'isomiso2avc1mp41')
+    padding = max(0, size_bytes - len(ftyp) - len(moov) - 8)
+    mdat = _box(b'mdat', bytes(padding))
+
+    if moov_at_end:
+        return ftyp + mdat + moov
+    return ftyp + moov + mdat
+
+
+def _ebml_element(element_id: int, payload: bytes) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big')
+    size = len(payload) | (1 << 56)
+    return id_bytes + size.to_bytes(8, 'big') + payload
+
+
+def _ebml_uint(element_id: int, value: int) -> bytes:
+    return _ebml_element(element_id, value.to_bytes(8, 'big'))
+
+
+def make_webm(duration_s: float = 30.0, width: int = 1280, height: int = 720,
+              fps: int = 30, codec_id: str = 'V_VP9', size_bytes: int = 1024 * 1024) -> bytes:
+    """Build a WebM container with Info, one video track and a padded cluster"""
+    header = _ebml_element(0x1A45DFA3, _ebml_element(0x4282, b'webm'))
+
+    info = _ebml_element(0x1549A966,
+                         _ebml_uint(0x2AD7B1, 1000000)
+                         + _ebml_element(0x4489, struct.pack('>d', duration_s * 1000)))
+    video = _ebml_element(0xE0, _ebml_uint(0xB0, width) + _ebml_uint(0xBA, height))
+    track = _ebml_element(0xAE,
+                          _ebml_uint(0xD7, 1)
+                          + _ebml_uint(0x83, 1)
+                          + _ebml_element(0x86, codec_id.encode())
+                          + _ebml_uint(0x23E383, int(1e9 / fps))
+                          + video)
+    tracks = _ebml_element(0x1654AE6B, track)
+
+    padding = max(0, size_bytes - len(header) - len(info) - len(tracks) - 32)
+    cluster = _ebml_element(0x1F43B675, bytes(padding))
+
+    return header + _ebml_element(0x18538067, info + tracks + cluster)
+
+
+def make_ffmpeg_video(output_path: Path, duration_s: int = 30,
+                      size: str = '1280x720', brand: str = 'EcoThreads') -> Optional[Path]:
+    """Render a playable test ad with ffmpeg (None if ffmpeg isn't installed)"""
+    if not shutil.which('ffmpeg'):
+        return None
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    cmd = [
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'color=c=#2E7D32:s={size}:d={duration_s}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration_s}',
+        '-vf', f"drawtext=text='{brand}':fontsize=80:fontcolor=white:x=(w-text_w)/2:y=100",
+        '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest',
+        str(output_path)
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        # drawtext needs a font; retry without it on minimal ffmpeg builds
+        cmd[cmd.index('-vf'):cmd.index('-vf') + 2] = []
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+    return output_path if result.returncode == 0 else None
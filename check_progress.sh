@@ -14,11 +14,13 @@ if ps aux | grep -q "[r]un_overnight.sh"; then
     PIDS=$(ps aux | grep "[r]un_overnight.sh" | awk '{print $2}' | tr '\n' ' ')
     echo "   PIDs: $PIDS"
 
-    # Check caffeinate
-    if ps aux | grep -q "[c]affeinate"; then
-        echo "✅ Mac sleep prevention ACTIVE"
-    else
-        echo "⚠️  caffeinate not running (Mac may sleep)"
+    # Check caffeinate (macOS only)
+    if command -v caffeinate >/dev/null 2>&1; then
+        if ps aux | grep -q "[c]affeinate"; then
+            echo "✅ Mac sleep prevention ACTIVE"
+        else
+            echo "⚠️  caffeinate not running (Mac may sleep)"
+        fi
     fi
 else
     echo "❌ Script is NOT running"
@@ -29,6 +31,22 @@ echo "=================================="
 echo "📊 PROGRESS"
 echo "=================================="
 
+# Live batch status from the metrics endpoint (simple_pipeline.py batch --metrics-port)
+METRICS_PORT=${RAI_METRICS_PORT:-9464}
+if STATUS=$(curl -sf --max-time 2 "http://127.0.0.1:$METRICS_PORT/status"); then
+    echo "$STATUS" | python3 -c '
+import json, sys
+s = json.load(sys.stdin)
+eta = "%d min" % (s["eta_seconds"] // 60) if s["eta_seconds"] is not None else "n/a"
+print("Batch: %s  %d/%d done, %d queued, %d in flight" % (s["name"], s["done"], s["total"], s["queue_depth"], s["in_flight"]))
+print("Finished: %s" % s["finished"])
+print("Throughput: %.1f ads/h   429 rate: %.1f%%   ETA: %s" % (s["throughput_ads_per_hour"], s["rate_limited_ratio"] * 100, eta))
+for stage, v in s["stages"].items():
+    print("  %-16s ok=%d failed=%d running=%d mean=%ss" % (stage, v["completed"], v["failed"], v["in_flight"], v["mean_seconds"]))
+'
+    echo ""
+fi
+
 # Count analyzed ads
 TOTAL=$(ls analysis_storage/ 2>/dev/null | wc -l | tr -d ' ')
 echo "Total ads analyzed: $TOTAL"
@@ -23,9 +23,59 @@ class VideoConfig:
     # File API threshold (videos larger than this use File API)
     file_api_threshold_mb: int = 20
 
+    # Chunk size for streaming source-to-Gemini uploads (bounds memory use)
+    stream_chunk_mb: int = 8
+
+    # Low-resolution proxy uploaded instead of the original (see video_proxy.py)
+    use_proxy: bool = False
+    proxy_height: int = 360
+    proxy_fps: int = 2
+    proxy_audio_kbps: int = 64
+
+    # Split analysis: the uploaded file is scored by concurrent smaller
+    # requests (transcript, dimension groups, scenes/summary/temporal)
+    # merged into one result; see VideoAnalyzer._analyze_split. Each part
+    # is billed for the video's input tokens again.
+    split_requests: bool = False
+    split_group_size: int = 2
+    split_max_output_tokens: int = 3000
+
     def __post_init__(self):
         if self.supported_formats is None:
             self.supported_formats = ["mp4", "mov", "avi", "webm"]
 
-# Global config instance
+@dataclass
+class ImageConfig:
+    """Image ad preprocessing and result cache (see image_cache.py)"""
+    # Longest side sent to the model (Gemini tiles images at 768px)
+    max_side: int = 1536
+    jpeg_quality: int = 85
+
+    # Near-identical creatives: dHash bits that may differ for a cache hit (of 64)
+    match_distance: int = 6
+
+    # Shared across sessions and server processes
+    cache_dir: str = "image_cache"
+
+    # Packed requests: several creatives per call (image_analysis.analyze_packed).
+    # Creatives per request are chosen so estimated input stays under
+    # pack_input_tokens and expected output under pack_max_output_tokens.
+    pack_input_tokens: int = 24000
+    pack_output_tokens_per_creative: int = 2500
+    pack_max_output_tokens: int = 32768
+    max_pack_size: int = 10
+
+@dataclass
+class TranslationConfig:
+    """On-demand Hungarian versions of English analyses (see translation.py)"""
+    model_name: str = "gemini-2.5-flash"
+    temperature: float = 0.2
+    max_output_tokens: int = 4000
+
+    # Shared across sessions and server processes
+    cache_dir: str = "translation_cache"
+
+# Global config instances
 video_config = VideoConfig()
+image_config = ImageConfig()
+translation_config = TranslationConfig()
@@ -0,0 +1,467 @@
+"""
+Pure-Python container header parser for video metadata.
+
+Reads duration, resolution, fps and codec straight from MP4/MOV 'moov'
+atoms and WebM/Matroska headers, without spawning ffprobe or copying the
+video. Returns None for anything unusual (fragmented MP4, live WebM,
+unknown codecs, ...) so callers can fall back to ffprobe.
+"""
+
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# How much of a WebM file to read when looking for Info/Tracks
+WEBM_HEADER_BYTES = 1024 * 1024
+
+MP4_TOP_LEVEL = {b'ftyp', b'moov', b'mdat', b'free', b'wide', b'skip', b'pnot', b'uuid'}
+
+MP4_CODECS = {
+    b'avc1': 'h264', b'avc3': 'h264',
+    b'hvc1': 'hevc', b'hev1': 'hevc',
+    b'mp4v': 'mpeg4',
+    b'av01': 'av1',
+    b'vp09': 'vp9', b'vp08': 'vp8',
+    b'apcn': 'prores', b'apch': 'prores', b'apcs': 'prores', b'apco': 'prores', b'ap4h': 'prores',
+    b'jpeg': 'mjpeg', b'mjpa': 'mjpeg',
+    b's263': 'h263', b'h263': 'h263',
+}
+
+WEBM_CODECS = {
+    'V_VP8': 'vp8',
+    'V_VP9': 'vp9',
+    'V_AV1': 'av1',
+    'V_MPEG4/ISO/AVC': 'h264',
+    'V_MPEGH/ISO/HEVC': 'hevc',
+    'V_THEORA': 'theora',
+}
+
+EBML_MAGIC = b'\x1a\x45\xdf\xa3'
+
+# Matroska element IDs (marker bits included)
+EBML_SEGMENT = 0x18538067
+EBML_INFO = 0x1549A966
+EBML_TIMESTAMP_SCALE = 0x2AD7B1
+EBML_DURATION = 0x4489
+EBML_TRACKS = 0x1654AE6B
+EBML_TRACK_ENTRY = 0xAE
+EBML_TRACK_TYPE = 0x83
+EBML_CODEC_ID = 0x86
+EBML_DEFAULT_DURATION = 0x23E383
+EBML_VIDEO = 0xE0
+EBML_PIXEL_WIDTH = 0xB0
+EBML_PIXEL_HEIGHT = 0xBA
+EBML_CLUSTER = 0x1F43B675
+
+
+def probe_container(source: Union[bytes, bytearray, memoryview, str, Path]) -> Optional[Dict]:
+    """
+    Extract video metadata from container headers.
+
+    Args:
+        source: Video as an in-memory buffer, or a path to the file
+
+    Returns:
+        Dictionary with duration, size_mb, width, height, fps, codec
+        (same keys as video_utils.get_video_metadata), or None if the
+        container isn't one we can read reliably
+    """
+    try:
+        if isinstance(source, (str, Path)):
+            return _probe_file(Path(source))
+        return _probe_buffer(memoryview(source).cast('B'))
+    except (struct.error, ValueError, IndexError, OSError):
+        return None
+
+
+def is_truncated(path: Union[str, Path]) -> Optional[bool]:
+    """
+    Whether a file ends before its container says it should (a cut-off download).
+
+    MP4/MOV: every top-level box (mdat included) must fit in the file, so a
+    faststart file cut after its moov is caught even though its header
+    still reports the full duration. WebM: the Segment must fit, unless its
+    size is left open (live recordings).
+
+    Returns:
+        True or False, or None if the container isn't one we can check
+    """
+    path = Path(path)
+    try:
+        size = path.stat().st_size
+        with open(path, 'rb') as f:
+            head = f.read(64)
+            if head[4:8] in MP4_TOP_LEVEL:
+                return _mp4_boxes_overrun(f, size)
+            if head[:4] == EBML_MAGIC:
+                for element_id, data_start, data_end, unknown_size in _elements(memoryview(head), 0, 1 << 62):
+                    if element_id == EBML_SEGMENT:
+                        return None if unknown_size else data_end > size
+                return None
+    except (struct.error, ValueError, IndexError, OSError):
+        return None
+    return None
+
+
+def _mp4_boxes_overrun(f, file_size: int) -> bool:
+    """True if a top-level box header or extent runs past the end of the file"""
+    offset = 0
+    while offset < file_size:
+        if offset + 8 > file_size:
+            return True
+        f.seek(offset)
+        header = f.read(16)
+        size, _ = struct.unpack_from('>I4s', header, 0)
+        header_len = 8
+        if size == 1:
+            if len(header) < 16:
+                return True
+            size = struct.unpack_from('>Q', header, 8)[0]
+            header_len = 16
+        elif size == 0:
+            return False
+
+        if size < header_len:
+            raise ValueError("Malformed MP4 box")
+        offset += size
+    return offset > file_size
+
+
+def _probe_buffer(buf: memoryview) -> Optional[Dict]:
+    size = len(buf)
+    if size < 12:
+        return None
+
+    if bytes(buf[:4]) == EBML_MAGIC:
+        info = _parse_webm(buf)
+    elif bytes(buf[4:8]) in MP4_TOP_LEVEL:
+        moov = _find_mp4_moov_in_buffer(buf)
+        info = _parse_moov(moov) if moov is not None else None
+    else:
+        return None
+
+    return _with_size(info, size)
+
+
+def _probe_file(path: Path) -> Optional[Dict]:
+    size = path.stat().st_size
+    if size < 12:
+        return None
+
+    with open(path, 'rb') as f:
+        head = f.read(12)
+
+        if head[:4] == EBML_MAGIC:
+            f.seek(0)
+            info = _parse_webm(memoryview(f.read(WEBM_HEADER_BYTES)))
+        elif head[4:8] in MP4_TOP_LEVEL:
+            moov = _read_mp4_moov_from_file(f, size)
+            info = _parse_moov(memoryview(moov)) if moov is not None else None
+        else:
+            return None
+
+    return _with_size(info, size)
+
+
+def _with_size(info: Optional[Dict], size_bytes: int) -> Optional[Dict]:
+    if info is None:
+        return None
+    return {
+        'duration': info['duration'],
+        'size_mb': size_bytes / (1024 * 1024),
+        'width': info['width'],
+        'height': info['height'],
+        'fps': info['fps'],
+        'codec': info['codec']
+    }
+
+
+# ---------------------------------------------------------------------------
+# MP4 / MOV
+# ---------------------------------------------------------------------------
+
+def _box_header(buf, offset: int, end: int):
+    """Return (box_type, content_start, box_end) for the box at offset"""
+    size, box_type = struct.unpack_from('>I4s', buf, offset)
+    header = 8
+    if size == 1:
+        size = struct.unpack_from('>Q', buf, offset + 8)[0]
+        header = 16
+    elif size == 0:
+        size = end - offset
+
+    if size < header or offset + size > end:
+        raise ValueError("Malformed MP4 box")
+
+    return box_type, offset + header, offset + size
+
+
+def _children(buf, start: int, end: int):
+    offset = start
+    while offset + 8 <= end:
+        box_type, content, box_end = _box_header(buf, offset, end)
+        yield box_type, content, box_end
+        offset = box_end
+
+
+def _find_child(buf, start: int, end: int, wanted: bytes):
+    for box_type, content, box_end in _children(buf, start, end):
+        if box_type == wanted:
+            return content, box_end
+    return None
+
+
+def _find_mp4_moov_in_buffer(buf: memoryview) -> Optional[memoryview]:
+    found = _find_child(buf, 0, len(buf), b'moov')
+    if found is None:
+        return None
+    content, box_end = found
+    return buf[content:box_end]
+
+
+def _read_mp4_moov_from_file(f, file_size: int) -> Optional[bytes]:
+    """Seek from box header to box header; read only the moov payload"""
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        size, box_type = struct.unpack_from('>I4s', header, 0)
+        header_len = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', header, 8)[0]
+            header_len = 16
+        elif size == 0:
+            size = file_size - offset
+
+        if size < header_len:
+            return None
+
+        if box_type == b'moov':
+            f.seek(offset + header_len)
+            return f.read(size - header_len)
+
+        offset += size
+
+    return None
+
+
+def _parse_moov(moov: memoryview) -> Optional[Dict]:
+    end = len(moov)
+
+    mvhd = _find_child(moov, 0, end, b'mvhd')
+    if mvhd is None:
+        return None
+    content, _ = mvhd
+    if moov[content] == 1:
+        timescale, duration = struct.unpack_from('>IQ', moov, content + 20)
+    else:
+        timescale, duration = struct.unpack_from('>II', moov, content + 12)
+
+    # Fragmented MP4 keeps durations in moof boxes - leave it to ffprobe
+    if timescale == 0 or duration == 0 or _find_child(moov, 0, end, b'mvex') is not None:
+        return None
+
+    info = {
+        'duration': duration / timescale,
+        'width': 0,
+        'height': 0,
+        'fps': 0,
+        'codec': 'unknown'
+    }
+
+    for box_type, trak_start, trak_end in _children(moov, 0, end):
+        if box_type != b'trak':
+            continue
+        track = _parse_video_trak(moov, trak_start, trak_end)
+        if track is not None:
+            info.update(track)
+            break
+
+    return info
+
+
+def _parse_video_trak(buf, start: int, end: int) -> Optional[Dict]:
+    mdia = _find_child(buf, start, end, b'mdia')
+    if mdia is None:
+        return None
+    mdia_start, mdia_end = mdia
+
+    hdlr = _find_child(buf, mdia_start, mdia_end, b'hdlr')
+    if hdlr is None or bytes(buf[hdlr[0] + 8:hdlr[0] + 12]) != b'vide':
+        return None
+
+    mdhd = _find_child(buf, mdia_start, mdia_end, b'mdhd')
+    if mdhd is None:
+        return None
+    content = mdhd[0]
+    if buf[content] == 1:
+        timescale, media_duration = struct.unpack_from('>IQ', buf, content + 20)
+    else:
+        timescale, media_duration = struct.unpack_from('>II', buf, content + 12)
+
+    stbl = None
+    minf = _find_child(buf, mdia_start, mdia_end, b'minf')
+    if minf is not None:
+        stbl = _find_child(buf, minf[0], minf[1], b'stbl')
+    if stbl is None:
+        return None
+
+    stsd = _find_child(buf, stbl[0], stbl[1], b'stsd')
+    if stsd is None:
+        return None
+    # version/flags, entry_count, then the first sample entry (size, format)
+    fourcc = bytes(buf[stsd[0] + 12:stsd[0] + 16])
+    codec = MP4_CODECS.get(fourcc)
+    if codec is None:
+        raise ValueError(f"Unsupported video codec: {fourcc!r}")
+    # Visual sample entry carries the coded size, which is what ffprobe reports
+    width, height = struct.unpack_from('>HH', buf, stsd[0] + 8 + 32)
+
+    if width == 0 or height == 0:
+        tkhd = _find_child(buf, start, end, b'tkhd')
+        if tkhd is not None:
+            offset = tkhd[0] + (88 if buf[tkhd[0]] == 1 else 76)
+            width, height = (value >> 16 for value in struct.unpack_from('>II', buf, offset))
+
+    fps = 0
+    stts = _find_child(buf, stbl[0], stbl[1], b'stts')
+    if stts is not None and timescale:
+        entry_count = struct.unpack_from('>I', buf, stts[0] + 4)[0]
+        deltas = set()
+        samples = 0
+        for i in range(entry_count):
+            count, delta = struct.unpack_from('>II', buf, stts[0] + 8 + i * 8)
+            samples += count
+            deltas.add(delta)
+
+        if len(deltas) == 1 and 0 not in deltas:
+            fps = timescale / deltas.pop()
+        elif media_duration:
+            fps = samples * timescale / media_duration
+
+    return {
+        'width': width,
+        'height': height,
+        'fps': fps,
+        'codec': codec
+    }
+
+
+# ---------------------------------------------------------------------------
+# WebM / Matroska
+# ---------------------------------------------------------------------------
+
+def _read_vint(buf, offset: int, keep_marker: bool):
+    """Read an EBML variable-length integer; returns (value, length)"""
+    first = buf[offset]
+    if first == 0:
+        raise ValueError("Invalid EBML vint")
+
+    length = 1
+    mask = 0x80
+    while not first & mask:
+        mask >>= 1
+        length += 1
+
+    value = first if keep_marker else first & (mask - 1)
+    for i in range(1, length):
+        value = (value << 8) | buf[offset + i]
+
+    return value, length
+
+
+def _elements(buf, start: int, end: int):
+    """Yield (element_id, data_start, data_end, unknown_size) within a range"""
+    offset = start
+    while offset < end:
+        try:
+            element_id, id_len = _read_vint(buf, offset, keep_marker=True)
+            size, size_len = _read_vint(buf, offset + id_len, keep_marker=False)
+        except IndexError:
+            # Header cut off at the end of a partial read
+            return
+        data_start = offset + id_len + size_len
+
+        unknown_size = size == (1 << (7 * size_len)) - 1
+        data_end = end if unknown_size else data_start + size
+
+        yield element_id, data_start, min(data_end, end), unknown_size
+        if unknown_size:
+            return
+        offset = data_end
+
+
+def _ebml_uint(buf, start: int, end: int) -> int:
+    return int.from_bytes(bytes(buf[start:end]), 'big')
+
+
+def _parse_webm(buf: memoryview) -> Optional[Dict]:
+    end = len(buf)
+
+    segment = None
+    for element_id, data_start, data_end, _ in _elements(buf, 0, end):
+        if element_id == EBML_SEGMENT:
+            segment = (data_start, data_end)
+            break
+    if segment is None:
+        return None
+
+    timestamp_scale = 1000000
+    duration = None
+    video_track = None
+
+    for element_id, data_start, data_end, unknown_size in _elements(buf, *segment):
+        if element_id == EBML_INFO and not unknown_size:
+            for child_id, c_start, c_end, _ in _elements(buf, data_start, data_end):
+                if child_id == EBML_TIMESTAMP_SCALE:
+                    timestamp_scale = _ebml_uint(buf, c_start, c_end)
+                elif child_id == EBML_DURATION:
+                    fmt = '>f' if c_end - c_start == 4 else '>d'
+                    duration = struct.unpack_from(fmt, buf, c_start)[0]
+
+        elif element_id == EBML_TRACKS and not unknown_size:
+            for child_id, c_start, c_end, _ in _elements(buf, data_start, data_end):
+                if child_id == EBML_TRACK_ENTRY:
+                    track = _parse_webm_track(buf, c_start, c_end)
+                    if track is not None:
+                        video_track = track
+                        break
+
+        elif element_id == EBML_CLUSTER:
+            break
+
+    if duration is None or video_track is None or not video_track['fps']:
+        return None
+
+    codec = WEBM_CODECS.get(video_track['codec_id'])
+    if codec is None:
+        return None
+
+    return {
+        'duration': duration * timestamp_scale / 1e9,
+        'width': video_track['width'],
+        'height': video_track['height'],
+        'fps': video_track['fps'],
+        'codec': codec
+    }
+
+
+def _parse_webm_track(buf, start: int, end: int) -> Optional[Dict]:
+    track = {'type': None, 'codec_id': '', 'fps': 0, 'width': 0, 'height': 0}
+
+    for element_id, data_start, data_end, _ in _elements(buf, start, end):
+        if element_id == EBML_TRACK_TYPE:
+            track['type'] = _ebml_uint(buf, data_start, data_end)
+        elif element_id == EBML_CODEC_ID:
+            track['codec_id'] = bytes(buf[data_start:data_end]).rstrip(b'\x00').decode('ascii', 'replace')
+        elif element_id == EBML_DEFAULT_DURATION:
+            frame_ns = _ebml_uint(buf, data_start, data_end)
+            track['fps'] = round(1e9 / frame_ns, 3) if frame_ns else 0
+        elif element_id == EBML_VIDEO:
+            for child_id, c_start, c_end, _ in _elements(buf, data_start, data_end):
+                if child_id == EBML_PIXEL_WIDTH:
+                    track['width'] = _ebml_uint(buf, c_start, c_end)
+                elif child_id == EBML_PIXEL_HEIGHT:
+                    track['height'] = _ebml_uint(buf, c_start, c_end)
+
+    return track if track['type'] == 1 else None
@@ -4,6 +4,9 @@ Responsible Advertising Index - Analysis Dashboard
 Multi-page Streamlit app for exploring Cannes and Hungarian ad analysis results
 """
 
+from page_setup import setup_page
+setup_page(__file__)
+
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
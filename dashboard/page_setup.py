@@ -0,0 +1,26 @@
+"""
+Shared first step of every dashboard page.
+
+Streamlit puts this directory on sys.path, not the repository root, so
+the pages could not import profiling (or any analysis module) without
+each pasting the same sys.path fix. setup_page does it once.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def setup_page(script_path: str):
+    """
+    Call at the top of a page, before anything else runs.
+
+    Args:
+        script_path: The page's __file__
+    """
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+
+    from profiling import profile_page
+    profile_page(script_path)
@@ -1,3 +1,6 @@
+from page_setup import setup_page
+setup_page(__file__)
+
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
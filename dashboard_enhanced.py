@@ -10,6 +10,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import json
+from profiling import profiled
 import numpy as np
 
 # Page config
@@ -223,6 +224,7 @@ def generate_insights(df):
 
     return insights
 
+@profiled('dashboard_enhanced')
 def main():
     # Header
     st.markdown('<div class="main-title">📊 Responsible Advertising Index</div>', unsafe_allow_html=True)
@@ -489,7 +491,8 @@ def main():
                         height=250
                     )
 
-                    st.plotly_chart(fig, use_container_width=True)
+                    # Ads with the same brand and scores draw identical charts
+                    st.plotly_chart(fig, use_container_width=True, key=f"radar_{idx}")
 
                     # Transcript
                     if row['transcript']:
@@ -10,6 +10,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import json
+from profiling import profiled
 
 # Page config
 st.set_page_config(
@@ -135,6 +136,7 @@ def score_color(score):
     elif score >= 35: return "score-poor"
     else: return "score-bad"
 
+@profiled('dashboard_new')
 def main():
     st.markdown('<div class="main-title">📊 Responsible Advertising Index</div>', unsafe_allow_html=True)
 
@@ -285,7 +287,8 @@ def main():
                         height=250
                     )
 
-                    st.plotly_chart(fig, use_container_width=True)
+                    # Ads with the same brand and scores draw identical charts
+                    st.plotly_chart(fig, use_container_width=True, key=f"radar_{idx}")
 
                     # Transcript
                     if row['transcript']:
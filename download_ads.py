@@ -8,8 +8,10 @@ import sys
 import os
 from ad_scrapers import download_ad_video, detect_platform
 from pathlib import Path
+from profiling import profiled
 
 
+@profiled('download_ads')
 def main():
     print("=" * 70)
     print("📹 Video Ad Downloader")
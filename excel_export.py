@@ -0,0 +1,166 @@
+"""
+Streaming Excel export for analysis results.
+
+Rows go out through openpyxl's write-only mode as they are produced, so
+memory stays flat however many analyses are exported (pass a generator to
+keep the input flat too). Column widths come from the first
+WIDTH_SAMPLE_ROWS rows of each sheet, which are buffered and then flushed;
+no second pass over the cells.
+
+Sheets:
+  RAI Analysis   one row per ad (the columns app.py has always exported)
+  Findings       one row per finding: dimension, score, language, text
+  Scenes         one row per scene of a video analysis
+
+Each analysis is an app.py history entry:
+  {'brand_name' or 'brand', 'timestamp', 'ad_copy' (optional), 'result': {...}}
+"""
+
+from typing import BinaryIO, Dict, Iterable, List, Union
+
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 50
+
+DIMENSIONS = ['Climate Responsibility', 'Social Responsibility',
+              'Cultural Sensitivity', 'Ethical Communication']
+
+SUMMARY_HEADERS = ['Brand', 'Analysis Date', 'Overall Score'] + DIMENSIONS + [
+    'Rating', 'Key Strengths', 'Key Concerns', 'Recommendations', 'Ad Copy (excerpt)']
+
+FINDING_HEADERS = ['Brand', 'Analysis Date', 'Dimension', 'Score', 'Language', 'Finding']
+
+SCENE_HEADERS = ['Brand', 'Analysis Date', 'Scene', 'Timestamp', 'Description', 'Visual Elements',
+                 'Audio', 'Climate', 'Social', 'Cultural', 'Ethical', 'Scene Score']
+
+
+def _rating(score: int) -> str:
+    if score >= 90:
+        return '⭐⭐⭐⭐⭐'
+    if score >= 75:
+        return '⭐⭐⭐⭐'
+    if score >= 60:
+        return '⭐⭐⭐'
+    return '⭐⭐'
+
+
+def summary_row(analysis: Dict) -> List:
+    result = analysis['result']
+    dimensions = result.get('dimensions', {})
+    summary = result.get('summary', {})
+    ad_copy = analysis.get('ad_copy', '')
+
+    return [
+        analysis.get('brand_name') or analysis.get('brand', 'Unknown'),
+        analysis.get('timestamp'),
+        result.get('overall_score', 0),
+        *[dimensions.get(name, {}).get('score', 0) for name in DIMENSIONS],
+        _rating(result.get('overall_score', 0)),
+        ' | '.join(summary.get('strengths', [])),
+        ' | '.join(summary.get('concerns', [])),
+        ' | '.join(summary.get('recommendations', [])),
+        ad_copy[:200] + '...' if len(ad_copy) > 200 else (ad_copy or 'N/A')
+    ]
+
+
+def finding_rows(analysis: Dict) -> Iterable[List]:
+    brand = analysis.get('brand_name') or analysis.get('brand', 'Unknown')
+    for name, dimension in analysis['result'].get('dimensions', {}).items():
+        for language, key in (('en', 'findings'), ('hu', 'findings_hu')):
+            for finding in dimension.get(key, []):
+                yield [brand, analysis.get('timestamp'), name, dimension.get('score', 0), language, finding]
+
+
+def scene_rows(analysis: Dict) -> Iterable[List]:
+    brand = analysis.get('brand_name') or analysis.get('brand', 'Unknown')
+    for number, scene in enumerate(analysis['result'].get('scenes', []) or [], 1):
+        yield [brand, analysis.get('timestamp'), number, scene.get('timestamp', ''),
+               scene.get('description', ''), ', '.join(scene.get('visual_elements', [])),
+               scene.get('audio_content', ''), scene.get('climate_score'), scene.get('social_score'),
+               scene.get('cultural_score'), scene.get('ethical_score'), scene.get('overall_scene_score')]
+
+
+class _SheetWriter:
+    """Write-only sheet that sizes its columns from the first rows"""
+
+    def __init__(self, workbook, title: str, headers: List[str]):
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        # Control characters openpyxl refuses (model output sometimes has them)
+        self._illegal = ILLEGAL_CHARACTERS_RE
+        self.ws = workbook.create_sheet(title)
+        self.headers = headers
+        self.rows = 0
+        self._sample: List[List] = []
+        self._flushed = False
+
+    def append(self, row: List):
+        row = [self._illegal.sub('', value) if isinstance(value, str) else value for value in row]
+        self.rows += 1
+        if self._flushed:
+            self.ws.append(row)
+            return
+        self._sample.append(row)
+        if len(self._sample) >= WIDTH_SAMPLE_ROWS:
+            self._flush()
+
+    def _flush(self):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        # Column dimensions must be set before the first row is written
+        for index, header in enumerate(self.headers):
+            longest = max([len(header)] + [len(str(row[index])) for row in self._sample
+                                           if row[index] is not None])
+            self.ws.column_dimensions[get_column_letter(index + 1)].width = min(longest + 2, MAX_COLUMN_WIDTH)
+
+        bold = Font(bold=True)
+        header_cells = []
+        for header in self.headers:
+            cell = WriteOnlyCell(self.ws, value=header)
+            cell.font = bold
+            header_cells.append(cell)
+        self.ws.append(header_cells)
+
+        for row in self._sample:
+            self.ws.append(row)
+        self._sample = []
+        self._flushed = True
+
+    def close(self):
+        if not self._flushed:
+            self._flush()
+
+
+def write_analyses_xlsx(analyses: Iterable[Dict], output: Union[str, BinaryIO]) -> Dict[str, int]:
+    """
+    Stream analyses into a multi-sheet workbook.
+
+    Args:
+        analyses: History entries (any iterable; a generator keeps memory flat)
+        output: File path or binary file object
+
+    Returns:
+        Data rows written per sheet
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheets = {
+        'summary': _SheetWriter(workbook, 'RAI Analysis', SUMMARY_HEADERS),
+        'findings': _SheetWriter(workbook, 'Findings', FINDING_HEADERS),
+        'scenes': _SheetWriter(workbook, 'Scenes', SCENE_HEADERS),
+    }
+
+    for analysis in analyses:
+        sheets['summary'].append(summary_row(analysis))
+        for row in finding_rows(analysis):
+            sheets['findings'].append(row)
+        for row in scene_rows(analysis):
+            sheets['scenes'].append(row)
+
+    for sheet in sheets.values():
+        sheet.close()
+    workbook.save(output)
+
+    return {name: sheet.rows for name, sheet in sheets.items()}
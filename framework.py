@@ -0,0 +1,75 @@
+"""
+Responsible Advertising Index scoring framework.
+
+The four dimensions with their weights and indicators, in English and
+Hungarian. Shared by the Streamlit app (app.py) and the video prompt
+(video_processor.py); importing it has no side effects.
+"""
+
+# Scoring framework definition (English and Hungarian)
+FRAMEWORK = {
+    "Climate Responsibility": {
+        "weight": 0.25,
+        "indicators": [
+            "Sustainability messaging presence and authenticity",
+            "Absence of greenwashing or exaggerated claims",
+            "Climate-positive products/behaviors shown",
+            "Transparency in environmental framing"
+        ],
+        "hu_name": "Klímafelelősség",
+        "hu_indicators": [
+            "Fenntarthatósági üzenetek jelenléte és hitelessége",
+            "Zöldre festés és túlzó állítások hiánya",
+            "Klímapozitív termékek/viselkedések bemutatása",
+            "Átláthatóság a környezeti kommunikációban"
+        ]
+    },
+    "Social Responsibility": {
+        "weight": 0.25,
+        "indicators": [
+            "Diversity in representation (gender, race, age, body type, ability)",
+            "Avoidance of harmful stereotypes",
+            "Empowering depiction of underrepresented groups",
+            "Inclusive language and messaging"
+        ],
+        "hu_name": "Társadalmi Felelősség",
+        "hu_indicators": [
+            "Sokszínűség a megjelenítésben (nem, faj, kor, testalkat, képesség)",
+            "Káros sztereotípiák elkerülése",
+            "Alulreprezentált csoportok megerősítő ábrázolása",
+            "Befogadó nyelvezet és üzenet"
+        ]
+    },
+    "Cultural Sensitivity": {
+        "weight": 0.25,
+        "indicators": [
+            "Respectful use of cultural symbols and traditions",
+            "Sensitivity to local norms and values",
+            "Awareness of geopolitical contexts",
+            "Balance between global and local resonance"
+        ],
+        "hu_name": "Kulturális Érzékenység",
+        "hu_indicators": [
+            "Kulturális szimbólumok és hagyományok tiszteletteljes használata",
+            "Érzékenység a helyi normák és értékek iránt",
+            "Geopolitikai kontextusok tudatossága",
+            "Egyensúly a globális és helyi rezonancia között"
+        ]
+    },
+    "Ethical Communication": {
+        "weight": 0.25,
+        "indicators": [
+            "Transparency in intent and disclosures",
+            "Avoidance of manipulative techniques",
+            "Truthful and verifiable claims",
+            "Encouragement of informed choice over exploitation"
+        ],
+        "hu_name": "Etikus Kommunikáció",
+        "hu_indicators": [
+            "Átláthatóság a szándékban és közlésekben",
+            "Manipulatív technikák elkerülése",
+            "Igazolható és valós állítások",
+            "Tájékozott döntéshozatal ösztönzése a kizsákmányolás helyett"
+        ]
+    }
+}
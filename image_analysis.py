@@ -0,0 +1,417 @@
+"""
+Static image ad analysis, without Streamlit.
+
+The prompt, response parsing and the preprocess -> cache -> generate flow
+shared by the Streamlit app (app.analyze_ad) and the headless
+`simple_pipeline.py images` batch command.
+
+analyze_packed scores several creatives per request: the framework and
+instructions (most of a single request's input tokens) are sent once, and
+the reply is a "results" array keyed by creative id.
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+from framework import FRAMEWORK
+
+IMAGE_MODEL = 'models/gemini-2.5-flash'
+
+GENERATION_CONFIG = {
+    "temperature": 0.4,
+    "max_output_tokens": 8000,  # Ceiling; English-only replies stay well below it
+}
+
+
+class ResponseParseError(ValueError):
+    """The model's reply held no parseable JSON (the raw text is kept)"""
+
+    def __init__(self, message: str, response_text: str):
+        super().__init__(message)
+        self.response_text = response_text
+
+
+def detect_language(text: str) -> str:
+    """Detect if the text is primarily Hungarian or English"""
+    # Simple detection based on common Hungarian characters and words
+    hungarian_chars = sum(1 for c in text if c in 'áéíóöőúüűÁÉÍÓÖŐÚÜŰ')
+    hungarian_words = ['és', 'hogy', 'van', 'nem', 'egy', 'az', 'ezt', 'csak', 'még', 'vagy']
+    hungarian_word_count = sum(1 for word in hungarian_words if word in text.lower())
+
+    if hungarian_chars > 5 or hungarian_word_count > 2:
+        return 'hu'
+    return 'en'
+
+
+def create_analysis_prompt(ad_copy: str, output_language: str = 'en') -> str:
+    """
+    Create the prompt for Gemini to analyze the ad with language support
+
+    The analysis is written in English; Hungarian versions are added on
+    demand by translation.translate_result (or requested up front with
+    output_language='bilingual')
+    """
+    from prompt_compiler import image_prompt
+
+    return image_prompt(ad_copy, output_language == 'bilingual', detect_language(ad_copy))
+
+
+def parse_json_response(response_text: str) -> Dict:
+    """
+    Pull the JSON object out of a model reply (bare, or in a ``` block).
+
+    Raises:
+        ResponseParseError: No valid JSON in the reply
+    """
+    if "```json" in response_text:
+        start_idx = response_text.find("```json") + 7
+        end_idx = response_text.find("```", start_idx)
+        json_str = response_text[start_idx:end_idx].strip()
+    elif "```" in response_text:
+        start_idx = response_text.find("```") + 3
+        end_idx = response_text.find("```", start_idx)
+        json_str = response_text[start_idx:end_idx].strip()
+    else:
+        # Try to find JSON object directly
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}') + 1
+        json_str = response_text[start_idx:end_idx]
+
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError as e:
+        raise ResponseParseError(f"JSON Error: {e}", response_text) from e
+
+
+def validate_result(result) -> bool:
+    """True if a result has the fields the app, storage and exports rely on"""
+    def is_score(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 100
+
+    if not isinstance(result, dict) or not is_score(result.get('overall_score')):
+        return False
+    dimensions = result.get('dimensions')
+    if not isinstance(dimensions, dict) or not isinstance(result.get('summary'), dict):
+        return False
+    return all(isinstance(dimensions.get(name), dict) and is_score(dimensions[name].get('score'))
+               for name in FRAMEWORK)
+
+
+def _prepare(image_data: bytes, ad_copy: str, cache):
+    """Preprocess a creative and look it up: (prepared, cache key, cache hit or None)"""
+    import image_cache
+    from analysis_version import image_version
+
+    # Downsize/re-encode and hash the creative
+    prepared = image_cache.preprocess_image(image_data)
+    image_cache.stats['bytes_uploaded'] += prepared.original_bytes
+
+    # Keyed on the same prompts, framework and model settings as the stored
+    # version stamp, so a stale analysis is never served back as current
+    key = image_cache.copy_key(ad_copy, IMAGE_MODEL, image_version()['hash'])
+    cached = cache.lookup(key, prepared.dhash)
+    image_cache.stats['hits' if cached else 'misses'] += 1
+    return prepared, key, cached
+
+
+def _request_single(prepared, ad_copy: str, key: str, backend, cache, recorder, throttle, responses) -> Dict:
+    """One creative, one request; the result goes into the cache (raw replies into responses)"""
+    import image_cache
+    from pipeline_metrics import GENERATE, PARSE, record_usage
+    from response_archive import IMAGE, REPAIR
+
+    prompt = create_analysis_prompt(ad_copy)
+    if throttle:
+        throttle()
+
+    image_cache.stats['bytes_sent'] += len(prepared.jpeg)
+    with recorder.span(GENERATE, bytes=len(prepared.jpeg)) as span:
+        response = backend.generate_content([prompt, prepared.image], generation_config=GENERATION_CONFIG)
+        record_usage(span, response)
+    responses.add(IMAGE, prompt, GENERATION_CONFIG, response)
+
+    with recorder.span(PARSE):
+        try:
+            result = parse_json_response(response.text)
+        except ResponseParseError as e:
+            error, result = e, None
+
+    if result is None:
+        # Cut off: complete the missing fields instead of re-running the request
+        from prompt_compiler import image_spec
+        from response_repair import repair_truncated
+
+        def send(text):
+            if throttle:
+                throttle()
+            reply = backend.generate_content([text, prepared.image], generation_config=GENERATION_CONFIG)
+            responses.add(REPAIR, text, GENERATION_CONFIG, reply)
+            return reply
+
+        result = repair_truncated(response, prompt, image_spec(False, detect_language(ad_copy)), send,
+                                  recorder, span)
+        if result is None:
+            raise error
+
+    cache.store(key, prepared.dhash, result)
+    return result
+
+
+def analyze_image(image_data: bytes, ad_copy: str, backend, cache=None, recorder=None,
+                  throttle=None) -> Dict:
+    """
+    Analyze one image ad: preprocess, check the result cache, call the model.
+
+    Args:
+        image_data: Image file bytes
+        ad_copy: Ad copy
+        backend: model_backend.ModelBackend
+        cache: image_cache.ResultCache (default: the shared cache)
+        recorder: pipeline_metrics.StageRecorder for generate/parse spans
+        throttle: Called right before the model request (cache hits skip it),
+            e.g. rate_limiter.TokenBucket.acquire
+
+    Returns:
+        {'result', 'cached' (bool), 'distance' (dHash bits, cache hits),
+         'prepared' (image_cache.PreparedImage), 'responses' (raw reply
+         entries for response_archive, [] for cache hits)}
+
+    Raises:
+        ResponseParseError: The reply held no parseable JSON
+        Exception: Whatever the backend raises (429s, API errors)
+    """
+    import image_cache
+    from pipeline_metrics import StageRecorder
+    from response_archive import ResponseLog
+
+    recorder = recorder or StageRecorder()
+    cache = cache or image_cache.ResultCache()
+
+    prepared, key, cached = _prepare(image_data, ad_copy, cache)
+    if cached:
+        return {'result': cached['result'], 'cached': True, 'distance': cached['distance'], 'prepared': prepared,
+                'responses': []}
+
+    responses = ResponseLog(IMAGE_MODEL, language=detect_language(ad_copy))
+    result = _request_single(prepared, ad_copy, key, backend, cache, recorder, throttle, responses)
+    return {'result': result, 'cached': False, 'distance': None, 'prepared': prepared,
+            'responses': responses.entries}
+
+
+# ---------------------------------------------------------------------------
+# Packed requests: several creatives, one framework
+# ---------------------------------------------------------------------------
+
+PACKED_CREATIVE_HEADER = "=== CREATIVE {creative_id} ==="
+
+
+def create_packed_prompt(ad_copies: List[str], output_language: str = 'en') -> str:
+    """
+    Prompt for scoring several creatives in one request.
+
+    The framework, instructions and schema appear once; each creative follows
+    as its own header/copy part and image (see packed_contents).
+    """
+    from prompt_compiler import packed_prompt
+
+    hungarian = any(detect_language(copy) == 'hu' for copy in ad_copies)
+    return packed_prompt(len(ad_copies), output_language == 'bilingual', PACKED_CREATIVE_HEADER, hungarian)
+
+
+def packed_contents(ad_copies: List[str], images: List) -> List:
+    """generate_content parts for a packed request (creative ids c1, c2, ...)"""
+    contents = [create_packed_prompt(ad_copies)]
+    for number, (ad_copy, image) in enumerate(zip(ad_copies, images), 1):
+        header = PACKED_CREATIVE_HEADER.format(creative_id=f"c{number}")
+        contents.append(f"{header}\nADVERTISEMENT COPY:\n{ad_copy}")
+        contents.append(image)
+    return contents
+
+
+def creative_tokens(prepared, ad_copy: str) -> int:
+    """Estimated input tokens one creative adds to a packed request"""
+    from model_backend import estimate_tokens, image_tokens
+
+    return image_tokens(prepared.image.size) + estimate_tokens(ad_copy) + 20
+
+
+def plan_packs(items: List[Dict]) -> List[List[Dict]]:
+    """
+    Group creatives into requests within the token budget (image_config).
+
+    Args:
+        items: Dicts with 'tokens' (creative_tokens)
+
+    Returns:
+        Packs in input order; each has at most max_pack_size creatives,
+        estimated input under pack_input_tokens and expected output under
+        pack_max_output_tokens
+    """
+    from config import image_config
+    from model_backend import estimate_tokens
+
+    shared = estimate_tokens(create_packed_prompt(['']))
+    max_creatives = max(1, min(image_config.max_pack_size,
+                               image_config.pack_max_output_tokens // image_config.pack_output_tokens_per_creative))
+
+    packs, current, tokens = [], [], shared
+    for item in items:
+        if current and (len(current) >= max_creatives or tokens + item['tokens'] > image_config.pack_input_tokens):
+            packs.append(current)
+            current, tokens = [], shared
+        current.append(item)
+        tokens += item['tokens']
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _request_pack(pack: List[Dict], backend, throttle) -> Dict[str, Dict]:
+    """
+    One request for a pack of creatives.
+
+    Each creative's recorder gets its share of the request (seconds and
+    tokens divided by the pack size), and its response log the raw reply.
+    Failures other than 429 return {} so the caller falls back to
+    per-creative requests.
+
+    Returns:
+        {creative id: result} for the results that passed validate_result
+    """
+    import image_cache
+    from config import image_config
+    from pipeline_metrics import StageRecorder, GENERATE, PARSE, http_status, record_usage
+    from response_archive import IMAGE_PACK
+
+    contents = packed_contents([item['ad_copy'] for item in pack], [item['prepared'].image for item in pack])
+    generation_config = {**GENERATION_CONFIG, 'max_output_tokens': min(
+        image_config.pack_max_output_tokens, len(pack) * image_config.pack_output_tokens_per_creative)}
+    image_bytes = sum(len(item['prepared'].jpeg) for item in pack)
+
+    recorder = StageRecorder()
+    reply = None
+    try:
+        if throttle:
+            throttle()
+        image_cache.stats['bytes_sent'] += image_bytes
+        with recorder.span(GENERATE, bytes=image_bytes) as span:
+            response = backend.generate_content(contents, generation_config=generation_config)
+            record_usage(span, response)
+        for number, item in enumerate(pack, 1):
+            item['responses'].add(IMAGE_PACK, contents[0], generation_config, response, creative_id=f"c{number}")
+        with recorder.span(PARSE):
+            reply = parse_json_response(response.text)
+    except Exception as e:
+        if http_status(e) == 429:
+            raise
+    finally:
+        for record in recorder.spans:
+            share = {key: value / len(pack) if key in ('seconds', 'input_tokens', 'output_tokens') and value else value
+                     for key, value in record.items()}
+            for item in pack:
+                if 'bytes' in share:
+                    share = {**share, 'bytes': len(item['prepared'].jpeg)}
+                item['recorder'].add({**share, 'packed': len(pack)})
+
+    return packed_results(reply)
+
+
+def packed_results(reply) -> Dict[str, Dict]:
+    """{creative id: result} from a parsed packed reply, for the results that pass validate_result"""
+    results = {}
+    entries = reply.get('results', []) if isinstance(reply, dict) else []
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        result = {key: value for key, value in entry.items() if key != 'creative_id'}
+        creative_id = str(entry.get('creative_id'))
+        if creative_id not in results and validate_result(result):
+            results[creative_id] = result
+    return results
+
+
+def analyze_packed(ads: List[Tuple[bytes, str]], backend, cache=None, throttle=None) -> List[Dict]:
+    """
+    Analyze several image ads, packing cache misses into shared requests.
+
+    The number of creatives per request comes from the token budget in
+    image_config (plan_packs). Creatives missing from a packed reply, or
+    failing validate_result, are re-run one per request.
+
+    Args:
+        ads: (image bytes, ad copy) per creative
+        backend: model_backend.ModelBackend
+        cache: image_cache.ResultCache (default: the shared cache)
+        throttle: Called before every model request (packed or single)
+
+    Returns:
+        Per creative, in input order: analyze_image's dict plus
+        'recorder' (its spans), 'pack_size' (creatives in its request,
+        None for cache hits) and 'fallback' (re-run on its own).
+        'responses' holds the raw replies behind it (packed, fallback).
+        A creative whose fallback request failed has 'error' (the
+        exception) and result None instead.
+
+    Raises:
+        Exception: 429s (retry the call; finished creatives come from the cache)
+    """
+    import image_cache
+    from pipeline_metrics import StageRecorder, http_status
+    from response_archive import ResponseLog
+
+    cache = cache or image_cache.ResultCache()
+    analyses = [None] * len(ads)
+    pending = []
+
+    for index, (image_data, ad_copy) in enumerate(ads):
+        prepared, key, cached = _prepare(image_data, ad_copy, cache)
+        if cached:
+            analyses[index] = {'result': cached['result'], 'cached': True, 'distance': cached['distance'],
+                               'prepared': prepared, 'recorder': StageRecorder(), 'pack_size': None,
+                               'fallback': False, 'responses': []}
+            continue
+        item = {'index': index, 'prepared': prepared, 'ad_copy': ad_copy, 'key': key,
+                'recorder': StageRecorder(), 'tokens': creative_tokens(prepared, ad_copy),
+                'responses': ResponseLog(IMAGE_MODEL, language=detect_language(ad_copy))}
+
+        # Near-identical to a creative earlier in this call: reuse its result below
+        item['same_as'] = next((other for other in pending if other['key'] == key and image_cache.hamming(
+            other['prepared'].dhash, prepared.dhash) <= cache.match_distance), None)
+        pending.append(item)
+
+    for pack in plan_packs([item for item in pending if item['same_as'] is None]):
+        results = _request_pack(pack, backend, throttle) if len(pack) > 1 else {}
+
+        for number, item in enumerate(pack, 1):
+            result = results.get(f"c{number}")
+            if result is not None:
+                cache.store(item['key'], item['prepared'].dhash, result)
+            else:
+                try:
+                    result = _request_single(item['prepared'], item['ad_copy'], item['key'], backend, cache,
+                                             item['recorder'], throttle, item['responses'])
+                except Exception as e:
+                    if http_status(e) == 429:
+                        raise
+                    # This creative fails on its own
+                    analyses[item['index']] = {'result': None, 'error': e, 'recorder': item['recorder'],
+                                               'responses': item['responses'].entries}
+                    continue
+            analyses[item['index']] = {'result': result, 'cached': False, 'distance': None,
+                                       'prepared': item['prepared'], 'recorder': item['recorder'],
+                                       'pack_size': len(pack), 'fallback': len(pack) > 1 and f"c{number}" not in results,
+                                       'responses': item['responses'].entries}
+
+    for item in pending:
+        if item['same_as'] is not None:
+            source = item['same_as']
+            if analyses[source['index']].get('error'):
+                analyses[item['index']] = {**analyses[source['index']], 'recorder': item['recorder'],
+                                           'responses': []}
+                continue
+            distance = image_cache.hamming(source['prepared'].dhash, item['prepared'].dhash)
+            analyses[item['index']] = {'result': analyses[source['index']]['result'], 'cached': True,
+                                       'distance': distance, 'prepared': item['prepared'],
+                                       'recorder': item['recorder'], 'pack_size': None, 'fallback': False,
+                                       'responses': []}
+    return analyses
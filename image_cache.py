@@ -0,0 +1,191 @@
+"""
+Image ad preprocessing and a shared result cache.
+
+app.analyze_ad runs every upload through preprocess_image before it goes to
+the model: the image is flattened to RGB, downsized so its longest side is
+at most image_config.max_side, and re-encoded as JPEG. Phone photos and
+print-resolution PNGs shrink by an order of magnitude; the model sees no
+less detail than it would after its own resizing.
+
+Results are cached on disk under image_config.cache_dir, keyed by
+  - the ad copy (case and whitespace normalized), model and prompt template
+  - a 64-bit difference hash (dHash) of the image
+A lookup matches any cached creative with the same copy key whose dHash is
+within image_config.match_distance bits, so re-uploads, re-encodes, resizes
+and small edits reuse the earlier analysis. The cache is plain files, shared
+by every Streamlit session and server process on the machine.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import image_config
+
+# Cached creatives kept per copy key (oldest dropped first)
+MAX_ENTRIES_PER_KEY = 20
+
+_lock = threading.Lock()
+
+# Process-wide counters (shown in the app sidebar)
+stats = {'hits': 0, 'misses': 0, 'bytes_uploaded': 0, 'bytes_sent': 0}
+
+
+@dataclass
+class PreparedImage:
+    """An image ready to send to the model"""
+    image: object          # PIL image opened from the JPEG bytes
+    jpeg: bytes
+    dhash: int
+    original_size: tuple
+    original_bytes: int
+
+
+def dhash(image, hash_size: int = 8) -> int:
+    """
+    Difference hash: compares neighbouring pixels of a tiny grayscale copy.
+
+    Args:
+        image: PIL image
+        hash_size: Bits per row/column (8 gives a 64-bit hash)
+
+    Returns:
+        The hash as an int
+    """
+    from PIL import Image
+
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = small.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def preprocess_image(image_data: bytes, max_side: Optional[int] = None,
+                     quality: Optional[int] = None) -> PreparedImage:
+    """
+    Downsize and re-encode an uploaded image for the model.
+
+    Args:
+        image_data: Uploaded file bytes (any format PIL reads)
+        max_side: Longest side in pixels (default image_config.max_side)
+        quality: JPEG quality (default image_config.jpeg_quality)
+
+    Returns:
+        PreparedImage with the re-encoded JPEG and its dHash
+    """
+    from PIL import Image, ImageOps
+
+    max_side = max_side or image_config.max_side
+    quality = quality or image_config.jpeg_quality
+
+    img = Image.open(io.BytesIO(image_data))
+    original_size = img.size
+    # Phone photos are often stored sideways with an EXIF rotation
+    img = ImageOps.exif_transpose(img)
+
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    jpeg = buffer.getvalue()
+
+    return PreparedImage(
+        image=Image.open(io.BytesIO(jpeg)),
+        jpeg=jpeg,
+        dhash=dhash(img),
+        original_size=original_size,
+        original_bytes=len(image_data)
+    )
+
+
+def normalize_copy(ad_copy: str) -> str:
+    return re.sub(r'\s+', ' ', ad_copy).strip().casefold()
+
+
+def copy_key(ad_copy: str, model_name: str, prompt_template: str) -> str:
+    """
+    Cache key for everything except the image.
+
+    Args:
+        ad_copy: Ad copy as entered
+        model_name: Model the result came from
+        prompt_template: The prompt without ad copy, or a version hash covering
+            it (a prompt change invalidates the cache)
+    """
+    digest = hashlib.sha256()
+    for part in (model_name, prompt_template, normalize_copy(ad_copy)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Analysis results on disk, one JSON file of creatives per copy key"""
+
+    def __init__(self, cache_dir: Optional[str] = None, match_distance: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or image_config.cache_dir)
+        self.match_distance = image_config.match_distance if match_distance is None else match_distance
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _load(self, key: str) -> list:
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def lookup(self, key: str, image_hash: int) -> Optional[Dict]:
+        """
+        Closest cached creative for this copy key within match_distance.
+
+        Returns:
+            {'result', 'distance', 'cached_at'} or None
+        """
+        best = None
+        for entry in self._load(key):
+            distance = hamming(int(entry['dhash'], 16), image_hash)
+            if distance <= self.match_distance and (best is None or distance < best['distance']):
+                best = {'result': entry['result'], 'distance': distance, 'cached_at': entry['cached_at']}
+        return best
+
+    def store(self, key: str, image_hash: int, result: Dict):
+        """Add a creative's result (replacing an identical image)"""
+        path = self._path(key)
+        with _lock:
+            entries = [entry for entry in self._load(key) if int(entry['dhash'], 16) != image_hash]
+            entries.append({'dhash': f"{image_hash:016x}", 'cached_at': time.time(), 'result': result})
+            entries = entries[-MAX_ENTRIES_PER_KEY:]
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
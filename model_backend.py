@@ -0,0 +1,471 @@
+"""
+Pluggable model backends for the analysis pipeline.
+
+VideoAnalyzer and app.analyze_ad talk to a backend instead of calling
+google.generativeai directly, so performance work can be measured offline:
+
+- GeminiBackend: the real API (default)
+- FakeBackend: in-process stand-in that simulates upload, the
+  PROCESSING -> ACTIVE transition, latency distributions, 429s and
+  truncated JSON, deterministically from a seed
+- CassetteBackend: records real responses to disk and replays them
+
+Selected with environment variables:
+
+  RAI_MODEL_BACKEND=gemini|fake        (default gemini)
+  RAI_CASSETTE_DIR=cassettes/          (wrap the backend in record/replay)
+  RAI_CASSETTE_MODE=record|replay      (default replay)
+  RAI_FAKE_SEED, RAI_FAKE_TIME_SCALE, RAI_FAKE_429_RATE, RAI_FAKE_TRUNCATE_RATE
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+DIMENSIONS = ["Climate Responsibility", "Social Responsibility",
+              "Cultural Sensitivity", "Ethical Communication"]
+
+
+class RateLimitError(Exception):
+    """The (fake) API rejected the request with HTTP 429"""
+    code = 429
+
+
+class CassetteMiss(KeyError):
+    """Replay mode found no recorded response for a request"""
+
+
+def content_fingerprint(part) -> str:
+    """Stable hash of one generate_content part (prompt, file handle or image)"""
+    if isinstance(part, str):
+        return hashlib.sha256(part.encode('utf-8')).hexdigest()
+    if isinstance(part, (bytes, bytearray)):
+        return hashlib.sha256(part).hexdigest()
+
+    # Uploaded files: our handles carry the content hash, real ones a name
+    sha = getattr(part, 'sha256_hash', None) or getattr(part, 'content_sha256', None)
+    if sha:
+        return sha if isinstance(sha, str) else sha.hex()
+
+    # PIL images
+    if hasattr(part, 'tobytes') and hasattr(part, 'size'):
+        digest = hashlib.sha256(f"{part.mode}{part.size}".encode())
+        digest.update(part.tobytes())
+        return digest.hexdigest()
+
+    return hashlib.sha256(str(getattr(part, 'name', part)).encode()).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def image_tokens(size) -> int:
+    """Gemini input tokens for an image: 258, or 258 per 768px tile if a side exceeds 384px"""
+    width, height = size
+    if width <= 384 and height <= 384:
+        return 258
+    return 258 * math.ceil(width / 768) * math.ceil(height / 768)
+
+
+# Creative headers in packed image requests (image_analysis.packed_contents)
+PACKED_CREATIVE_RE = re.compile(r'^=== CREATIVE (\S+) ===', re.MULTILINE)
+
+# First line of each request in a split video analysis (prompt_compiler.video_part_prompt)
+SPLIT_PART_HEADER = "SPLIT PART: {part}"
+SPLIT_PART_RE = re.compile(r'^SPLIT PART: (\S+)', re.MULTILINE)
+
+# Opens the instructions of a continuation request (prompt_compiler.continuation_prompt)
+CONTINUATION_MARKER = "CONTINUATION: your previous reply was cut off."
+
+# First line of a translation request (translation.create_translation_prompt)
+TRANSLATION_HEADER = "Translate these {count} English texts into Hungarian."
+
+
+class ModelBackend:
+    """Interface used by the pipeline (mirrors the google.generativeai calls)"""
+
+    # Multiplier for the pipeline's own sleeps (e.g. the processing poll)
+    time_scale = 1.0
+
+    def upload_file(self, path: str):
+        raise NotImplementedError
+
+    def get_file(self, name: str):
+        raise NotImplementedError
+
+    def delete_file(self, name: str):
+        raise NotImplementedError
+
+    def generate_content(self, contents: List, generation_config: Dict):
+        raise NotImplementedError
+
+    def count_tokens(self, contents: List) -> int:
+        """Input tokens for generate_content parts (local estimate of the text parts)"""
+        return sum(estimate_tokens(part) for part in contents if isinstance(part, str))
+
+
+class GeminiBackend(ModelBackend):
+    """The real Gemini API through google.generativeai"""
+
+    def __init__(self, api_key: str, model_name: str):
+        import google.generativeai as genai
+
+        self.genai = genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def upload_file(self, path: str):
+        return self.genai.upload_file(path=str(path))
+
+    def get_file(self, name: str):
+        return self.genai.get_file(name)
+
+    def delete_file(self, name: str):
+        self.genai.delete_file(name)
+
+    def generate_content(self, contents: List, generation_config: Dict):
+        return self.model.generate_content(contents, generation_config=generation_config)
+
+    def count_tokens(self, contents: List) -> int:
+        return self.model.count_tokens(contents).total_tokens
+
+
+class FakeBackend(ModelBackend):
+    """
+    Offline stand-in for Gemini.
+
+    Latencies are lognormal (median seconds, sigma) per operation, scaled by
+    time_scale (0 = no sleeping at all). Scores depend only on the request
+    content and seed, so runs are reproducible.
+    """
+
+    DEFAULT_LATENCY = {
+        'upload_base': (0.8, 0.3),
+        'upload_per_mb': (0.15, 0.2),
+        'processing': (6.0, 0.5),
+        'generate': (14.0, 0.35),
+        # Extra generate time per 1000 output tokens (off by default)
+        'generate_per_1k_output': (0.0, 0.2)
+    }
+
+    def __init__(self, seed: int = 0, time_scale: float = 1.0,
+                 rate_limit_rate: float = 0.0, truncate_rate: float = 0.0,
+                 latency: Optional[Dict] = None):
+        """
+        Args:
+            seed: Seed for latencies, errors and scores
+            time_scale: Multiplier applied to every simulated latency
+            rate_limit_rate: Probability that a generate call raises RateLimitError
+            truncate_rate: Probability that a response is cut off mid-JSON
+            latency: Overrides for DEFAULT_LATENCY entries
+        """
+        self.seed = seed
+        self.time_scale = time_scale
+        self.rate_limit_rate = rate_limit_rate
+        self.truncate_rate = truncate_rate
+        self.latency = {**self.DEFAULT_LATENCY, **(latency or {})}
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._files: Dict[str, SimpleNamespace] = {}
+        self.calls = {'upload': 0, 'get_file': 0, 'delete': 0, 'generate': 0, 'rate_limited': 0}
+        self.upload_bytes = 0
+
+    def _draw(self, operation: str) -> float:
+        median, sigma = self.latency[operation]
+        with self._lock:
+            return median * math.exp(self._rng.gauss(0, sigma))
+
+    def _chance(self, probability: float) -> bool:
+        with self._lock:
+            return self._rng.random() < probability
+
+    def _sleep(self, seconds: float):
+        if self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def upload_file(self, path: str):
+        data = Path(path).read_bytes()
+        size_mb = len(data) / (1024 * 1024)
+        self._sleep(self._draw('upload_base') + self._draw('upload_per_mb') * size_mb)
+
+        sha = hashlib.sha256(data).hexdigest()
+        processing = self._draw('processing') * self.time_scale
+        with self._lock:
+            self.calls['upload'] += 1
+            self.upload_bytes += len(data)
+            name = f"files/fake-{sha[:12]}-{self.calls['upload']}"
+            handle = SimpleNamespace(
+                name=name,
+                uri=f"fake://{name}",
+                sha256_hash=sha,
+                size_bytes=len(data),
+                state=SimpleNamespace(name='PROCESSING'),
+                ready_at=time.time() + processing
+            )
+            self._files[name] = handle
+        return handle
+
+    def get_file(self, name: str):
+        with self._lock:
+            self.calls['get_file'] += 1
+            handle = self._files[name]
+            if handle.state.name == 'PROCESSING' and time.time() >= handle.ready_at:
+                handle.state = SimpleNamespace(name='ACTIVE')
+            return handle
+
+    def delete_file(self, name: str):
+        with self._lock:
+            self.calls['delete'] += 1
+            self._files.pop(name, None)
+
+    def generate_content(self, contents: List, generation_config: Dict):
+        with self._lock:
+            self.calls['generate'] += 1
+
+        prompt = '\n'.join(part for part in contents if isinstance(part, str))
+        self._sleep(self._draw('generate'))
+
+        if self._chance(self.rate_limit_rate):
+            with self._lock:
+                self.calls['rate_limited'] += 1
+            raise RateLimitError("429 Resource has been exhausted (fake)")
+
+        key = ''.join(content_fingerprint(part) for part in contents)
+        creative_ids = PACKED_CREATIVE_RE.findall(prompt)
+        if prompt.startswith(TRANSLATION_HEADER.split('{')[0]):
+            # Translation request: the English texts follow as {"en": [...]}
+            texts = json.loads(prompt[prompt.index('{"en"'):])['en']
+            result = {'hu': [f"(HU) {text}" for text in texts]}
+        elif creative_ids:
+            # Packed image request: one result per creative
+            result = {'results': [{'creative_id': creative_id,
+                                   **fake_result(prompt, seed=f"{self.seed}:{key}:{creative_id}")}
+                                  for creative_id in creative_ids]}
+        else:
+            result = fake_result(prompt, seed=f"{self.seed}:{key}")
+        text = json.dumps(result, ensure_ascii=False, indent=2)
+        if self.latency['generate_per_1k_output'][0] > 0:
+            self._sleep(self._draw('generate_per_1k_output') * estimate_tokens(text) / 1000)
+
+        if self._chance(self.truncate_rate):
+            with self._lock:
+                cut = self._rng.randint(len(text) // 3, len(text) - 10)
+            text = text[:cut]
+
+        media_tokens = sum(int(getattr(p, 'size_bytes', 0) / 40000) for p in contents)
+        media_tokens += sum(image_tokens(p.size) for p in contents if hasattr(p, 'tobytes') and hasattr(p, 'size'))
+        usage = SimpleNamespace(
+            prompt_token_count=estimate_tokens(prompt) + media_tokens,
+            candidates_token_count=estimate_tokens(text),
+            total_token_count=estimate_tokens(prompt) + media_tokens + estimate_tokens(text)
+        )
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+def fake_result(prompt: str, seed: str) -> Dict:
+    """
+    A schema-valid analysis for a prompt.
+
+    Fields follow what the prompt asks for: Hungarian '_hu' lists, the
+    transcript/scenes/temporal sections of the video prompt, and only the
+    requested slice for a split video part or a continuation request.
+    """
+    rng = random.Random(seed)
+    bilingual = 'findings_hu' in prompt
+    video = any(f'"{key}"' in prompt for key in ('scenes', 'transcript', 'temporal_analysis'))
+    hungarian = bilingual or re.search(r'"(detected|ad)_language":\s*"hu"', prompt) is not None
+
+    dimensions = {}
+    for name in DIMENSIONS:
+        entry = {
+            'score': rng.randint(35, 95),
+            'findings': [f"{name} finding {i + 1}" for i in range(3)]
+        }
+        if bilingual:
+            entry['findings_hu'] = [f"{name} megállapítás {i + 1}" for i in range(3)]
+        dimensions[name] = entry
+
+    summary = {}
+    for field, hu_label in (('strengths', 'erősség'), ('concerns', 'aggály'), ('recommendations', 'ajánlás')):
+        summary[field] = [f"{field[:-1]} {i + 1}" for i in range(3)]
+        if bilingual:
+            summary[f"{field}_hu"] = [f"{hu_label} {i + 1}" for i in range(3)]
+
+    result = {
+        'overall_score': round(sum(d['score'] for d in dimensions.values()) / len(dimensions)),
+        'dimensions': dimensions,
+        'summary': summary
+    }
+
+    if video:
+        result.update({
+            'detected_language': 'hu' if hungarian else 'en',
+            'duration_analyzed': str(rng.randint(15, 90)),
+            'transcript': "[0:00] Narrator: Fake transcript for offline runs.",
+            'scenes': [
+                {
+                    'timestamp': f"0:{i * 10:02d}-0:{i * 10 + 10:02d}",
+                    'description': f"Scene {i + 1}",
+                    'visual_elements': ['product', 'people'],
+                    'audio_content': 'Voiceover',
+                    'climate_score': rng.randint(35, 95),
+                    'social_score': rng.randint(35, 95),
+                    'cultural_score': rng.randint(35, 95),
+                    'ethical_score': rng.randint(35, 95),
+                    'overall_scene_score': rng.randint(35, 95)
+                }
+                for i in range(3)
+            ],
+            'temporal_analysis': {
+                'messaging_evolution': 'Consistent',
+                'key_moments': [{'timestamp': '0:05', 'event': 'Logo'}],
+                'audio_visual_alignment': 'consistent',
+                'pacing_notes': 'Even pacing'
+            }
+        })
+    else:
+        result['ad_language'] = 'hu' if hungarian else 'en'
+
+    if SPLIT_PART_RE.search(prompt) or CONTINUATION_MARKER in prompt:
+        # One slice of a split video analysis, or the rest of a cut-off
+        # reply: only the fields it asks for
+        result = {key: value for key, value in result.items() if f'"{key}"' in prompt}
+        if 'dimensions' in result:
+            result['dimensions'] = {name: entry for name, entry in result['dimensions'].items() if name in prompt}
+
+    return result
+
+
+class CassetteBackend(ModelBackend):
+    """
+    Record/replay wrapper.
+
+    record: forward to the inner backend and save every generate_content
+            response under cassette_dir/<request hash>.json
+    replay: answer from disk only (uploads are local no-ops); a request
+            that was never recorded raises CassetteMiss
+    """
+
+    def __init__(self, cassette_dir: Path, mode: str = 'replay',
+                 inner: Optional[ModelBackend] = None):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == 'record' and inner is None:
+            raise ValueError("Record mode needs a backend to record from")
+
+        self.cassette_dir = Path(cassette_dir)
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.inner = inner
+        self.time_scale = inner.time_scale if (inner and mode == 'record') else 0.0
+
+        # Content hash of each uploaded file, by file name (request keys use
+        # content, not server-side names, so they match across runs)
+        self._hashes: Dict[str, str] = {}
+        self._files: Dict[str, SimpleNamespace] = {}
+
+    @staticmethod
+    def request_key(contents: List, generation_config: Dict, hashes: Dict[str, str]) -> str:
+        digest = hashlib.sha256()
+        for part in contents:
+            name = getattr(part, 'name', None)
+            digest.update((hashes.get(name) if name in hashes else content_fingerprint(part)).encode())
+        digest.update(json.dumps(generation_config or {}, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def upload_file(self, path: str):
+        sha = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        if self.mode == 'record':
+            handle = self.inner.upload_file(path)
+        else:
+            handle = SimpleNamespace(name=f"files/replay-{sha[:12]}", uri=None,
+                                     state=SimpleNamespace(name='ACTIVE'))
+            self._files[handle.name] = handle
+        self._hashes[handle.name] = sha
+        return handle
+
+    def get_file(self, name: str):
+        if self.mode == 'record':
+            return self.inner.get_file(name)
+        return self._files[name]
+
+    def delete_file(self, name: str):
+        if self.mode == 'record':
+            self.inner.delete_file(name)
+        self._files.pop(name, None)
+
+    def generate_content(self, contents: List, generation_config: Dict):
+        key = self.request_key(contents, generation_config, self._hashes)
+        path = self.cassette_dir / f"{key}.json"
+
+        if self.mode == 'replay':
+            if not path.exists():
+                raise CassetteMiss(f"No recorded response for request {key[:12]} in {self.cassette_dir}")
+            with open(path, 'r') as f:
+                recorded = json.load(f)
+            return SimpleNamespace(text=recorded['text'],
+                                   usage_metadata=SimpleNamespace(**recorded['usage']))
+
+        response = self.inner.generate_content(contents, generation_config)
+        usage = getattr(response, 'usage_metadata', None)
+        recorded = {
+            'key': key,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'text': response.text,
+            'usage': {
+                'prompt_token_count': getattr(usage, 'prompt_token_count', None),
+                'candidates_token_count': getattr(usage, 'candidates_token_count', None),
+                'total_token_count': getattr(usage, 'total_token_count', None)
+            }
+        }
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(recorded, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return response
+
+
+def get_backend(api_key: Optional[str], model_name: str) -> ModelBackend:
+    """
+    Build the backend selected by the RAI_* environment variables.
+
+    Args:
+        api_key: Google AI API key (only needed for the real API)
+        model_name: Gemini model name
+
+    Returns:
+        A ModelBackend
+    """
+    kind = os.getenv('RAI_MODEL_BACKEND', 'gemini').lower()
+    cassette_dir = os.getenv('RAI_CASSETTE_DIR')
+    cassette_mode = os.getenv('RAI_CASSETTE_MODE', 'replay').lower()
+
+    if cassette_dir and cassette_mode == 'replay':
+        return CassetteBackend(Path(cassette_dir), mode='replay')
+
+    if kind == 'fake':
+        backend = FakeBackend(
+            seed=int(os.getenv('RAI_FAKE_SEED', '0')),
+            time_scale=float(os.getenv('RAI_FAKE_TIME_SCALE', '1.0')),
+            rate_limit_rate=float(os.getenv('RAI_FAKE_429_RATE', '0')),
+            truncate_rate=float(os.getenv('RAI_FAKE_TRUNCATE_RATE', '0'))
+        )
+    elif kind == 'gemini':
+        backend = GeminiBackend(api_key, model_name)
+    else:
+        raise ValueError(f"Unknown RAI_MODEL_BACKEND: {kind}")
+
+    if cassette_dir:
+        return CassetteBackend(Path(cassette_dir), mode='record', inner=backend)
+    return backend
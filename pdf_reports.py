@@ -0,0 +1,450 @@
+"""
+PDF reports: single-ad reports, comparisons and bulk rendering.
+
+app.py renders one report at a time for the Streamlit session; the
+'reports' command in simple_pipeline.py renders a report for every analysed
+ad in analysis_storage/ (plus optional per-brand portfolios) on a process
+pool.
+
+Style sheets and the fixed table styles are built once per process
+(report_styles), so a worker pays for them on its first report only.
+Rendered files are recorded in <out>/report_index.json with a hash of their
+inputs; a report whose inputs are unchanged is skipped on the next run.
+Bump REPORT_VERSION when the layout changes to re-render everything.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+REPORT_VERSION = 1
+REPORT_INDEX_FILE = 'report_index.json'
+
+DIMENSIONS = ['Climate Responsibility', 'Social Responsibility',
+              'Cultural Sensitivity', 'Ethical Communication']
+
+
+@lru_cache(maxsize=None)
+def report_styles() -> Dict:
+    """Paragraph and table styles shared by every report (built once per process)"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1f77b4'),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor('#1f77b4'),
+            spaceAfter=12,
+            spaceBefore=12
+        ),
+        'subtitle': styles['Heading2'],
+        'dimension': styles['Heading3'],
+        'normal': styles['Normal'],
+        'italic': styles['Italic'],
+        'dimension_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ]),
+        'comparison_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ]),
+        'score_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+    }
+
+
+def _text(value) -> str:
+    """Model output as Paragraph markup (&, < and > would otherwise break parsing)"""
+    return escape(str(value))
+
+
+def _new_document(buffer):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(buffer, pagesize=letter,
+                             rightMargin=72, leftMargin=72,
+                             topMargin=72, bottomMargin=18)
+
+
+def _score(result: Dict, dimension: str):
+    return result.get('dimensions', {}).get(dimension, {}).get('score', 0)
+
+
+def render_ad_report(result: Dict, brand_name: str = "Unknown Brand", ad_copy: str = "") -> bytes:
+    """
+    Render the analysis report for one ad.
+
+    Args:
+        result: Analysis result (overall_score, dimensions, summary)
+        brand_name: Brand shown in the subtitle
+        ad_copy: Ad copy (not printed; kept for the app.py signature)
+
+    Returns:
+        PDF bytes
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table, TableStyle, Paragraph, Spacer, PageBreak
+
+    styles = report_styles()
+    buffer = io.BytesIO()
+    doc = _new_document(buffer)
+    elements = []
+
+    # Title
+    elements.append(Paragraph("Responsible Advertising Index", styles['title']))
+    elements.append(Paragraph(f"Analysis Report - {_text(brand_name)}", styles['subtitle']))
+    elements.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles['normal']))
+    elements.append(Spacer(1, 20))
+
+    # Executive Summary Box
+    elements.append(Paragraph("Executive Summary", styles['heading']))
+
+    overall_score = result['overall_score']
+    score_color = colors.green if overall_score >= 80 else (colors.orange if overall_score >= 60 else colors.red)
+
+    summary_data = [
+        ['Overall Responsibility Score', f"{overall_score}/100"],
+        ['Rating', 'Excellent' if overall_score >= 80 else ('Good' if overall_score >= 60 else 'Needs Improvement')]
+    ]
+
+    summary_table = Table(summary_data, colWidths=[4*inch, 2*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (1, 0), (1, 0), score_color),
+        ('TEXTCOLOR', (1, 0), (1, 0), colors.white),
+    ]))
+
+    elements.append(summary_table)
+    elements.append(Spacer(1, 20))
+
+    # Dimension Scores
+    elements.append(Paragraph("Dimension Scores", styles['heading']))
+
+    dim_data = [['Dimension', 'Score', 'Assessment']]
+    for dim_name, dimension in result['dimensions'].items():
+        score = dimension['score']
+        assessment = '⭐⭐⭐⭐⭐' if score >= 90 else ('⭐⭐⭐⭐' if score >= 75 else ('⭐⭐⭐' if score >= 60 else '⭐⭐'))
+        dim_data.append([dim_name, f"{score}/100", assessment])
+
+    dim_table = Table(dim_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
+    dim_table.setStyle(styles['dimension_table'])
+
+    elements.append(dim_table)
+    elements.append(Spacer(1, 20))
+
+    # Key Findings
+    elements.append(Paragraph("Detailed Findings", styles['heading']))
+
+    for dim_name, dimension in result['dimensions'].items():
+        elements.append(Paragraph(f"<b>{_text(dim_name)}</b> ({dimension['score']}/100)", styles['dimension']))
+        for finding in dimension.get('findings', []):
+            elements.append(Paragraph(f"• {_text(finding)}", styles['normal']))
+        elements.append(Spacer(1, 10))
+
+    # Page break before summary
+    elements.append(PageBreak())
+    summary = result.get('summary', {})
+
+    elements.append(Paragraph("Key Strengths", styles['heading']))
+    for strength in summary.get('strengths', []):
+        elements.append(Paragraph(f"✓ {_text(strength)}", styles['normal']))
+    elements.append(Spacer(1, 15))
+
+    elements.append(Paragraph("Areas of Concern", styles['heading']))
+    for concern in summary.get('concerns', []):
+        elements.append(Paragraph(f"⚠ {_text(concern)}", styles['normal']))
+    elements.append(Spacer(1, 15))
+
+    elements.append(Paragraph("Recommendations", styles['heading']))
+    for i, rec in enumerate(summary.get('recommendations', []), 1):
+        elements.append(Paragraph(f"{i}. {_text(rec)}", styles['normal']))
+    elements.append(Spacer(1, 30))
+
+    # Footer
+    elements.append(Paragraph("This report was generated by the Responsible Advertising Index assessment tool.",
+                              styles['italic']))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def render_comparison_report(analyses: List[Dict], title: Optional[str] = None) -> bytes:
+    """
+    Render a comparison report: score table, highest score, one page per ad.
+
+    Args:
+        analyses: History entries ({'brand_name', 'result'})
+        title: Subtitle (defaults to "Comparison Report - N Advertisements")
+
+    Returns:
+        PDF bytes
+    """
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table, Paragraph, Spacer, PageBreak
+
+    styles = report_styles()
+    buffer = io.BytesIO()
+    doc = _new_document(buffer)
+    elements = []
+
+    # Title
+    elements.append(Paragraph("Responsible Advertising Index", styles['title']))
+    elements.append(Paragraph(_text(title or f"Comparison Report - {len(analyses)} Advertisements"),
+                              styles['subtitle']))
+    elements.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles['normal']))
+    elements.append(Spacer(1, 20))
+
+    # Comparison Summary Table (repeats its header row when it spans pages)
+    elements.append(Paragraph("Overall Comparison", styles['heading']))
+
+    table_data = [['Brand', 'Overall Score', 'Climate', 'Social', 'Cultural', 'Ethical']]
+    for analysis in analyses:
+        result = analysis['result']
+        table_data.append([
+            analysis['brand_name'][:40],
+            f"{result['overall_score']}/100",
+            *[f"{_score(result, dimension)}" for dimension in DIMENSIONS]
+        ])
+
+    comp_table = Table(table_data, colWidths=[2*inch, 1*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch],
+                       repeatRows=1)
+    comp_table.setStyle(styles['comparison_table'])
+
+    elements.append(comp_table)
+    elements.append(Spacer(1, 20))
+
+    # Winner section
+    winner = max(analyses, key=lambda x: x['result']['overall_score'])
+    elements.append(Paragraph("🏆 Highest Score", styles['heading']))
+    elements.append(Paragraph(
+        f"<b>{_text(winner['brand_name'])}</b> achieved the highest overall score of "
+        f"<b>{winner['result']['overall_score']}/100</b>",
+        styles['normal']
+    ))
+    elements.append(Spacer(1, 30))
+
+    # Individual analyses
+    for idx, analysis in enumerate(analyses, 1):
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"Advertisement {idx}: {_text(analysis['brand_name'])}", styles['heading']))
+
+        result = analysis['result']
+        score_data = [['Overall Score', f"{result['overall_score']}/100"]]
+        score_data += [[dimension, f"{_score(result, dimension)}/100"] for dimension in DIMENSIONS]
+
+        score_table = Table(score_data, colWidths=[3*inch, 2*inch])
+        score_table.setStyle(styles['score_table'])
+
+        elements.append(score_table)
+        elements.append(Spacer(1, 15))
+
+        summary = result.get('summary', {})
+        elements.append(Paragraph("<b>Key Strengths:</b>", styles['normal']))
+        for strength in summary.get('strengths', []):
+            elements.append(Paragraph(f"✓ {_text(strength)}", styles['normal']))
+
+        elements.append(Spacer(1, 10))
+
+        elements.append(Paragraph("<b>Areas of Concern:</b>", styles['normal']))
+        for concern in summary.get('concerns', []):
+            elements.append(Paragraph(f"⚠ {_text(concern)}", styles['normal']))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Bulk rendering
+# ---------------------------------------------------------------------------
+
+def slugify(name: str) -> str:
+    """File-name-safe form of a brand name"""
+    slug = re.sub(r'[^\w-]+', '_', name.strip().lower(), flags=re.UNICODE).strip('_')
+    return slug or 'unknown'
+
+
+def input_hash(kind: str, payload) -> str:
+    """Hash of everything a report is rendered from (plus REPORT_VERSION)"""
+    encoded = json.dumps({'kind': kind, 'version': REPORT_VERSION, 'payload': payload},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def plan_reports(entries: Iterable[Dict], portfolios: bool = False) -> List[Tuple[str, str, Dict]]:
+    """
+    Reports to render for a set of stored analyses.
+
+    Args:
+        entries: simple_pipeline.iter_stored_analyses() entries
+        portfolios: Add one portfolio report per brand
+
+    Returns:
+        (kind, relative output path, payload) per report
+    """
+    tasks = []
+    brands: Dict[str, List[Dict]] = {}
+
+    for entry in entries:
+        brand = entry.get('brand') or 'Unknown'
+        tasks.append(('ad', f"{entry['ad_id']}.pdf", {
+            'result': entry['result'],
+            'brand_name': brand,
+            'ad_copy': entry.get('ad_copy', '')
+        }))
+        brands.setdefault(brand, []).append({
+            'brand_name': entry.get('ad_copy') or entry['ad_id'],
+            'result': entry['result']
+        })
+
+    if portfolios:
+        for brand, analyses in sorted(brands.items()):
+            tasks.append(('portfolio', f"brands/{slugify(brand)}.pdf", {
+                'brand': brand,
+                'analyses': analyses
+            }))
+
+    return tasks
+
+
+def _render_task(task: Tuple[str, str, str, Dict]) -> Dict:
+    """Render one report and write it (runs in a worker process)"""
+    kind, out_path, digest, payload = task
+    start = time.perf_counter()
+    try:
+        if kind == 'ad':
+            pdf = render_ad_report(payload['result'], payload['brand_name'], payload['ad_copy'])
+        else:
+            pdf = render_comparison_report(
+                payload['analyses'],
+                title=f"Portfolio Report - {payload['brand']} ({len(payload['analyses'])} Advertisements)"
+            )
+
+        path = Path(out_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.pdf.tmp')
+        tmp_path.write_bytes(pdf)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        return {'path': out_path, 'hash': digest, 'error': f"{type(e).__name__}: {e}"}
+
+    return {'path': out_path, 'hash': digest, 'seconds': time.perf_counter() - start, 'bytes': len(pdf)}
+
+
+def load_report_index(out_dir: Path) -> Dict[str, str]:
+    """{relative path: input hash} of reports already rendered"""
+    index_path = Path(out_dir) / REPORT_INDEX_FILE
+    if not index_path.exists():
+        return {}
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def render_reports(entries: Iterable[Dict], out_dir: Path, portfolios: bool = False,
+                   workers: Optional[int] = None, force: bool = False) -> Dict:
+    """
+    Render PDF reports for stored analyses, skipping unchanged ones.
+
+    Args:
+        entries: simple_pipeline.iter_stored_analyses() entries
+        out_dir: Where reports go (<ad_id>.pdf, brands/<brand>.pdf)
+        portfolios: Also render one portfolio report per brand
+        workers: Process pool size (defaults to CPU count)
+        force: Re-render even if the inputs are unchanged
+
+    Returns:
+        {'rendered', 'skipped', 'failed': [(path, error)], 'seconds'}
+    """
+    out_dir = Path(out_dir)
+    index = {} if force else load_report_index(out_dir)
+
+    tasks = []
+    skipped = 0
+    for kind, name, payload in plan_reports(entries, portfolios=portfolios):
+        digest = input_hash(kind, payload)
+        if index.get(name) == digest and (out_dir / name).exists():
+            skipped += 1
+            continue
+        tasks.append((kind, str(out_dir / name), digest, payload))
+
+    print(f"📄 {len(tasks) + skipped} reports ({skipped} unchanged, {len(tasks)} to render)")
+
+    start = time.perf_counter()
+    rendered = 0
+    failed = []
+
+    if tasks:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        # Portfolios are the slowest; start them first so they don't finish last
+        tasks.sort(key=lambda task: task[0] != 'portfolio')
+        with ProcessPoolExecutor(max_workers=workers, initializer=report_styles) as pool:
+            for outcome in pool.map(_render_task, tasks, chunksize=4):
+                name = str(Path(outcome['path']).relative_to(out_dir))
+                if 'error' in outcome:
+                    failed.append((name, outcome['error']))
+                    index.pop(name, None)
+                    continue
+                rendered += 1
+                index[name] = outcome['hash']
+
+        tmp_path = out_dir / f"{REPORT_INDEX_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, out_dir / REPORT_INDEX_FILE)
+
+    return {
+        'rendered': rendered,
+        'skipped': skipped,
+        'failed': failed,
+        'seconds': time.perf_counter() - start
+    }
@@ -0,0 +1,273 @@
+"""
+Per-ad stage timing for the analysis pipeline.
+
+A StageRecorder collects spans (wall time plus optional bytes / token counts)
+around download, upload, Gemini processing wait, generation and parsing.
+The spans are stored in each ad's metadata.json under 'timings' and appended
+to a rolling analysis_storage/metrics.jsonl, which `simple_pipeline.py stats`
+summarises as p50/p95 per stage.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+METRICS_FILE = 'metrics.jsonl'
+
+# Keep the rolling metrics file to roughly this many ads
+METRICS_MAX_LINES = 5000
+
+# Stage names
+DOWNLOAD = 'download'
+PROXY = 'proxy'
+STREAM_UPLOAD = 'stream_upload'
+UPLOAD = 'upload'
+PROCESSING_WAIT = 'processing_wait'
+GENERATE = 'generate'
+PARSE = 'parse'
+TRANSLATE = 'translate'
+REPAIR = 'repair'
+
+# Numeric span fields that are summed per stage
+COUNTERS = ('bytes', 'input_tokens', 'output_tokens', 'saved_tokens', 'saved_seconds')
+
+# Callbacks notified as spans start and end (e.g. batch_status.BatchStatus)
+_listeners = []
+
+
+def add_listener(listener):
+    """
+    Receive span events from every StageRecorder in this process.
+
+    listener(event, record) is called with event 'start' (record has only
+    'stage' and initial fields) and 'end' (record is complete).
+    """
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _notify(event: str, record: Dict):
+    for listener in list(_listeners):
+        try:
+            listener(event, record)
+        except Exception:
+            # Monitoring must never break the pipeline
+            pass
+
+
+def http_status(exc: BaseException) -> Optional[int]:
+    """
+    HTTP status behind an exception, if any.
+
+    Understands google.api_core errors (.code), googleapiclient HttpError
+    (.resp.status) and requests errors (.response.status_code), and follows
+    wrapped causes (e.g. StreamingUploadError raised from a requests error).
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+
+        code = getattr(exc, 'code', None)
+        if isinstance(code, int):
+            return int(code)
+
+        resp = getattr(exc, 'resp', None)
+        if isinstance(getattr(resp, 'status', None), int):
+            return int(resp.status)
+
+        response = getattr(exc, 'response', None)
+        if isinstance(getattr(response, 'status_code', None), int):
+            return int(response.status_code)
+
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class StageRecorder:
+    """Collects timed spans for one ad (thread-safe)"""
+
+    def __init__(self):
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str, **fields):
+        """
+        Time a block of work.
+
+        Yields a dict the block can add fields to (bytes, input_tokens, ...).
+        Failed blocks are recorded with an 'error' field and re-raised.
+        """
+        record = {'stage': stage, **fields}
+        start = time.perf_counter()
+        _notify('start', record)
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = type(e).__name__
+            status = http_status(e)
+            if status is not None:
+                record['http_status'] = status
+            raise
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            with self._lock:
+                self.spans.append(record)
+            _notify('end', record)
+
+    def add(self, record: Dict):
+        """Add a span measured elsewhere (e.g. this ad's share of a packed request)"""
+        with self._lock:
+            self.spans.append(record)
+
+    def stages(self) -> Dict[str, Dict]:
+        """Totals per stage: seconds, count and summed counters"""
+        totals: Dict[str, Dict] = {}
+        with self._lock:
+            spans = list(self.spans)
+
+        for record in spans:
+            stage = totals.setdefault(record['stage'], {'seconds': 0.0, 'count': 0})
+            stage['seconds'] = round(stage['seconds'] + record['seconds'], 4)
+            stage['count'] += 1
+            for key in COUNTERS:
+                if record.get(key) is not None:
+                    stage[key] = stage.get(key, 0) + record[key]
+
+        return totals
+
+
+def record_usage(record: Dict, response):
+    """Copy token usage from a Gemini response into a span record"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    record['input_tokens'] = getattr(usage, 'prompt_token_count', None)
+    record['output_tokens'] = getattr(usage, 'candidates_token_count', None)
+
+
+def persist_timings(metadata: Dict, recorder: StageRecorder, storage_dir: Path):
+    """
+    Merge a recorder's spans into an ad's metadata and the rolling metrics file.
+
+    The caller still writes metadata.json; this only updates the dict.
+    """
+    if not recorder.spans:
+        return
+
+    timings = metadata.setdefault('timings', {'spans': []})
+    timings['spans'].extend(recorder.spans)
+
+    # Recompute per-stage totals across every phase (download, analysis, ...)
+    merged = StageRecorder()
+    merged.spans = timings['spans']
+    timings['stages'] = merged.stages()
+
+    line = {
+        'id': metadata.get('id'),
+        'recorded_at': datetime.now().isoformat(),
+        'stages': recorder.stages()
+    }
+    append_metrics(Path(storage_dir) / METRICS_FILE, line)
+
+
+def append_metrics(metrics_path: Path, line: Dict):
+    """Append one JSON line, trimming the file to the newest METRICS_MAX_LINES"""
+    metrics_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(metrics_path, 'a') as f:
+        f.write(json.dumps(line) + '\n')
+
+    # Trim occasionally rather than on every write
+    if metrics_path.stat().st_size > METRICS_MAX_LINES * 400:
+        with open(metrics_path, 'r') as f:
+            lines = f.readlines()
+        if len(lines) > METRICS_MAX_LINES:
+            with open(metrics_path, 'w') as f:
+                f.writelines(lines[-METRICS_MAX_LINES:])
+
+
+def load_metrics(metrics_path: Path) -> List[Dict]:
+    """Read the rolling metrics file, skipping malformed lines"""
+    if not metrics_path.exists():
+        return []
+
+    lines = []
+    with open(metrics_path, 'r') as f:
+        for raw in f:
+            try:
+                lines.append(json.loads(raw))
+            except json.JSONDecodeError:
+                continue
+    return lines
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for an empty list)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def stage_report(lines: List[Dict]) -> Dict[str, Dict]:
+    """p50/p95 seconds, count and mean counters per stage"""
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for line in lines:
+        for stage, totals in line.get('stages', {}).items():
+            bucket = samples.setdefault(stage, {'seconds': []})
+            bucket['seconds'].append(totals['seconds'])
+            for key in COUNTERS:
+                if key in totals:
+                    bucket.setdefault(key, []).append(totals[key])
+
+    report = {}
+    for stage, bucket in samples.items():
+        report[stage] = {
+            'count': len(bucket['seconds']),
+            'p50': percentile(bucket['seconds'], 50),
+            'p95': percentile(bucket['seconds'], 95),
+            'total': sum(bucket['seconds'])
+        }
+        for key in COUNTERS:
+            if key in bucket:
+                report[stage][f'mean_{key}'] = sum(bucket[key]) / len(bucket[key])
+
+    return report
+
+
+def print_stage_report(lines: List[Dict]):
+    """Print the p50/p95 table for `simple_pipeline.py stats`"""
+    report = stage_report(lines)
+    if not report:
+        print("  No timings recorded yet")
+        return
+
+    order = [DOWNLOAD, PROXY, STREAM_UPLOAD, UPLOAD, PROCESSING_WAIT, GENERATE, PARSE, REPAIR, TRANSLATE]
+    stages = sorted(report, key=lambda s: order.index(s) if s in order else len(order))
+    grand_total = sum(r['total'] for r in report.values()) or 1
+
+    print(f"\n  {'stage':18s} {'n':>6s} {'p50':>9s} {'p95':>9s} {'share':>7s}  extra")
+    print("  " + "-" * 72)
+    for stage in stages:
+        r = report[stage]
+        extra = []
+        if 'mean_bytes' in r:
+            extra.append(f"{r['mean_bytes'] / (1024 * 1024):.1f} MB avg")
+        if 'mean_input_tokens' in r:
+            extra.append(f"{r['mean_input_tokens']:.0f} in-tok")
+        if 'mean_output_tokens' in r:
+            extra.append(f"{r['mean_output_tokens']:.0f} out-tok")
+        if 'mean_saved_tokens' in r:
+            extra.append(f"saved {r['mean_saved_tokens']:.0f} tok / {r.get('mean_saved_seconds', 0):.1f}s vs. re-run")
+        print(f"  {stage:18s} {r['count']:6d} {r['p50']:8.2f}s {r['p95']:8.2f}s "
+              f"{r['total'] / grand_total * 100:6.1f}%  {', '.join(extra)}")
@@ -0,0 +1,188 @@
+"""
+Opt-in profiling for the CLIs and Streamlit pages.
+
+Set RAI_PROFILE to turn it on:
+
+  RAI_PROFILE=1       cProfile each run
+  RAI_PROFILE=sample  cProfile plus a wall-clock stack sampler
+
+Each run writes to profiles/<name>/ (RAI_PROFILE_DIR to change):
+
+  <stamp>.prof     pstats dump (python -m pstats, snakeviz, ...)
+  <stamp>.txt      top functions by cumulative and own time
+  <stamp>.folded   sampled stacks, one "a;b;c count" line per stack
+                   (flamegraph.pl / speedscope), RAI_PROFILE=sample only
+
+When RAI_PROFILE is unset the hooks cost one environment lookup per call.
+
+Usage:
+  RAI_PROFILE=1 python3 simple_pipeline.py export
+  RAI_PROFILE=sample streamlit run dashboard/Home.py   # one profile per rerun
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Dict
+
+PROFILE_ENV = 'RAI_PROFILE'
+PROFILE_DIR_ENV = 'RAI_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = 'profiles'
+
+# Functions listed per ordering in the .txt summary
+TOP_FUNCTIONS = 30
+
+# Sampler interval (seconds)
+SAMPLE_INTERVAL = 0.005
+
+# Page scripts being profiled on this thread (profile_page re-runs the script)
+_local = threading.local()
+
+
+def enabled() -> bool:
+    """True if RAI_PROFILE asks for profiling"""
+    return os.environ.get(PROFILE_ENV, '') not in ('', '0')
+
+
+def profile_dir() -> Path:
+    return Path(os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR))
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts stacks"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rai-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def folded(self) -> str:
+        return '\n'.join(f"{stack} {count}" for stack, count in
+                         sorted(self.counts.items(), key=lambda item: -item[1])) + '\n'
+
+
+def _summary(profiler, name: str, seconds: float) -> str:
+    import io
+    import pstats
+
+    out = io.StringIO()
+    out.write(f"{name}: {seconds:.3f}s wall\n\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.strip_dirs()
+    for order in ('cumulative', 'tottime'):
+        out.write(f"=== Top {TOP_FUNCTIONS} by {order} ===\n")
+        stats.sort_stats(order).print_stats(TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+@contextmanager
+def profile(name: str):
+    """
+    Profile the enclosed block if RAI_PROFILE is set.
+
+    Args:
+        name: Entry point name (subdirectory under the profiles dir)
+    """
+    if not enabled():
+        yield
+        return
+
+    import cProfile
+
+    sampler = None
+    if os.environ.get(PROFILE_ENV) == 'sample':
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        seconds = time.perf_counter() - start
+        if sampler:
+            sampler.stop()
+
+        out_dir = profile_dir() / name
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stem = out_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+
+        profiler.dump_stats(f"{stem}.prof")
+        Path(f"{stem}.txt").write_text(_summary(profiler, name, seconds))
+        if sampler:
+            Path(f"{stem}.folded").write_text(sampler.folded())
+        print(f"⏱️ Profile written to {stem}.prof ({seconds:.2f}s)", file=sys.stderr)
+
+
+def profiled(name: str):
+    """Decorator form of profile() for entry point functions"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with profile(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_page(script_path: str):
+    """
+    Profile a Streamlit page script, one profile per rerun.
+
+    Call at the top of the page, before anything else runs. When profiling
+    is on, this runs the page script under the profiler and stops the
+    outer run; when off, it returns immediately.
+
+    Args:
+        script_path: The page's __file__
+    """
+    if not enabled():
+        return
+
+    active = getattr(_local, 'pages', None)
+    if active is None:
+        active = _local.pages = set()
+    if script_path in active:
+        # Inside the profiled run
+        return
+
+    import runpy
+    import streamlit as st
+
+    active.add(script_path)
+    try:
+        with profile(Path(script_path).stem):
+            runpy.run_path(script_path, run_name='__main__')
+    finally:
+        active.discard(script_path)
+    st.stop()
@@ -0,0 +1,346 @@
+"""
+Compact analysis prompts with measured token budgets.
+
+Every analysis request used to carry json.dumps(FRAMEWORK, indent=2) (both
+languages' indicators, indented) plus a fully spelled-out example reply.
+This module compiles the same content into a compact canonical form:
+
+  - framework: one line per dimension (name, Hungarian name for bilingual
+    prompts, weight, indicators); the model answers in the output spec's
+    languages, so the Hungarian indicator translations are left out
+  - output spec: the exact reply shape as single-line JSON, with N for a
+    0-100 score and L for a list of three strings
+  - split video analysis: video_part_prompt asks for one slice of the
+    video schema (transcript, a group of dimensions, or scenes/summary/
+    temporal analysis) so VideoAnalyzer can run the slices concurrently
+  - language: analyses are written in English (Hungarian ads get a
+    cultural-context note); the _hu lists come from translation.py when a
+    Hungarian view needs them, unless bilingual output is asked for
+
+The reply schema (keys, nesting, language fields) is unchanged.
+image_analysis.create_analysis_prompt / create_packed_prompt and
+VideoAnalyzer._create_prompt are built from here. PROMPT_BUDGETS caps the
+input tokens of each variant (tests/test_prompt_compiler.py enforces it);
+`python simple_pipeline.py prompts` prints the current counts.
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+from model_backend import CONTINUATION_MARKER, SPLIT_PART_HEADER
+
+# Estimated input tokens (model_backend.estimate_tokens, empty ad copy) per variant
+PROMPT_BUDGETS = {
+    'image_en': 460,
+    'image_hu': 480,
+    'image_bilingual': 555,
+    'packed_en': 530,
+    'packed_bilingual': 620,
+    'video_en': 760,
+    'video_hu': 790,
+    'video_split_transcript': 140,
+    'video_split_dimensions': 410,
+    'video_split_overview': 560,
+}
+
+# Placeholders in the output spec (explained by _LEGEND)
+SCORE = 'N'
+LIST = 'L'
+
+_LEGEND = f"{SCORE} = number 0-100; {LIST} = list of 3 strings; <...> = text to fill in."
+
+_RETURN = "Return ONLY this JSON (no markdown):"
+
+_HUNGARIAN_CONTEXT = ("The ad is Hungarian: respect Hungarian cultural context, local norms and language "
+                      "nuances. Write the analysis in English.")
+
+_BILINGUAL_OUTPUT = ("Write every finding, strength, concern and recommendation in English, with Hungarian "
+                     "versions in the matching _hu fields.")
+
+_IMAGE_TASK = ("You are an expert in responsible advertising assessment. Score the ad below (copy and image) "
+               "on the four framework dimensions.\n"
+               "Per dimension: score and findings covering strengths and risks, citing specific "
+               "elements of the copy and image. overall_score = weighted average of the dimensions. "
+               "Summary: top strengths, top concerns or risks, recommendations for improvement.")
+
+_TRANSCRIPT_TASK = """Watch and listen to this VIDEO ad from start to end. Transcribe ALL dialogue and voiceover with timestamps (language appears to be {language}); include on-screen text and note music and tone.
+Additional context: {ad_copy}"""
+
+_OVERVIEW_TASK = """You are an expert in responsible advertising assessment. Watch this ENTIRE VIDEO ad.
+- Identify 3-5 key scenes/moments and score each on the framework dimensions.
+- Describe how the message evolves from beginning to end; flag contradictions, fast disclaimers or buried warnings, and mismatches between what is SHOWN and SAID.
+- Summarize the ad's strengths, concerns and recommendations, citing timestamps.
+Additional context: {ad_copy}"""
+
+_VIDEO_TASK = """You are an expert in responsible advertising assessment. Analyze this VIDEO ad on the four framework dimensions. Watch the ENTIRE video.
+- Visual: people, products, settings, text overlays, on-screen brand messages; greenwashing cues (nature imagery, green colors without substance); diversity and representation.
+- Audio: transcribe ALL dialogue and voiceover (language appears to be {language}); note music, tone, sound effects, claims and promises.
+- Temporal: 3-5 key scenes; how the message evolves; contradictions (e.g. empowering start, manipulative end); fast disclaimers or buried warnings.
+- Integration: compare what is SHOWN vs. SAID; flag mismatches and misleading combinations.
+Cite actual elements with timestamps. overall_score = weighted average of the dimensions.
+Additional context: {ad_copy}"""
+
+
+def default_framework() -> Dict:
+    from framework import FRAMEWORK
+    return FRAMEWORK
+
+
+def compile_framework(framework: Optional[Dict] = None, bilingual: bool = False) -> str:
+    """
+    The framework as one line per dimension.
+
+    Args:
+        framework: Dimension definitions (default framework.FRAMEWORK)
+        bilingual: Add each dimension's Hungarian name
+
+    Returns:
+        "FRAMEWORK ..." block, e.g. "- Climate Responsibility (0.25): a; b; c"
+    """
+    framework = framework or default_framework()
+    lines = ["FRAMEWORK (dimension (weight): indicators):"]
+    for name, spec in framework.items():
+        label = f"{name} / {spec['hu_name']}" if bilingual and spec.get('hu_name') else name
+        lines.append(f"- {label} ({spec['weight']:g}): {'; '.join(spec['indicators'])}")
+    return '\n'.join(lines)
+
+
+def render_spec(spec: Dict) -> str:
+    """Single-line JSON with the SCORE/LIST placeholders left unquoted"""
+    text = json.dumps(spec, ensure_ascii=False, separators=(',', ':'))
+    return text.replace(f'"{SCORE}"', SCORE).replace(f'"{LIST}"', LIST)
+
+
+def _dimensions_spec(framework: Dict, bilingual: bool) -> Dict:
+    entry = {'score': SCORE, 'findings': LIST}
+    if bilingual:
+        entry['findings_hu'] = LIST
+    return {name: entry for name in framework}
+
+
+def _summary_spec(bilingual: bool) -> Dict:
+    summary = {}
+    for field in ('strengths', 'concerns', 'recommendations'):
+        summary[field] = LIST
+        if bilingual:
+            summary[f"{field}_hu"] = LIST
+    return summary
+
+
+def image_spec(bilingual: bool, ad_language: str, packed: bool = False,
+               framework: Optional[Dict] = None) -> Dict:
+    """Reply shape for one image ad (packed: with its creative_id)"""
+    framework = framework or default_framework()
+    spec = {'creative_id': '<creative id>'} if packed else {}
+    spec.update({
+        'overall_score': SCORE,
+        'ad_language': ad_language,
+        'dimensions': _dimensions_spec(framework, bilingual),
+        'summary': _summary_spec(bilingual),
+    })
+    return spec
+
+
+def _transcript_spec(detected_language: str) -> Dict:
+    return {
+        'detected_language': detected_language,
+        'duration_analyzed': '<video length in seconds>',
+        'transcript': '<full transcription with timestamps, e.g. [0:15] Speaker: ...>',
+    }
+
+
+def _overview_spec(bilingual: bool) -> Dict:
+    return {
+        'scenes': [{
+            'timestamp': '<m:ss-m:ss>',
+            'description': '<visual and audio details>',
+            'visual_elements': ['<element>'],
+            'audio_content': '<what is said or heard>',
+            'climate_score': SCORE,
+            'social_score': SCORE,
+            'cultural_score': SCORE,
+            'ethical_score': SCORE,
+            'overall_scene_score': SCORE,
+        }],
+        'summary': _summary_spec(bilingual),
+        'temporal_analysis': {
+            'messaging_evolution': '<how the message changes from beginning to end>',
+            'key_moments': [{'timestamp': '<m:ss>', 'event': '<what happens>'}],
+            'audio_visual_alignment': 'consistent|contradictory',
+            'pacing_notes': "<timing, emphasis, what's rushed vs. highlighted>",
+        },
+    }
+
+
+def video_spec(detected_language: str, bilingual: bool, framework: Optional[Dict] = None) -> Dict:
+    """Reply shape for a video ad"""
+    framework = framework or default_framework()
+    overview = _overview_spec(bilingual)
+    return {
+        'overall_score': SCORE,
+        **_transcript_spec(detected_language),
+        'dimensions': _dimensions_spec(framework, bilingual),
+        'scenes': overview['scenes'],
+        'summary': overview['summary'],
+        'temporal_analysis': overview['temporal_analysis'],
+    }
+
+
+def _language_notes(hungarian: bool, bilingual: bool) -> List[str]:
+    notes = [_HUNGARIAN_CONTEXT] if hungarian else []
+    return notes + [_BILINGUAL_OUTPUT] if bilingual else notes
+
+
+def image_prompt(ad_copy: str, bilingual: bool, ad_language: str) -> str:
+    """
+    Prompt for one image ad (the image is sent as a separate part).
+
+    Args:
+        ad_copy: Ad copy
+        bilingual: Ask for the _hu lists too (normally added later by translation.py)
+        ad_language: 'en' or 'hu' (Hungarian ads get a cultural-context note)
+    """
+    parts = [_IMAGE_TASK] + _language_notes(ad_language == 'hu', bilingual)
+    parts += [
+        compile_framework(bilingual=bilingual),
+        f"ADVERTISEMENT COPY:\n{ad_copy}",
+        f"{_RETURN}\n{render_spec(image_spec(bilingual, ad_language))}\n{_LEGEND}",
+    ]
+    return '\n\n'.join(parts)
+
+
+def packed_prompt(count: int, bilingual: bool, header: str, hungarian: bool = False) -> str:
+    """
+    Shared prompt for several image ads in one request.
+
+    Args:
+        count: Number of creatives
+        bilingual: Hungarian _hu fields in every result
+        header: Creative header line format with a {creative_id} field
+        hungarian: Some creatives are Hungarian
+    """
+    intro = (f"This request holds {count} separate creatives. Each starts with a line "
+             f"\"{header.format(creative_id='<creative id>')}\", then its ad copy, then its image. "
+             f"Score EACH creative on its own; never let one influence another.")
+    parts = [_IMAGE_TASK.replace("the ad below (copy and image)", "each creative"), intro]
+    parts += [note.replace("The ad is", "Some ads are") for note in _language_notes(hungarian, bilingual)]
+    spec = image_spec(bilingual, 'en|hu', packed=True)
+    parts += [
+        compile_framework(bilingual=bilingual),
+        f"Return ONLY one JSON object (no markdown) with exactly one result per creative:\n"
+        f"{{\"results\":[{render_spec(spec)}]}}\n{_LEGEND}",
+    ]
+    return '\n\n'.join(parts)
+
+
+def video_prompt(ad_copy: str, detected_language: str, framework: Optional[Dict] = None,
+                 bilingual: bool = False) -> str:
+    """Prompt for a video ad (the video is sent as a separate part)"""
+    parts = [_VIDEO_TASK.format(language=detected_language, ad_copy=ad_copy or "None")]
+    parts += _language_notes(detected_language == 'hu', bilingual)
+    parts += [
+        compile_framework(framework, bilingual=bilingual),
+        f"{_RETURN}\n{render_spec(video_spec(detected_language, bilingual, framework))}\n{_LEGEND}",
+    ]
+    return '\n\n'.join(parts)
+
+
+def video_split_parts(framework: Optional[Dict] = None, group_size: int = 2) -> List[Tuple[str, List[str]]]:
+    """
+    The requests of a split video analysis: (part name, dimensions it scores).
+
+    'transcript' (language, duration, transcript), 'dimensions1', ... (groups
+    of group_size dimensions) and 'overview' (scenes, summary, temporal analysis).
+    """
+    names = list(framework or default_framework())
+    groups = [names[start:start + group_size] for start in range(0, len(names), group_size)]
+    return ([('transcript', [])] + [(f"dimensions{number}", group) for number, group in enumerate(groups, 1)]
+            + [('overview', [])])
+
+
+def video_part_prompt(part: str, dimensions: List[str], ad_copy: str, detected_language: str,
+                      framework: Optional[Dict] = None, bilingual: bool = False) -> str:
+    """
+    Prompt for one request of a split video analysis (see video_split_parts).
+
+    Every part sees the whole video; each asks only for its own slice of
+    the reply schema, so the replies are short and can run concurrently.
+    """
+    framework = framework or default_framework()
+    context = ad_copy or "None"
+
+    if part == 'transcript':
+        task = _TRANSCRIPT_TASK.format(language=detected_language, ad_copy=context)
+        spec, block = _transcript_spec(detected_language), None
+    elif part == 'overview':
+        task = _OVERVIEW_TASK.format(ad_copy=context)
+        spec, block = _overview_spec(bilingual), compile_framework(framework, bilingual=bilingual)
+    else:
+        subset = {name: framework[name] for name in dimensions}
+        task = _VIDEO_TASK.format(language=detected_language, ad_copy=context).replace(
+            "the four framework dimensions", "the framework dimensions below").replace(
+            " overall_score = weighted average of the dimensions.", "").replace("transcribe ALL", "listen to ALL")
+        spec = {'dimensions': _dimensions_spec(subset, bilingual)}
+        block = compile_framework(subset, bilingual=bilingual)
+
+    parts = [SPLIT_PART_HEADER.format(part=part), task]
+    parts += _language_notes(detected_language == 'hu', bilingual and part != 'transcript')
+    if block:
+        parts.append(block)
+    parts.append(f"{_RETURN}\n{render_spec(spec)}\n{_LEGEND}")
+    return '\n\n'.join(parts)
+
+
+def continuation_prompt(prompt: str, missing_spec: Dict, partial: Dict) -> str:
+    """
+    Prompt for the fields a cut-off reply is missing (response_repair.py).
+
+    The original instructions are kept; its output spec is replaced by the
+    missing slice, and the fields already received are listed so the
+    model does not repeat them.
+    """
+    instructions = prompt.rsplit(_RETURN, 1)[0].rstrip()
+    received = ', '.join(f"{key}.{sub}" if isinstance(value, dict) else key
+                         for key, value in partial.items()
+                         for sub in (value if isinstance(value, dict) else [None]))
+    return (f"{instructions}\n\n{CONTINUATION_MARKER} Already received: {received or 'nothing'}.\n"
+            f"Return ONLY the missing fields as JSON (no markdown):\n{render_spec(missing_spec)}\n{_LEGEND}")
+
+
+def prompt_variants() -> Dict[str, str]:
+    """Every prompt variant with empty ad copy, keyed like PROMPT_BUDGETS"""
+    from image_analysis import create_analysis_prompt, create_packed_prompt
+
+    return {
+        'image_en': create_analysis_prompt('', 'en'),
+        'image_hu': image_prompt('', False, 'hu'),
+        'image_bilingual': create_analysis_prompt('', 'bilingual'),
+        'packed_en': create_packed_prompt([''], 'en'),
+        'packed_bilingual': create_packed_prompt([''], 'bilingual'),
+        'video_en': video_prompt('', 'en'),
+        'video_hu': video_prompt('', 'hu'),
+        'video_split_transcript': video_part_prompt('transcript', [], '', 'en'),
+        'video_split_dimensions': video_part_prompt('dimensions1', list(default_framework())[:2], '', 'en'),
+        'video_split_overview': video_part_prompt('overview', [], '', 'en'),
+    }
+
+
+def token_report(backend=None) -> List[Dict]:
+    """
+    Input tokens per prompt variant.
+
+    Args:
+        backend: model_backend.ModelBackend whose count_tokens to use
+            (default: the local estimate)
+
+    Returns:
+        [{'variant', 'tokens', 'budget', 'chars'}] in PROMPT_BUDGETS order
+    """
+    from model_backend import estimate_tokens
+
+    report = []
+    for variant, prompt in prompt_variants().items():
+        tokens = backend.count_tokens([prompt]) if backend else estimate_tokens(prompt)
+        report.append({'variant': variant, 'tokens': tokens,
+                       'budget': PROMPT_BUDGETS[variant], 'chars': len(prompt)})
+    return report
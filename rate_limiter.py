@@ -0,0 +1,60 @@
+"""
+Client-side request rate limiting for concurrent API calls.
+
+A token bucket shared by worker threads: requests_per_minute tokens are
+added evenly over each minute, up to burst, and every request takes one.
+Workers block in acquire() instead of sending requests the API would
+answer with a 429.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None):
+        """
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Requests allowed back to back (default: one second's worth, at least 1)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(self.rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until tokens are available and take them.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.waited_seconds += waited
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def penalize(self, seconds: float):
+        """Stop handing out tokens for a while (after a 429)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
@@ -0,0 +1,200 @@
+"""
+Raw model response archive.
+
+Only the parsed result used to be stored, and a reply that did not parse
+left nothing but placeholders, so every parser fix or schema change meant
+paying for new model calls. Every generate_content reply behind a stored
+analysis is now appended to analysis_storage/<ad_id>/raw_responses.jsonl.gz
+(next to metadata.json) with the hash of the prompt it answered and the
+model settings. `simple_pipeline.py reparse` rebuilds the results from
+these archives with parse_entries, on a process pool, without calling the
+model.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ARCHIVE_FILE = 'raw_responses.jsonl.gz'
+
+# Entry kinds
+VIDEO = 'video'
+VIDEO_PART = 'video_part'
+IMAGE = 'image'
+IMAGE_PACK = 'image_pack'
+REPAIR = 'repair'
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+
+
+class ResponseLog:
+    """Raw replies of one analysis, in request order (thread-safe)"""
+
+    def __init__(self, model: str, **context):
+        """
+        Args:
+            model: Model name the requests go to
+            **context: Fields stored with every entry (e.g. language)
+        """
+        self.model = model
+        self.context = context
+        self.run = datetime.now().isoformat()
+        self.entries: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, prompt: str, generation_config: Dict, response, **fields):
+        """Record one reply (fields: part, attempt, creative_id, ...)"""
+        usage = getattr(response, 'usage_metadata', None)
+        entry = {
+            'run': self.run,
+            'kind': kind,
+            **self.context,
+            **fields,
+            'prompt_hash': prompt_hash(prompt),
+            'model': self.model,
+            'generation_config': dict(generation_config),
+            'input_tokens': getattr(usage, 'prompt_token_count', None),
+            'output_tokens': getattr(usage, 'candidates_token_count', None),
+            'text': response.text
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+
+def append_archive(ad_dir: Path, entries: List[Dict]) -> int:
+    """Append entries to an ad's archive (one gzip member per call); returns the count"""
+    if not entries:
+        return 0
+    ad_dir = Path(ad_dir)
+    ad_dir.mkdir(parents=True, exist_ok=True)
+    with gzip.open(ad_dir / ARCHIVE_FILE, 'at', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    return len(entries)
+
+
+def load_archive(ad_dir: Path) -> List[Dict]:
+    """Every archived entry of an ad, oldest first ([] without an archive)"""
+    path = Path(ad_dir) / ARCHIVE_FILE
+    if not path.exists():
+        return []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def latest_run(entries: List[Dict]) -> List[Dict]:
+    """The entries of the most recent analysis"""
+    if not entries:
+        return []
+    run = entries[-1]['run']
+    return [entry for entry in entries if entry['run'] == run]
+
+
+def _with_repair(text: str, repairs: List[Dict], spec: Dict) -> Optional[Dict]:
+    """
+    A reply that did not parse as a whole, as repair_truncated accepted it:
+    its salvaged prefix if that is already complete (no continuation was
+    sent), else completed by its archived continuation reply. None if
+    still incomplete.
+    """
+    from response_repair import merge_partial, missing_paths, salvage_json
+
+    partial = salvage_json(text)
+    if partial is None:
+        return None
+    missing = missing_paths(partial, spec)
+    if not missing:
+        return partial
+    if not repairs:
+        return None
+    result = merge_partial(partial, salvage_json(repairs[-1]['text']) or {}, missing)
+    return None if missing_paths(result, spec) else result
+
+
+def parse_entries(entries: List[Dict], framework: Optional[Dict] = None) -> Dict:
+    """
+    Rebuild an analysis result from the raw replies of one run.
+
+    Follows the live pipeline: a single video reply (completed by its
+    continuation reply, else parse_video_response's salvage), split parts
+    merged with merge_split_parts, a single image reply, or this
+    creative's entry of a packed reply.
+
+    Args:
+        entries: latest_run(load_archive(ad_dir))
+        framework: Scoring framework (default: framework.FRAMEWORK)
+
+    Raises:
+        ResponseParseError: An image reply holds no (complete) result
+        ValueError: No replies to parse
+    """
+    from image_analysis import ResponseParseError, packed_results, parse_json_response
+    from prompt_compiler import image_spec, video_spec
+    from video_processor import merge_split_parts, parse_video_response
+
+    if framework is None:
+        from framework import FRAMEWORK as framework
+
+    kinds = {entry['kind'] for entry in entries}
+    repairs = [entry for entry in entries if entry['kind'] == REPAIR]
+    language = entries[0].get('language', 'en') if entries else 'en'
+
+    if VIDEO_PART in kinds:
+        replies = {}
+        for entry in entries:
+            if entry['kind'] != VIDEO_PART or replies.get(entry['part']) is not None:
+                continue
+            try:
+                replies[entry['part']] = parse_json_response(entry['text'])
+            except ValueError:
+                replies[entry['part']] = None
+        return merge_split_parts(replies, framework, language)
+
+    if VIDEO in kinds:
+        text = next(entry['text'] for entry in entries if entry['kind'] == VIDEO)
+        try:
+            return parse_json_response(text)
+        except ValueError:
+            pass
+        return (_with_repair(text, repairs, video_spec(language, False, framework))
+                or parse_video_response(text))
+
+    if IMAGE in kinds:
+        text = [entry['text'] for entry in entries if entry['kind'] == IMAGE][-1]
+        try:
+            return parse_json_response(text)
+        except ResponseParseError as e:
+            result = _with_repair(text, repairs, image_spec(False, language))
+            if result is None:
+                raise
+            return result
+
+    if IMAGE_PACK in kinds:
+        entry = next(entry for entry in entries if entry['kind'] == IMAGE_PACK)
+        result = packed_results(parse_json_response(entry['text'])).get(entry['creative_id'])
+        if result is None:
+            raise ResponseParseError(f"No valid result for {entry['creative_id']}", entry['text'])
+        return result
+
+    raise ValueError("No archived replies")
+
+
+def rebuild_ad(ad_dir: str) -> Dict:
+    """
+    Re-parse one ad's latest archived run (module-level, for process pools).
+
+    Returns:
+        {'ad_id', 'kind', 'replies', 'result'} or {'ad_id', 'error'}
+    """
+    entries = latest_run(load_archive(Path(ad_dir)))
+    try:
+        result = parse_entries(entries)
+    except Exception as e:
+        return {'ad_id': Path(ad_dir).name, 'error': f"{type(e).__name__}: {e}"}
+    return {'ad_id': Path(ad_dir).name, 'kind': entries[0]['kind'], 'replies': len(entries), 'result': result}
@@ -0,0 +1,167 @@
+"""
+Continuation repair for truncated model replies.
+
+A reply cut off at max_output_tokens used to cost a full re-run (or, for
+videos, scores of zero from VideoAnalyzer._parse_response's placeholder).
+repair_truncated keeps the longest valid JSON prefix of the reply, works
+out which schema fields are missing from it (from the prompt_compiler
+spec the request used) and asks the model for those fields only, reusing
+the uploaded video or image. The repair span records what that saved
+compared with re-running the whole request.
+"""
+
+import json
+from typing import Callable, Dict, List, Optional
+
+from pipeline_metrics import REPAIR, record_usage
+
+
+def salvage_json(text: str) -> Optional[Dict]:
+    """
+    The longest prefix of a (possibly cut-off) JSON reply that parses.
+
+    Open strings are dropped and open objects/arrays closed, so every value
+    kept is one the model finished writing (a list may hold fewer items).
+
+    Returns:
+        The parsed object, or None if not even the opening object survived
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    text = text[start:]
+
+    # Cut points: (end of text to keep, closers for the containers still open)
+    cuts = []
+    stack = []
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+            cuts.append((index + 1, ''.join(reversed(stack))))
+        elif char in '}]':
+            if not stack:
+                break
+            stack.pop()
+            cuts.append((index + 1, ''.join(reversed(stack))))
+            if not stack:
+                break
+        elif char == ',' and stack:
+            cuts.append((index, ''.join(reversed(stack))))
+
+    for end, closers in reversed(cuts):
+        try:
+            value = json.loads(text[:end] + closers)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == '' or value == [] or value == {}
+
+
+def missing_paths(result: Dict, spec: Dict) -> List[List[str]]:
+    """
+    Fields of spec that result lacks, as key paths at most two levels deep.
+
+    A second-level entry that is an object (e.g. one dimension) counts as
+    missing unless it has every key the spec gives it.
+    """
+    missing = []
+    for key, value in spec.items():
+        if isinstance(value, dict) and value:
+            present = result.get(key) if isinstance(result.get(key), dict) else {}
+            for sub_key, sub_value in value.items():
+                found = present.get(sub_key)
+                if _is_empty(found) or (isinstance(sub_value, dict) and (
+                        not isinstance(found, dict) or any(_is_empty(found.get(k)) for k in sub_value))):
+                    missing.append([key, sub_key])
+        elif _is_empty(result.get(key)):
+            missing.append([key])
+    return missing
+
+
+def subset_spec(spec: Dict, paths: List[List[str]]) -> Dict:
+    """The part of spec covering paths (in spec order)"""
+    subset = {}
+    for key, value in spec.items():
+        subs = [path[1] for path in paths if path[0] == key and len(path) > 1]
+        if [key] in paths:
+            subset[key] = value
+        elif subs:
+            subset[key] = {sub_key: sub_value for sub_key, sub_value in value.items() if sub_key in subs}
+    return subset
+
+
+def merge_partial(partial: Dict, addition: Dict, paths: List[List[str]]) -> Dict:
+    """partial with the given paths taken from addition (where addition has them)"""
+    merged = {key: dict(value) if isinstance(value, dict) else value for key, value in partial.items()}
+    for path in paths:
+        section = addition.get(path[0])
+        if len(path) == 1:
+            if path[0] in addition:
+                merged[path[0]] = section
+        elif isinstance(section, dict) and path[1] in section:
+            if not isinstance(merged.get(path[0]), dict):
+                merged[path[0]] = {}
+            merged[path[0]][path[1]] = section[path[1]]
+    return merged
+
+
+def repair_truncated(response, prompt: str, spec: Dict, send: Callable[[str], object],
+                     recorder, original: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Complete a reply that did not parse with a continuation request.
+
+    Args:
+        response: The generate_content response (its text failed to parse)
+        prompt: The prompt it answered (prompt_compiler output)
+        spec: The output spec of that prompt (prompt_compiler.*_spec)
+        send: Sends a continuation prompt with the same video/image and
+            returns the response
+        recorder: pipeline_metrics.StageRecorder for the repair span
+        original: The original request's generate span (for the savings)
+
+    Returns:
+        The complete result, or None if the reply held no usable prefix,
+        the continuation request failed or fields are still missing
+    """
+    from prompt_compiler import continuation_prompt
+
+    partial = salvage_json(response.text)
+    if partial is None:
+        return None
+    missing = missing_paths(partial, spec)
+    if not missing:
+        return partial
+
+    try:
+        with recorder.span(REPAIR, missing=len(missing)) as span:
+            reply = send(continuation_prompt(prompt, subset_spec(spec, missing), partial))
+            record_usage(span, reply)
+            addition = salvage_json(reply.text) or {}
+    except Exception:
+        return None
+
+    result = merge_partial(partial, addition, missing)
+    span['completed'] = not missing_paths(result, spec)
+    if original:
+        # A re-run would have cost the original request again
+        span['saved_seconds'] = round(original.get('seconds', 0) - span['seconds'], 4)
+        span['saved_tokens'] = ((original.get('input_tokens') or 0) + (original.get('output_tokens') or 0)
+                                - (span.get('input_tokens') or 0) - (span.get('output_tokens') or 0))
+    return result if span['completed'] else None
@@ -7,12 +7,17 @@ echo "Started at: $(date)"
 echo "============================================"
 echo ""
 
-# Keep Mac awake
-echo "Preventing sleep..."
-caffeinate -d -i -s &
-CAFFEINATE_PID=$!
-echo "Caffeinate running (PID: $CAFFEINATE_PID)"
-echo ""
+# Keep Mac awake (caffeinate is macOS only)
+if command -v caffeinate >/dev/null 2>&1; then
+    echo "Preventing sleep..."
+    caffeinate -d -i -s &
+    CAFFEINATE_PID=$!
+    echo "Caffeinate running (PID: $CAFFEINATE_PID)"
+    echo ""
+fi
+
+# Live progress: curl -s localhost:$METRICS_PORT/status (or ./check_progress.sh)
+METRICS_PORT=${RAI_METRICS_PORT:-9464}
 
 # Redirect all output to log file
 LOG_FILE="overnight_run_$(date +%Y%m%d_%H%M%S).log"
@@ -36,9 +41,9 @@ run_batch() {
     echo ""
 
     if [ -z "$count" ]; then
-        python3 simple_pipeline.py batch "$catalog" --start $start
+        python3 simple_pipeline.py batch "$catalog" --start $start --metrics-port $METRICS_PORT
     else
-        python3 simple_pipeline.py batch "$catalog" --start $start --count $count
+        python3 simple_pipeline.py batch "$catalog" --start $start --count $count --metrics-port $METRICS_PORT
     fi
 
     local exit_code=$?
@@ -120,5 +125,7 @@ echo "📁 Log file: $LOG_FILE"
 echo ""
 
 # Kill caffeinate
-kill $CAFFEINATE_PID 2>/dev/null
-echo "Sleep mode restored"
+if [ -n "$CAFFEINATE_PID" ]; then
+    kill $CAFFEINATE_PID 2>/dev/null
+    echo "Sleep mode restored"
+fi
@@ -8,13 +8,16 @@ Usage:
   python3 simple_pipeline.py analyze_batch catalog.csv
 """
 
+import time
+_IMPORTS_STARTED = time.perf_counter()
+
 import os
 import sys
 import json
 import hashlib
+import threading
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
 
 # Load environment
 env_path = Path(__file__).parent / '.env'
@@ -26,57 +29,130 @@ if env_path.exists():
                 key, value = line.split('=', 1)
                 os.environ[key.strip()] = value.strip()
 
-from video_processor import VideoAnalyzer
-from ad_scrapers import download_ad_video
+# Only light modules here: pandas, the Gemini SDK (via video_processor) and
+# the scrapers are imported by the subcommands that use them
+from config import image_config, video_config
+from pipeline_metrics import StageRecorder, persist_timings, DOWNLOAD, STREAM_UPLOAD
+from response_archive import append_archive
+from profiling import profiled
 
-# Simple storage structure
+# Simple storage structure (created on first write)
 STORAGE_DIR = Path('analysis_storage')
-STORAGE_DIR.mkdir(exist_ok=True)
+
+_IMPORTS_DONE = time.perf_counter()
 
 def generate_id(url: str) -> str:
     """Generate unique ID from URL"""
     return hashlib.md5(url.encode()).hexdigest()[:12]
 
-def download_with_metadata(url: str, brand: str = "Unknown", campaign: str = "") -> dict:
+_asset_index = None
+
+def get_asset_index():
+    """Index of local video copies (built once per run, see asset_resolver.py)"""
+    global _asset_index
+    if _asset_index is None:
+        from asset_resolver import LocalAssetIndex
+        _asset_index = LocalAssetIndex()
+    return _asset_index
+
+def download_with_metadata(url: str, brand: str = "Unknown", campaign: str = "",
+                           reuse_local: bool = True) -> dict:
     """
     Download video and immediately create metadata file
+    Existing local copies (catalog downloads, submissions, other storage
+    entries) are hard-linked instead of downloaded unless reuse_local=False
     Returns: {'id', 'video_path', 'metadata_path', 'url', 'brand', 'campaign'}
     """
+    from ad_scrapers import download_ad_video
+    from asset_resolver import file_sha256, link_or_copy, is_usable_video
+
     print(f"\n📥 Downloading: {url}")
 
     # Generate unique ID
     ad_id = generate_id(url)
+    recorder = StageRecorder()
 
     # Create storage directory for this ad
     ad_dir = STORAGE_DIR / ad_id
-    ad_dir.mkdir(exist_ok=True)
+    ad_dir.mkdir(parents=True, exist_ok=True)
 
     # Download video
     video_path = ad_dir / "video.mp4"
+    metadata_path = ad_dir / "metadata.json"
 
     print(f"  ID: {ad_id}")
-    print(f"  Downloading to: {video_path}")
 
-    success = download_ad_video(url, str(video_path))
+    source = 'download'
+    local_copy = None
+    if reuse_local:
+        if is_usable_video(video_path):
+            source = 'storage'
+        else:
+            local_copy = get_asset_index().resolve(url, exclude=video_path)
+
+    if source == 'storage':
+        print("  ♻️ Already in storage, skipping download")
+    elif local_copy:
+        mode = link_or_copy(local_copy, video_path)
+        source = f"local:{local_copy}"
+        print(f"  ♻️ Reusing local copy ({mode}): {local_copy}")
+    else:
+        print(f"  Downloading to: {video_path}")
+
+        # Download under a temporary name so an interrupted or failed
+        # download never leaves a truncated video.mp4 that looks reusable
+        partial_path = ad_dir / "video.download.mp4"
+        with recorder.span(DOWNLOAD) as span:
+            success = download_ad_video(url, str(partial_path))
+            span['bytes'] = partial_path.stat().st_size if partial_path.exists() else 0
+
+        if not success or not partial_path.exists() or partial_path.stat().st_size == 0:
+            print("  ❌ Download failed")
+            if partial_path.exists():
+                partial_path.unlink()
+            return None
+
+        os.replace(partial_path, video_path)
 
-    if not success or not video_path.exists():
-        print("  ❌ Download failed")
-        return None
+    content_sha256 = file_sha256(video_path)
+
+    # Same bytes already stored under another id: share one copy on disk
+    if source == 'download':
+        duplicate = get_asset_index().find_by_hash(content_sha256, exclude=video_path)
+        if duplicate:
+            link_or_copy(duplicate, video_path)
+            print(f"  ♻️ Identical to {duplicate}, linked")
+
+    get_asset_index().register(url, video_path, content_sha256)
+
+    # Reused video: keep what earlier runs stored about the same bytes
+    # (probe-all video_metadata, timings, analysis)
+    metadata = {}
+    if source != 'download' and metadata_path.exists():
+        try:
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            metadata = {}
+        if metadata.get('content_sha256') not in (None, content_sha256):
+            metadata = {}
 
     # Create metadata immediately
-    metadata = {
+    metadata.update({
         'id': ad_id,
         'url': url,
         'brand': brand,
         'campaign': campaign,
-        'downloaded_at': datetime.now().isoformat(),
+        'downloaded_at': metadata.get('downloaded_at', datetime.now().isoformat()),
         'video_file': str(video_path),
-        'status': 'downloaded'
-    }
+        'content_sha256': content_sha256,
+        'source': source,
+        'status': 'analyzed' if 'analysis' in metadata else 'downloaded'
+    })
+    persist_timings(metadata, recorder, STORAGE_DIR)
 
-    metadata_path = ad_dir / "metadata.json"
     with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
 
     print(f"  ✅ Downloaded and saved metadata")
 
@@ -94,6 +170,9 @@ def analyze_ad(ad_id: str = None, video_path: Path = None) -> dict:
     Analyze a downloaded ad (by ID or direct path)
     Updates metadata file with results
     """
+    from analysis_version import video_version
+    from video_processor import VideoAnalyzer
+
     api_key = os.getenv('GOOGLE_API_KEY')
     if not api_key:
         print("❌ GOOGLE_API_KEY not found in .env")
@@ -118,72 +197,194 @@ def analyze_ad(ad_id: str = None, video_path: Path = None) -> dict:
 
     print(f"\n🤖 Analyzing: {video_path.name}")
 
-    # Read video
-    with open(video_path, 'rb') as f:
-        video_bytes = f.read()
-
-    # Analyze
+    # Analyze (uploads straight from disk, or the proxy when enabled)
     analyzer = VideoAnalyzer(api_key=api_key)
 
     # Simple ad copy (no assumptions about language)
     ad_copy = f"Brand: {metadata.get('brand', 'Unknown')}\nCampaign: {metadata.get('campaign', '')}"
 
     # Let AI detect language automatically
-    result = analyzer.analyze_video(
-        video_bytes=video_bytes,
-        ad_copy=ad_copy,
-        detected_language='auto'  # Will be overridden by actual detection
-    )
+    result = None
+    try:
+        result = analyzer.analyze_video_file(
+            video_path,
+            ad_copy=ad_copy,
+            detected_language='auto'  # Will be overridden by actual detection
+        )
+    finally:
+        if ad_id:
+            # Raw replies, so a parser fix can rebuild this result without the model (reparse)
+            append_archive(ad_dir, analyzer.responses.entries)
+        # Keep the spans of failed analyses too (they carry the error)
+        if ad_id and (not result or 'dimensions' not in result):
+            persist_timings(metadata, analyzer.recorder, STORAGE_DIR)
+            with open(metadata_path, 'w') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
 
     if not result or 'dimensions' not in result:
         print("  ❌ Analysis failed")
         return None
 
-    # Extract scores
+    analysis_result = build_analysis_result(result)
+    if 'split_failed' not in analysis_result:
+        # Unstamped, so `reanalyze --stale` re-runs an analysis with failed parts
+        analysis_result['version'] = video_version()
+
+    # Update metadata with analysis
+    if ad_id:
+        metadata.update({
+            'status': 'analyzed',
+            'analysis': analysis_result
+        })
+        persist_timings(metadata, analyzer.recorder, STORAGE_DIR)
+
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    print_scores(analysis_result)
+
+    return analysis_result
+
+def build_analysis_result(result: dict) -> dict:
+    """Flatten a VideoAnalyzer result into the stored analysis record"""
     dimensions = result.get('dimensions', {})
-    climate_score = dimensions.get('Climate Responsibility', {}).get('score', 0)
-    social_score = dimensions.get('Social Responsibility', {}).get('score', 0)
-    cultural_score = dimensions.get('Cultural Sensitivity', {}).get('score', 0)
-    ethical_score = dimensions.get('Ethical Communication', {}).get('score', 0)
 
-    analysis_result = {
+    return {
         'analyzed_at': datetime.now().isoformat(),
         'detected_language': result.get('detected_language', 'unknown'),
         'overall_score': result.get('overall_score', 0),
-        'climate_score': climate_score,
-        'social_score': social_score,
-        'cultural_score': cultural_score,
-        'ethical_score': ethical_score,
+        'climate_score': dimensions.get('Climate Responsibility', {}).get('score', 0),
+        'social_score': dimensions.get('Social Responsibility', {}).get('score', 0),
+        'cultural_score': dimensions.get('Cultural Sensitivity', {}).get('score', 0),
+        'ethical_score': dimensions.get('Ethical Communication', {}).get('score', 0),
         'summary': result.get('summary', {}),
         'dimensions': dimensions,
         'transcript': result.get('transcript', ''),
-        'duration': result.get('duration_analyzed', '')
+        'duration': result.get('duration_analyzed', ''),
+        **({'split_failed': result['split_failed']} if result.get('split_failed') else {})
     }
 
-    # Update metadata with analysis
-    if ad_id:
-        metadata.update({
-            'status': 'analyzed',
-            'analysis': analysis_result
-        })
+def print_scores(analysis_result: dict):
+    """Print the one-line score summary for an analyzed ad"""
+    print(f"  ✅ Overall: {analysis_result['overall_score']}/100")
+    print(f"     Language: {analysis_result['detected_language']}")
+    print(f"     Climate: {analysis_result['climate_score']}, Social: {analysis_result['social_score']}, "
+          f"Cultural: {analysis_result['cultural_score']}, Ethical: {analysis_result['ethical_score']}")
+    if analysis_result.get('split_failed'):
+        print(f"  ⚠️ Failed parts: {', '.join(analysis_result['split_failed'])} "
+              f"(`reanalyze --stale` re-runs this ad)")
+
+def stream_and_analyze(url: str, brand: str = "Unknown", campaign: str = "") -> dict:
+    """
+    Analyze an ad without keeping a local copy.
+
+    The video is piped from its source straight into a Gemini upload
+    (see streaming_upload.py); only metadata.json is written to storage.
+    """
+    from analysis_version import video_version
+    from streaming_upload import stream_to_gemini, StreamingUploadError
+    from video_processor import VideoAnalyzer
+
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        print("❌ GOOGLE_API_KEY not found in .env")
+        return None
+
+    print(f"\n📡 Streaming: {url}")
+
+    ad_id = generate_id(url)
+    ad_dir = STORAGE_DIR / ad_id
+    ad_dir.mkdir(parents=True, exist_ok=True)
+    print(f"  ID: {ad_id}")
+
+    recorder = StageRecorder()
+    try:
+        with recorder.span(STREAM_UPLOAD) as span:
+            uploaded = stream_to_gemini(url, api_key, display_name=f"{brand} {ad_id}")
+            span['bytes'] = uploaded['size_bytes']
+    except StreamingUploadError as e:
+        print(f"  ❌ Streaming upload failed: {e}")
+        return None
 
+    print(f"  ✅ Uploaded {uploaded['size_bytes'] / (1024 * 1024):.1f} MB (sha256 {uploaded['content_sha256'][:12]})")
+
+    metadata = {
+        'id': ad_id,
+        'url': url,
+        'brand': brand,
+        'campaign': campaign,
+        'downloaded_at': datetime.now().isoformat(),
+        'video_file': None,
+        'content_sha256': uploaded['content_sha256'],
+        'size_bytes': uploaded['size_bytes'],
+        'status': 'streamed'
+    }
+    persist_timings(metadata, recorder, STORAGE_DIR)
+
+    metadata_path = ad_dir / "metadata.json"
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"\n🤖 Analyzing streamed upload: {uploaded['file_name']}")
+
+    analyzer = VideoAnalyzer(api_key=api_key)
+    ad_copy = f"Brand: {brand}\nCampaign: {campaign}"
+
+    result = None
+    try:
+        result = analyzer.analyze_uploaded_file(
+            uploaded['file_name'],
+            ad_copy=ad_copy,
+            detected_language='auto'
+        )
+    except Exception as e:
+        # Processing failures and API errors fail this ad, not the batch
+        print(f"  ❌ {type(e).__name__}: {e}")
+    append_archive(ad_dir, analyzer.responses.entries)
+
+    if not result or 'dimensions' not in result:
+        print("  ❌ Analysis failed")
+        # Keep the spans of failed analyses too (they carry the error)
+        metadata['status'] = 'analysis_failed'
+        persist_timings(metadata, analyzer.recorder, STORAGE_DIR)
         with open(metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
+        return None
 
-    print(f"  ✅ Overall: {analysis_result['overall_score']}/100")
-    print(f"     Language: {analysis_result['detected_language']}")
-    print(f"     Climate: {climate_score}, Social: {social_score}, Cultural: {cultural_score}, Ethical: {ethical_score}")
+    analysis_result = build_analysis_result(result)
+    if 'split_failed' not in analysis_result:
+        analysis_result['version'] = video_version()
 
-    return analysis_result
+    metadata.update({
+        'status': 'analyzed',
+        'analysis': analysis_result
+    })
+    persist_timings(metadata, analyzer.recorder, STORAGE_DIR)
+
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    print_scores(analysis_result)
 
-def analyze_single_url(url: str, brand: str, campaign: str):
+    return {'id': ad_id, **analysis_result}
+
+def analyze_single_url(url: str, brand: str, campaign: str, stream: bool = False,
+                       reuse_local: bool = True):
     """Download and analyze a single URL"""
     print("="*80)
     print("SIMPLE AD PIPELINE - Single URL")
     print("="*80)
 
+    if stream:
+        result = stream_and_analyze(url, brand, campaign)
+        if result:
+            print("\n" + "="*80)
+            print(f"✅ Complete! Results stored in: {STORAGE_DIR / result['id']}")
+            print("="*80)
+        return
+
     # Download
-    download_result = download_with_metadata(url, brand, campaign)
+    download_result = download_with_metadata(url, brand, campaign, reuse_local=reuse_local)
     if not download_result:
         return
 
@@ -194,8 +395,47 @@ def analyze_single_url(url: str, brand: str, campaign: str):
     print(f"✅ Complete! Results stored in: {STORAGE_DIR / download_result['id']}")
     print("="*80)
 
-def analyze_from_catalog(catalog_path: str, start_index: int = 0, max_count: int = None):
-    """Download and analyze from a CSV catalog"""
+# Pause between analyzed ads in a batch (rate limiting)
+BATCH_DELAY_SECONDS = 2
+
+def process_catalog_ad(url: str, brand: str, campaign: str, stream: bool = False,
+                       reuse_local: bool = True) -> dict:
+    """Download (or stream) and analyze one catalog ad, returning its batch summary entry"""
+    if stream:
+        analysis = stream_and_analyze(url, brand, campaign)
+        if not analysis:
+            return {'id': generate_id(url), 'status': 'stream_failed', 'url': url}
+        return {'status': 'success', 'url': url, 'brand': brand, **analysis}
+
+    # Download
+    download_result = download_with_metadata(url, brand, campaign, reuse_local=reuse_local)
+    if not download_result:
+        return {'id': None, 'status': 'download_failed', 'url': url}
+
+    # Analyze
+    analysis = analyze_ad(ad_id=download_result['id'])
+    if not analysis:
+        return {'id': download_result['id'], 'status': 'analysis_failed', 'url': url}
+
+    return {
+        'id': download_result['id'],
+        'status': 'success',
+        'url': url,
+        'brand': brand,
+        **analysis
+    }
+
+def analyze_from_catalog(catalog_path: str, start_index: int = 0, max_count: int = None,
+                         stream: bool = False, reuse_local: bool = True,
+                         metrics_port: int = None):
+    """
+    Download and analyze from a CSV catalog
+    With metrics_port, live progress is served on localhost:<port>/metrics
+    (Prometheus) and /status (JSON), see batch_status.py
+    """
+    import pandas as pd
+    from batch_status import BatchStatus, start_status_server
+
     print("="*80)
     print("SIMPLE AD PIPELINE - Batch from Catalog")
     print("="*80)
@@ -213,64 +453,411 @@ def analyze_from_catalog(catalog_path: str, start_index: int = 0, max_count: int
 
     print(f"\n📊 Processing {len(df)} ads (starting from index {start_index})")
 
+    status = BatchStatus(total=len(df), name=Path(catalog_path).name,
+                         delay_seconds=BATCH_DELAY_SECONDS)
+    server = None
+    if metrics_port:
+        try:
+            server = start_status_server(status, port=metrics_port)
+            print(f"📈 Live metrics: http://127.0.0.1:{metrics_port}/metrics  (status: /status)")
+        except OSError as e:
+            # Monitoring must never stop the batch (e.g. port still held by a previous run)
+            print(f"⚠️ Metrics server not started on port {metrics_port}: {e}")
+
     results = []
 
-    for idx, row in df.iterrows():
-        print(f"\n[{idx+1}/{len(df)}] Processing...")
+    try:
+        for idx, row in df.iterrows():
+            eta = status.snapshot()['eta_seconds']
+            eta_note = f" (ETA {eta // 60}m)" if eta is not None else ""
+            print(f"\n[{idx+1}/{len(df)}] Processing...{eta_note}")
+
+            url = row['url']
+            status.ad_started(url)
+
+            # Try to extract brand/campaign from title
+            title = row.get('title', '')
+            if '//' in title:
+                parts = title.split('//')
+                brand = parts[0].strip()
+                campaign = parts[1].strip() if len(parts) > 1 else ''
+            else:
+                brand = title.split()[0] if title else "Unknown"
+                campaign = title
+
+            # One bad ad (429, API error, corrupt video) must not end the batch
+            error = None
+            try:
+                result = process_catalog_ad(url, brand, campaign, stream=stream, reuse_local=reuse_local)
+            except Exception as e:
+                print(f"  ❌ Error: {type(e).__name__}: {e}")
+                error = e
+                result = {'id': generate_id(url), 'status': 'error', 'url': url,
+                          'error': f"{type(e).__name__}: {e}"}
+
+            results.append(result)
+            status.ad_finished(result['status'], error=error)
+
+            if result['status'] == 'success':
+                # Small delay
+                time.sleep(BATCH_DELAY_SECONDS)
+    finally:
+        status.close()
+        if server:
+            server.shutdown()
+            server.server_close()
 
-        url = row['url']
+    # Save summary
+    STORAGE_DIR.mkdir(exist_ok=True)
+    summary_path = STORAGE_DIR / f"batch_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(summary_path, 'w') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
 
-        # Try to extract brand/campaign from title
-        title = row.get('title', '')
-        if '//' in title:
-            parts = title.split('//')
-            brand = parts[0].strip()
-            campaign = parts[1].strip() if len(parts) > 1 else ''
-        else:
-            brand = title.split()[0] if title else "Unknown"
-            campaign = title
+    print("\n" + "="*80)
+    print(f"✅ Batch complete! Summary: {summary_path}")
+    print(f"   Successful: {sum(1 for r in results if r['status'] == 'success')}/{len(results)}")
+    print("="*80)
 
-        # Download
-        download_result = download_with_metadata(url, brand, campaign)
-        if not download_result:
-            results.append({'id': None, 'status': 'download_failed', 'url': url})
-            continue
+# Image ads: files picked up from a directory, default request rate and retries on 429
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
+IMAGE_REQUESTS_PER_MINUTE = 30
+IMAGE_MAX_RETRIES = 3
 
-        # Analyze
-        analysis = analyze_ad(ad_id=download_result['id'])
-        if not analysis:
-            results.append({'id': download_result['id'], 'status': 'analysis_failed', 'url': url})
+# Serializes metadata.json / metrics.jsonl writes from concurrent image workers
+_store_lock = threading.Lock()
+
+def load_image_jobs(source: str, brand: str = None) -> list:
+    """
+    Image ads to analyze, from a directory or a CSV
+    Directory: every image file; ad copy from a .txt file with the same name
+    (empty if there is none), campaign from the file name, brand from
+    --brand or the directory name
+    CSV: columns image (path, relative to the CSV), ad_copy, brand, campaign
+    """
+    import csv
+
+    source_path = Path(source)
+    jobs = []
+
+    if source_path.is_dir():
+        for path in sorted(source_path.rglob('*')):
+            if path.suffix.lower() not in IMAGE_EXTENSIONS or not path.is_file():
+                continue
+            copy_path = path.with_suffix('.txt')
+            jobs.append({
+                'image': path,
+                'ad_copy': copy_path.read_text(encoding='utf-8').strip() if copy_path.exists() else '',
+                'brand': brand or path.parent.name,
+                'campaign': path.stem
+            })
+        return jobs
+
+    with open(source_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+            if not row.get('image'):
+                continue
+            image_path = Path(row['image'])
+            if not image_path.is_absolute():
+                image_path = source_path.parent / image_path
+            jobs.append({
+                'image': image_path,
+                'ad_copy': row.get('ad_copy', ''),
+                'brand': brand or row.get('brand') or 'Unknown',
+                'campaign': row.get('campaign') or image_path.stem
+            })
+    return jobs
+
+def image_ad_id(content_sha256: str, ad_copy: str) -> str:
+    """Storage id of an image ad (image content plus normalized copy)"""
+    from image_cache import normalize_copy
+
+    return generate_id(f"image:{content_sha256}:{normalize_copy(ad_copy)}")
+
+def _image_job_state(job: dict, force: bool = False) -> dict:
+    """Read an image job's file and work out its storage id (and whether it is already analyzed)"""
+    image_data = Path(job['image']).read_bytes()
+    content_sha256 = hashlib.sha256(image_data).hexdigest()
+    ad_id = image_ad_id(content_sha256, job['ad_copy'])
+    summary = {'id': ad_id, 'image': str(job['image']), 'brand': job['brand']}
+
+    metadata_path = STORAGE_DIR / ad_id / "metadata.json"
+    if not force and metadata_path.exists():
+        with open(metadata_path, 'r') as f:
+            existing = json.load(f)
+        if 'analysis' in existing:
+            summary.update({'status': 'skipped', 'overall_score': existing['analysis']['overall_score']})
+
+    return {'job': job, 'image_data': image_data, 'content_sha256': content_sha256, 'summary': summary}
+
+def store_image_analysis(state: dict, analysis: dict, recorder) -> dict:
+    """
+    Write an analyzed image ad to analysis_storage/<id>/ (metadata.json with
+    type 'image', the downsized image.jpg that was sent to the model and
+    the raw replies in raw_responses.jsonl.gz)
+    Returns its batch summary entry
+    """
+    from analysis_version import image_version
+
+    job = state['job']
+    ad_id = state['summary']['id']
+    ad_dir = STORAGE_DIR / ad_id
+
+    result = analysis['result']
+    analysis_result = build_analysis_result({'detected_language': result.get('ad_language', 'unknown'), **result})
+    analysis_result['cache_hit'] = analysis['cached']
+    analysis_result['version'] = image_version()
+    if analysis.get('pack_size'):
+        analysis_result['pack_size'] = analysis['pack_size']
+
+    metadata = {
+        'id': ad_id,
+        'type': 'image',
+        'brand': job['brand'],
+        'campaign': job['campaign'],
+        'ad_copy': job['ad_copy'],
+        'source_file': str(job['image']),
+        'image_file': str(ad_dir / "image.jpg"),
+        'content_sha256': state['content_sha256'],
+        'size_bytes': len(state['image_data']),
+        'status': 'analyzed',
+        'analysis': analysis_result
+    }
+
+    with _store_lock:
+        ad_dir.mkdir(parents=True, exist_ok=True)
+        (ad_dir / "image.jpg").write_bytes(analysis['prepared'].jpeg)
+        append_archive(ad_dir, analysis.get('responses', []))
+        persist_timings(metadata, recorder, STORAGE_DIR)
+        with open(ad_dir / "metadata.json", 'w') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    return {**state['summary'], 'status': 'cached' if analysis['cached'] else 'success',
+            'overall_score': analysis_result['overall_score']}
+
+def _image_failure(state: dict, recorder, error: Exception) -> dict:
+    # Keep the spans of failed analyses too (they carry the error)
+    with _store_lock:
+        persist_timings({'id': state['summary']['id']}, recorder, STORAGE_DIR)
+    return {**state['summary'], 'status': 'error', 'error': f"{type(error).__name__}: {error}"}
+
+def analyze_image_file(job: dict, backend, bucket, force: bool = False) -> dict:
+    """Analyze one image ad into storage, returning its batch summary entry"""
+    from batch_status import is_rate_limited
+    from image_analysis import analyze_image
+
+    state = _image_job_state(job, force)
+    if state['summary'].get('status') == 'skipped':
+        return state['summary']
+
+    recorder = StageRecorder()
+    for attempt in range(IMAGE_MAX_RETRIES + 1):
+        try:
+            analysis = analyze_image(state['image_data'], job['ad_copy'], backend, recorder=recorder,
+                                     throttle=bucket.acquire)
+            break
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == IMAGE_MAX_RETRIES:
+                return _image_failure(state, recorder, e)
+            # Everyone backs off, not just this worker
+            bucket.penalize(5 * 2 ** attempt)
+
+    return store_image_analysis(state, analysis, recorder)
+
+def analyze_image_group(jobs: list, backend, bucket, force: bool = False) -> list:
+    """
+    Analyze several image ads with packed requests (image_analysis.analyze_packed),
+    returning their batch summary entries
+    """
+    from batch_status import is_rate_limited
+    from image_analysis import analyze_packed
+
+    summaries = [None] * len(jobs)
+    todo = []
+    for index, job in enumerate(jobs):
+        try:
+            state = _image_job_state(job, force)
+        except Exception as e:
+            # Unreadable image: fails on its own, not with its group
+            summaries[index] = {'id': None, 'image': str(job['image']), 'brand': job['brand'],
+                                'status': 'error', 'error': f"{type(e).__name__}: {e}"}
             continue
+        if state['summary'].get('status') == 'skipped':
+            summaries[index] = state['summary']
+        else:
+            todo.append((index, state))
+
+    for attempt in range(IMAGE_MAX_RETRIES + 1):
+        try:
+            analyses = analyze_packed([(state['image_data'], state['job']['ad_copy']) for _, state in todo],
+                                      backend, throttle=bucket.acquire)
+            break
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == IMAGE_MAX_RETRIES:
+                for index, state in todo:
+                    summaries[index] = _image_failure(state, StageRecorder(), e)
+                return summaries
+            # Everyone backs off; creatives finished before the 429 come back from the cache
+            bucket.penalize(5 * 2 ** attempt)
+
+    for (index, state), analysis in zip(todo, analyses):
+        if analysis.get('error'):
+            summaries[index] = _image_failure(state, analysis['recorder'], analysis['error'])
+        else:
+            summaries[index] = store_image_analysis(state, analysis, analysis['recorder'])
+    return summaries
 
-        results.append({
-            'id': download_result['id'],
-            'status': 'success',
-            'url': url,
-            'brand': brand,
-            **analysis
-        })
+def run_image_jobs(jobs: list, workers: int = 4, requests_per_minute: float = IMAGE_REQUESTS_PER_MINUTE,
+                   force: bool = False, pack: bool = False):
+    """
+    Analyze image jobs concurrently into storage, printing one line per ad
+    Requests share one token bucket (requests_per_minute); 429s back off
+    every worker. Already analyzed images are skipped unless force=True.
+    With pack, each worker scores groups of creatives in shared requests
+    (sized from the token budget in config.image_config).
+    Returns (batch summary entries, the token bucket)
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from image_analysis import IMAGE_MODEL
+    from model_backend import get_backend
+    from rate_limiter import TokenBucket
 
-        # Small delay
-        import time
-        time.sleep(2)
+    backend = get_backend(os.getenv('GOOGLE_API_KEY'), IMAGE_MODEL)
+    bucket = TokenBucket(requests_per_minute)
+    results = []
 
-    # Save summary
-    summary_path = STORAGE_DIR / f"batch_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    def run_group(group):
+        if pack:
+            return analyze_image_group(group, backend, bucket, force)
+        return [analyze_image_file(group[0], backend, bucket, force)]
+
+    group_size = image_config.max_pack_size if pack else 1
+    groups = [jobs[i:i + group_size] for i in range(0, len(jobs), group_size)]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_group, group): group for group in groups}
+        for future in as_completed(futures):
+            group = futures[future]
+            try:
+                group_results = future.result()
+            except Exception as e:
+                # Unreadable image, bad metadata: these ads fail, not the batch
+                group_results = [{'id': None, 'image': str(job['image']), 'brand': job['brand'],
+                                  'status': 'error', 'error': f"{type(e).__name__}: {e}"} for job in group]
+
+            for job, result in zip(group, group_results):
+                results.append(result)
+                done = len(results)
+                if result['status'] == 'error':
+                    print(f"  [{done}/{len(jobs)}] ❌ {job['image']}: {result['error']}")
+                else:
+                    note = {'cached': ' (cache)', 'skipped': ' (already analyzed)'}.get(result['status'], '')
+                    print(f"  [{done}/{len(jobs)}] ✅ {job['brand']} / {Path(job['image']).name}: "
+                          f"{result['overall_score']}/100{note}")
+
+    return results, bucket
+
+def analyze_image_batch(source: str, brand: str = None, workers: int = 4,
+                        requests_per_minute: float = IMAGE_REQUESTS_PER_MINUTE, force: bool = False,
+                        pack: bool = False):
+    """
+    Analyze a directory or CSV of static image ads concurrently
+    (see run_image_jobs), writing a batch summary
+    """
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        print("❌ GOOGLE_API_KEY not found in .env")
+        return
+
+    print("="*80)
+    print("SIMPLE AD PIPELINE - Image Batch")
+    print("="*80)
+
+    jobs = load_image_jobs(source, brand)
+    mode = "packed" if pack else "one per request"
+    print(f"\n🖼️ {len(jobs)} images from {source} ({workers} workers, {requests_per_minute:g} requests/min, {mode})")
+
+    start = time.perf_counter()
+    results, bucket = run_image_jobs(jobs, workers, requests_per_minute, force, pack)
+
+    STORAGE_DIR.mkdir(exist_ok=True)
+    summary_path = STORAGE_DIR / f"batch_summary_images_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     with open(summary_path, 'w') as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
 
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
     print("\n" + "="*80)
-    print(f"✅ Batch complete! Summary: {summary_path}")
-    print(f"   Successful: {sum(1 for r in results if r['status'] == 'success')}/{len(results)}")
+    print(f"✅ Image batch complete in {time.perf_counter() - start:.0f}s! Summary: {summary_path}")
+    print(f"   Analyzed: {counts.get('success', 0)}, from cache: {counts.get('cached', 0)}, "
+          f"already analyzed: {counts.get('skipped', 0)}, failed: {counts.get('error', 0)}")
+    print(f"   Waiting on the rate limit: {bucket.waited_seconds:.0f}s (summed over workers)")
     print("="*80)
 
-def export_all_results():
-    """Export all analyzed ads to CSV"""
+def iter_stored_analyses():
+    """
+    Analyzed ads in storage as app.py-style history entries
+    (both the nested 'analysis' metadata and the flat format)
+    """
+    if not STORAGE_DIR.exists():
+        return
+
+    for ad_dir in sorted(STORAGE_DIR.iterdir()):
+        metadata_path = ad_dir / "metadata.json"
+        if not metadata_path.is_file():
+            continue
+
+        try:
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+
+        if 'analysis' in metadata:
+            result = metadata['analysis']
+        elif 'overall_score' in metadata and 'dimensions' in metadata:
+            result = metadata
+        else:
+            continue
+
+        yield {
+            'ad_id': ad_dir.name,
+            'brand': metadata.get('brand', 'Unknown'),
+            'timestamp': result.get('analyzed_at', ''),
+            'ad_copy': metadata.get('campaign', ''),
+            'result': result
+        }
+
+def export_all_results(xlsx: bool = False):
+    """
+    Export all analyzed ads to CSV
+    With xlsx, write a streamed workbook instead (summary, findings and
+    scenes sheets; memory stays flat for any number of ads)
+    """
     print("\n📊 Exporting all results...")
 
+    if xlsx:
+        from excel_export import write_analyses_xlsx
+
+        STORAGE_DIR.mkdir(exist_ok=True)
+        export_path = STORAGE_DIR / f"all_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        rows = write_analyses_xlsx(iter_stored_analyses(), export_path)
+        if not rows['summary']:
+            export_path.unlink()
+            print("  No analyzed ads found")
+            return
+        print(f"  ✅ Exported {rows['summary']} ads ({rows['findings']} findings, "
+              f"{rows['scenes']} scenes) to: {export_path}")
+        return
+
+    import pandas as pd
+
     all_results = []
+    ad_dirs = STORAGE_DIR.iterdir() if STORAGE_DIR.exists() else []
 
-    for ad_dir in STORAGE_DIR.iterdir():
+    for ad_dir in ad_dirs:
         if not ad_dir.is_dir():
             continue
 
@@ -297,6 +884,9 @@ def export_all_results():
             'social_score': analysis.get('social_score'),
             'cultural_score': analysis.get('cultural_score'),
             'ethical_score': analysis.get('ethical_score'),
+            'video_duration': metadata.get('video_metadata', {}).get('duration'),
+            'video_resolution': (f"{metadata['video_metadata']['width']}x{metadata['video_metadata']['height']}"
+                                 if 'video_metadata' in metadata else None),
             'analyzed_at': analysis.get('analyzed_at')
         })
 
@@ -310,6 +900,435 @@ def export_all_results():
 
     print(f"  ✅ Exported {len(all_results)} ads to: {export_path}")
 
+def render_all_reports(brand: str = None, portfolios: bool = False, workers: int = None,
+                       force: bool = False):
+    """
+    Render a PDF report per analyzed ad (and optionally per brand) into
+    analysis_storage/reports/, skipping reports whose inputs are unchanged
+    """
+    from pdf_reports import render_reports
+
+    entries = iter_stored_analyses()
+    if brand:
+        entries = (entry for entry in entries if entry['brand'].lower() == brand.lower())
+
+    print("\n📄 Rendering reports...")
+    summary = render_reports(entries, STORAGE_DIR / "reports", portfolios=portfolios,
+                             workers=workers, force=force)
+
+    print(f"  ✅ Rendered {summary['rendered']}, unchanged {summary['skipped']} "
+          f"in {summary['seconds']:.1f}s -> {STORAGE_DIR / 'reports'}")
+    for name, error in summary['failed']:
+        print(f"  ❌ {name}: {error}")
+
+def translate_stored_analyses(brand: str = None, workers: int = 4):
+    """
+    Add the Hungarian (_hu) lists to stored Hungarian analyses that lack them
+    (analyses are generated in English; the dashboards' Magyar views read these)
+    One cached text-only request per ad, see translation.py
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from config import translation_config
+    from model_backend import get_backend
+    from translation import TranslationCache, needs_translation, translate_result
+
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        print("❌ GOOGLE_API_KEY not found in .env")
+        return
+
+    entries = [entry for entry in iter_stored_analyses()
+               if (not brand or entry['brand'].lower() == brand.lower())
+               and 'hu' in (entry['result'].get('detected_language'), entry['result'].get('ad_language'))
+               and needs_translation(entry['result'])]
+    print(f"\n🇭🇺 Translating {len(entries)} Hungarian analyses ({workers} workers)")
+
+    backend = get_backend(api_key, translation_config.model_name)
+    cache = TranslationCache()
+
+    def translate(entry):
+        metadata_path = STORAGE_DIR / entry['ad_id'] / "metadata.json"
+        try:
+            translated = translate_result(entry['result'], backend, cache)
+        except Exception as e:
+            return entry['ad_id'], e
+
+        with _store_lock:
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+            if 'analysis' in metadata:
+                metadata['analysis'] = translated
+            else:
+                metadata.update(translated)
+            with open(metadata_path, 'w') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
+        return entry['ad_id'], None
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ad_id, error in pool.map(translate, entries):
+            if error:
+                failed += 1
+                print(f"  ❌ {ad_id}: {error}")
+    print(f"  ✅ Translated {len(entries) - failed}, failed {failed}")
+
+def stored_analysis(metadata: dict, result: dict) -> dict:
+    """The metadata 'analysis' record for a (re-)parsed model result"""
+    if metadata.get('type') == 'image':
+        return build_analysis_result({'detected_language': result.get('ad_language', 'unknown'), **result})
+    return build_analysis_result(result)
+
+def reparse_stored_analyses(brand: str = None, workers: int = None):
+    """
+    Rebuild stored analyses from their raw response archives, without the model
+    Each ad's latest archived analysis is re-parsed on a process pool
+    (response_archive.rebuild_ad); metadata.json is rewritten only where
+    the result changed (analyzed_at is kept, reparsed_at added)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from response_archive import ARCHIVE_FILE, rebuild_ad
+    from translation import needs_translation
+
+    jobs = {}
+    archives = sorted(STORAGE_DIR.glob(f"*/{ARCHIVE_FILE}")) if STORAGE_DIR.exists() else []
+    for archive_path in archives:
+        metadata_path = archive_path.parent / "metadata.json"
+        if not metadata_path.exists():
+            continue
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+        if brand and metadata.get('brand', '').lower() != brand.lower():
+            continue
+        jobs[str(archive_path.parent)] = metadata
+
+    print(f"\n♻️ Re-parsing {len(jobs)} archived analyses ({workers or os.cpu_count()} processes, no model calls)")
+    start = time.perf_counter()
+    counts = {'changed': 0, 'unchanged': 0, 'failed': 0}
+    untranslated = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for ad_dir, rebuilt in zip(jobs, pool.map(rebuild_ad, jobs, chunksize=8)):
+            if 'error' in rebuilt:
+                counts['failed'] += 1
+                print(f"  ❌ {rebuilt['ad_id']}: {rebuilt['error']}")
+                continue
+
+            metadata = jobs[ad_dir]
+            previous = {key: value for key, value in metadata.get('analysis', {}).items() if key != 'reparsed_at'}
+            analysis = stored_analysis(metadata, rebuilt['result'])
+            for key in ('analyzed_at', 'cache_hit', 'pack_size', 'version'):
+                if key in previous:
+                    analysis[key] = previous[key]
+            if analysis == previous:
+                counts['unchanged'] += 1
+                continue
+
+            untranslated += needs_translation(analysis) and not needs_translation(previous)
+            counts['changed'] += 1
+            metadata.update({'status': 'analyzed',
+                             'analysis': {**analysis, 'reparsed_at': datetime.now().isoformat()}})
+            with open(Path(ad_dir) / "metadata.json", 'w') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    print(f"  ✅ Changed {counts['changed']}, unchanged {counts['unchanged']}, failed {counts['failed']} "
+          f"in {time.perf_counter() - start:.1f}s")
+    if untranslated:
+        print(f"  ℹ️ {untranslated} rebuilt analyses lost their Hungarian lists; "
+              f"`translate` restores them from the translation cache")
+
+def find_reanalysis_candidates(brand: str = None) -> list:
+    """
+    Stored analyses with the components their version stamp differs in
+    from what the current prompts, framework and model settings produce
+    ('reasons' is empty for up-to-date ads, 'incomplete' for split analyses
+    with failed parts), see analysis_version.py
+    """
+    from analysis_version import INCOMPLETE, image_version, stale_reasons, video_version
+
+    current = {'image': image_version(), 'video': video_version()}
+    candidates = []
+    for ad_dir in sorted(STORAGE_DIR.iterdir()) if STORAGE_DIR.exists() else []:
+        metadata_path = ad_dir / "metadata.json"
+        if not metadata_path.is_file():
+            continue
+        try:
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        if 'analysis' not in metadata or (brand and metadata.get('brand', '').lower() != brand.lower()):
+            continue
+
+        kind = 'image' if metadata.get('type') == 'image' else 'video'
+        if metadata['analysis'].get('split_failed'):
+            reasons = [INCOMPLETE]
+        else:
+            reasons = stale_reasons(metadata['analysis'].get('version'), current[kind])
+        candidates.append({'ad_id': ad_dir.name, 'kind': kind, 'metadata': metadata, 'reasons': reasons})
+    return candidates
+
+def reanalyze_video(metadata: dict) -> dict:
+    """Re-run one stored video ad (local copy, else streamed from its URL)"""
+    video_file = metadata.get('video_file')
+    if video_file and Path(video_file).exists():
+        analysis = analyze_ad(ad_id=metadata['id'])
+    elif metadata.get('url'):
+        analysis = stream_and_analyze(metadata['url'], metadata.get('brand', 'Unknown'), metadata.get('campaign', ''))
+    else:
+        return {'id': metadata['id'], 'status': 'error', 'error': 'no local video or URL'}
+    if not analysis:
+        return {'id': metadata['id'], 'status': 'error', 'error': 'analysis failed'}
+    return {'id': metadata['id'], 'status': 'success', 'overall_score': analysis['overall_score']}
+
+def reanalyze_stored(stale_only: bool = False, brand: str = None, workers: int = 4,
+                     requests_per_minute: float = IMAGE_REQUESTS_PER_MINUTE, dry_run: bool = False):
+    """
+    Re-run stored analyses through the concurrent pipeline
+    With stale_only, only ads whose version stamp differs from the current
+    prompts, framework or model settings (analyses stored before stamping
+    count as stale); images go through run_image_jobs, videos through
+    analyze_ad / stream_and_analyze on a thread pool
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    candidates = find_reanalysis_candidates(brand)
+    selected = [entry for entry in candidates if entry['reasons'] or not stale_only]
+
+    reasons = {}
+    for entry in selected:
+        for reason in entry['reasons']:
+            reasons[reason] = reasons.get(reason, 0) + 1
+    breakdown = ', '.join(f"{reason}: {count}" for reason, count in sorted(reasons.items()))
+    print(f"\n🔁 {len(selected)} of {len(candidates)} stored analyses to re-run"
+          f"{' (stale: ' + breakdown + ')' if breakdown else ''}")
+
+    if dry_run or not selected:
+        for entry in selected:
+            print(f"  {entry['ad_id']} {entry['kind']:5s} {entry['metadata'].get('brand', 'Unknown')}: "
+                  f"{', '.join(entry['reasons']) or 'up to date'}")
+        return
+
+    if not os.getenv('GOOGLE_API_KEY'):
+        print("❌ GOOGLE_API_KEY not found in .env")
+        return
+
+    start = time.perf_counter()
+    results = []
+    jobs = []
+    for entry in selected:
+        metadata = entry['metadata']
+        if entry['kind'] == 'video':
+            continue
+        source = Path(metadata.get('source_file', ''))
+        if not source.is_file():
+            error = f"source image {source} missing"
+        elif image_ad_id(hashlib.sha256(source.read_bytes()).hexdigest(),
+                         metadata.get('ad_copy', '')) != entry['ad_id']:
+            # Re-running would store it under a new id and leave this entry stale
+            error = f"source image {source} changed since it was analyzed"
+        else:
+            error = None
+        if error:
+            results.append({'id': entry['ad_id'], 'status': 'error', 'error': error})
+            print(f"  ❌ {entry['ad_id']}: {error}")
+            continue
+        jobs.append({'image': Path(metadata['source_file']), 'ad_copy': metadata.get('ad_copy', ''),
+                     'brand': metadata.get('brand', 'Unknown'), 'campaign': metadata.get('campaign', '')})
+    if jobs:
+        image_results, _ = run_image_jobs(jobs, workers, requests_per_minute, force=True)
+        results.extend(image_results)
+
+    videos = [entry['metadata'] for entry in selected if entry['kind'] == 'video']
+    if videos:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results.extend(pool.map(reanalyze_video, videos))
+
+    failed = sum(result['status'] == 'error' for result in results)
+    print(f"\n✅ Re-analyzed {len(results) - failed}, failed {failed} in {time.perf_counter() - start:.0f}s")
+
+def probe_all_videos(root: str = None, workers: int = None, force: bool = False):
+    """Probe and validate every downloaded video, caching the results"""
+    from storage_probe import probe_all, print_probe_summary
+
+    root_path = Path(root) if root else STORAGE_DIR
+    if not root_path.exists():
+        print(f"❌ Directory not found: {root_path}")
+        return
+
+    cache = probe_all(root_path, workers=workers, force=force)
+    print_probe_summary(cache)
+
+def show_stats(last: int = None):
+    """
+    Print p50/p95 per pipeline stage from the rolling metrics file
+    last limits the report to the N most recently recorded ads (an ad can
+    have several records: download, analysis, re-analysis)
+    """
+    from pipeline_metrics import METRICS_FILE, load_metrics, print_stage_report
+
+    lines = load_metrics(STORAGE_DIR / METRICS_FILE)
+    if last:
+        recent_ids = []
+        for line in reversed(lines):
+            if line.get('id') not in recent_ids:
+                recent_ids.append(line.get('id'))
+            if len(recent_ids) == last:
+                break
+        lines = [line for line in lines if line.get('id') in recent_ids]
+
+    ads = len({line.get('id') for line in lines})
+    print(f"\n📊 Stage timings ({ads} ads, {len(lines)} records from {STORAGE_DIR / METRICS_FILE})")
+    print_stage_report(lines)
+
+def show_prompt_tokens(use_api: bool = False):
+    """
+    Print input tokens per prompt variant against its budget
+    (use_api counts with the model's count_tokens instead of the local estimate)
+    """
+    from prompt_compiler import token_report
+
+    backend = None
+    if use_api:
+        from model_backend import get_backend
+
+        api_key = os.getenv('GOOGLE_API_KEY')
+        if not api_key:
+            print("❌ GOOGLE_API_KEY not found in .env")
+            return
+        backend = get_backend(api_key, video_config.model_name)
+
+    print(f"\n🧾 Prompt input tokens ({'count_tokens' if use_api else 'estimated'}, empty ad copy)")
+    for row in token_report(backend):
+        status = "✅" if row['tokens'] <= row['budget'] else "❌ over budget"
+        print(f"  {row['variant']:18s} {row['tokens']:6d} / {row['budget']:6d}  {row['chars']:6d} chars  {status}")
+
+def option_value(name: str, default=None):
+    """Value following a --flag in sys.argv"""
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def cmd_url():
+    args = [arg for arg in sys.argv[2:] if not arg.startswith('--')]
+    if not args:
+        print("❌ Usage: python3 simple_pipeline.py url <URL> [brand] [campaign] [--stream]")
+        return
+
+    url = args[0]
+    brand = args[1] if len(args) > 1 else "Unknown"
+    campaign = args[2] if len(args) > 2 else ""
+
+    analyze_single_url(url, brand, campaign, stream='--stream' in sys.argv,
+                       reuse_local='--redownload' not in sys.argv)
+
+def cmd_batch():
+    if len(sys.argv) < 3:
+        print("❌ Usage: python3 simple_pipeline.py batch <catalog.csv> [--start N] [--count N] [--stream]")
+        return
+
+    count = option_value('--count')
+    metrics_port = option_value('--metrics-port')
+
+    analyze_from_catalog(sys.argv[2], int(option_value('--start', 0)), int(count) if count else None,
+                         stream='--stream' in sys.argv, reuse_local='--redownload' not in sys.argv,
+                         metrics_port=int(metrics_port) if metrics_port else None)
+
+def cmd_export():
+    export_all_results(xlsx='--xlsx' in sys.argv)
+
+def cmd_images():
+    args = [arg for arg in sys.argv[2:] if not arg.startswith('--')]
+    options = {name: option_value(name) for name in ('--brand', '--workers', '--rpm')}
+    args = [arg for arg in args if arg not in options.values()]
+    if not args:
+        print("❌ Usage: python3 simple_pipeline.py images <dir|images.csv> [--brand NAME] [--workers N] [--rpm N] [--pack] [--force]")
+        return
+
+    analyze_image_batch(args[0], brand=options['--brand'], workers=int(options['--workers'] or 4),
+                        requests_per_minute=float(options['--rpm'] or IMAGE_REQUESTS_PER_MINUTE),
+                        force='--force' in sys.argv, pack='--pack' in sys.argv)
+
+def cmd_reports():
+    workers = option_value('--workers')
+    render_all_reports(brand=option_value('--brand'), portfolios='--portfolios' in sys.argv,
+                       workers=int(workers) if workers else None, force='--force' in sys.argv)
+
+def cmd_translate():
+    workers = option_value('--workers')
+    translate_stored_analyses(brand=option_value('--brand'), workers=int(workers) if workers else 4)
+
+def cmd_reparse():
+    workers = option_value('--workers')
+    reparse_stored_analyses(brand=option_value('--brand'), workers=int(workers) if workers else None)
+
+def cmd_reanalyze():
+    workers = option_value('--workers')
+    rpm = option_value('--rpm')
+    reanalyze_stored(stale_only='--stale' in sys.argv, brand=option_value('--brand'),
+                     workers=int(workers) if workers else 4,
+                     requests_per_minute=float(rpm) if rpm else IMAGE_REQUESTS_PER_MINUTE,
+                     dry_run='--dry-run' in sys.argv)
+
+def cmd_probe_all():
+    args = [arg for arg in sys.argv[2:] if not arg.startswith('--')]
+    workers = option_value('--workers')
+    if workers:
+        args.remove(workers)
+
+    probe_all_videos(args[0] if args else None, workers=int(workers) if workers else None,
+                     force='--force' in sys.argv)
+
+def cmd_stats():
+    last = option_value('--last')
+    show_stats(int(last) if last else None)
+
+def cmd_prompts():
+    show_prompt_tokens(use_api='--api' in sys.argv)
+
+# Subcommand: (handler, modules it imports on first use)
+COMMANDS = {
+    'url': (cmd_url, ['ad_scrapers', 'asset_resolver', 'streaming_upload', 'video_processor']),
+    'batch': (cmd_batch, ['pandas', 'batch_status', 'ad_scrapers', 'asset_resolver',
+                          'streaming_upload', 'video_processor']),
+    'export': (cmd_export, ['pandas']),
+    'images': (cmd_images, ['image_analysis', 'image_cache', 'PIL.Image', 'model_backend', 'rate_limiter']),
+    'reports': (cmd_reports, ['pdf_reports', 'reportlab.platypus']),
+    'translate': (cmd_translate, ['translation', 'image_analysis', 'model_backend']),
+    'reparse': (cmd_reparse, ['response_archive', 'image_analysis', 'video_processor', 'translation']),
+    'reanalyze': (cmd_reanalyze, ['analysis_version', 'image_analysis', 'image_cache', 'PIL.Image',
+                                  'model_backend', 'rate_limiter', 'video_processor', 'streaming_upload']),
+    'probe-all': (cmd_probe_all, ['storage_probe']),
+    'stats': (cmd_stats, []),
+    'prompts': (cmd_prompts, ['prompt_compiler', 'image_analysis']),
+}
+
+def command_imports(command: str) -> list:
+    """Modules a subcommand will import with the current flags"""
+    if command == 'export' and '--xlsx' in sys.argv:
+        return ['excel_export', 'openpyxl']
+    return COMMANDS[command][1]
+
+def print_import_timing(command: str) -> None:
+    """
+    Import a subcommand's modules up front and print what each one costs
+    (the command then finds them already loaded)
+    """
+    import importlib
+
+    print(f"\n⏱️ Import cost for '{command}'")
+    print(f"  simple_pipeline itself: {(_IMPORTS_DONE - _IMPORTS_STARTED) * 1000:7.1f} ms")
+
+    total = 0.0
+    for module in command_imports(command):
+        loaded_before = len(sys.modules)
+        start = time.perf_counter()
+        importlib.import_module(module)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"  {module:22s} {elapsed * 1000:7.1f} ms  (+{len(sys.modules) - loaded_before} modules)")
+    print(f"  {'total':22s} {total * 1000:7.1f} ms\n")
+
+@profiled('simple_pipeline')
 def main():
     if len(sys.argv) < 2:
         print("""
@@ -326,51 +1345,83 @@ Usage:
   # Analyze from catalog (range)
   python3 simple_pipeline.py batch catalog.csv --start 0 --count 10
 
-  # Export all results to CSV
-  python3 simple_pipeline.py export
+  # Always fetch from the URL (skip reuse of local copies in downloaded_ads/, submissions/, storage)
+  python3 simple_pipeline.py batch catalog.csv --redownload
 
-Storage:
-  All data stored in: analysis_storage/
-    ├── <ad_id>/
-    │   ├── video.mp4
-    │   └── metadata.json (includes analysis)
-        """)
-        return
+  # Upload a low-resolution proxy instead of the original (needs ffmpeg)
+  python3 simple_pipeline.py batch catalog.csv --proxy
 
-    command = sys.argv[1]
+  # Score each video with concurrent smaller requests (transcript, dimension groups, scenes) on one upload
+  python3 simple_pipeline.py batch catalog.csv --split
 
-    if command == "url":
-        if len(sys.argv) < 3:
-            print("❌ Usage: python3 simple_pipeline.py url <URL> [brand] [campaign]")
-            return
+  # Stream straight from source to Gemini (no local video copy)
+  python3 simple_pipeline.py url "https://youtube.com/..." "Brand" --stream
+  python3 simple_pipeline.py batch catalog.csv --stream
 
-        url = sys.argv[2]
-        brand = sys.argv[3] if len(sys.argv) > 3 else "Unknown"
-        campaign = sys.argv[4] if len(sys.argv) > 4 else ""
+  # Analyze static image ads (directory with optional <name>.txt ad copy, or CSV: image,ad_copy,brand,campaign)
+  python3 simple_pipeline.py images banners/ --brand "Brand" --workers 8 --rpm 60
 
-        analyze_single_url(url, brand, campaign)
+  # Same, several creatives per request (framework sent once per request; K from the token budget)
+  python3 simple_pipeline.py images banners/ --pack
 
-    elif command == "batch":
-        if len(sys.argv) < 3:
-            print("❌ Usage: python3 simple_pipeline.py batch <catalog.csv> [--start N] [--count N]")
-            return
+  # Export all results to CSV (or a streamed Excel workbook with findings and scenes sheets)
+  python3 simple_pipeline.py export [--xlsx]
 
-        catalog_path = sys.argv[2]
-        start = 0
-        count = None
+  # PDF report per analyzed ad into analysis_storage/reports/ (unchanged reports are skipped)
+  python3 simple_pipeline.py reports [--brand NAME] [--portfolios] [--workers N] [--force]
 
-        if '--start' in sys.argv:
-            start = int(sys.argv[sys.argv.index('--start') + 1])
-        if '--count' in sys.argv:
-            count = int(sys.argv[sys.argv.index('--count') + 1])
+  # Add Hungarian versions (_hu fields) to stored Hungarian analyses (generated in English)
+  python3 simple_pipeline.py translate [--brand NAME] [--workers N]
 
-        analyze_from_catalog(catalog_path, start, count)
+  # Rebuild stored results from the archived raw replies after a parser/schema change (no model calls)
+  python3 simple_pipeline.py reparse [--brand NAME] [--workers N]
 
-    elif command == "export":
-        export_all_results()
+  # Re-run only the ads scored with an older prompt, framework or model settings (--dry-run: list them)
+  python3 simple_pipeline.py reanalyze --stale [--brand NAME] [--workers N] [--rpm N] [--dry-run]
 
-    else:
+  # Probe/validate every video (writes video_metadata + probe_cache.json)
+  python3 simple_pipeline.py probe-all [analysis_storage|downloaded_ads] [--workers N] [--force]
+
+  # Serve live progress while a batch runs (Prometheus /metrics, JSON /status)
+  python3 simple_pipeline.py batch catalog.csv --metrics-port 9464
+
+  # Per-stage timing report (p50/p95 download, upload, processing wait, generate, parse)
+  python3 simple_pipeline.py stats [--last N]   (N = most recent ads)
+
+  # Input tokens per prompt variant vs. its budget (--api: the model's count_tokens)
+  python3 simple_pipeline.py prompts [--api]
+
+  # Any command: report what its imports cost
+  python3 simple_pipeline.py export --timing
+
+Storage:
+  All data stored in: analysis_storage/
+    ├── <ad_id>/
+    │   ├── video.mp4
+    │   ├── video.proxy.mp4 (only with --proxy)
+    │   ├── metadata.json (includes analysis and stage timings)
+    │   └── raw_responses.jsonl.gz (raw model replies, prompt hash, model settings)
+    └── metrics.jsonl (rolling per-ad stage timings)
+        """)
+        return
+
+    command = sys.argv[1]
+    if command not in COMMANDS:
         print(f"❌ Unknown command: {command}")
+        return
+
+    if '--proxy' in sys.argv:
+        video_config.use_proxy = True
+    if '--split' in sys.argv:
+        video_config.split_requests = True
+
+    if '--timing' in sys.argv:
+        print_import_timing(command)
+        start = time.perf_counter()
+        COMMANDS[command][0]()
+        print(f"\n⏱️ '{command}' ran in {time.perf_counter() - start:.2f}s")
+    else:
+        COMMANDS[command][0]()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,206 @@
+"""
+Bulk metadata probing and validation for downloaded videos.
+
+Walks analysis_storage/ (one <id>/video.mp4 per ad) or a flat directory such
+as downloaded_ads/, probes every video on a process pool and caches the
+results keyed on (path, size, mtime) in <root>/probe_cache.json. For ads in
+analysis_storage/, the result is also written into metadata.json under
+'video_metadata' so later stages (cost estimates, filtering, scheduling)
+can read it without touching the video again.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import video_config
+from video_utils import validate_video
+
+PROBE_CACHE_FILE = 'probe_cache.json'
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.webm'}
+
+# Files next to the originals that are not originals: cached proxies
+# (video_proxy.py) and in-progress downloads (simple_pipeline.py)
+DERIVED_SUFFIXES = ('.proxy.mp4', '.download.mp4')
+
+
+def is_original_video(path: Path) -> bool:
+    """A video file that is neither a proxy nor a partial (.part, in-progress download) file"""
+    if path.suffix.lower() not in VIDEO_EXTENSIONS:
+        return False
+    if '.part' in (suffix.lower() for suffix in path.suffixes):
+        return False
+    return not path.name.lower().endswith(DERIVED_SUFFIXES)
+
+
+def find_videos(root: Path) -> List[Path]:
+    """List original videos under root (proxies and partial files are skipped)"""
+    return sorted(path for path in root.rglob('*') if is_original_video(path) and path.is_file())
+
+
+def load_probe_cache(root: Path) -> Dict[str, Dict]:
+    """Load the probe cache for a directory ({} if it doesn't exist yet)"""
+    cache_path = Path(root) / PROBE_CACHE_FILE
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def cached_video_metadata(video_path: Path, cache: Dict[str, Dict]) -> Optional[Dict]:
+    """Return cached probe results for a video if its size and mtime still match"""
+    entry = cache.get(str(video_path))
+    if entry is None:
+        return None
+
+    try:
+        stat = video_path.stat()
+    except OSError:
+        return None
+
+    if entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+        return None
+
+    return entry['video_metadata']
+
+
+def _probe_one(path_str: str) -> Dict:
+    """Probe and validate one video (runs in a worker process)"""
+    path = Path(path_str)
+    try:
+        stat = path.stat()
+    except OSError as e:
+        # Vanished or unreadable: record it as invalid (never matches the
+        # cache, so it is probed again next time)
+        return {
+            'path': path_str,
+            'size': None,
+            'mtime': None,
+            'video_metadata': {
+                'valid': False,
+                'validation_message': f"Error reading video: {e}",
+                'probed_at': datetime.now().isoformat()
+            }
+        }
+
+    is_valid, message, metadata = validate_video(
+        path,
+        max_size_mb=video_config.max_file_size_mb,
+        max_duration=video_config.max_duration_seconds
+    )
+
+    video_metadata = dict(metadata or {})
+    video_metadata.update({
+        'valid': is_valid,
+        'validation_message': message,
+        'probed_at': datetime.now().isoformat()
+    })
+
+    return {
+        'path': path_str,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'video_metadata': video_metadata
+    }
+
+
+def _write_ad_metadata(video_path: Path, video_metadata: Dict):
+    """Store probe results in the ad's metadata.json (analysis_storage layout)"""
+    metadata_path = video_path.parent / 'metadata.json'
+    if not metadata_path.exists():
+        return
+
+    try:
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"  ⚠️ Skipping unreadable {metadata_path}: {e}")
+        return
+
+    if metadata.get('video_metadata') == video_metadata:
+        return
+
+    metadata['video_metadata'] = video_metadata
+
+    tmp_path = metadata_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, metadata_path)
+
+
+def probe_all(root: Path, workers: Optional[int] = None, force: bool = False) -> Dict[str, Dict]:
+    """
+    Probe every video under root, reusing cached results where possible.
+
+    Args:
+        root: analysis_storage/, downloaded_ads/ or any directory of videos
+        workers: Process pool size (defaults to CPU count)
+        force: Ignore the cache and re-probe everything
+
+    Returns:
+        The updated probe cache ({path: {size, mtime, video_metadata}})
+    """
+    root = Path(root)
+    cache = {} if force else load_probe_cache(root)
+    videos = find_videos(root)
+
+    stale = [path for path in videos if cached_video_metadata(path, cache) is None]
+
+    print(f"🔎 {len(videos)} videos under {root}/ ({len(videos) - len(stale)} cached, {len(stale)} to probe)")
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for entry in pool.map(_probe_one, [str(p) for p in stale], chunksize=8):
+                cache[entry['path']] = {
+                    'size': entry['size'],
+                    'mtime': entry['mtime'],
+                    'video_metadata': entry['video_metadata']
+                }
+
+    # Drop entries for files that no longer exist
+    present = {str(p) for p in videos}
+    cache = {path: entry for path, entry in cache.items() if path in present}
+
+    for path in videos:
+        try:
+            _write_ad_metadata(path, cache[str(path)]['video_metadata'])
+        except OSError as e:
+            print(f"  ⚠️ Could not update metadata for {path}: {e}")
+
+    cache_path = root / PROBE_CACHE_FILE
+    tmp_path = cache_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, cache_path)
+
+    return cache
+
+
+def print_probe_summary(cache: Dict[str, Dict]):
+    """Print totals and any videos that failed validation"""
+    entries = [entry['video_metadata'] for entry in cache.values()]
+    if not entries:
+        print("  No videos found")
+        return
+
+    invalid = [(path, entry['video_metadata']['validation_message'])
+               for path, entry in cache.items() if not entry['video_metadata']['valid']]
+    total_minutes = sum(meta.get('duration', 0) for meta in entries) / 60
+    total_gb = sum(meta.get('size_mb', 0) for meta in entries) / 1024
+
+    codecs = {}
+    for meta in entries:
+        codecs[meta.get('codec', 'unknown')] = codecs.get(meta.get('codec', 'unknown'), 0) + 1
+
+    print(f"  ✅ Valid: {len(entries) - len(invalid)}/{len(entries)}")
+    print(f"     Total: {total_minutes:.1f} min, {total_gb:.2f} GB")
+    print(f"     Codecs: {', '.join(f'{c} ({n})' for c, n in sorted(codecs.items()))}")
+
+    for path, message in invalid:
+        print(f"  ❌ {path}: {message}")
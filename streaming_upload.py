@@ -0,0 +1,295 @@
+"""
+Stream ad videos straight from their source into a Gemini File API upload.
+
+The regular pipeline downloads to analysis_storage/<id>/video.mp4, reads the
+file back and writes a temp copy before uploading. For ads that don't need an
+archived copy, this module pipes the source stream (direct HTTP or yt-dlp
+stdout) into a resumable upload instead, hashing the bytes on the way through.
+Memory use is bounded by two upload chunks regardless of video size.
+"""
+
+import hashlib
+import itertools
+import json
+import subprocess
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from ad_scrapers import detect_platform, find_yt_dlp, YT_DLP_FORMAT, YT_DLP_USER_AGENT
+from config import video_config
+
+GEMINI_UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+
+# Resumable uploads must be sent in multiples of 256 KiB (except the last chunk)
+CHUNK_GRANULARITY = 256 * 1024
+
+# Upload content types by source URL extension (yt-dlp output defaults to mp4)
+MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.webm': 'video/webm',
+    '.avi': 'video/x-msvideo'
+}
+
+
+class StreamingUploadError(Exception):
+    """Raised when the source stream or the upload endpoint fails"""
+
+
+def guess_mime_type(url: str) -> str:
+    """Content type from the URL's file extension (video/mp4 if unknown)"""
+    path = urlparse(url).path.lower()
+    for extension, mime_type in MIME_TYPES.items():
+        if path.endswith(extension):
+            return mime_type
+    return 'video/mp4'
+
+
+def iter_http_source(url: str, read_size: int = 64 * 1024,
+                     info: Optional[Dict] = None) -> Iterator[bytes]:
+    """
+    Stream a direct video URL.
+
+    Args:
+        url: Direct video URL (.mp4, .mov, ...)
+        read_size: Bytes per network read
+        info: Optional dict that receives the response's 'content_type'
+
+    Yields:
+        Raw byte chunks as they arrive
+    """
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        if info is not None:
+            info['content_type'] = response.headers.get('Content-Type', '').split(';')[0].strip()
+        for chunk in response.iter_content(chunk_size=read_size):
+            if chunk:
+                yield chunk
+
+
+def iter_yt_dlp_source(url: str, read_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Stream a YouTube/Vimeo video through yt-dlp's stdout.
+
+    Args:
+        url: YouTube or Vimeo URL
+        read_size: Bytes per pipe read
+
+    Yields:
+        Raw byte chunks as yt-dlp writes them
+    """
+    yt_dlp_cmd = find_yt_dlp()
+    if not yt_dlp_cmd:
+        raise StreamingUploadError("yt-dlp not found. Install with: pip3 install yt-dlp")
+
+    # Single-file format only: merged formats can't be written to a pipe
+    cmd = yt_dlp_cmd + [
+        url,
+        '-f', YT_DLP_FORMAT,
+        '-o', '-',
+        '--no-playlist',
+        '--quiet',
+        '--user-agent', YT_DLP_USER_AGENT
+    ]
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            chunk = process.stdout.read(read_size)
+            if not chunk:
+                break
+            yield chunk
+
+        process.wait()
+        if process.returncode != 0:
+            stderr = process.stderr.read().decode('utf-8', errors='replace')
+            raise StreamingUploadError(f"yt-dlp failed: {stderr.strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def iter_source(url: str, info: Optional[Dict] = None) -> Iterator[bytes]:
+    """
+    Pick the streaming source for a URL based on its platform.
+
+    Only platforms with automated downloads can be streamed.
+    """
+    platform = detect_platform(url)
+
+    if platform == 'direct':
+        return iter_http_source(url, info=info)
+    if platform in ('youtube', 'vimeo'):
+        return iter_yt_dlp_source(url)
+
+    raise StreamingUploadError(f"Streaming not supported for platform: {platform}")
+
+
+def rechunk(source: Iterator[bytes], chunk_size: int) -> Iterator[bytes]:
+    """
+    Regroup arbitrary-sized source pieces into fixed-size chunks.
+
+    Every chunk except the last is exactly chunk_size bytes.
+    """
+    buffer = bytearray()
+    for piece in source:
+        buffer.extend(piece)
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+
+    if buffer:
+        yield bytes(buffer)
+
+
+def _upload_chunks(chunks: Iterator[bytes], api_key: str, display_name: str,
+                   mime_type: str, upload_url: str,
+                   session: requests.Session) -> Dict:
+    """
+    Run the resumable upload protocol over an iterator of chunks.
+
+    Uses one chunk of look-ahead so the final chunk can carry the
+    'finalize' command without knowing the total size up front.
+
+    Returns:
+        The 'file' resource returned by the upload endpoint
+    """
+    start = session.post(
+        upload_url,
+        params={'key': api_key},
+        headers={
+            'X-Goog-Upload-Protocol': 'resumable',
+            'X-Goog-Upload-Command': 'start',
+            'X-Goog-Upload-Header-Content-Type': mime_type,
+            'Content-Type': 'application/json'
+        },
+        data=json.dumps({'file': {'display_name': display_name}}),
+        timeout=60
+    )
+    start.raise_for_status()
+
+    session_url = start.headers.get('X-Goog-Upload-URL')
+    if not session_url:
+        raise StreamingUploadError("Upload endpoint did not return an upload URL")
+
+    offset = 0
+    pending = next(chunks, None)
+    if pending is None:
+        raise StreamingUploadError("Source stream was empty")
+
+    while pending is not None:
+        following = next(chunks, None)
+        command = 'upload' if following is not None else 'upload, finalize'
+
+        response = session.post(
+            session_url,
+            headers={
+                'X-Goog-Upload-Command': command,
+                'X-Goog-Upload-Offset': str(offset),
+                'Content-Length': str(len(pending))
+            },
+            data=pending,
+            timeout=300
+        )
+        response.raise_for_status()
+
+        offset += len(pending)
+        pending = following
+
+    result = response.json()
+    if 'file' not in result:
+        raise StreamingUploadError(f"Unexpected upload response: {result}")
+
+    return result['file']
+
+
+def stream_to_gemini(url: str, api_key: str, display_name: Optional[str] = None,
+                     mime_type: Optional[str] = None,
+                     upload_url: str = GEMINI_UPLOAD_URL,
+                     source: Optional[Iterator[bytes]] = None) -> Dict:
+    """
+    Pipe a video from its source URL straight into a Gemini file upload.
+
+    Nothing is written to local disk. The content hash is computed while
+    the bytes pass through, so callers can still deduplicate.
+
+    Args:
+        url: Ad URL (direct, YouTube or Vimeo)
+        api_key: Google AI API key
+        display_name: Name shown in the File API (defaults to the URL)
+        mime_type: Content type of the uploaded video (defaults to the source's
+            video/* Content-Type, else a guess from the URL extension)
+        upload_url: Upload endpoint (override to point at a local fake)
+        source: Optional pre-built byte iterator instead of fetching url
+
+    Returns:
+        Dictionary with mime_type, file_name, uri, state, size_bytes and content_sha256
+    """
+    chunk_size = video_config.stream_chunk_mb * 1024 * 1024
+    chunk_size -= chunk_size % CHUNK_GRANULARITY
+
+    digest = hashlib.sha256()
+    size = 0
+
+    def hashed(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        nonlocal size
+        for chunk in chunks:
+            size += len(chunk)
+            if size > video_config.max_file_size_mb * 1024 * 1024:
+                raise StreamingUploadError(
+                    f"Video exceeds {video_config.max_file_size_mb}MB limit"
+                )
+            digest.update(chunk)
+            yield chunk
+
+    source_info = {}
+    if source is None:
+        source = iter_source(url, info=source_info)
+
+    try:
+        # Pull the first chunk before starting the upload: it opens the
+        # source (so its Content-Type is known) and catches empty sources
+        chunks = hashed(rechunk(source, chunk_size))
+        first = next(chunks, None)
+        if first is None:
+            raise StreamingUploadError("Source stream was empty")
+
+        if mime_type is None:
+            content_type = source_info.get('content_type', '')
+            mime_type = content_type if content_type.startswith('video/') else guess_mime_type(url)
+
+        with requests.Session() as session:
+            uploaded = _upload_chunks(
+                itertools.chain([first], chunks),
+                api_key=api_key,
+                display_name=display_name or url[:120],
+                mime_type=mime_type,
+                upload_url=upload_url,
+                session=session
+            )
+    except requests.RequestException as e:
+        raise StreamingUploadError(f"Network error during streaming upload: {e}") from e
+
+    return {
+        'mime_type': mime_type,
+        'file_name': uploaded.get('name'),
+        'uri': uploaded.get('uri'),
+        'state': uploaded.get('state', 'PROCESSING'),
+        'size_bytes': size,
+        'content_sha256': digest.hexdigest()
+    }
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python streaming_upload.py <url>")
+        sys.exit(1)
+
+    result = stream_to_gemini(sys.argv[1], os.getenv('GOOGLE_API_KEY', ''))
+    print(json.dumps(result, indent=2))
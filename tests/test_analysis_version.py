@@ -0,0 +1,107 @@
+"""Version stamps on stored analyses and selective re-analysis."""
+
+import json
+
+import pytest
+
+import analysis_version
+import simple_pipeline
+from config import image_config, video_config
+from framework import FRAMEWORK
+
+
+def test_stale_reasons_name_the_changed_component(monkeypatch):
+    current = analysis_version.video_version()
+    assert analysis_version.stale_reasons(current, analysis_version.video_version()) == []
+    assert analysis_version.stale_reasons(None, current) == ['unversioned']
+
+    monkeypatch.setattr(video_config, 'temperature', 0.1)
+    assert analysis_version.stale_reasons(current, analysis_version.video_version()) == ['model']
+
+    monkeypatch.undo()
+    reweighted = {name: {**spec, 'weight': 0.4 if name == 'Climate Responsibility' else 0.2}
+                  for name, spec in FRAMEWORK.items()}
+    # Weights are in the prompt too
+    assert analysis_version.stale_reasons(current, analysis_version.video_version(reweighted)) == \
+        ['prompt', 'framework']
+
+
+def test_split_mode_is_its_own_version(monkeypatch):
+    single = analysis_version.video_version()
+    monkeypatch.setattr(video_config, 'split_requests', True)
+    assert analysis_version.stale_reasons(single, analysis_version.video_version()) == ['prompt', 'model']
+
+
+def store_banners(tmp_path, monkeypatch, count=3):
+    """Image ads analyzed into a temporary storage dir; their metadata.json paths"""
+    from test_image_cache import creative
+
+    banners = tmp_path / 'banners' / 'Volvo'
+    banners.mkdir(parents=True)
+    for n in range(count):
+        (banners / f'b{n}.png').write_bytes(creative(size=(600, 400), text=f'v{n}'))
+        (banners / f'b{n}.txt').write_text(f'Variant {n}: drive electric')
+
+    storage = tmp_path / 'analysis_storage'
+    monkeypatch.setattr(simple_pipeline, 'STORAGE_DIR', storage)
+    monkeypatch.setattr(image_config, 'cache_dir', str(tmp_path / 'image_cache'))
+    monkeypatch.setenv('RAI_MODEL_BACKEND', 'fake')
+    monkeypatch.setenv('RAI_FAKE_TIME_SCALE', '0')
+    monkeypatch.setenv('GOOGLE_API_KEY', 'test')
+    simple_pipeline.analyze_image_batch(str(tmp_path / 'banners'), workers=2, requests_per_minute=6000)
+    return sorted(storage.glob('*/metadata.json'))
+
+
+def test_reanalyze_stale_reruns_only_changed_ads(tmp_path, monkeypatch, capsys):
+    pytest.importorskip('PIL')
+    paths = store_banners(tmp_path, monkeypatch)
+
+    stamps = [json.loads(path.read_text())['analysis']['version'] for path in paths]
+    assert all(stamp == analysis_version.image_version() for stamp in stamps)
+    assert not any(entry['reasons'] for entry in simple_pipeline.find_reanalysis_candidates())
+
+    # One ad scored with an older prompt
+    metadata = json.loads(paths[0].read_text())
+    metadata['analysis']['version'] = {**metadata['analysis']['version'], 'prompt': 'old', 'hash': 'old'}
+    paths[0].write_text(json.dumps(metadata))
+    untouched = paths[1].read_text()
+    capsys.readouterr()
+
+    simple_pipeline.reanalyze_stored(stale_only=True, requests_per_minute=6000)
+
+    assert '1 of 3 stored analyses to re-run (stale: prompt: 1)' in capsys.readouterr().out
+    assert json.loads(paths[0].read_text())['analysis']['version'] == analysis_version.image_version()
+    assert paths[1].read_text() == untouched
+
+
+def test_model_change_is_not_served_from_the_result_cache(tmp_path, monkeypatch, capsys):
+    pytest.importorskip('PIL')
+    import image_analysis
+
+    paths = store_banners(tmp_path, monkeypatch, count=2)
+    monkeypatch.setitem(image_analysis.GENERATION_CONFIG, 'temperature', 0.1)
+    capsys.readouterr()
+
+    simple_pipeline.reanalyze_stored(stale_only=True, requests_per_minute=6000)
+
+    out = capsys.readouterr().out
+    assert 'stale: model: 2' in out and '(cache)' not in out
+    assert not any(json.loads(path.read_text())['analysis']['cache_hit'] for path in paths)
+    assert not any(entry['reasons'] for entry in simple_pipeline.find_reanalysis_candidates())
+
+
+def test_changed_source_image_is_reported_not_duplicated(tmp_path, monkeypatch, capsys):
+    pytest.importorskip('PIL')
+    from test_image_cache import creative
+
+    paths = store_banners(tmp_path, monkeypatch, count=1)
+    metadata = json.loads(paths[0].read_text())
+    metadata['analysis'].pop('version')
+    paths[0].write_text(json.dumps(metadata))
+    (tmp_path / 'banners' / 'Volvo' / 'b0.png').write_bytes(creative(size=(600, 400), text='new'))
+    capsys.readouterr()
+
+    simple_pipeline.reanalyze_stored(stale_only=True, requests_per_minute=6000)
+
+    assert 'changed since it was analyzed' in capsys.readouterr().out
+    assert sorted((tmp_path / 'analysis_storage').glob('*/metadata.json')) == paths
@@ -0,0 +1,63 @@
+"""Export files in app.py are rendered on demand and memoized by input hash."""
+
+import pytest
+
+pytest.importorskip('streamlit')
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    app._export_cache.clear()
+    yield
+    app._export_cache.clear()
+
+
+def test_cached_export_renders_once_per_input():
+    calls = []
+
+    def build(analyses):
+        calls.append(len(analyses))
+        return b'file-%d' % len(analyses)
+
+    history = [{'result': {'overall_score': 70}, 'timestamp': '2025-01-01 10:00:00'}]
+
+    assert app.cached_export(build, history) == b'file-1'
+    assert app.cached_export(build, [dict(item) for item in history]) == b'file-1'
+    assert calls == [1]
+
+    history.append({'result': {'overall_score': 40}, 'timestamp': '2025-01-02 10:00:00'})
+    assert app.cached_export(build, history) == b'file-2'
+    assert calls == [1, 2]
+
+
+def test_cached_export_is_bounded():
+    def build(n):
+        return str(n)
+
+    for n in range(app.EXPORT_CACHE_SIZE + 5):
+        app.cached_export(build, n)
+
+    assert len(app._export_cache) == app.EXPORT_CACHE_SIZE
+
+
+def test_export_button_does_not_render_on_rerun():
+    def build(_):
+        raise AssertionError("rendered without a click")
+
+    app.export_button("📄 Download PDF Report", build, ({'overall_score': 1},),
+                      file_name='report.pdf', mime='application/pdf', key='test_pdf')
+
+
+def test_deferred_downloads_follow_the_data_annotation():
+    from typing import BinaryIO, Callable, Union
+
+    def deferred(label: str, data: Union[str, bytes, BinaryIO, Callable[[], Union[str, bytes]]]):
+        pass
+
+    def eager(label: str, data: Union[str, bytes, BinaryIO]):
+        pass
+
+    assert app._supports_deferred_downloads(deferred)
+    assert not app._supports_deferred_downloads(eager)
@@ -0,0 +1,34 @@
+"""Local copy reuse: only complete videos qualify."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from asset_resolver import is_usable_video
+from container_probe import is_truncated
+from synthetic_video import make_mp4, make_webm
+
+
+def test_truncated_faststart_mp4_is_not_reused(tmp_path):
+    data = make_mp4(duration_s=30, moov_at_end=False)
+    complete = tmp_path / 'complete.mp4'
+    complete.write_bytes(data)
+    cut = tmp_path / 'cut.mp4'
+    cut.write_bytes(data[:len(data) // 3])
+
+    assert is_truncated(complete) is False and is_usable_video(complete)
+    # The moov (and its 30 s duration) survived the cut; the mdat did not
+    assert is_truncated(cut) is True and not is_usable_video(cut)
+
+
+def test_moov_at_end_and_webm_truncation(tmp_path):
+    mp4 = make_mp4(duration_s=10)
+    webm = make_webm()
+    for name, data in (('a.mp4', mp4), ('a.webm', webm)):
+        (tmp_path / name).write_bytes(data)
+        (tmp_path / f'cut_{name}').write_bytes(data[:len(data) // 2])
+
+    assert is_truncated(tmp_path / 'a.mp4') is False and is_truncated(tmp_path / 'cut_a.mp4') is True
+    assert is_truncated(tmp_path / 'a.webm') is False and is_truncated(tmp_path / 'cut_a.webm') is True
+    assert not is_usable_video(tmp_path / 'cut_a.mp4')
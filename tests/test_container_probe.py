@@ -0,0 +1,67 @@
+"""
+container_probe's header fast path against ffprobe on real encoded files.
+
+Only runs where ffmpeg/ffprobe are installed: the reference video is the one
+create_test_video.sh renders, remuxed/re-encoded into the other containers.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from container_probe import probe_container
+from video_utils import _ffprobe_metadata
+
+REPO_ROOT = Path(__file__).parent.parent
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')),
+    reason='ffmpeg/ffprobe not installed'
+)
+
+
+def ffmpeg(*args):
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', *map(str, args)], check=True)
+
+
+@pytest.fixture(scope='module')
+def videos(tmp_path_factory):
+    """The create_test_video.sh ad as MP4 (moov at end and faststart), MOV and WebM"""
+    work_dir = tmp_path_factory.mktemp('probe')
+    subprocess.run(['bash', str(REPO_ROOT / 'create_test_video.sh')], cwd=work_dir,
+                   capture_output=True)
+
+    source = work_dir / 'test_videos' / 'sustainable_fashion_ad.mp4'
+    if not source.exists() or source.stat().st_size == 0:
+        # ffmpeg builds without drawtext/fonts: same ad without the captions
+        source.parent.mkdir(exist_ok=True)
+        ffmpeg('-f', 'lavfi', '-i', 'color=c=#2E7D32:s=1280x720:d=30',
+               '-c:v', 'libx264', '-pix_fmt', 'yuv420p', source)
+
+    files = {'mp4': source}
+    files['faststart.mp4'] = work_dir / 'faststart.mp4'
+    ffmpeg('-i', source, '-c', 'copy', '-movflags', '+faststart', files['faststart.mp4'])
+    files['mov'] = work_dir / 'ad.mov'
+    ffmpeg('-i', source, '-c', 'copy', files['mov'])
+    files['webm'] = work_dir / 'ad.webm'
+    ffmpeg('-i', source, '-t', '5', '-vf', 'scale=640:360', '-c:v', 'libvpx-vp9',
+           '-deadline', 'realtime', '-cpu-used', '8', '-b:v', '200k', files['webm'])
+    return files
+
+
+@pytest.mark.parametrize('kind', ['mp4', 'faststart.mp4', 'mov', 'webm'])
+def test_fast_path_matches_ffprobe(videos, kind):
+    path = videos[kind]
+
+    fast = probe_container(path)
+    reference = _ffprobe_metadata(str(path), path.stat().st_size)
+
+    assert fast is not None, f'fast path fell back to ffprobe for {kind}'
+    assert fast['duration'] == pytest.approx(reference['duration'], abs=0.1)
+    assert fast['width'] == reference['width']
+    assert fast['height'] == reference['height']
+    assert fast['codec'] == reference['codec']
+    assert fast['fps'] == pytest.approx(reference['fps'], rel=0.01)
+    assert fast['size_mb'] == pytest.approx(reference['size_mb'])
@@ -0,0 +1,70 @@
+"""Streaming Excel export: sheets, rows, sampled column widths."""
+
+import io
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from excel_export import MAX_COLUMN_WIDTH, SUMMARY_HEADERS, write_analyses_xlsx
+
+
+def analysis(brand, scenes=0):
+    return {
+        'brand_name': brand,
+        'timestamp': '2025-01-01 10:00:00',
+        'ad_copy': 'x' * 300,
+        'result': {
+            'overall_score': 72,
+            'dimensions': {
+                'Climate Responsibility': {'score': 70, 'findings': ['Uses recycled packaging\x07'],
+                                           'findings_hu': ['Újrahasznosított csomagolás']},
+                'Social Responsibility': {'score': 80, 'findings': ['Diverse cast']},
+            },
+            'summary': {'strengths': ['Clear message'], 'concerns': [], 'recommendations': ['Cite sources']},
+            'scenes': [{'timestamp': '0:00-0:05', 'description': 'Opening', 'visual_elements': ['car', 'forest'],
+                        'overall_scene_score': 75} for _ in range(scenes)]
+        }
+    }
+
+
+def test_writes_summary_findings_and_scenes():
+    output = io.BytesIO()
+    rows = write_analyses_xlsx((analysis(f'Brand {n}', scenes=n) for n in range(3)), output)
+
+    assert rows == {'summary': 3, 'findings': 9, 'scenes': 3}
+
+    workbook = openpyxl.load_workbook(io.BytesIO(output.getvalue()))
+    assert workbook.sheetnames == ['RAI Analysis', 'Findings', 'Scenes']
+
+    summary = list(workbook['RAI Analysis'].values)
+    assert list(summary[0]) == SUMMARY_HEADERS
+    assert summary[1][0] == 'Brand 0'
+    assert summary[1][SUMMARY_HEADERS.index('Ad Copy (excerpt)')].endswith('...')
+
+    findings = list(workbook['Findings'].values)
+    # Control characters are stripped rather than failing the export
+    assert findings[1][-1] == 'Uses recycled packaging'
+    assert {row[4] for row in findings[1:]} == {'en', 'hu'}
+
+    scenes = list(workbook['Scenes'].values)
+    assert scenes[1][:3] == ('Brand 1', '2025-01-01 10:00:00', 1)
+    assert scenes[1][5] == 'car, forest'
+
+
+def test_column_widths_come_from_sample():
+    output = io.BytesIO()
+    write_analyses_xlsx([analysis('B')], output)
+
+    sheet = openpyxl.load_workbook(io.BytesIO(output.getvalue()))['RAI Analysis']
+    assert sheet.column_dimensions['A'].width == len('Brand') + 2
+    # Ad copy excerpt is capped
+    assert sheet.column_dimensions['L'].width == MAX_COLUMN_WIDTH
+
+
+def test_empty_export_still_has_headers():
+    output = io.BytesIO()
+    assert write_analyses_xlsx([], output) == {'summary': 0, 'findings': 0, 'scenes': 0}
+
+    workbook = openpyxl.load_workbook(io.BytesIO(output.getvalue()))
+    assert [sheet.max_row for sheet in workbook] == [1, 1, 1]
@@ -0,0 +1,73 @@
+"""Headless image batch: job loading, rate limiting and storage layout."""
+
+import json
+
+import pytest
+
+pytest.importorskip('PIL')
+
+import rate_limiter
+import simple_pipeline
+from config import image_config
+from rate_limiter import TokenBucket
+from test_image_cache import creative
+
+
+class FakeClock:
+    """time.monotonic/time.sleep stand-in: sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_limits_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    bucket = TokenBucket(requests_per_minute=600, burst=2)
+
+    waits = [bucket.acquire() for _ in range(6)]
+
+    # 2 immediately, then 4 at 10/s
+    assert waits == pytest.approx([0, 0, 0.1, 0.1, 0.1, 0.1])
+    assert clock.now == pytest.approx(0.4) and bucket.waited_seconds == pytest.approx(0.4)
+
+
+def test_load_jobs_from_csv(tmp_path):
+    (tmp_path / 'a.png').write_bytes(creative(size=(400, 400)))
+    (tmp_path / 'ads.csv').write_text('Image,Ad_Copy,Brand,Campaign\na.png,Buy less,Patagonia,\n,,,\n')
+
+    jobs = simple_pipeline.load_image_jobs(str(tmp_path / 'ads.csv'))
+
+    assert jobs == [{'image': tmp_path / 'a.png', 'ad_copy': 'Buy less', 'brand': 'Patagonia', 'campaign': 'a'}]
+
+
+def test_image_batch_writes_storage(tmp_path, monkeypatch):
+    banners = tmp_path / 'banners' / 'Volvo'
+    banners.mkdir(parents=True)
+    for n in range(4):
+        (banners / f'b{n}.png').write_bytes(creative(size=(2000, 1000), text=f'v{n}'))
+        (banners / f'b{n}.txt').write_text(f'Variant {n}: drive electric')
+
+    monkeypatch.setattr(simple_pipeline, 'STORAGE_DIR', tmp_path / 'analysis_storage')
+    monkeypatch.setattr(image_config, 'cache_dir', str(tmp_path / 'image_cache'))
+    monkeypatch.setenv('RAI_MODEL_BACKEND', 'fake')
+    monkeypatch.setenv('RAI_FAKE_TIME_SCALE', '0')
+    monkeypatch.setenv('GOOGLE_API_KEY', 'test')
+
+    simple_pipeline.analyze_image_batch(str(tmp_path / 'banners'), workers=3, requests_per_minute=6000)
+
+    stored = list(simple_pipeline.iter_stored_analyses())
+    assert len(stored) == 4
+    assert {entry['brand'] for entry in stored} == {'Volvo'}
+
+    metadata = json.loads((tmp_path / 'analysis_storage' / stored[0]['ad_id'] / 'metadata.json').read_text())
+    assert metadata['type'] == 'image' and metadata['status'] == 'analyzed'
+    assert metadata['analysis']['overall_score'] == stored[0]['result']['overall_score']
+    assert (tmp_path / 'analysis_storage' / stored[0]['ad_id'] / 'image.jpg').exists()
+    assert metadata['timings']['stages']['generate']['count'] == 1
@@ -0,0 +1,83 @@
+"""Image preprocessing, perceptual hashing and the shared result cache."""
+
+import io
+
+import pytest
+
+PIL = pytest.importorskip('PIL')
+from PIL import Image, ImageDraw, ImageEnhance
+
+import image_cache
+from config import image_config
+
+
+def creative(size=(3000, 2000), text='Drive electric', fmt='PNG'):
+    img = Image.new('RGBA', size, (30, 120, 60, 255))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([size[0] // 10, size[1] // 5, size[0] // 2, size[1] // 2], fill=(240, 240, 240, 255))
+    draw.ellipse([size[0] // 2, size[1] // 2, size[0] - 100, size[1] - 100], fill=(200, 40, 40, 255))
+    draw.text((50, 50), text, fill=(0, 0, 0, 255))
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_preprocess_downsizes_and_reencodes():
+    data = creative()
+    prepared = image_cache.preprocess_image(data)
+
+    assert max(prepared.image.size) == image_config.max_side
+    assert prepared.image.format == 'JPEG' and prepared.image.mode == 'RGB'
+    assert len(prepared.jpeg) < len(data)
+    assert prepared.original_size == (3000, 2000)
+
+
+def test_near_identical_creatives_hash_close():
+    original = image_cache.preprocess_image(creative())
+
+    # Smaller re-export, slightly brighter
+    edited = Image.open(io.BytesIO(creative(size=(1200, 800)))).convert('RGB')
+    edited = ImageEnhance.Brightness(edited).enhance(1.05)
+    buffer = io.BytesIO()
+    edited.save(buffer, format='JPEG', quality=70)
+    near = image_cache.preprocess_image(buffer.getvalue())
+
+    other = Image.new('RGB', (800, 800), (255, 255, 255))
+    ImageDraw.Draw(other).rectangle([400, 0, 800, 400], fill=(0, 0, 0))
+    buffer = io.BytesIO()
+    other.save(buffer, format='PNG')
+    different = image_cache.preprocess_image(buffer.getvalue())
+
+    assert image_cache.hamming(original.dhash, near.dhash) <= image_config.match_distance
+    assert image_cache.hamming(original.dhash, different.dhash) > image_config.match_distance
+
+
+def test_cache_matches_on_normalized_copy(tmp_path):
+    cache = image_cache.ResultCache(tmp_path)
+    key = image_cache.copy_key('Drive  electric.\n', 'model', 'template')
+
+    cache.store(key, 0b1011, {'overall_score': 80})
+
+    assert image_cache.copy_key('drive electric.', 'model', 'template') == key
+    assert cache.lookup(key, 0b1001)['result'] == {'overall_score': 80}
+    assert cache.lookup(key, 0b1001)['distance'] == 1
+    assert cache.lookup(key, 0xFFFF_0000_FFFF) is None
+    assert cache.lookup(image_cache.copy_key('Drive electric', 'model', 'v2'), 0b1011) is None
+
+
+def test_analyze_ad_reuses_result_for_edited_creative(tmp_path, monkeypatch):
+    pytest.importorskip('streamlit')
+    import app
+    from model_backend import FakeBackend
+
+    monkeypatch.setattr(image_config, 'cache_dir', str(tmp_path))
+    backend = FakeBackend(time_scale=0)
+    monkeypatch.setattr(app, 'get_backend', lambda api_key, model_name: backend)
+
+    first = app.analyze_ad(creative(), 'Drive electric. Zero emissions.', 'key')
+    again = app.analyze_ad(creative(size=(1500, 1000)), 'Drive electric.  Zero emissions.', 'key')
+    other_copy = app.analyze_ad(creative(), 'Fly more, pay less.', 'key')
+
+    assert first and again == first
+    assert other_copy != first
+    assert backend.calls['generate'] == 2
@@ -0,0 +1,85 @@
+"""Packed multi-creative requests: sizing, parsing and per-creative fallback."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('PIL')
+
+import image_analysis
+from config import image_config
+from image_cache import ResultCache
+from model_backend import FakeBackend, PACKED_CREATIVE_RE, estimate_tokens
+from test_image_cache import creative
+
+ADS = [(creative(size=(800, 600), text=f'v{n}'), f'Offer {n}: switch to rail') for n in range(5)]
+
+
+def test_plan_packs_respects_budget(monkeypatch):
+    monkeypatch.setattr(image_config, 'max_pack_size', 3)
+    items = [{'tokens': 300} for _ in range(7)]
+    assert [len(pack) for pack in image_analysis.plan_packs(items)] == [3, 3, 1]
+
+    # Room for three 1000-token creatives next to the shared prompt
+    shared = estimate_tokens(image_analysis.create_packed_prompt(['']))
+    monkeypatch.setattr(image_config, 'max_pack_size', 10)
+    monkeypatch.setattr(image_config, 'pack_input_tokens', shared + 3500)
+    assert [len(pack) for pack in image_analysis.plan_packs([{'tokens': 1000} for _ in range(7)])] == [3, 3, 1]
+
+
+def test_packed_prompt_sends_framework_once():
+    contents = image_analysis.packed_contents(['a', 'b'], ['img1', 'img2'])
+
+    prompt = '\n'.join(part for part in contents if isinstance(part, str))
+    assert prompt.count('FRAMEWORK') == 1
+    assert PACKED_CREATIVE_RE.findall(prompt) == ['c1', 'c2']
+    assert contents[2] == 'img1' and contents[4] == 'img2'
+
+
+def test_analyze_packed_uses_one_request(tmp_path):
+    backend = FakeBackend(time_scale=0)
+    analyses = image_analysis.analyze_packed(ADS, backend, cache=ResultCache(tmp_path))
+
+    assert backend.calls['generate'] == 1
+    assert all(image_analysis.validate_result(a['result']) for a in analyses)
+    assert [a['pack_size'] for a in analyses] == [5] * 5
+    assert analyses[0]['recorder'].spans[0]['packed'] == 5
+
+    # Now cached
+    again = image_analysis.analyze_packed(ADS, backend, cache=ResultCache(tmp_path))
+    assert backend.calls['generate'] == 1
+    assert all(a['cached'] for a in again)
+
+
+class DropsOneBackend(FakeBackend):
+    """Packed replies lose c2 and break c3's scores"""
+
+    def generate_content(self, contents, generation_config):
+        response = super().generate_content(contents, generation_config)
+        reply = json.loads(response.text)
+        if 'results' in reply:
+            reply['results'] = [r for r in reply['results'] if r['creative_id'] != 'c2']
+            for r in reply['results']:
+                if r['creative_id'] == 'c3':
+                    r['overall_score'] = 'high'
+        return SimpleNamespace(text=json.dumps(reply), usage_metadata=response.usage_metadata)
+
+
+def test_invalid_items_fall_back_to_single_requests(tmp_path):
+    backend = DropsOneBackend(time_scale=0)
+    analyses = image_analysis.analyze_packed(ADS, backend, cache=ResultCache(tmp_path))
+
+    assert backend.calls['generate'] == 3
+    assert [a['fallback'] for a in analyses] == [False, True, True, False, False]
+    assert all(image_analysis.validate_result(a['result']) for a in analyses)
+
+
+def test_unparseable_pack_falls_back_for_every_item(tmp_path):
+    backend = FakeBackend(time_scale=0, truncate_rate=1.0)
+    analyses = image_analysis.analyze_packed(ADS[:2], backend, cache=ResultCache(tmp_path))
+
+    # One packed call, then one per creative plus its continuation request
+    # (truncated too, so they fail individually)
+    assert backend.calls['generate'] == 5
+    assert all(isinstance(a['error'], image_analysis.ResponseParseError) for a in analyses)
@@ -0,0 +1,81 @@
+"""FakeBackend and CassetteBackend behaviour, and VideoAnalyzer running offline."""
+
+import json
+
+import pytest
+
+from model_backend import CassetteBackend, CassetteMiss, FakeBackend, RateLimitError, get_backend
+from pipeline_metrics import http_status
+
+
+def test_fake_backend_is_deterministic_and_schema_valid(tmp_path):
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x00' * 4096)
+
+    texts = []
+    for _ in range(2):
+        backend = FakeBackend(seed=7, time_scale=0)
+        handle = backend.upload_file(str(video))
+        texts.append(backend.generate_content([handle, 'Analyze this VIDEO. "scenes"'], {}).text)
+
+    assert texts[0] == texts[1]
+    result = json.loads(texts[0])
+    assert set(result['dimensions']) == {'Climate Responsibility', 'Social Responsibility',
+                                         'Cultural Sensitivity', 'Ethical Communication'}
+    assert result['scenes'] and result['transcript']
+
+
+def test_fake_backend_processing_becomes_active(tmp_path):
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x00' * 10)
+    backend = FakeBackend(time_scale=0)
+
+    handle = backend.upload_file(str(video))
+
+    assert handle.state.name == 'PROCESSING'
+    assert backend.get_file(handle.name).state.name == 'ACTIVE'
+
+
+def test_fake_backend_rate_limits_and_truncates():
+    limited = FakeBackend(time_scale=0, rate_limit_rate=1.0)
+    with pytest.raises(RateLimitError) as excinfo:
+        limited.generate_content(['prompt'], {})
+    assert http_status(excinfo.value) == 429
+
+    truncated = FakeBackend(time_scale=0, truncate_rate=1.0)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(truncated.generate_content(['prompt'], {}).text)
+
+
+def test_cassette_records_then_replays_without_inner_backend(tmp_path):
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x01' * 2048)
+    config = {'temperature': 0.4}
+
+    recorder = CassetteBackend(tmp_path / 'cassettes', mode='record', inner=FakeBackend(seed=3, time_scale=0))
+    handle = recorder.upload_file(str(video))
+    recorded = recorder.generate_content([handle, 'prompt'], config).text
+
+    replayer = CassetteBackend(tmp_path / 'cassettes', mode='replay')
+    handle = replayer.upload_file(str(video))
+    assert replayer.get_file(handle.name).state.name == 'ACTIVE'
+    assert replayer.generate_content([handle, 'prompt'], config).text == recorded
+
+    with pytest.raises(CassetteMiss):
+        replayer.generate_content([handle, 'another prompt'], config)
+
+
+def test_video_analyzer_runs_offline(tmp_path, monkeypatch):
+    monkeypatch.setenv('RAI_MODEL_BACKEND', 'fake')
+    monkeypatch.setenv('RAI_FAKE_TIME_SCALE', '0')
+    from video_processor import VideoAnalyzer
+
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x02' * 4096)
+
+    analyzer = VideoAnalyzer(api_key='unused')
+    result = analyzer.analyze_video_file(video, ad_copy='Brand: Test', detected_language='en')
+
+    assert 0 <= result['overall_score'] <= 100
+    assert {span['stage'] for span in analyzer.recorder.spans} >= {'upload', 'processing_wait', 'generate', 'parse'}
+    assert isinstance(get_backend(None, 'x'), FakeBackend)
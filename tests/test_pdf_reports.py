@@ -0,0 +1,55 @@
+"""Bulk PDF reports: rendering, escaping and skipping unchanged inputs."""
+
+import pytest
+
+pytest.importorskip('reportlab')
+
+import pdf_reports
+
+
+def entry(ad_id, brand='Volvo', score=70, finding='Mentions EV range'):
+    dimension = {'score': score, 'findings': [finding]}
+    return {
+        'ad_id': ad_id,
+        'brand': brand,
+        'timestamp': '2025-01-01T10:00:00',
+        'ad_copy': f'Campaign {ad_id}',
+        'result': {
+            'overall_score': score,
+            'dimensions': {name: dict(dimension) for name in pdf_reports.DIMENSIONS},
+            'summary': {'strengths': ['Clear <b>message'], 'concerns': ['R&D claims'], 'recommendations': []}
+        }
+    }
+
+
+def test_model_text_is_escaped():
+    pdf = pdf_reports.render_ad_report(entry('a', finding='Uses <unclosed & tags')['result'], 'A & B')
+    assert pdf.startswith(b'%PDF')
+
+
+def test_styles_are_built_once():
+    pdf_reports.report_styles.cache_clear()
+    pdf_reports.render_ad_report(entry('a')['result'])
+    pdf_reports.render_comparison_report([{'brand_name': 'A', 'result': entry('a')['result']}])
+    assert pdf_reports.report_styles.cache_info().misses == 1
+
+
+def test_unchanged_reports_are_skipped(tmp_path):
+    entries = [entry('a'), entry('b'), entry('c', brand='Škoda')]
+
+    first = pdf_reports.render_reports(entries, tmp_path, portfolios=True, workers=1)
+    assert (first['rendered'], first['skipped'], first['failed']) == (5, 0, [])
+    assert (tmp_path / 'a.pdf').exists()
+    assert (tmp_path / 'brands' / 'volvo.pdf').exists()
+    assert (tmp_path / 'brands' / 'škoda.pdf').exists()
+
+    second = pdf_reports.render_reports(entries, tmp_path, portfolios=True, workers=1)
+    assert (second['rendered'], second['skipped']) == (0, 5)
+
+    # One changed ad re-renders that ad and its brand portfolio only
+    entries[1] = entry('b', score=40)
+    third = pdf_reports.render_reports(entries, tmp_path, portfolios=True, workers=1)
+    assert (third['rendered'], third['skipped']) == (2, 3)
+
+    forced = pdf_reports.render_reports(entries, tmp_path, workers=1, force=True)
+    assert (forced['rendered'], forced['skipped']) == (3, 0)
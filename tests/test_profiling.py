@@ -0,0 +1,44 @@
+"""Opt-in profiling hooks: off by default, per-run files when RAI_PROFILE is set."""
+
+import time
+
+from profiling import profiled
+
+
+def busy():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    return 'done'
+
+
+def test_disabled_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.delenv('RAI_PROFILE', raising=False)
+    monkeypatch.setenv('RAI_PROFILE_DIR', str(tmp_path))
+
+    assert profiled('entry')(busy)() == 'done'
+    assert not any(tmp_path.iterdir())
+
+
+def test_enabled_writes_profile_and_summary(tmp_path, monkeypatch):
+    monkeypatch.setenv('RAI_PROFILE', '1')
+    monkeypatch.setenv('RAI_PROFILE_DIR', str(tmp_path))
+
+    assert profiled('entry')(busy)() == 'done'
+
+    files = sorted(p.suffix for p in (tmp_path / 'entry').iterdir())
+    assert files == ['.prof', '.txt']
+    summary = next((tmp_path / 'entry').glob('*.txt')).read_text()
+    assert 'busy' in summary and 'cumulative' in summary
+
+
+def test_sample_mode_writes_folded_stacks(tmp_path, monkeypatch):
+    monkeypatch.setenv('RAI_PROFILE', 'sample')
+    monkeypatch.setenv('RAI_PROFILE_DIR', str(tmp_path))
+
+    profiled('entry')(busy)()
+
+    folded = next((tmp_path / 'entry').glob('*.folded')).read_text()
+    assert 'busy (test_profiling.py' in folded
+    stack, count = folded.splitlines()[0].rsplit(' ', 1)
+    assert int(count) > 0
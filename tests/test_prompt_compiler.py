@@ -0,0 +1,88 @@
+"""Compact prompts: token budgets per variant and an unchanged reply schema."""
+
+import json
+
+import pytest
+
+import prompt_compiler
+from framework import FRAMEWORK
+from image_analysis import create_analysis_prompt, validate_result
+from model_backend import FakeBackend, estimate_tokens
+
+
+def spec_keys(rendered: str) -> dict:
+    """The rendered output spec as JSON (placeholders filled in)"""
+    text = rendered.replace(':N', ':50').replace(':L', ':[]')
+    return json.loads(text)
+
+
+@pytest.mark.parametrize('variant', sorted(prompt_compiler.PROMPT_BUDGETS))
+def test_prompt_within_budget(variant):
+    prompt = prompt_compiler.prompt_variants()[variant]
+    assert estimate_tokens(prompt) <= prompt_compiler.PROMPT_BUDGETS[variant]
+
+
+def test_framework_is_one_line_per_dimension():
+    block = prompt_compiler.compile_framework(bilingual=True)
+
+    assert len(block.splitlines()) == len(FRAMEWORK) + 1
+    for name, spec in FRAMEWORK.items():
+        assert name in block and spec['hu_name'] in block
+        assert all(indicator in block for indicator in spec['indicators'])
+    assert spec['hu_indicators'][0] not in block
+
+
+def test_image_spec_keeps_schema():
+    spec = spec_keys(prompt_compiler.render_spec(prompt_compiler.image_spec(True, 'hu')))
+
+    assert list(spec) == ['overall_score', 'ad_language', 'dimensions', 'summary']
+    assert list(spec['dimensions']) == list(FRAMEWORK)
+    assert set(spec['dimensions']['Climate Responsibility']) == {'score', 'findings', 'findings_hu'}
+    assert set(spec['summary']) == {'strengths', 'strengths_hu', 'concerns', 'concerns_hu',
+                                    'recommendations', 'recommendations_hu'}
+
+    english = spec_keys(prompt_compiler.render_spec(prompt_compiler.image_spec(False, 'en')))
+    assert set(english['summary']) == {'strengths', 'concerns', 'recommendations'}
+
+
+def test_video_spec_keeps_schema():
+    spec = spec_keys(prompt_compiler.render_spec(prompt_compiler.video_spec('en', False)))
+
+    assert set(spec) == {'overall_score', 'detected_language', 'duration_analyzed', 'transcript',
+                         'dimensions', 'scenes', 'summary', 'temporal_analysis'}
+    assert set(spec['scenes'][0]) == {'timestamp', 'description', 'visual_elements', 'audio_content',
+                                      'climate_score', 'social_score', 'cultural_score',
+                                      'ethical_score', 'overall_scene_score'}
+    assert set(spec['temporal_analysis']) == {'messaging_evolution', 'key_moments',
+                                              'audio_visual_alignment', 'pacing_notes'}
+
+
+def test_video_prompt_uses_given_framework():
+    custom = {'Honesty': {'weight': 1.0, 'indicators': ['No false claims'], 'hu_name': 'Őszinteség'}}
+    prompt = prompt_compiler.video_prompt('Spot copy', 'hu', custom, bilingual=True)
+
+    assert 'Honesty / Őszinteség (1): No false claims' in prompt
+    assert '"Honesty":{"score":N,"findings":L,"findings_hu":L}' in prompt
+    assert 'Climate Responsibility' not in prompt and 'Spot copy' in prompt
+
+
+def test_fake_replies_to_compact_prompts_validate():
+    backend = FakeBackend(time_scale=0)
+
+    hungarian = 'Új vasúti bérlet, és még olcsóbb'
+    reply = json.loads(backend.generate_content([create_analysis_prompt(hungarian)], {}).text)
+    assert validate_result(reply) and reply['ad_language'] == 'hu'
+    assert 'findings_hu' not in reply['dimensions']['Social Responsibility']
+
+    reply = json.loads(backend.generate_content([create_analysis_prompt(hungarian, 'bilingual')], {}).text)
+    assert 'findings_hu' in reply['dimensions']['Social Responsibility']
+
+    video = json.loads(backend.generate_content([prompt_compiler.video_prompt('', 'en')], {}).text)
+    assert video['scenes'] and 'findings_hu' not in video['dimensions']['Social Responsibility']
+
+
+def test_token_report_uses_backend_count():
+    report = prompt_compiler.token_report(FakeBackend(time_scale=0))
+
+    assert [row['variant'] for row in report] == list(prompt_compiler.PROMPT_BUDGETS)
+    assert all(0 < row['tokens'] <= row['budget'] for row in report)
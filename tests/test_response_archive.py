@@ -0,0 +1,118 @@
+"""Raw response archive: what is stored, and rebuilding results from it."""
+
+import json
+
+import pytest
+
+import response_archive
+import simple_pipeline
+from config import image_config, video_config
+from framework import FRAMEWORK
+from model_backend import FakeBackend
+from video_processor import VideoAnalyzer
+
+
+def analyze_video(tmp_path, monkeypatch, backend, split=False):
+    monkeypatch.setattr(video_config, 'split_requests', split)
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x06' * 4096)
+    analyzer = VideoAnalyzer(api_key='unused')
+    analyzer.backend = backend
+    return analyzer, analyzer.analyze_video_file(video, ad_copy='Brand: Test', detected_language='en')
+
+
+def test_archive_roundtrip_keeps_runs_apart(tmp_path, monkeypatch):
+    analyzer, result = analyze_video(tmp_path, monkeypatch, FakeBackend(time_scale=0))
+    ad_dir = tmp_path / 'ad'
+    response_archive.append_archive(ad_dir, [{**entry, 'run': 'old'} for entry in analyzer.responses.entries])
+    assert response_archive.append_archive(ad_dir, analyzer.responses.entries) == 1
+
+    entries = response_archive.load_archive(ad_dir)
+    assert len(entries) == 2 and response_archive.latest_run(entries) == entries[1:]
+    entry = entries[1]
+    assert entry['kind'] == 'video' and entry['model'] == video_config.model_name
+    assert entry['generation_config']['max_output_tokens'] == video_config.max_output_tokens
+    assert len(entry['prompt_hash']) == 16 and entry['language'] == 'en'
+    assert response_archive.parse_entries(response_archive.latest_run(entries)) == result
+
+
+def test_split_parts_rebuild_to_the_same_result(tmp_path, monkeypatch):
+    analyzer, result = analyze_video(tmp_path, monkeypatch, FakeBackend(time_scale=0), split=True)
+
+    kinds = {entry['kind'] for entry in analyzer.responses.entries}
+    assert kinds == {'video_part'} and len(analyzer.responses.entries) == 4
+    assert response_archive.parse_entries(analyzer.responses.entries) == result
+
+
+def test_truncated_reply_rebuilds_with_its_continuation(tmp_path, monkeypatch):
+    from test_response_repair import TruncateFirstBackend
+
+    analyzer, result = analyze_video(tmp_path, monkeypatch, TruncateFirstBackend(time_scale=0, seed=4))
+
+    assert [entry['kind'] for entry in analyzer.responses.entries] == ['video', 'repair']
+    rebuilt = response_archive.parse_entries(analyzer.responses.entries)
+    assert rebuilt == result and list(rebuilt['dimensions']) == list(FRAMEWORK)
+
+
+def test_reparse_rewrites_only_changed_analyses(tmp_path, monkeypatch):
+    pytest.importorskip('PIL')
+    from test_image_cache import creative
+
+    banners = tmp_path / 'banners' / 'Volvo'
+    banners.mkdir(parents=True)
+    for n in range(3):
+        (banners / f'b{n}.png').write_bytes(creative(size=(600, 400), text=f'v{n}'))
+        (banners / f'b{n}.txt').write_text(f'Variant {n}: drive electric')
+
+    storage = tmp_path / 'analysis_storage'
+    monkeypatch.setattr(simple_pipeline, 'STORAGE_DIR', storage)
+    monkeypatch.setattr(image_config, 'cache_dir', str(tmp_path / 'image_cache'))
+    monkeypatch.setenv('RAI_MODEL_BACKEND', 'fake')
+    monkeypatch.setenv('RAI_FAKE_TIME_SCALE', '0')
+    monkeypatch.setenv('GOOGLE_API_KEY', 'test')
+    simple_pipeline.analyze_image_batch(str(tmp_path / 'banners'), workers=1, requests_per_minute=6000, pack=True)
+
+    archives = sorted(storage.glob(f'*/{response_archive.ARCHIVE_FILE}'))
+    assert len(archives) == 3
+    assert {entry['kind'] for path in archives for entry in response_archive.load_archive(path.parent)} == {'image_pack'}
+
+    # A stored result gone wrong (e.g. written by an older parser)
+    metadata_path = archives[0].parent / 'metadata.json'
+    metadata = json.loads(metadata_path.read_text())
+    expected = metadata['analysis']['overall_score']
+    metadata['analysis']['overall_score'] = 0
+    metadata_path.write_text(json.dumps(metadata))
+
+    simple_pipeline.reparse_stored_analyses(workers=2)
+
+    repaired = json.loads(metadata_path.read_text())
+    assert repaired['analysis']['overall_score'] == expected and 'reparsed_at' in repaired['analysis']
+    assert repaired['analysis']['analyzed_at'] == metadata['analysis']['analyzed_at']
+    untouched = json.loads((archives[1].parent / 'metadata.json').read_text())
+    assert 'reparsed_at' not in untouched['analysis']
+
+
+class UnclosedFenceBackend(FakeBackend):
+    """Complete JSON in an opening ```json fence that is never closed"""
+
+    def generate_content(self, contents, generation_config):
+        response = super().generate_content(contents, generation_config)
+        response.text = f"```json\n{response.text}"
+        return response
+
+
+def test_complete_salvage_without_continuation_rebuilds(tmp_path, monkeypatch):
+    analyzer, result = analyze_video(tmp_path, monkeypatch, UnclosedFenceBackend(time_scale=0))
+
+    # Accepted live without a continuation request, so no repair entry
+    assert [entry['kind'] for entry in analyzer.responses.entries] == ['video']
+    assert result['overall_score'] > 0
+    assert response_archive.parse_entries(analyzer.responses.entries) == result
+
+    from image_analysis import create_analysis_prompt
+    from model_backend import fake_result
+
+    image_result = fake_result(create_analysis_prompt('Drive electric'), seed='fence')
+    image_entries = [{'run': 'r', 'kind': 'image', 'language': 'en',
+                      'text': f"```json\n{json.dumps(image_result)}"}]
+    assert response_archive.parse_entries(image_entries) == image_result
@@ -0,0 +1,82 @@
+"""Continuation repair of cut-off model replies."""
+
+import json
+
+import pytest
+
+import image_analysis
+import prompt_compiler
+import response_repair
+from config import video_config
+from model_backend import CONTINUATION_MARKER, FakeBackend
+from pipeline_metrics import StageRecorder
+from image_cache import ResultCache
+from video_processor import VideoAnalyzer
+
+
+def test_salvage_keeps_finished_values_only():
+    text = '{"overall_score": 70, "dimensions": {"A": {"score": 60, "findings": ["one", "tw'
+
+    assert response_repair.salvage_json(text) == {'overall_score': 70,
+                                                  'dimensions': {'A': {'score': 60, 'findings': ['one']}}}
+    assert response_repair.salvage_json('```json\n{"a": [1, 2]}\n```') == {'a': [1, 2]}
+    assert response_repair.salvage_json('{"tra') == {}
+    assert response_repair.salvage_json('no json here') is None
+
+
+def test_missing_paths_against_spec():
+    spec = prompt_compiler.image_spec(False, 'en')
+    partial = {'overall_score': 70, 'ad_language': 'en',
+               'dimensions': {'Climate Responsibility': {'score': 60, 'findings': ['a']},
+                              'Social Responsibility': {'score': 50}}}
+
+    missing = response_repair.missing_paths(partial, spec)
+
+    assert ['overall_score'] not in missing and ['dimensions', 'Climate Responsibility'] not in missing
+    assert ['dimensions', 'Social Responsibility'] in missing and ['summary', 'strengths'] in missing
+    assert list(response_repair.subset_spec(spec, missing)) == ['dimensions', 'summary']
+
+
+class TruncateFirstBackend(FakeBackend):
+    """Cuts off the first reply only; records every prompt"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prompts = []
+
+    def generate_content(self, contents, generation_config):
+        self.truncate_rate = 1.0 if not self.prompts else 0.0
+        self.prompts.append(next(part for part in contents if isinstance(part, str)))
+        return super().generate_content(contents, generation_config)
+
+
+def test_cut_off_image_reply_is_completed(tmp_path):
+    pytest.importorskip('PIL')
+    from test_image_cache import creative
+
+    backend = TruncateFirstBackend(time_scale=0, seed=3)
+    recorder = StageRecorder()
+
+    analysis = image_analysis.analyze_image(creative(), 'Brand: Test', backend,
+                                            cache=ResultCache(tmp_path), recorder=recorder)
+
+    assert backend.calls['generate'] == 2 and CONTINUATION_MARKER in backend.prompts[1]
+    assert image_analysis.validate_result(analysis['result'])
+    repair = [span for span in recorder.spans if span['stage'] == 'repair']
+    assert repair[0]['completed'] and repair[0]['saved_tokens'] > 0
+
+
+def test_cut_off_video_reply_is_completed_on_same_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_config, 'split_requests', False)
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x05' * 4096)
+    backend = TruncateFirstBackend(time_scale=0, seed=4)
+
+    analyzer = VideoAnalyzer(api_key='unused')
+    analyzer.backend = backend
+    result = analyzer.analyze_video_file(video, ad_copy='Brand: Test', detected_language='en')
+
+    assert backend.calls['upload'] == 1 and backend.calls['generate'] == 2 and backend.calls['delete'] == 1
+    assert result['transcript'] != '[Error: Response truncated]'
+    assert all(dimension['findings'] for dimension in result['dimensions'].values())
+    json.dumps(result)
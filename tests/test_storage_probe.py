@@ -0,0 +1,14 @@
+"""Bulk probing: which files under a storage root count as videos."""
+
+from storage_probe import find_videos
+
+
+def test_find_videos_skips_proxies_and_partial_files(tmp_path):
+    ad_dir = tmp_path / 'abc123'
+    ad_dir.mkdir()
+    for name in ('video.mp4', 'video.proxy.mp4', 'video.download.mp4', 'video.proxy.mp4.part',
+                 'video.part.mp4', 'video.mp4.part', 'metadata.json'):
+        (ad_dir / name).write_bytes(b'\x00' * 16)
+    (tmp_path / 'flat.MOV').write_bytes(b'\x00' * 16)
+
+    assert find_videos(tmp_path) == [ad_dir / 'video.mp4', tmp_path / 'flat.MOV']
@@ -0,0 +1,149 @@
+"""
+streaming_upload against a local HTTP video source and a fake resumable
+upload endpoint (no network, no API key).
+"""
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import video_config
+from streaming_upload import CHUNK_GRANULARITY, StreamingUploadError, stream_to_gemini
+
+MB = 1024 * 1024
+
+
+class FakeEndpoint:
+    """Serves /video.<ext> and implements the resumable upload protocol"""
+
+    def __init__(self):
+        self.video = b''
+        self.video_content_type = 'video/webm'
+        self.start_headers = None
+        self.chunks = []  # (command, offset, length)
+        self.received = bytearray()
+
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', endpoint.video_content_type)
+                self.send_header('Content-Length', str(len(endpoint.video)))
+                self.end_headers()
+                self.wfile.write(endpoint.video)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                command = self.headers['X-Goog-Upload-Command']
+
+                if command == 'start':
+                    endpoint.start_headers = dict(self.headers)
+                    self.send_response(200)
+                    self.send_header('X-Goog-Upload-URL', f'{endpoint.base_url}/session')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                offset = int(self.headers['X-Goog-Upload-Offset'])
+                endpoint.chunks.append((command, offset, len(body)))
+                if offset != len(endpoint.received):
+                    self.send_error(400, 'bad offset')
+                    return
+                endpoint.received.extend(body)
+
+                payload = b'{}'
+                if 'finalize' in command:
+                    payload = json.dumps({'file': {
+                        'name': 'files/fake123',
+                        'uri': f'{endpoint.base_url}/files/fake123',
+                        'state': 'PROCESSING'
+                    }}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    monkeypatch.setattr(video_config, 'stream_chunk_mb', 1)
+    fake = FakeEndpoint()
+    yield fake
+    fake.close()
+
+
+def upload(endpoint, name='video.mp4', **kwargs):
+    return stream_to_gemini(f'{endpoint.base_url}/{name}', 'test-key',
+                            upload_url=f'{endpoint.base_url}/upload', **kwargs)
+
+
+def test_streams_http_source_in_granular_chunks(endpoint):
+    endpoint.video = bytes(range(256)) * (10 * 1024)  # 2.5 MiB
+
+    result = upload(endpoint, 'ad.webm')
+
+    assert bytes(endpoint.received) == endpoint.video
+    assert result['size_bytes'] == len(endpoint.video)
+    assert result['content_sha256'] == hashlib.sha256(endpoint.video).hexdigest()
+    assert result['file_name'] == 'files/fake123'
+
+    assert [c[1] for c in endpoint.chunks] == [0, MB, 2 * MB]
+    assert [c[0] for c in endpoint.chunks] == ['upload', 'upload', 'upload, finalize']
+    assert all(length % CHUNK_GRANULARITY == 0 for _, _, length in endpoint.chunks[:-1])
+
+    # Content type comes from the source response
+    assert endpoint.start_headers['X-Goog-Upload-Header-Content-Type'] == 'video/webm'
+    assert result['mime_type'] == 'video/webm'
+
+
+def test_exact_multiple_of_chunk_size_finalizes_on_last_full_chunk(endpoint):
+    endpoint.video = b'\x01' * (2 * MB)
+
+    upload(endpoint)
+
+    assert endpoint.chunks == [('upload', 0, MB), ('upload, finalize', MB, MB)]
+    assert bytes(endpoint.received) == endpoint.video
+
+
+def test_mime_type_falls_back_to_url_extension(endpoint):
+    endpoint.video = b'\x02' * 1000
+    endpoint.video_content_type = 'application/octet-stream'
+
+    result = upload(endpoint, 'ad.mov')
+
+    assert result['mime_type'] == 'video/quicktime'
+    assert endpoint.chunks == [('upload, finalize', 0, 1000)]
+
+
+def test_empty_source_never_starts_an_upload(endpoint):
+    with pytest.raises(StreamingUploadError, match='empty'):
+        upload(endpoint, source=iter([]))
+
+    assert endpoint.start_headers is None
+    assert endpoint.chunks == []
+
+
+def test_size_limit_aborts_before_finalize(endpoint, monkeypatch):
+    monkeypatch.setattr(video_config, 'max_file_size_mb', 2)
+
+    with pytest.raises(StreamingUploadError, match='2MB limit'):
+        upload(endpoint, source=iter([b'\x03' * MB] * 3))
+
+    assert all('finalize' not in command for command, _, _ in endpoint.chunks)
+    assert len(endpoint.received) <= 2 * MB
@@ -0,0 +1,63 @@
+"""On-demand Hungarian translation of English analyses."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import translation
+from image_analysis import ResponseParseError
+from model_backend import FakeBackend, fake_result
+
+
+def english_result():
+    return fake_result('{"ad_language":"hu"}', seed='t')
+
+
+def test_translate_result_fills_every_hu_list(tmp_path):
+    backend = FakeBackend(time_scale=0)
+    result = english_result()
+    assert translation.needs_translation(result)
+
+    translated = translation.translate_result(result, backend, translation.TranslationCache(tmp_path))
+
+    assert backend.calls['generate'] == 1
+    assert not translation.needs_translation(translated)
+    climate = translated['dimensions']['Climate Responsibility']
+    assert climate['findings_hu'] == [f"(HU) {text}" for text in climate['findings']]
+    assert translated['summary']['recommendations_hu'][0] == "(HU) recommendation 1"
+    # The input is left alone
+    assert 'findings_hu' not in result['dimensions']['Climate Responsibility']
+
+
+def test_translations_are_cached(tmp_path):
+    backend = FakeBackend(time_scale=0)
+    for _ in range(2):
+        translation.translate_result(english_result(), backend, translation.TranslationCache(tmp_path))
+    assert backend.calls['generate'] == 1
+
+
+def test_existing_hu_lists_are_kept(tmp_path):
+    backend = FakeBackend(time_scale=0)
+    result = english_result()
+    result['summary']['strengths_hu'] = ['megvan']
+
+    translated = translation.translate_result(result, backend, translation.TranslationCache(tmp_path))
+    assert translated['summary']['strengths_hu'] == ['megvan']
+    prompt = translation.create_translation_prompt(['x'])
+    assert prompt.startswith("Translate these 1 English texts")
+
+    done = translation.translate_result(translated, backend, translation.TranslationCache(tmp_path))
+    assert done is translated and backend.calls['generate'] == 1
+
+
+class ShortReplyBackend(FakeBackend):
+    def generate_content(self, contents, generation_config):
+        return SimpleNamespace(text=json.dumps({'hu': ['csak egy']}), usage_metadata=None)
+
+
+def test_wrong_length_reply_raises(tmp_path):
+    cache = translation.TranslationCache(tmp_path)
+    with pytest.raises(ResponseParseError):
+        translation.translate_result(english_result(), ShortReplyBackend(time_scale=0), cache)
+    assert not list(tmp_path.rglob('*.json'))
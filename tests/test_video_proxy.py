@@ -0,0 +1,43 @@
+"""Cached proxy reuse: only while it matches the original and the proxy settings."""
+
+import json
+
+import analysis_version
+import video_proxy
+from config import video_config
+
+
+def cached_proxy(tmp_path):
+    """An original with a proxy recorded as made with the current settings"""
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x00' * 1024)
+    video_proxy.proxy_path_for(video).write_bytes(b'\x00' * 256)
+    video_proxy.proxy_settings_path_for(video).write_text(json.dumps(video_proxy.proxy_settings()))
+    return video
+
+
+def test_proxy_is_stale_after_a_settings_change(tmp_path, monkeypatch):
+    video = cached_proxy(tmp_path)
+    assert video_proxy.is_proxy_fresh(video)
+
+    monkeypatch.setattr(video_config, 'proxy_height', video_config.proxy_height * 2)
+    assert not video_proxy.is_proxy_fresh(video)
+
+
+def test_proxy_without_recorded_settings_is_stale(tmp_path):
+    video = cached_proxy(tmp_path)
+    video_proxy.proxy_settings_path_for(video).unlink()
+
+    assert not video_proxy.is_proxy_fresh(video)
+
+
+def test_proxy_settings_are_part_of_the_video_version(monkeypatch):
+    monkeypatch.setattr(video_config, 'use_proxy', False)
+    direct = analysis_version.video_version()
+    monkeypatch.setattr(video_config, 'proxy_fps', video_config.proxy_fps + 1)
+    assert analysis_version.video_version() == direct
+
+    monkeypatch.setattr(video_config, 'use_proxy', True)
+    proxied = analysis_version.video_version()
+    monkeypatch.setattr(video_config, 'proxy_fps', video_config.proxy_fps + 1)
+    assert analysis_version.stale_reasons(proxied, analysis_version.video_version()) == ['model']
@@ -0,0 +1,100 @@
+"""Split video analysis: concurrent part requests merged into the usual schema."""
+
+import json
+from types import SimpleNamespace
+
+from config import video_config
+from framework import FRAMEWORK
+from model_backend import FakeBackend, SPLIT_PART_RE
+from video_processor import VideoAnalyzer, merge_split_parts
+
+
+def split_analyzer(monkeypatch, backend):
+    monkeypatch.setenv('RAI_MODEL_BACKEND', 'fake')
+    monkeypatch.setattr(video_config, 'split_requests', True)
+    analyzer = VideoAnalyzer(api_key='unused')
+    analyzer.backend = backend
+    return analyzer
+
+
+def test_split_analysis_matches_single_schema(tmp_path, monkeypatch):
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x03' * 4096)
+    backend = FakeBackend(time_scale=0)
+
+    analyzer = split_analyzer(monkeypatch, backend)
+    result = analyzer.analyze_video_file(video, ad_copy='Brand: Test', detected_language='en')
+
+    assert backend.calls['generate'] == 4 and backend.calls['delete'] == 1
+    assert set(result) == {'overall_score', 'detected_language', 'duration_analyzed', 'transcript',
+                           'dimensions', 'scenes', 'summary', 'temporal_analysis'}
+    assert list(result['dimensions']) == list(FRAMEWORK)
+    assert result['transcript'] and result['scenes'] and result['summary']['strengths']
+
+    generate = [span for span in analyzer.recorder.spans if span['stage'] == 'generate']
+    assert sorted(span['part'] for span in generate) == ['dimensions1', 'dimensions2', 'overview', 'transcript']
+
+
+class BrokenPartBackend(FakeBackend):
+    """The transcript part never returns JSON"""
+
+    def generate_content(self, contents, generation_config):
+        prompt = next(part for part in contents if isinstance(part, str))
+        if SPLIT_PART_RE.search(prompt).group(1) == 'transcript':
+            with self._lock:
+                self.calls['generate'] += 1
+            return SimpleNamespace(text='The transcript is', usage_metadata=None)
+        return super().generate_content(contents, generation_config)
+
+
+def test_failed_part_is_retried_then_marked(tmp_path, monkeypatch):
+    video = tmp_path / 'ad.mp4'
+    video.write_bytes(b'\x04' * 4096)
+    backend = BrokenPartBackend(time_scale=0)
+
+    result = split_analyzer(monkeypatch, backend).analyze_video_file(video, detected_language='en')
+
+    assert backend.calls['generate'] == 5
+    assert result['split_failed'] == ['transcript']
+    assert result['dimensions']['Climate Responsibility']['score'] > 0
+
+
+def test_merge_weights_overall_and_fills_missing_dimensions():
+    framework = {'A': {'weight': 0.75}, 'B': {'weight': 0.25}}
+    replies = {
+        'transcript': {'detected_language': 'hu', 'duration_analyzed': '30', 'transcript': '[0:00] Hi'},
+        'dimensions1': {'dimensions': {'A': {'score': 80, 'findings': ['a']}}},
+        'dimensions2': {'dimensions': {'B': {'score': 'high'}}},
+        'overview': None,
+    }
+
+    result = merge_split_parts(replies, framework, 'auto')
+
+    # B's placeholder is not averaged in
+    assert result['overall_score'] == 80
+    assert result['detected_language'] == 'hu'
+    assert result['dimensions']['B'] == {'score': 0, 'findings': ['Analysis error']}
+    assert result['split_failed'] == ['overview'] and result['scenes'] == []
+    json.dumps(result)
+
+
+def test_ad_with_a_failed_part_is_stored_unstamped(tmp_path, monkeypatch):
+    import simple_pipeline
+    import video_processor
+
+    storage = tmp_path / 'analysis_storage'
+    ad_dir = storage / 'ad1'
+    ad_dir.mkdir(parents=True)
+    video = ad_dir / 'video.mp4'
+    video.write_bytes(b'\x07' * 4096)
+    (ad_dir / 'metadata.json').write_text(json.dumps({'id': 'ad1', 'brand': 'Test', 'video_file': str(video)}))
+    monkeypatch.setattr(simple_pipeline, 'STORAGE_DIR', storage)
+    monkeypatch.setattr(video_processor, 'get_backend', lambda *args: BrokenPartBackend(time_scale=0))
+    monkeypatch.setattr(video_config, 'split_requests', True)
+    monkeypatch.setenv('GOOGLE_API_KEY', 'test')
+
+    simple_pipeline.analyze_ad(ad_id='ad1')
+
+    analysis = json.loads((ad_dir / 'metadata.json').read_text())['analysis']
+    assert analysis['split_failed'] == ['transcript'] and 'version' not in analysis
+    assert [entry['reasons'] for entry in simple_pipeline.find_reanalysis_candidates()] == [['incomplete']]
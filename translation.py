@@ -0,0 +1,148 @@
+"""
+On-demand Hungarian versions of an analysis.
+
+Analyses are generated in English only. Asking for every finding,
+strength, concern and recommendation in both languages roughly doubled
+the output tokens (and the truncation rate) of Hungarian ads. The _hu
+lists the app, dashboards and exports understand (findings_hu per
+dimension, strengths_hu / concerns_hu / recommendations_hu in the summary)
+are instead added by translate_result when a Hungarian view needs them:
+one short text-only request per analysis, cached on disk under
+translation_config.cache_dir so each set of texts is translated once.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import translation_config
+from model_backend import TRANSLATION_HEADER
+
+SUMMARY_FIELDS = ('strengths', 'concerns', 'recommendations')
+
+_lock = threading.Lock()
+
+
+def missing_fields(result: Dict) -> List[Tuple[Dict, str]]:
+    """(container, English key) for every list whose _hu version is missing"""
+    fields = []
+    for dimension in (result.get('dimensions') or {}).values():
+        if isinstance(dimension, dict) and dimension.get('findings') and 'findings_hu' not in dimension:
+            fields.append((dimension, 'findings'))
+    summary = result.get('summary') or {}
+    for field in SUMMARY_FIELDS:
+        if summary.get(field) and f"{field}_hu" not in summary:
+            fields.append((summary, field))
+    return fields
+
+
+def needs_translation(result: Optional[Dict]) -> bool:
+    return bool(result) and bool(missing_fields(result))
+
+
+def create_translation_prompt(texts: List[str]) -> str:
+    """Prompt for translating a list of analysis texts into Hungarian"""
+    return (f"{TRANSLATION_HEADER.format(count=len(texts))}\n"
+            "These are findings from a responsible-advertising assessment. Keep brand names, quotes "
+            "from the ad and timestamps as they are. Return ONLY JSON (no markdown) "
+            "{\"hu\": [...]} with one Hungarian string per input string, in the same order.\n\n"
+            + json.dumps({'en': texts}, ensure_ascii=False))
+
+
+class TranslationCache:
+    """Translated text lists on disk, keyed by a hash of the English texts"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or translation_config.cache_dir)
+
+    @staticmethod
+    def key(texts: List[str]) -> str:
+        payload = json.dumps([translation_config.model_name, texts], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[str]]:
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, translations: List[str]):
+        path = self._path(key)
+        with _lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(translations, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+
+def translate_texts(texts: List[str], backend, cache: Optional[TranslationCache] = None,
+                    recorder=None) -> List[str]:
+    """
+    Hungarian versions of texts (one model request unless cached).
+
+    Raises:
+        image_analysis.ResponseParseError: The reply was not one string per text
+    """
+    from image_analysis import ResponseParseError, parse_json_response
+    from pipeline_metrics import StageRecorder, TRANSLATE, record_usage
+
+    cache = cache or TranslationCache()
+    recorder = recorder or StageRecorder()
+
+    key = cache.key(texts)
+    translations = cache.get(key)
+    if translations is not None:
+        return translations
+
+    with recorder.span(TRANSLATE, strings=len(texts)) as span:
+        response = backend.generate_content(
+            [create_translation_prompt(texts)],
+            generation_config={"temperature": translation_config.temperature,
+                               "max_output_tokens": translation_config.max_output_tokens}
+        )
+        record_usage(span, response)
+
+    translations = parse_json_response(response.text).get('hu')
+    if (not isinstance(translations, list) or len(translations) != len(texts)
+            or not all(isinstance(text, str) for text in translations)):
+        raise ResponseParseError(f"Expected {len(texts)} translations", response.text)
+
+    cache.put(key, translations)
+    return translations
+
+
+def translate_result(result: Dict, backend, cache: Optional[TranslationCache] = None,
+                     recorder=None) -> Dict:
+    """
+    The analysis with its missing _hu lists filled in.
+
+    Args:
+        result: Analysis (English lists; existing _hu lists are kept)
+        backend: model_backend.ModelBackend
+        cache: TranslationCache (default: the shared cache)
+        recorder: pipeline_metrics.StageRecorder for the translate span
+
+    Returns:
+        A copy of result with findings_hu / strengths_hu / concerns_hu /
+        recommendations_hu (result itself if nothing was missing)
+    """
+    if not needs_translation(result):
+        return result
+
+    result = copy.deepcopy(result)
+    fields = missing_fields(result)
+    texts = [str(text) for container, field in fields for text in container[field]]
+    translations = iter(translate_texts(texts, backend, cache, recorder))
+
+    for container, field in fields:
+        container[f"{field}_hu"] = [next(translations) for _ in container[field]]
+    return result
@@ -2,13 +2,19 @@
 Video analysis using Google Gemini 2.5 Flash.
 """
 
-import google.generativeai as genai
 import json
 import time
 from typing import Dict, Optional
 from config import video_config
 import tempfile
 import os
+from pathlib import Path
+from video_proxy import make_proxy, proxy_path_for, proxy_settings_path_for
+from prompt_compiler import video_part_prompt, video_prompt, video_spec, video_split_parts
+from model_backend import get_backend
+from pipeline_metrics import (StageRecorder, record_usage, PROXY, UPLOAD,
+                              PROCESSING_WAIT, GENERATE, PARSE)
+from response_archive import ResponseLog, REPAIR, VIDEO, VIDEO_PART
 
 
 class VideoAnalyzer:
@@ -22,8 +28,15 @@ class VideoAnalyzer:
             api_key: Google AI API key
         """
         self.api_key = api_key
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(video_config.model_name)
+
+        # Real Gemini API unless RAI_MODEL_BACKEND / RAI_CASSETTE_DIR say otherwise
+        self.backend = get_backend(api_key, video_config.model_name)
+
+        # Stage timings for the most recent analysis (see pipeline_metrics)
+        self.recorder = StageRecorder()
+
+        # Raw replies of the most recent analysis (see response_archive)
+        self.responses = ResponseLog(video_config.model_name)
 
     def analyze_video(self, video_bytes: bytes, ad_copy: str = "",
                      detected_language: str = "en") -> Dict:
@@ -38,6 +51,7 @@ class VideoAnalyzer:
         Returns:
             Dictionary with analysis results
         """
+        self.recorder = StageRecorder()
         size_mb = len(video_bytes) / (1024 * 1024)
 
         # For large videos, use File API
@@ -57,39 +71,18 @@ class VideoAnalyzer:
 
         try:
             # Upload the video file
-            video_file = genai.upload_file(path=tmp_path)
-
-            # Wait for processing
-            while video_file.state.name == "PROCESSING":
-                time.sleep(1)
-                video_file = genai.get_file(video_file.name)
-
-            if video_file.state.name == "FAILED":
-                raise ValueError("Video processing failed")
-
-            # Create prompt
-            prompt = self._create_prompt(ad_copy, detected_language)
-
-            # Generate analysis
-            response = self.model.generate_content(
-                [video_file, prompt],
-                generation_config={
-                    "temperature": video_config.temperature,
-                    "max_output_tokens": video_config.max_output_tokens
-                }
-            )
+            video_file = self._upload(tmp_path)
 
-            # Delete the file from Google's servers
-            genai.delete_file(video_file.name)
-
-            return self._parse_response(response.text)
+            return self._analyze_file(video_file, ad_copy, detected_language,
+                                      poll_interval=1)
 
         finally:
-            # Clean up temp file
-            try:
-                os.remove(tmp_path)
-            except:
-                pass
+            # Clean up temp file (and its proxy, if one was made)
+            for path in (tmp_path, proxy_path_for(tmp_path), proxy_settings_path_for(tmp_path)):
+                try:
+                    os.remove(path)
+                except:
+                    pass
 
     def _analyze_via_file_api(self, video_bytes: bytes, ad_copy: str,
                               detected_language: str) -> Dict:
@@ -103,46 +96,192 @@ class VideoAnalyzer:
         try:
             # Upload the video file
             print("Uploading video to Google's servers...")
-            video_file = genai.upload_file(path=tmp_path)
+            video_file = self._upload(tmp_path)
+
+            return self._analyze_file(video_file, ad_copy, detected_language,
+                                      poll_interval=2, verbose=True)
+
+        finally:
+            # Clean up temp file (and its proxy, if one was made)
+            for path in (tmp_path, proxy_path_for(tmp_path), proxy_settings_path_for(tmp_path)):
+                try:
+                    os.remove(path)
+                except:
+                    pass
+
+    def analyze_video_file(self, video_path, ad_copy: str = "",
+                           detected_language: str = "en") -> Dict:
+        """
+        Analyze a video that is already on disk.
+
+        Uploads straight from the path (no in-memory copy or temp file).
+        When video_config.use_proxy is set, the cached low-resolution proxy
+        next to the original is uploaded instead.
 
-            # Wait for processing
+        Args:
+            video_path: Path to the video file
+            ad_copy: Optional text description/copy from the ad
+            detected_language: Language code ('en' or 'hu')
+
+        Returns:
+            Dictionary with analysis results
+        """
+        self.recorder = StageRecorder()
+        video_file = self._upload(video_path)
+        return self._analyze_file(video_file, ad_copy, detected_language,
+                                  poll_interval=2)
+
+    def _upload(self, video_path):
+        """Upload a video file (or its proxy) to the File API"""
+        upload_path = Path(video_path)
+        if video_config.use_proxy:
+            with self.recorder.span(PROXY) as span:
+                upload_path = make_proxy(upload_path)
+                span['bytes'] = upload_path.stat().st_size
+
+        with self.recorder.span(UPLOAD, bytes=upload_path.stat().st_size):
+            return self.backend.upload_file(str(upload_path))
+
+    def analyze_uploaded_file(self, file_name: str, ad_copy: str = "",
+                              detected_language: str = "en") -> Dict:
+        """
+        Analyze a video that is already in the File API.
+
+        Used by the streaming pipeline, which uploads straight from the
+        source URL without a local copy.
+
+        Args:
+            file_name: File API resource name (e.g. 'files/abc123')
+            ad_copy: Optional text description/copy from the ad
+            detected_language: Language code ('en' or 'hu')
+
+        Returns:
+            Dictionary with analysis results
+        """
+        self.recorder = StageRecorder()
+        video_file = self.backend.get_file(file_name)
+        return self._analyze_file(video_file, ad_copy, detected_language,
+                                  poll_interval=2)
+
+    def _analyze_file(self, video_file, ad_copy: str, detected_language: str,
+                      poll_interval: float = 1, verbose: bool = False) -> Dict:
+        """Wait for an uploaded file to become ACTIVE, then analyze it"""
+        self.responses = ResponseLog(video_config.model_name, language=detected_language)
+
+        # Wait for processing
+        if verbose:
             print("Processing video...")
+        with self.recorder.span(PROCESSING_WAIT) as span:
+            span['polls'] = 0
             while video_file.state.name == "PROCESSING":
-                time.sleep(2)
-                video_file = genai.get_file(video_file.name)
+                time.sleep(poll_interval * self.backend.time_scale)
+                video_file = self.backend.get_file(video_file.name)
+                span['polls'] += 1
 
-            if video_file.state.name == "FAILED":
-                raise ValueError("Video processing failed")
+        if video_file.state.name == "FAILED":
+            raise ValueError("Video processing failed")
 
+        if verbose:
             print("Analyzing video...")
-            # Create prompt
-            prompt = self._create_prompt(ad_copy, detected_language)
-
-            # Generate analysis
-            response = self.model.generate_content(
-                [video_file, prompt],
-                generation_config={
-                    "temperature": video_config.temperature,
-                    "max_output_tokens": video_config.max_output_tokens
-                }
-            )
 
-            # Delete the file from Google's servers
-            genai.delete_file(video_file.name)
-
-            return self._parse_response(response.text)
+        if video_config.split_requests:
+            result = self._analyze_split(video_file, ad_copy, detected_language)
+            self.backend.delete_file(video_file.name)
+            return result
+
+        # Create prompt
+        prompt = self._create_prompt(ad_copy, detected_language)
+
+        # Generate analysis
+        response, span = self._generate(video_file, prompt, video_config.max_output_tokens)
+        result = self._parse_or_repair(video_file, prompt, response, span, detected_language)
+
+        # Delete the file from Google's servers (after any continuation request)
+        self.backend.delete_file(video_file.name)
+        return result
+
+    def _request(self, video_file, prompt: str, max_output_tokens: int, kind: str, **fields):
+        """One generate_content call on an uploaded file (the raw reply goes into self.responses)"""
+        generation_config = {
+            "temperature": video_config.temperature,
+            "max_output_tokens": max_output_tokens
+        }
+        response = self.backend.generate_content([video_file, prompt], generation_config=generation_config)
+        self.responses.add(kind, prompt, generation_config, response, **fields)
+        return response
+
+    def _generate(self, video_file, prompt: str, max_output_tokens: int, kind: str = VIDEO, **fields):
+        """_request recorded as a generate span: (response, its generate span)"""
+        with self.recorder.span(GENERATE, **fields) as span:
+            response = self._request(video_file, prompt, max_output_tokens, kind, **fields)
+            record_usage(span, response)
+        return response, span
+
+    def _parse_or_repair(self, video_file, prompt: str, response, generate_span: Dict,
+                         detected_language: str) -> Dict:
+        """
+        Parse the reply. A cut-off reply keeps its valid prefix and gets the
+        missing fields from a continuation request on the same uploaded file
+        (response_repair.py); only if that fails does parse_video_response's
+        salvage/placeholder run.
+        """
+        from image_analysis import parse_json_response
+        from response_repair import repair_truncated
 
-        finally:
-            # Clean up temp file
+        with self.recorder.span(PARSE, chars=len(response.text)):
             try:
-                os.remove(tmp_path)
-            except:
+                return parse_json_response(response.text)
+            except ValueError:
                 pass
 
-    def _create_prompt(self, ad_copy: str, detected_language: str) -> str:
-        """Create analysis prompt for video"""
+        repaired = repair_truncated(
+            response, prompt, video_spec(detected_language, False, self._framework()),
+            lambda text: self._request(video_file, text, video_config.max_output_tokens, REPAIR),
+            self.recorder, generate_span
+        )
+        if repaired is not None:
+            return repaired
+
+        with self.recorder.span(PARSE, chars=len(response.text), fallback=True):
+            return parse_video_response(response.text)
+
+    def _analyze_split(self, video_file, ad_copy: str, detected_language: str) -> Dict:
+        """
+        Score an ACTIVE file with several smaller concurrent requests.
+
+        Transcript, each dimension group and scenes/summary/temporal analysis
+        are separate requests against the same uploaded file (see
+        prompt_compiler.video_split_parts), merged into the usual result.
+        Wall time is that of the slowest part; a part whose reply does not
+        parse is retried once on its own.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from image_analysis import parse_json_response
+
+        framework = self._framework()
+        parts = video_split_parts(framework, video_config.split_group_size)
+
+        def run(part: str, dimensions: list):
+            prompt = video_part_prompt(part, dimensions, ad_copy, detected_language, framework)
+            for attempt in range(2):
+                response, _ = self._generate(video_file, prompt, video_config.split_max_output_tokens,
+                                             VIDEO_PART, part=part, attempt=attempt)
+                with self.recorder.span(PARSE, chars=len(response.text), part=part):
+                    try:
+                        return part, parse_json_response(response.text)
+                    except ValueError:
+                        pass
+            return part, None
+
+        with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            replies = dict(pool.map(lambda item: run(*item), parts))
 
-        # Import framework - try from calling module first, then app.py
+        return merge_split_parts(replies, framework, detected_language)
+
+    def _framework(self) -> Dict:
+        """Scoring framework for the prompt"""
+
+        # Import framework - try from calling module first, then framework.py
         FRAMEWORK = None
         try:
             import sys
@@ -155,165 +294,136 @@ class VideoAnalyzer:
             pass
 
         if FRAMEWORK is None:
-            try:
-                from app import FRAMEWORK
-            except:
-                # Fallback if neither available
-                FRAMEWORK = {
-                    "Climate Responsibility": {"hu_name": "Klímafelelősség"},
-                    "Social Responsibility": {"hu_name": "Társadalmi Felelősség"},
-                    "Cultural Sensitivity": {"hu_name": "Kulturális Érzékenység"},
-                    "Ethical Communication": {"hu_name": "Etikus Kommunikáció"}
-                }
-
-        bilingual = detected_language == 'hu'
-
-        prompt = f"""You are an expert in responsible advertising assessment.
-Analyze this VIDEO advertisement across four key dimensions.
-
-CRITICAL INSTRUCTIONS FOR VIDEO ANALYSIS:
-
-1. VISUAL ANALYSIS:
-   - Watch the ENTIRE video carefully
-   - Note all visual elements: people, products, environments, text overlays
-   - Identify brand messages shown on screen
-   - Look for greenwashing visual cues (nature imagery, green colors without substance)
-   - Assess diversity and representation
-
-2. AUDIO ANALYSIS:
-   - Transcribe ALL dialogue and voiceover
-   - Detect the language (appears to be {detected_language})
-   - Note music, tone, and sound effects
-   - Identify any audio claims or promises
-
-3. TEMPORAL ANALYSIS:
-   - Identify 3-5 key scenes/moments in the video
-   - Note how messaging evolves from beginning to end
-   - Flag any contradictions (e.g., empowering start, manipulative end)
-   - Look for fast disclaimers or buried warnings
-
-4. INTEGRATION:
-   - Compare what's SHOWN vs. what's SAID
-   - Flag mismatches between visual and audio messaging
-   - Identify misleading combinations
-
-Additional context provided: {ad_copy if ad_copy else "None"}
-
-FRAMEWORK - Assess across these dimensions:
-{json.dumps(FRAMEWORK, indent=2)}
-
-Return JSON in this EXACT format:
-{{
-    "overall_score": <0-100>,
-    "detected_language": "{detected_language}",
-    "duration_analyzed": "<video length in seconds>",
-    "transcript": "Full transcription with key timestamps like [0:15] Speaker: ...",
-    "dimensions": {{
-        "Climate Responsibility": {{
-            "score": <0-100>,
-            "findings": ["finding 1 with specific video evidence", "finding 2", "finding 3"]{', "findings_hu": ["magyar megállapítás 1", "..."]' if bilingual else ""}
-        }},
-        "Social Responsibility": {{
-            "score": <0-100>,
-            "findings": ["finding 1", "finding 2", "finding 3"]{', "findings_hu": ["magyar megállapítás 1", "..."]' if bilingual else ""}
-        }},
-        "Cultural Sensitivity": {{
-            "score": <0-100>,
-            "findings": ["finding 1", "finding 2", "finding 3"]{', "findings_hu": ["magyar megállapítás 1", "..."]' if bilingual else ""}
-        }},
-        "Ethical Communication": {{
-            "score": <0-100>,
-            "findings": ["finding 1", "finding 2", "finding 3"]{', "findings_hu": ["magyar megállapítás 1", "..."]' if bilingual else ""}
-        }}
-    }},
-    "scenes": [
-        {{
-            "timestamp": "0:00-0:30",
-            "description": "Opening scene description with visual and audio details",
-            "visual_elements": ["element 1", "element 2"],
-            "audio_content": "What is said or heard",
-            "climate_score": <0-100>,
-            "social_score": <0-100>,
-            "cultural_score": <0-100>,
-            "ethical_score": <0-100>,
-            "overall_scene_score": <0-100>
-        }}
-    ],
-    "summary": {{
-        "strengths": ["strength 1 with video timestamp reference", "strength 2", "strength 3"]{', "strengths_hu": ["erősség 1", "..."]' if bilingual else ""},
-        "concerns": ["concern 1 with timestamp", "concern 2", "concern 3"]{', "concerns_hu": ["aggály 1", "..."]' if bilingual else ""},
-        "recommendations": ["recommendation 1", "recommendation 2", "recommendation 3"]{', "recommendations_hu": ["ajánlás 1", "..."]' if bilingual else ""}
-    }},
-    "temporal_analysis": {{
-        "messaging_evolution": "Describe how the message changes from beginning to end",
-        "key_moments": [
-            {{"timestamp": "0:45", "event": "Brief disclaimer appears"}},
-            {{"timestamp": "1:30", "event": "Tone shifts from empowering to manipulative"}}
-        ],
-        "audio_visual_alignment": "consistent" or "contradictory",
-        "pacing_notes": "Analysis of timing, emphasis, and what's rushed vs. highlighted"
-    }}
-}}
-
-Be specific and reference ACTUAL elements from the video with timestamps."""
-
-        return prompt
+            from framework import FRAMEWORK
 
-    def _parse_response(self, response_text: str) -> Dict:
-        """Parse JSON from Gemini response"""
+        return FRAMEWORK
 
-        # Handle markdown code blocks
-        if "```json" in response_text:
-            start = response_text.find("```json") + 7
-            end = response_text.find("```", start)
-            json_str = response_text[start:end].strip()
-        elif "```" in response_text:
-            start = response_text.find("```") + 3
-            end = response_text.find("```", start)
-            json_str = response_text[start:end].strip()
-        else:
-            # Find JSON object
-            start = response_text.find('{')
-            end = response_text.rfind('}') + 1
-            if start == -1 or end == 0:
-                raise ValueError("No JSON found in response")
-            json_str = response_text[start:end]
+    def _create_prompt(self, ad_copy: str, detected_language: str) -> str:
+        """Create analysis prompt for video"""
+        return video_prompt(ad_copy, detected_language, self._framework())
 
+    def _parse_response(self, response_text: str) -> Dict:
+        """Parse JSON from Gemini response"""
+        return parse_video_response(response_text)
+
+
+def parse_video_response(response_text: str) -> Dict:
+    """
+    Parse JSON from a Gemini video reply.
+
+    Cut-off replies get their braces closed; if that fails, a zero-score
+    placeholder is returned so batch analysis can continue. Module-level so
+    `simple_pipeline.py reparse` can run it on archived replies.
+    """
+    # Handle markdown code blocks
+    if "```json" in response_text:
+        start = response_text.find("```json") + 7
+        end = response_text.find("```", start)
+        json_str = response_text[start:end].strip()
+    elif "```" in response_text:
+        start = response_text.find("```") + 3
+        end = response_text.find("```", start)
+        json_str = response_text[start:end].strip()
+    else:
+        # Find JSON object
+        start = response_text.find('{')
+        end = response_text.rfind('}') + 1
+        if start == -1 or end == 0:
+            raise ValueError("No JSON found in response")
+        json_str = response_text[start:end]
+
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError as e:
+        # Try to salvage partial JSON by finding the last complete object
+        print(f"Warning: JSON parse error: {e}")
+        print(f"Full response length: {len(response_text)}")
+
+        # Try to fix common JSON issues
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            # Try to salvage partial JSON by finding the last complete object
-            print(f"Warning: JSON parse error: {e}")
-            print(f"Full response length: {len(response_text)}")
-
-            # Try to fix common JSON issues
-            try:
-                # Remove trailing commas and fix common issues
-                fixed_json = json_str.rstrip().rstrip(',')
-                # Try to close any unclosed braces
-                if fixed_json.count('{') > fixed_json.count('}'):
-                    fixed_json += '}' * (fixed_json.count('{') - fixed_json.count('}'))
-                return json.loads(fixed_json)
-            except:
-                pass
+            # Remove trailing commas and fix common issues
+            fixed_json = json_str.rstrip().rstrip(',')
+            # Try to close any unclosed braces
+            if fixed_json.count('{') > fixed_json.count('}'):
+                fixed_json += '}' * (fixed_json.count('{') - fixed_json.count('}'))
+            return json.loads(fixed_json)
+        except:
+            pass
 
-            # If it's an unterminated string error, the response was likely truncated
-            # Return a minimal valid structure so batch analysis can continue
-            print("⚠️ Returning minimal valid structure to continue batch processing")
-            return {
-                'overall_score': 0,
-                'detected_language': 'unknown',
-                'duration_analyzed': '0',
-                'transcript': '[Error: Response truncated]',
-                'summary': {
-                    'main_message': 'Analysis failed due to malformed response',
-                    'responsible_advertising_assessment': 'Unable to analyze',
-                    'recommendations': ['Re-analyze this ad individually']
-                },
-                'dimensions': {
-                    'Climate Responsibility': {'score': 0, 'findings': ['Analysis error']},
-                    'Social Responsibility': {'score': 0, 'findings': ['Analysis error']},
-                    'Cultural Sensitivity': {'score': 0, 'findings': ['Analysis error']},
-                    'Ethical Communication': {'score': 0, 'findings': ['Analysis error']}
-                }
+        # If it's an unterminated string error, the response was likely truncated
+        # Return a minimal valid structure so batch analysis can continue
+        print("⚠️ Returning minimal valid structure to continue batch processing")
+        return {
+            'overall_score': 0,
+            'detected_language': 'unknown',
+            'duration_analyzed': '0',
+            'transcript': '[Error: Response truncated]',
+            'summary': {
+                'main_message': 'Analysis failed due to malformed response',
+                'responsible_advertising_assessment': 'Unable to analyze',
+                'recommendations': ['Re-analyze this ad individually']
+            },
+            'dimensions': {
+                'Climate Responsibility': {'score': 0, 'findings': ['Analysis error']},
+                'Social Responsibility': {'score': 0, 'findings': ['Analysis error']},
+                'Cultural Sensitivity': {'score': 0, 'findings': ['Analysis error']},
+                'Ethical Communication': {'score': 0, 'findings': ['Analysis error']}
             }
+        }
+
+
+def merge_split_parts(replies: Dict[str, Optional[Dict]], framework: Dict,
+                      detected_language: str) -> Dict:
+    """
+    Combine the replies of a split video analysis into one result.
+
+    Args:
+        replies: Parsed reply per part name (None if it never parsed)
+        framework: Scoring framework (weights for overall_score)
+        detected_language: Language passed to the analysis
+
+    Returns:
+        The single-request result schema; overall_score is the weighted
+        average of the dimensions that were scored. Sections of failed
+        parts get the same placeholders as a truncated single reply (left
+        out of overall_score), and their part names are listed under
+        'split_failed'.
+    """
+    def section(part: str) -> Dict:
+        reply = replies.get(part)
+        return reply if isinstance(reply, dict) else {}
+
+    dimensions, scored = {}, []
+    for name in framework:
+        entry = None
+        for part, reply in replies.items():
+            found = section(part).get('dimensions', {}) if part.startswith('dimensions') else {}
+            if isinstance(found, dict) and isinstance(found.get(name), dict):
+                entry = found[name]
+        score = entry.get('score') if entry else None
+        if not isinstance(score, (int, float)) or isinstance(score, bool):
+            entry = {'score': 0, 'findings': ['Analysis error']}
+        else:
+            scored.append(name)
+        dimensions[name] = entry
+
+    # A placeholder 0 would drag the overall score down for a request that failed
+    total_weight = sum(framework[name]['weight'] for name in scored) or 1
+    overall = sum(dimensions[name]['score'] * framework[name]['weight'] for name in scored) / total_weight
+
+    transcript, overview = section('transcript'), section('overview')
+    result = {
+        'overall_score': round(overall),
+        'detected_language': transcript.get('detected_language', detected_language),
+        'duration_analyzed': transcript.get('duration_analyzed', '0'),
+        'transcript': transcript.get('transcript', '[Error: transcript request failed]'),
+        'dimensions': dimensions,
+        'scenes': overview.get('scenes', []),
+        'summary': overview.get('summary', {'recommendations': ['Re-analyze this ad individually']}),
+        'temporal_analysis': overview.get('temporal_analysis', {})
+    }
+
+    failed = [part for part, reply in replies.items() if not isinstance(reply, dict)]
+    if failed:
+        result['split_failed'] = failed
+    return result
@@ -0,0 +1,136 @@
+"""
+Low-resolution analysis proxies for video ads.
+
+Gemini samples video at about 1 frame per second and doesn't need full HD
+to judge an ad, so uploading the original download (up to 200MB) mostly
+costs upload time and server-side processing. This module transcodes a
+small, low-fps, audio-preserving mp4 with ffmpeg and caches it next to the
+original (video.mp4 -> video.proxy.mp4), with the settings it was made
+with in video.proxy.json so a settings change re-creates it.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, Union
+
+from config import video_config
+
+PROXY_SUFFIX = '.proxy.mp4'
+PROXY_SETTINGS_SUFFIX = '.proxy.json'
+
+# Encoder settings (not configurable, but part of what a cached proxy is)
+PROXY_PRESET = 'veryfast'
+PROXY_CRF = 30
+
+
+def proxy_path_for(video_path: Union[str, Path]) -> Path:
+    """Return where the proxy for a video is cached (next to the original)"""
+    video_path = Path(video_path)
+    return video_path.with_name(video_path.stem + PROXY_SUFFIX)
+
+
+def proxy_settings_path_for(video_path: Union[str, Path]) -> Path:
+    """Return where the settings of a video's cached proxy are kept"""
+    video_path = Path(video_path)
+    return video_path.with_name(video_path.stem + PROXY_SETTINGS_SUFFIX)
+
+
+def proxy_settings() -> Dict:
+    """Everything that determines a proxy's content, from video_config"""
+    return {
+        'height': video_config.proxy_height,
+        'fps': video_config.proxy_fps,
+        'audio_kbps': video_config.proxy_audio_kbps,
+        'preset': PROXY_PRESET,
+        'crf': PROXY_CRF
+    }
+
+
+def is_proxy_fresh(video_path: Union[str, Path]) -> bool:
+    """True if a cached proxy exists, is newer than the original and was made with the current settings"""
+    proxy_path = proxy_path_for(video_path)
+    if not proxy_path.exists():
+        return False
+    if proxy_path.stat().st_mtime < Path(video_path).stat().st_mtime:
+        return False
+    try:
+        with open(proxy_settings_path_for(video_path), 'r') as f:
+            return json.load(f) == proxy_settings()
+    except (OSError, json.JSONDecodeError):
+        # Made before settings were recorded
+        return False
+
+
+def make_proxy(video_path: Union[str, Path]) -> Path:
+    """
+    Create (or reuse) the analysis proxy for a video.
+
+    The proxy is scaled down to video_config.proxy_height (never up),
+    resampled to video_config.proxy_fps and re-encoded with mono AAC audio,
+    so transcripts and audio cues survive.
+
+    Args:
+        video_path: Path to the original video
+
+    Returns:
+        Path to the proxy, or the original path if ffmpeg is unavailable
+        or the transcode fails (the proxy stage is optional)
+    """
+    video_path = Path(video_path)
+    proxy_path = proxy_path_for(video_path)
+
+    if is_proxy_fresh(video_path):
+        return proxy_path
+
+    if not shutil.which('ffmpeg'):
+        print("⚠️ ffmpeg not found - uploading original video")
+        return video_path
+
+    # Write to a temp name first so an interrupted run never leaves a
+    # truncated proxy that looks fresh
+    tmp_path = proxy_path.with_name(proxy_path.name + '.part')
+
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-i', str(video_path),
+        '-vf', f"scale=-2:'min({video_config.proxy_height},ih)',fps={video_config.proxy_fps}",
+        '-c:v', 'libx264', '-preset', PROXY_PRESET, '-crf', str(PROXY_CRF),
+        '-c:a', 'aac', '-b:a', f'{video_config.proxy_audio_kbps}k', '-ac', '1',
+        '-movflags', '+faststart',
+        '-f', 'mp4',
+        str(tmp_path)
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+
+    if result.returncode != 0 or not tmp_path.exists():
+        print(f"⚠️ Proxy transcode failed, uploading original: {result.stderr.strip()[:200]}")
+        try:
+            os.remove(tmp_path)
+        except:
+            pass
+        return video_path
+
+    os.replace(tmp_path, proxy_path)
+    with open(proxy_settings_path_for(video_path), 'w') as f:
+        json.dump(proxy_settings(), f)
+
+    original_mb = video_path.stat().st_size / (1024 * 1024)
+    proxy_mb = proxy_path.stat().st_size / (1024 * 1024)
+    print(f"  🎞️ Proxy: {original_mb:.1f} MB → {proxy_mb:.1f} MB")
+
+    return proxy_path
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python video_proxy.py <video.mp4> [...]")
+        sys.exit(1)
+
+    for path in sys.argv[1:]:
+        print(f"{path} → {make_proxy(path)}")
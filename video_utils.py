@@ -4,82 +4,40 @@ Utility functions for video processing.
 
 import subprocess
 import json
-from typing import Dict, Tuple, Optional
+from pathlib import Path
+from typing import Dict, Tuple, Optional, Union
 import tempfile
 import os
 
-def get_video_metadata(video_bytes: bytes) -> Dict:
+from container_probe import probe_container
+
+def get_video_metadata(video: Union[bytes, bytearray, memoryview, str, Path]) -> Dict:
     """
-    Extract video metadata using ffprobe.
+    Extract video metadata.
+
+    Reads the container headers directly (see container_probe.py) and only
+    spawns ffprobe when the container is unusual.
 
     Args:
-        video_bytes: Video file as bytes
+        video: Video file as bytes/buffer, or a path to the file
 
     Returns:
         Dictionary with duration, size_mb, width, height, fps, codec
     """
+    metadata = probe_container(video)
+    if metadata is not None:
+        return metadata
+
+    if isinstance(video, (str, Path)):
+        return _ffprobe_metadata(str(video), os.path.getsize(video))
+
     # Write to temp file for ffprobe
     with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp:
-        tmp.write(video_bytes)
+        tmp.write(video)
         tmp_path = tmp.name
 
     try:
-        cmd = [
-            'ffprobe', '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format', '-show_streams',
-            tmp_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            # If ffprobe fails, return basic info
-            return {
-                'duration': 0,
-                'size_mb': len(video_bytes) / (1024 * 1024),
-                'width': 0,
-                'height': 0,
-                'fps': 0,
-                'codec': 'unknown'
-            }
-
-        metadata = json.loads(result.stdout)
-
-        # Find video stream
-        video_stream = None
-        for stream in metadata.get('streams', []):
-            if stream.get('codec_type') == 'video':
-                video_stream = stream
-                break
-
-        if not video_stream:
-            return {
-                'duration': float(metadata.get('format', {}).get('duration', 0)),
-                'size_mb': len(video_bytes) / (1024 * 1024),
-                'width': 0,
-                'height': 0,
-                'fps': 0,
-                'codec': 'unknown'
-            }
-
-        # Parse frame rate (can be "30/1" format)
-        fps_str = video_stream.get('r_frame_rate', '0/1')
-        try:
-            num, den = fps_str.split('/')
-            fps = float(num) / float(den) if float(den) != 0 else 0
-        except:
-            fps = 0
-
-        return {
-            'duration': float(metadata.get('format', {}).get('duration', 0)),
-            'size_mb': len(video_bytes) / (1024 * 1024),
-            'width': video_stream.get('width', 0),
-            'height': video_stream.get('height', 0),
-            'fps': fps,
-            'codec': video_stream.get('codec_name', 'unknown')
-        }
-
+        return _ffprobe_metadata(tmp_path, len(video))
     finally:
         # Clean up temp file
         try:
@@ -88,13 +46,75 @@ def get_video_metadata(video_bytes: bytes) -> Dict:
             pass
 
 
-def validate_video(video_bytes: bytes, max_size_mb: int = 200,
+def _ffprobe_metadata(path: str, size_bytes: int) -> Dict:
+    """Extract video metadata by running ffprobe on a file"""
+    cmd = [
+        'ffprobe', '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format', '-show_streams',
+        path
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        result = None
+
+    if result is None or result.returncode != 0:
+        # If ffprobe fails, return basic info
+        return {
+            'duration': 0,
+            'size_mb': size_bytes / (1024 * 1024),
+            'width': 0,
+            'height': 0,
+            'fps': 0,
+            'codec': 'unknown'
+        }
+
+    metadata = json.loads(result.stdout)
+
+    # Find video stream
+    video_stream = None
+    for stream in metadata.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            video_stream = stream
+            break
+
+    if not video_stream:
+        return {
+            'duration': float(metadata.get('format', {}).get('duration', 0)),
+            'size_mb': size_bytes / (1024 * 1024),
+            'width': 0,
+            'height': 0,
+            'fps': 0,
+            'codec': 'unknown'
+        }
+
+    # Parse frame rate (can be "30/1" format)
+    fps_str = video_stream.get('r_frame_rate', '0/1')
+    try:
+        num, den = fps_str.split('/')
+        fps = float(num) / float(den) if float(den) != 0 else 0
+    except:
+        fps = 0
+
+    return {
+        'duration': float(metadata.get('format', {}).get('duration', 0)),
+        'size_mb': size_bytes / (1024 * 1024),
+        'width': video_stream.get('width', 0),
+        'height': video_stream.get('height', 0),
+        'fps': fps,
+        'codec': video_stream.get('codec_name', 'unknown')
+    }
+
+
+def validate_video(video_bytes: Union[bytes, str, Path], max_size_mb: int = 200,
                    max_duration: int = 180) -> Tuple[bool, str, Optional[Dict]]:
     """
     Validate video meets requirements.
 
     Args:
-        video_bytes: Video file as bytes
+        video_bytes: Video file as bytes, or a path to the file
         max_size_mb: Maximum file size in MB
         max_duration: Maximum duration in seconds
 